@@ -1,13 +1,11 @@
 from __future__ import annotations
 
-import io
+from dataclasses import replace
 from pathlib import Path
-from typing import Optional
 
 import streamlit as st
 from dotenv import load_dotenv
 
-import os
 import sys
 
 # Ensure src/ is on sys.path when running on platforms that do not install the package automatically
@@ -16,13 +14,30 @@ src_dir = repo_root / "src"
 if src_dir.exists() and str(src_dir) not in sys.path:
     sys.path.insert(0, str(src_dir))
 
+from euri_codegen.cache import CompletionCache, DEFAULT_CACHE_PATH
 from euri_codegen.config import Settings
 from euri_codegen.euri_client import Euri
+from euri_codegen.hedging import HedgePolicy, LatencyTracker
 from euri_codegen.catalog_loader import load_catalog
-from euri_codegen.codegen.generator import generate_code_for_topic, explain_code
-from euri_codegen.codegen.optimizer import optimize_code
-from euri_codegen.models import validate_specs
-
+from euri_codegen.catalog_store import catalog_paths
+from euri_codegen.codegen.artifacts import bundle_bytes, read_artifacts, write_artifacts
+from euri_codegen.codegen.generator import (
+    generate_topic_artifacts,
+    explain_code,
+    explain_code_chunked,
+    explain_code_stream,
+    strip_code_fences_stream,
+)
+from euri_codegen.codegen.optimizer import (
+    optimize_code,
+    optimize_code_chunked,
+    optimize_code_stream,
+)
+from euri_codegen.codegen.rewrites import RULES, apply_rules
+from euri_codegen.semantic_cache import DEFAULT_SEMANTIC_CACHE_PATH, SemanticCache
+from euri_codegen.telemetry import DEFAULT_TELEMETRY_PATH, Telemetry
+from euri_codegen.codegen.jobs import JobRunner, JobStore
+from euri_codegen.models import Spec, validate_specs
 
 # Load env variables from .env if present
 load_dotenv()
@@ -37,24 +52,108 @@ with st.sidebar:
     try:
         settings = Settings.load()
         st.success("EURI_API_KEY found")
-    except Exception as e:
+    except Exception:
         st.error("EURI_API_KEY not configured. Please set it in Streamlit Secrets or environment.")
         st.caption("Admin: In Streamlit Cloud, open Settings → Secrets and add EURI_API_KEY.")
         st.stop()
 
-    temp = st.slider("Temperature", min_value=0.0, max_value=1.0, value=settings.temperature, step=0.05)
-    max_tokens = st.number_input("Max tokens", min_value=256, max_value=32000, value=settings.max_tokens, step=256)
-    model = st.selectbox("Model", ["gpt-4.1-nano", "gpt-4.1-mini", "gemini-2.5-flash"], index=0)
+    temp = st.slider(
+        "Temperature", min_value=0.0, max_value=1.0, value=settings.temperature, step=0.05
+    )
+    max_tokens = st.number_input(
+        "Max tokens", min_value=256, max_value=32000, value=settings.max_tokens, step=256
+    )
+    model_choices = ["gpt-4.1-nano", "gpt-4.1-mini", "gemini-2.5-flash"]
+    model = st.selectbox("Model", model_choices, index=0)
+    hedge_with = st.multiselect(
+        "Hedge with",
+        [m for m in model_choices if m != model],
+        help=(
+            "If the model is slower than its usual p95, also ask these and keep the first "
+            "valid answer."
+        ),
+    )
     out_dir = Path(st.text_input("Output directory", value="generated"))
+    use_cache = st.checkbox("Use completion cache", value=True)
+
+
+@st.cache_resource(show_spinner=False)
+def get_completion_cache(path: str) -> CompletionCache:
+    return CompletionCache(Path(path))
+
+
+@st.cache_resource(show_spinner=False)
+def get_semantic_cache(path: str) -> SemanticCache:
+    # Re-uploads that differ only in formatting, comments or docstrings reuse earlier results.
+    return SemanticCache(Path(path))
+
+
+@st.cache_resource(show_spinner=False)
+def get_latency_tracker() -> LatencyTracker:
+    # Shared across reruns and sessions so hedge deadlines keep learning.
+    return LatencyTracker()
+
+
+# Memoized per sidebar choice: every setting that changes requests is part of the key.
+# HTTP clients and their keep-alive connections come from the process-wide client pool.
+@st.cache_resource(show_spinner=False, max_entries=16)
+def get_euri(
+    _settings: Settings,
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    use_cache: bool,
+    hedge_models: tuple = (),
+) -> Euri:
+    cfg = replace(_settings, model=model, temperature=temperature, max_tokens=max_tokens)
+    cache_path = Path(_settings.cache_path or DEFAULT_CACHE_PATH)
+    cache = get_completion_cache(str(cache_path)) if use_cache else None
+    semantic = (
+        get_semantic_cache(str(cache_path.with_name(DEFAULT_SEMANTIC_CACHE_PATH.name)))
+        if use_cache
+        else None
+    )
+    telemetry = Telemetry(
+        Path(_settings.telemetry_path or DEFAULT_TELEMETRY_PATH), command="streamlit"
+    )
+    hedge = (
+        HedgePolicy([model, *hedge_models], tracker=get_latency_tracker()) if hedge_models else None
+    )
+    return Euri(cfg, cache=cache, semantic=semantic, telemetry=telemetry, hedge=hedge)
+
+
+euri = get_euri(settings, model, float(temp), int(max_tokens), use_cache, tuple(hedge_with))
+
+
+def _catalog_stamp() -> tuple:
+    # Cheap stat of the catalog files: cached specs are reloaded only when one changes.
+    return tuple((str(p), p.stat().st_mtime_ns) for p in catalog_paths())
+
+
+@st.cache_data(show_spinner=False)
+def load_specs_data(stamp: tuple) -> list:
+    return load_catalog()
+
+
+@st.cache_data(show_spinner=False)
+def load_specs(stamp: tuple) -> list[Spec]:
+    return validate_specs(load_specs_data(stamp))
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def job_bundle(stamp: tuple) -> bytes:
+    # Keyed on (path, mtime) of every generated file, so the fragment's reruns reuse the archive.
+    return bundle_bytes(read_artifacts(path for path, _ in stamp))
+
 
-# Memoize Euri client
 @st.cache_resource(show_spinner=False)
-def get_euri(_settings: Settings) -> Euri:
-    cfg = Settings(api_key=_settings.api_key, model=model, temperature=temp, max_tokens=max_tokens)
-    return Euri(cfg)
+def get_job_runner() -> JobRunner:
+    # Jobs run on background threads of the server process and persist their state, so bulk
+    # generation survives reruns, other tabs and (with Resume) a server restart.
+    return JobRunner(JobStore())
 
 
-euri = get_euri(settings)
+runner = get_job_runner()
 
 # Tabs for features
 tab_gen, tab_opt, tab_explain, tab_catalog, tab_doctor = st.tabs(
@@ -64,9 +163,10 @@ tab_gen, tab_opt, tab_explain, tab_catalog, tab_doctor = st.tabs(
 
 with tab_gen:
     st.subheader("Generate DSA Implementation + Tests")
-    specs_data = load_catalog()
+    stamp = _catalog_stamp()
+    specs_data = load_specs_data(stamp)
     try:
-        specs = validate_specs(specs_data)
+        specs = load_specs(stamp)
     except Exception as e:
         st.error(f"Catalog validation failed: {e}")
         st.stop()
@@ -74,91 +174,218 @@ with tab_gen:
     id_to_spec = {s.id: s for s in specs}
     topic_id = st.selectbox("Topic", options=list(id_to_spec.keys()))
     do_all = st.checkbox("Generate all topics", value=False)
+    concurrency = st.slider(
+        "Parallel topics", min_value=1, max_value=16, value=4, disabled=not do_all
+    )
+    llm_tests = st.selectbox(
+        "Model-written edge-case tests",
+        ["auto", "always", "never"],
+        help=(
+            "Tests always include the spec's examples; 'auto' asks the model only for specs "
+            "without examples."
+        ),
+    )
 
     if st.button("Generate", type="primary"):
         out_dir.mkdir(parents=True, exist_ok=True)
         if do_all:
-            for sp in specs:
-                with st.status(f"Generating {sp.id}…", expanded=False):
-                    try:
-                        module_path, test_path = generate_code_for_topic(
-                            euri, sp.model_dump(), out_dir
-                        )
-                        st.success(f"OK: {module_path} | {test_path}")
-                    except Exception as ex:
-                        st.error(f"Failed {sp.id}: {ex}")
+            st.session_state["job_id"] = runner.submit(
+                euri, specs, out_dir, concurrency=concurrency, llm_tests=llm_tests
+            )
         else:
             sp = id_to_spec[topic_id]
             with st.spinner(f"Generating {sp.id}…"):
                 try:
-                    module_path, test_path = generate_code_for_topic(
-                        euri, sp.model_dump(), out_dir
+                    module, tests = generate_topic_artifacts(
+                        euri, sp.model_dump(), llm_tests=llm_tests
                     )
+                    module_path, test_path = write_artifacts([module, tests], out_dir)
                 except Exception as ex:
                     st.error(f"Generation failed: {ex}")
                 else:
-                    code = Path(module_path).read_text(encoding="utf-8")
-                    tests = Path(test_path).read_text(encoding="utf-8")
+                    # Shown and downloaded from memory; the files on disk are not read back.
                     st.success(f"Generated: {module_path}")
-                    st.code(code, language="python")
+                    st.code(module.content, language="python")
                     st.download_button(
-                        "Download module", data=code, file_name=Path(module_path).name, mime="text/x-python"
+                        "Download module",
+                        data=module.content,
+                        file_name=module.name,
+                        mime="text/x-python",
                     )
                     st.divider()
                     st.success(f"Tests: {test_path}")
-                    st.code(tests, language="python")
+                    st.code(tests.content, language="python")
                     st.download_button(
-                        "Download tests", data=tests, file_name=Path(test_path).name, mime="text/x-python"
+                        "Download tests",
+                        data=tests.content,
+                        file_name=tests.name,
+                        mime="text/x-python",
                     )
 
+    jobs = runner.store.recent()
+    if jobs:
+        labels = {j.id: f"{j.id} · {j.status} · {len(j.topics)} topic(s)" for j in jobs}
+        current = st.session_state.get("job_id")
+        job_ids = list(labels)
+        st.divider()
+        job_id = st.selectbox(
+            "Bulk generation job",
+            job_ids,
+            index=job_ids.index(current) if current in labels else 0,
+            format_func=labels.get,
+        )
+        st.session_state["job_id"] = job_id
+
+        # Reruns only this block every second; the rest of the page stays as it is.
+        @st.fragment(run_every=1.0)
+        def job_progress(job_id: str) -> None:
+            job = runner.store.get(job_id)
+            if job is None:
+                st.warning(f"Job {job_id} not found")
+                return
+            counts = job.counts()
+            summary = ", ".join(
+                f"{counts[s]} {s}" for s in ("done", "failed", "running", "queued", "cancelled")
+            )
+            st.progress(job.progress, text=f"{job.status}: {summary}")
+            st.dataframe(
+                [
+                    {
+                        "Topic": t.topic,
+                        "Status": t.status,
+                        "Seconds": round(t.seconds, 1),
+                        "Module": t.module_path or "",
+                        "Error": t.error or "",
+                    }
+                    for t in job.topics
+                ],
+                hide_index=True,
+                use_container_width=True,
+            )
+            left, right = st.columns(2)
+            if not job.finished and left.button("Cancel", key=f"cancel-{job.id}"):
+                if not runner.cancel(job.id):
+                    st.warning(
+                        f"Job {job.id} is run by another process and cannot be cancelled here"
+                    )
+            unfinished = len(job.topics) - counts["done"]
+            if job.finished and unfinished:
+                if right.button(f"Resume ({unfinished} topic(s))", key=f"resume-{job.id}"):
+                    runner.resume(euri, job.id)
+            paths = [
+                Path(p)
+                for t in job.topics
+                if t.status == "done"
+                for p in (t.module_path, t.test_path)
+                if p
+            ]
+            if job.finished and paths and all(p.exists() for p in paths):
+                st.download_button(
+                    f"Download bundle ({len(paths)} files, .zip)",
+                    data=job_bundle(tuple((str(p), p.stat().st_mtime_ns) for p in paths)),
+                    file_name=f"euri_{job.id}.zip",
+                    mime="application/zip",
+                    key=f"bundle-{job.id}",
+                )
+
+        job_progress(job_id)
+
 
 with tab_opt:
     st.subheader("Optimize Python File")
-    uploaded = st.file_uploader("Upload a .py file to optimize", type=["py"]) 
-    level = st.selectbox("Level", ["all", "one", "readability", "performance", "memory"], index=0)
+    uploaded = st.file_uploader("Upload a .py file to optimize", type=["py"])
+    level = st.selectbox(
+        "Level", ["all", "one", "readability", "performance", "memory", "offline"], index=0
+    )
+    opt_chunked = st.checkbox("Large file: optimize functions/classes in parallel", value=False)
+    opt_rules = st.multiselect(
+        "Local rewrite rules (run first; applied only where they provably keep behaviour)",
+        sorted(RULES),
+    )
 
     if st.button("Optimize", type="primary"):
         if not uploaded:
             st.warning("Please upload a .py file.")
+        elif level == "offline" and not opt_rules:
+            st.warning("Offline optimization needs at least one local rewrite rule.")
         else:
-            code_text = uploaded.read().decode("utf-8")
-            with st.spinner("Optimizing…"):
-                try:
-                    new_code = optimize_code(euri, code_text, level=level)  # strips code fences internally
-                except Exception as ex:
-                    st.error(f"Optimization failed: {ex}")
+            code_text, applied = apply_rules(uploaded.read().decode("utf-8"), opt_rules)
+            for r in applied:
+                st.caption(f"Local rewrite, line {r.line}: {r.rule} ({r.detail})")
+            placeholder = st.empty()
+            completion = None
+            try:
+                if level == "offline":
+                    new_code = code_text
+                elif opt_chunked:
+                    with st.spinner("Optimizing chunks in parallel…"):
+                        new_code = optimize_code_chunked(euri, code_text, level=level)
+                elif euri.hedged:  # streams are never hedged
+                    with st.spinner("Optimizing (hedged, so not streamed)…"):
+                        new_code = optimize_code(euri, code_text, level=level)
                 else:
-                    st.success("Optimized code:")
-                    st.code(new_code, language="python")
-                    st.download_button(
-                        "Download optimized.py",
-                        data=new_code,
-                        file_name="optimized.py",
-                        mime="text/x-python",
+                    completion = optimize_code_stream(euri, code_text, level=level)
+                    new_code = ""
+                    for chunk in strip_code_fences_stream(completion):
+                        new_code += chunk
+                        placeholder.code(new_code, language="python")
+            except Exception as ex:
+                st.error(f"Optimization failed: {ex}")
+            else:
+                st.success("Optimized code:")
+                placeholder.code(new_code, language="python")
+                if completion is not None:
+                    st.caption(
+                        f"First token {completion.ttft or 0:.2f}s · total "
+                        f"{completion.total_seconds or 0:.2f}s"
                     )
+                st.download_button(
+                    "Download optimized.py",
+                    data=new_code,
+                    file_name="optimized.py",
+                    mime="text/x-python",
+                )
 
 
 with tab_explain:
     st.subheader("Explain Python Code")
     uploaded2 = st.file_uploader("Upload a .py file to explain", type=["py"], key="explain_upl")
+    explain_chunked = st.checkbox(
+        "Large file: explain parts in parallel, then combine", value=False
+    )
     if st.button("Explain", type="primary"):
         if not uploaded2:
             st.warning("Please upload a .py file.")
         else:
             code_text = uploaded2.read().decode("utf-8")
-            with st.spinner("Explaining…"):
-                try:
-                    explanation = explain_code(euri, code_text)
-                except Exception as ex:
-                    st.error(f"Explain failed: {ex}")
-                else:
+            completion = None
+            try:
+                if explain_chunked:
+                    with st.spinner("Explaining parts in parallel…"):
+                        explanation = explain_code_chunked(euri, code_text)
                     st.text(explanation)
-                    st.download_button(
-                        "Download explanation.txt",
-                        data=explanation,
-                        file_name="explanation.txt",
-                        mime="text/plain",
+                elif euri.hedged:  # streams are never hedged
+                    with st.spinner("Explaining (hedged, so not streamed)…"):
+                        explanation = explain_code(euri, code_text)
+                    st.text(explanation)
+                else:
+                    completion = explain_code_stream(euri, code_text)
+                    st.write_stream(completion)
+                    explanation = completion.text
+            except Exception as ex:
+                st.error(f"Explain failed: {ex}")
+            else:
+                if completion is not None:
+                    st.caption(
+                        f"First token {completion.ttft or 0:.2f}s · total "
+                        f"{completion.total_seconds or 0:.2f}s"
                     )
+                st.download_button(
+                    "Download explanation.txt",
+                    data=explanation,
+                    file_name="explanation.txt",
+                    mime="text/plain",
+                )
 
 
 with tab_catalog:
@@ -180,5 +407,18 @@ with tab_doctor:
     st.write(f"Default model: {model}")
     st.write(f"Temperature: {temp}")
     st.write(f"Max tokens: {max_tokens}")
+    if euri.cache is not None:
+        cache_stats = euri.cache.stats()
+        st.write(
+            f"Completion cache: {cache_stats['entries']} entries, "
+            f"{cache_stats['hits']} hit(s) / {cache_stats['misses']} miss(es) this session"
+        )
+    if euri.semantic is not None:
+        sem = euri.semantic.stats()
+        st.write(
+            f"Semantic cache (optimize/explain by normalized AST): {sem['entries']} entries, "
+            f"hit rate {sem['hit_rate']:.0%} "
+            f"({sem['hits']} hit(s) / {sem['misses']} miss(es) overall)"
+        )
     if ok:
         st.success("Environment looks good.")
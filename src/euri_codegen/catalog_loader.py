@@ -1,14 +1,14 @@
 from __future__ import annotations
 
-import json
-from importlib import resources
 from typing import Any, List
 
+from .catalog_store import open_catalog
+
 
 def load_catalog() -> List[dict[str, Any]]:
-    with resources.files("euri_codegen.catalog").joinpath("dsa_catalog.json").open("r", encoding="utf-8") as f:
-        return json.load(f)
+    """Every spec as a plain dict, from the indexed store (:mod:`euri_codegen.catalog_store`)."""
+    return open_catalog().raw()
 
 
 def list_topics() -> list[str]:
-    return [item["id"] for item in load_catalog()]
+    return open_catalog().ids()
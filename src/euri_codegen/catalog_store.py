@@ -0,0 +1,291 @@
+"""Indexed catalog store: spec files compiled into SQLite with an id and tag index.
+
+JSON (a list of specs) and JSON Lines catalogs are parsed once and written to a
+cache database next to the completion cache. Later opens only ``stat`` the
+source files; a changed mtime/size triggers a content-hash check, and only
+changed content triggers a rebuild. Specs are decoded and validated one at a
+time, on first access.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from importlib import resources
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from .models import Spec
+
+DEFAULT_CATALOG_CACHE_DIR = Path.home() / ".cache" / "euri_codegen" / "catalogs"
+# Bump when the database layout changes so old caches are rebuilt.
+SCHEMA_VERSION = "1"
+
+
+def builtin_catalog_path() -> Path:
+    return Path(str(resources.files("euri_codegen.catalog").joinpath("dsa_catalog.json")))
+
+
+def catalog_paths(extra: Optional[Sequence[Path]] = None) -> List[Path]:
+    """The built-in catalog then ``extra`` files, or ``EURI_CATALOG`` (os.pathsep-separated)."""
+    if not extra:
+        env = os.getenv("EURI_CATALOG", "")
+        extra = [Path(p) for p in env.split(os.pathsep) if p.strip()]
+    return [builtin_catalog_path(), *(Path(p) for p in extra)]
+
+
+def _iter_specs(path: Path) -> Iterator[Dict[str, Any]]:
+    with path.open("r", encoding="utf-8") as f:
+        if path.suffix == ".jsonl":
+            for n, line in enumerate(f, 1):
+                if line.strip():
+                    item = json.loads(line)
+                    if not isinstance(item, dict):
+                        raise ValueError(f"{path}:{n}: expected a JSON object per line")
+                    yield item
+            return
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError(f"{path}: expected a JSON list of specs")
+    yield from data
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _stat(path: Path) -> Tuple[int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+_SCHEMA = (
+    "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    "CREATE TABLE sources (pos INTEGER PRIMARY KEY, path TEXT NOT NULL, mtime_ns INTEGER NOT NULL,"
+    " size INTEGER NOT NULL, sha256 TEXT NOT NULL)",
+    "CREATE TABLE specs (id TEXT PRIMARY KEY, pos INTEGER NOT NULL, source INTEGER NOT NULL,"
+    " title TEXT NOT NULL, summary TEXT NOT NULL, data TEXT NOT NULL)",
+    "CREATE INDEX idx_specs_pos ON specs(pos)",
+    "CREATE TABLE tags (tag TEXT NOT NULL, id TEXT NOT NULL, pos INTEGER NOT NULL, "
+    "PRIMARY KEY (tag, pos))"
+    " WITHOUT ROWID",
+)
+
+
+def _build(conn: sqlite3.Connection, paths: Sequence[Path]) -> None:
+    """Load every source into ``conn``; a later file's spec replaces an earlier one with its id."""
+    for stmt in _SCHEMA:
+        conn.execute(stmt)
+    specs: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+    for source, path in enumerate(paths):
+        mtime_ns, size = _stat(path)
+        conn.execute(
+            "INSERT INTO sources VALUES (?, ?, ?, ?, ?)",
+            (source, str(path), mtime_ns, size, _sha256(path)),
+        )
+        for item in _iter_specs(path):
+            if not isinstance(item, dict) or not isinstance(item.get("id"), str):
+                raise ValueError(f"{path}: every spec needs a string 'id'")
+            specs.pop(item["id"], None)  # re-inserting moves an overridden id to its new position
+            specs[item["id"]] = (source, item)
+    rows: List[Tuple[Any, ...]] = []
+    tags: List[Tuple[str, str, int]] = []
+    for pos, (spec_id, (source, item)) in enumerate(specs.items()):
+        rows.append(
+            (
+                spec_id,
+                pos,
+                source,
+                str(item.get("title", "")),
+                str(item.get("summary", "")),
+                json.dumps(item, ensure_ascii=False, separators=(",", ":")),
+            )
+        )
+        tags.extend((str(tag), spec_id, pos) for tag in dict.fromkeys(item.get("tags") or []))
+    conn.executemany("INSERT INTO specs VALUES (?, ?, ?, ?, ?, ?)", rows)
+    conn.executemany("INSERT INTO tags VALUES (?, ?, ?)", tags)
+    conn.execute("INSERT INTO meta VALUES ('schema', ?)", (SCHEMA_VERSION,))
+
+
+class CatalogStore:
+    """Read-only view of one or more catalog files; safe to share between threads."""
+
+    def __init__(
+        self, paths: Sequence[Path], *, cache_dir: Optional[Path] = DEFAULT_CATALOG_CACHE_DIR
+    ):
+        self.paths = [Path(p).resolve() for p in paths]
+        if not self.paths:
+            raise ValueError("CatalogStore needs at least one catalog file")
+        key = hashlib.sha256("\0".join(map(str, self.paths)).encode("utf-8")).hexdigest()[:16]
+        self.db_path = Path(cache_dir) / f"{key}.sqlite3" if cache_dir is not None else None
+        self.rebuilds = 0
+        self._lock = threading.Lock()
+        self._validated: Dict[str, Spec] = {}
+        self._conn = self._open()
+
+    # -- cache lifecycle -------------------------------------------------
+
+    def _connect(self, target: str) -> sqlite3.Connection:
+        return sqlite3.connect(target, check_same_thread=False, isolation_level=None)
+
+    def _open(self) -> sqlite3.Connection:
+        if self.db_path is not None:
+            try:
+                if self.db_path.exists():
+                    conn = self._connect(str(self.db_path))
+                    if self._is_fresh(conn):
+                        return conn
+                    conn.close()
+                return self._rebuild_file()
+            except (OSError, sqlite3.Error):
+                pass  # unwritable or corrupt cache: fall back to an in-memory index
+        conn = self._connect(":memory:")
+        conn.execute("BEGIN")
+        _build(conn, self.paths)
+        conn.execute("COMMIT")
+        self.rebuilds += 1
+        return conn
+
+    def _rebuild_file(self) -> sqlite3.Connection:
+        assert self.db_path is not None
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(self.db_path.parent), suffix=".sqlite3.tmp")
+        os.close(fd)
+        try:
+            conn = self._connect(tmp)
+            conn.execute("BEGIN")
+            _build(conn, self.paths)
+            conn.execute("COMMIT")
+            conn.close()
+            # Readers in other processes keep their old file; new opens see the new one.
+            os.replace(tmp, self.db_path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self.rebuilds += 1
+        return self._connect(str(self.db_path))
+
+    def _is_fresh(self, conn: sqlite3.Connection) -> bool:
+        try:
+            if conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone() != (
+                SCHEMA_VERSION,
+            ):
+                return False
+            sources = conn.execute(
+                "SELECT pos, path, mtime_ns, size, sha256 FROM sources ORDER BY pos"
+            ).fetchall()
+        except sqlite3.Error:
+            return False
+        if [Path(row[1]) for row in sources] != self.paths:
+            return False
+        touched = []
+        for pos, path, mtime_ns, size, digest in sources:
+            try:
+                stat = _stat(Path(path))
+            except OSError:
+                return False
+            if stat == (mtime_ns, size):
+                continue
+            # Touched but possibly unchanged (checkout, copy): compare content before rebuilding.
+            if stat[1] != size or _sha256(Path(path)) != digest:
+                return False
+            touched.append((*stat, pos))
+        if touched:
+            conn.executemany("UPDATE sources SET mtime_ns = ?, size = ? WHERE pos = ?", touched)
+        return True
+
+    def refresh(self) -> bool:
+        """Reopen (rebuilding if needed) when a source changed; returns True if it did."""
+        with self._lock:
+            if self._is_fresh(self._conn):
+                return False
+            self._conn.close()
+            self._validated.clear()
+            self._conn = self._open()
+            return True
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -- queries ---------------------------------------------------------
+
+    def _query(self, sql: str, args: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            return self._conn.execute(sql, args).fetchall()
+
+    def _tag_filter(self, tag: Optional[str]) -> Tuple[str, Tuple[Any, ...]]:
+        if tag is None:
+            return "SELECT {} FROM specs ORDER BY pos", ()
+        return (
+            "SELECT {} FROM specs WHERE id IN (SELECT id FROM tags WHERE tag = ?) ORDER BY pos",
+            (tag,),
+        )
+
+    def __len__(self) -> int:
+        return self._query("SELECT COUNT(*) FROM specs")[0][0]
+
+    def __contains__(self, spec_id: object) -> bool:
+        return bool(self._query("SELECT 1 FROM specs WHERE id = ?", (spec_id,)))
+
+    def ids(self, tag: Optional[str] = None) -> List[str]:
+        sql, args = self._tag_filter(tag)
+        return [row[0] for row in self._query(sql.format("id"), args)]
+
+    def summaries(self, tag: Optional[str] = None) -> List[Tuple[str, str, str]]:
+        """``(id, title, summary)`` rows in catalog order, without decoding the specs."""
+        sql, args = self._tag_filter(tag)
+        return self._query(sql.format("id, title, summary"), args)
+
+    def tags(self) -> Dict[str, int]:
+        return dict(self._query("SELECT tag, COUNT(*) FROM tags GROUP BY tag ORDER BY tag"))
+
+    def get(self, spec_id: str) -> Optional[Dict[str, Any]]:
+        """The raw spec dict (a fresh copy), or None."""
+        rows = self._query("SELECT data FROM specs WHERE id = ?", (spec_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def raw(self, tag: Optional[str] = None) -> List[Dict[str, Any]]:
+        sql, args = self._tag_filter(tag)
+        return [json.loads(row[0]) for row in self._query(sql.format("data"), args)]
+
+    def spec(self, spec_id: str) -> Spec:
+        """The validated spec; raises KeyError if unknown, pydantic's ValidationError if invalid."""
+        cached = self._validated.get(spec_id)
+        if cached is not None:
+            return cached
+        data = self.get(spec_id)
+        if data is None:
+            raise KeyError(spec_id)
+        from .models import Spec
+
+        spec = self._validated[spec_id] = Spec.model_validate(data)
+        return spec
+
+    def specs(self, tag: Optional[str] = None) -> List[Spec]:
+        return [self.spec(spec_id) for spec_id in self.ids(tag)]
+
+
+_stores: Dict[Tuple[Path, ...], CatalogStore] = {}
+_stores_lock = threading.Lock()
+
+
+def open_catalog(paths: Optional[Sequence[Path]] = None) -> CatalogStore:
+    """Process-wide store for ``paths`` (default :func:`catalog_paths`), kept fresh."""
+    resolved = tuple(Path(p).resolve() for p in catalog_paths(paths))
+    with _stores_lock:
+        store = _stores.get(resolved)
+        if store is None:
+            store = _stores[resolved] = CatalogStore(resolved)
+            return store
+    store.refresh()
+    return store
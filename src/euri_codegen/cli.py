@@ -1,22 +1,196 @@
 from __future__ import annotations
 
+import contextlib
 import json
+import os
+import time
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, List, Optional
 
 import typer
 from rich.console import Console
 from rich.table import Table
 
 from .config import Settings
-from .euri_client import Euri
-from .codegen.generator import generate_code_for_topic, explain_code
-from .codegen.optimizer import optimize_code
-from .catalog_loader import load_catalog, list_topics
-from .models import validate_specs, Spec
+from .cache import DEFAULT_CACHE_PATH
+from .semantic_cache import DEFAULT_SEMANTIC_CACHE_PATH
+from .telemetry import DEFAULT_TELEMETRY_PATH
+from .catalog_store import open_catalog
+from .perf.benchmark import DEFAULT_SIZES, HISTORY_NAME
+
+if TYPE_CHECKING:
+    from .catalog_store import CatalogStore
+    from .codegen.batch import TopicResult
+    from .euri_client import CompletionStream, Euri
+    from .hedging import HedgePolicy
+    from .models import Spec
+
+# Modules that pull in requests, the generator stack or pydantic are imported inside
+# the commands that use them, so offline commands (list-topics, models, ...) start fast.
 
 app = typer.Typer(add_completion=False)
 console = Console()
+_cache_opts = {"enabled": True, "refresh": False, "semantic": True}
+_telemetry_opts: dict = {"enabled": True, "command": None}
+_hedge_opts: dict = {"models": None}
+_catalog_opts: dict = {"paths": None}
+_daemon_opts: dict = {"enabled": False}
+
+
+@app.callback()
+def _global_options(
+    ctx: typer.Context,
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the completion cache entirely"),
+    refresh: bool = typer.Option(
+        False, "--refresh", help="Ignore cached completions but store new ones"
+    ),
+    no_semantic_cache: bool = typer.Option(
+        False,
+        "--no-semantic-cache",
+        help="Do not reuse optimize/explain results for code with the same AST",
+    ),
+    no_telemetry: bool = typer.Option(
+        False, "--no-telemetry", help="Do not record LLM call telemetry"
+    ),
+    hedge: Optional[str] = typer.Option(
+        None, "--hedge", help="Comma-separated fallback models to race when the primary is slow"
+    ),
+    catalog: Optional[List[Path]] = typer.Option(
+        None,
+        "--catalog",
+        help="Extra catalog file (.json or .jsonl) loaded after the built-in one; repeatable",
+    ),
+    via_daemon: bool = typer.Option(
+        False, "--via-daemon", help="Send generate/optimize/explain to a running `serve` daemon"
+    ),
+) -> None:
+    _cache_opts["enabled"] = not no_cache
+    _cache_opts["refresh"] = refresh
+    _cache_opts["semantic"] = not no_semantic_cache
+    _telemetry_opts["enabled"] = not no_telemetry
+    _telemetry_opts["command"] = ctx.invoked_subcommand
+    _hedge_opts["models"] = hedge
+    _catalog_opts["paths"] = catalog or None
+    _daemon_opts["enabled"] = via_daemon
+    if via_daemon:
+        # The daemon uses the cache, telemetry, hedge and catalog settings it was started with.
+        _reject_via_daemon(
+            no_cache=no_cache,
+            refresh=refresh,
+            no_semantic_cache=no_semantic_cache,
+            no_telemetry=no_telemetry,
+            hedge=hedge is not None,
+            catalog=bool(catalog),
+        )
+
+
+def _catalog() -> CatalogStore:
+    return open_catalog(_catalog_opts["paths"])
+
+
+def _find_spec(spec_id: str) -> Optional[Spec]:
+    try:
+        return _catalog().spec(spec_id)
+    except KeyError:
+        return None
+
+
+def _daemon_call(method: str, **params):
+    """Run ``method`` on the daemon; exits with a message when it is down or the call fails."""
+    from .daemon_client import DaemonClient, DaemonError, DaemonUnavailable
+
+    client = DaemonClient()
+    try:
+        return client.call(method, **params)
+    except DaemonUnavailable as e:
+        console.print(f"[red]{e}[/red] (start one with: python -m euri_codegen serve)")
+        raise typer.Exit(code=1)
+    except DaemonError as e:
+        console.print(f"[red]Daemon error:[/red] {e}")
+        raise typer.Exit(code=1)
+    finally:
+        client.close()
+
+
+def _reject_via_daemon(**flags: bool) -> None:
+    for name, used in flags.items():
+        if used:
+            raise typer.BadParameter(
+                f"--{name.replace('_', '-')} cannot be combined with --via-daemon"
+            )
+
+
+def _cache_path(settings: Optional[Settings] = None) -> Path:
+    path = settings.cache_path if settings is not None else os.getenv("EURI_CACHE_PATH")
+    return Path(path) if path else DEFAULT_CACHE_PATH
+
+
+def _semantic_cache_path(settings: Optional[Settings] = None) -> Path:
+    # Lives next to the completion cache, so EURI_CACHE_PATH moves both.
+    return _cache_path(settings).with_name(DEFAULT_SEMANTIC_CACHE_PATH.name)
+
+
+def _telemetry_path(settings: Optional[Settings] = None) -> Path:
+    path = settings.telemetry_path if settings is not None else os.getenv("EURI_TELEMETRY_PATH")
+    return Path(path) if path else DEFAULT_TELEMETRY_PATH
+
+
+def _make_euri(settings: Settings) -> Euri:
+    from .cache import CompletionCache
+    from .euri_client import Euri
+    from .semantic_cache import SemanticCache
+    from .telemetry import Telemetry
+
+    cache = CompletionCache(_cache_path(settings)) if _cache_opts["enabled"] else None
+    semantic = (
+        SemanticCache(_semantic_cache_path(settings))
+        if _cache_opts["enabled"] and _cache_opts["semantic"]
+        else None
+    )
+    telemetry = (
+        Telemetry(_telemetry_path(settings), command=_telemetry_opts["command"])
+        if _telemetry_opts["enabled"]
+        else None
+    )
+    return Euri(
+        settings,
+        cache=cache,
+        semantic=semantic,
+        refresh=bool(_cache_opts["refresh"]),
+        telemetry=telemetry,
+        hedge=_hedge_policy(settings),
+    )
+
+
+def _hedge_policy(settings: Settings) -> Optional[HedgePolicy]:
+    from .hedging import HedgePolicy
+    from .telemetry import load_records
+
+    names = _hedge_opts["models"] or settings.hedge_models
+    fallbacks = [
+        m.strip() for m in (names or "").split(",") if m.strip() and m.strip() != settings.model
+    ]
+    if not fallbacks:
+        return None
+    policy = HedgePolicy([settings.model, *fallbacks], percentile=settings.hedge_percentile)
+    # Start from the last week's latencies so deadlines are meaningful from the first call.
+    records = load_records(_telemetry_path(settings), since=time.time() - 7 * 24 * 3600)
+    policy.tracker.seed(
+        (r.model, r.latency_s)
+        for r in records
+        if r.status == "ok" and not r.cached and not r.streamed
+    )
+    return policy
+
+
+def _print_cache_counters(euri: Euri) -> None:
+    if euri.cache is not None:
+        console.print(f"[dim]cache: {euri.cache.hits} hit(s), {euri.cache.misses} miss(es)[/dim]")
+    if euri.semantic is not None and euri.semantic.hits + euri.semantic.misses:
+        console.print(
+            f"[dim]semantic cache: {euri.semantic.hits} hit(s), "
+            f"{euri.semantic.misses} miss(es)[/dim]"
+        )
 
 
 @app.command("doctor")
@@ -29,22 +203,26 @@ def doctor() -> None:
         console.print("[green]Environment looks good![/green]")
     except Exception as e:
         console.print(f"[red]Config error:[/red] {e}")
-        console.print("Set the key with: $env:EURI_API_KEY = \"<your-key>\"")
+        console.print('Set the key with: $env:EURI_API_KEY = "<your-key>"')
         raise typer.Exit(code=1)
 
 
 @app.command("list-topics")
-def cmd_list_topics() -> None:
-    data = load_catalog()
-    # Validate for early feedback
-    _ = validate_specs(data)
-    table = Table(title="DSA Topics")
+def cmd_list_topics(
+    tag: Optional[str] = typer.Option(None, help="Only topics with this tag")
+) -> None:
+    """List catalog topics (validation is left to validate-catalog)."""
+    store = _catalog()
+    table = Table(title="DSA Topics" if tag is None else f"DSA Topics tagged {tag!r}")
     table.add_column("ID")
     table.add_column("Title")
     table.add_column("Summary")
-    for item in data:
-        table.add_row(item["id"], item["title"], item["summary"])
+    for spec_id, title, summary in store.summaries(tag):
+        table.add_row(spec_id, title, summary)
     console.print(table)
+    tags = store.tags()
+    if tags:
+        console.print("[dim]Tags: " + ", ".join(f"{t} ({n})" for t, n in tags.items()) + "[/dim]")
 
 
 @app.command("models")
@@ -59,19 +237,43 @@ def cmd_models() -> None:
     console.print(table)
 
 
-@app.command("integrations")
-def cmd_integrations() -> None:
-    """Show how to enable optional framework integrations."""
-    console.rule("Euri AI Integrations")
-    console.print("Install extras as needed:")
-    console.print("- euriai[autogen]    # AutoGen integration")
-    console.print("- euriai[crewai]     # CrewAI integration")
-    console.print("- euriai[langchain]  # LangChain integration")
-    console.print("- euriai[smolagents] # SmolAgents integration")
-    console.print("- euriai[langgraph]  # LangGraph integration")
-    console.print("- euriai[llama-index] # LlamaIndex integration")
-    console.print("- euriai[all]        # Install all integrations")
-    console.print("\nThen import from euriai.<framework> as shown in docs.")
+def _fingerprint(
+    spec: Spec, settings: Settings, max_tokens: Optional[int], llm_tests: str = "auto"
+) -> str:
+    from .codegen.manifest import fingerprint
+
+    return fingerprint(
+        spec,
+        model=settings.model,
+        temperature=settings.temperature,
+        max_tokens=max_tokens or settings.max_tokens,
+        llm_tests=llm_tests,
+    )
+
+
+def _check_llm_tests(value: str) -> str:
+    if value not in ("auto", "always", "never"):
+        raise typer.BadParameter("expected auto, always or never")
+    return value
+
+
+def _check_complexity(spec: Spec, module_path: Path) -> Optional[str]:
+    """Run the empirical complexity check; return a failure message or None."""
+    from .perf.complexity import verify_module_complexity
+    from .perf.inputs import function_name
+
+    if function_name(spec) is None:
+        console.print(f"[dim]{spec.id}: complexity check skipped (class spec)[/dim]")
+        return None
+    try:
+        report = verify_module_complexity(module_path, spec)
+    except Exception as e:
+        return f"complexity check failed to run: {e}"
+    console.print(
+        f"[dim]{spec.id}: measured time O({report.time_class}) / space O({report.space_class}); "
+        f"spec O({report.time_bound or '?'}) / O({report.space_bound or '?'})[/dim]"
+    )
+    return "; ".join(report.problems) or None
 
 
 @app.command("generate")
@@ -79,52 +281,316 @@ def cmd_generate(
     topic: str = typer.Option(..., help="Topic id from the catalog"),
     out_dir: Path = typer.Option(Path("generated"), help="Output directory"),
     max_tokens: Optional[int] = typer.Option(None, help="Override max tokens"),
+    llm_tests: str = typer.Option(
+        "auto",
+        callback=_check_llm_tests,
+        help="Model-written edge-case tests: auto (only for specs without examples), always, never",
+    ),
+    check_complexity: bool = typer.Option(
+        False,
+        "--verify-complexity",
+        help="Measure growth and fail if it exceeds the spec's O(...) bound",
+    ),
+    max_repairs: int = typer.Option(
+        2,
+        "--max-repairs",
+        min=0,
+        help="Targeted repair prompts allowed when the code does not compile",
+    ),
 ) -> None:
+    if _daemon_opts["enabled"]:
+        _reject_via_daemon(verify_complexity=check_complexity)
+        reply = _daemon_call(
+            "generate",
+            topic=topic,
+            out_dir=str(out_dir.resolve()),
+            max_tokens=max_tokens,
+            llm_tests=llm_tests,
+            max_repairs=max_repairs,
+        )
+        if reply["repairs"]:
+            console.print(f"[yellow]{reply['repairs']} repair prompt(s)[/yellow]")
+        console.print(f"[green]Generated:[/green] {reply['module_path']}")
+        console.print(f"[green]Tests:[/green] {reply['test_path']}")
+        return
+    from .codegen.generator import generate_code_for_topic
+    from .codegen.manifest import BuildManifest
+
     settings = Settings.load()
-    euri = Euri(settings)
-    specs = load_catalog()
-    # Validate catalog first
-    valid_specs = {s.id: s for s in validate_specs(specs)}
-    spec = valid_specs.get(topic)
+    euri = _make_euri(settings)
+    spec = _find_spec(topic)
     if not spec:
         console.print(f"[red]Topic not found:[/red] {topic}")
         raise typer.Exit(code=1)
     out_dir.mkdir(parents=True, exist_ok=True)
-    module_path, test_path = generate_code_for_topic(euri, spec.model_dump(), out_dir, max_tokens=max_tokens)
+
+    def on_repair(issue) -> None:
+        console.print(
+            f"[yellow]Repairing[/yellow] lines {issue.start}-{issue.end}: {issue.message}"
+        )
+
+    module_path, test_path = generate_code_for_topic(
+        euri,
+        spec.model_dump(),
+        out_dir,
+        max_tokens=max_tokens,
+        llm_tests=llm_tests,
+        max_repairs=max_repairs,
+        on_repair=on_repair,
+        on_warning=lambda message: console.print(f"[yellow]Warning:[/yellow] {message}"),
+    )
+    problem = _check_complexity(spec, module_path) if check_complexity else None
+    if problem:
+        console.print(f"[red]Complexity check failed for {spec.id}:[/red] {problem}")
+        raise typer.Exit(code=1)
+    manifest = BuildManifest(out_dir)
+    manifest.record(
+        spec.id,
+        _fingerprint(spec, settings, max_tokens, llm_tests),
+        module_path,
+        test_path,
+        model=settings.model,
+    )
+    manifest.save()
     console.print(f"[green]Generated:[/green] {module_path}")
     console.print(f"[green]Tests:[/green] {test_path}")
+    _print_cache_counters(euri)
 
 
 @app.command("generate-all")
 def cmd_generate_all(
     out_dir: Path = typer.Option(Path("generated"), help="Output directory"),
     max_tokens: Optional[int] = typer.Option(None, help="Override max tokens"),
+    llm_tests: str = typer.Option(
+        "auto",
+        callback=_check_llm_tests,
+        help="Model-written edge-case tests: auto (only for specs without examples), always, never",
+    ),
+    concurrency: int = typer.Option(
+        1, "--concurrency", "-j", min=1, help="Topics generated in parallel"
+    ),
+    force: bool = typer.Option(False, "--force", help="Rebuild every topic, even if up to date"),
+    dry_run: bool = typer.Option(
+        False, "--dry-run", help="List topics that would be rebuilt and exit"
+    ),
+    check_complexity: bool = typer.Option(
+        False,
+        "--verify-complexity",
+        help="Measure growth and fail topics exceeding their O(...) bound",
+    ),
+    max_repairs: int = typer.Option(
+        2,
+        "--max-repairs",
+        min=0,
+        help="Targeted repair prompts per topic when the code does not compile",
+    ),
+    tag: Optional[str] = typer.Option(None, help="Only topics with this tag"),
+    bundle: Optional[Path] = typer.Option(
+        None,
+        "--bundle",
+        help="Also stream the generated files into a .zip, .tar or .tar.gz as topics finish",
+    ),
+    bundle_only: bool = typer.Option(
+        False,
+        "--bundle-only",
+        help="Write only the --bundle archive (every topic, no output directory)",
+    ),
 ) -> None:
-    """Generate implementations and tests for all catalog topics."""
-    settings = Settings.load()
-    euri = Euri(settings)
-    out_dir.mkdir(parents=True, exist_ok=True)
-    specs = [Spec.model_validate(s) for s in load_catalog()]
-    for spec in specs:
-        console.print(f"[cyan]Generating[/cyan] {spec.id} ...")
+    """Generate implementations and tests for all catalog topics.
+
+    Topics whose spec, prompt templates, model and settings are unchanged since the
+    last build (per the manifest in the output directory) are skipped.
+    """
+    if bundle_only and bundle is None:
+        console.print("[red]--bundle-only needs --bundle[/red]")
+        raise typer.Exit(code=1)
+    if bundle_only and check_complexity:
+        console.print("[red]--verify-complexity needs the files on disk; drop --bundle-only[/red]")
+        raise typer.Exit(code=1)
+    if _daemon_opts["enabled"]:
+        _reject_via_daemon(verify_complexity=check_complexity, bundle=bundle is not None)
+        _generate_all_via_daemon(
+            out_dir=str(out_dir.resolve()),
+            tag=tag,
+            force=force,
+            dry_run=dry_run,
+            max_tokens=max_tokens,
+            llm_tests=llm_tests,
+            max_repairs=max_repairs,
+            concurrency=concurrency,
+        )
+        return
+    from .codegen.artifacts import Bundle, bundle_format
+    from .codegen.batch import generate_all
+    from .codegen.manifest import BuildManifest
+
+    if bundle is not None:
         try:
-            module_path, test_path = generate_code_for_topic(
-                euri, spec.model_dump(), out_dir, max_tokens=max_tokens
+            fmt = bundle_format(bundle)
+        except ValueError as e:
+            console.print(f"[red]{e}[/red]")
+            raise typer.Exit(code=1)
+    # A dry run only fingerprints specs (model, temperature, ...), so it works without an API key.
+    settings = Settings.load(require_key=not dry_run)
+    all_specs = _catalog().specs(tag)
+    manifest = BuildManifest(out_dir)
+    fingerprints = {s.id: _fingerprint(s, settings, max_tokens, llm_tests) for s in all_specs}
+    # Nothing on disk to compare against when only bundling, so every topic is built.
+    reasons = {
+        s.id: (
+            "forced"
+            if force
+            else "bundled" if bundle_only else manifest.stale_reason(s.id, fingerprints[s.id])
+        )
+        for s in all_specs
+    }
+    specs = [s for s in all_specs if reasons[s.id]]
+    if dry_run:
+        for s in specs:
+            console.print(f"{s.id}: {reasons[s.id]}")
+        console.print(
+            f"[cyan]{len(specs)} to rebuild, {len(all_specs) - len(specs)} up to date[/cyan]"
+        )
+        return
+    if not specs:
+        console.print(
+            f"[green]All {len(all_specs)} topic(s) up to date[/green] (use --force to rebuild)"
+        )
+        return
+    euri = _make_euri(settings)
+    console.print(
+        f"[cyan]Generating[/cyan] {len(specs)} topic(s) with concurrency={concurrency} "
+        f"({len(all_specs) - len(specs)} up to date) ..."
+    )
+    done = 0
+
+    by_id = {s.id: s for s in specs}
+
+    def report(result: TopicResult) -> None:
+        nonlocal done
+        done += 1
+        prefix = f"[{done}/{len(specs)}]"
+        if result.ok and check_complexity:
+            # Runs on the main thread so timings are not skewed by other measurements.
+            problem = _check_complexity(by_id[result.topic], result.module_path)
+            if problem:
+                result.ok, result.error = False, problem
+        if result.ok and bundle_only:
+            console.print(
+                f"{prefix} [green]OK {result.topic}[/green] ({result.seconds:.1f}s): bundled"
             )
-            console.print(f"[green]OK:[/green] {module_path} | {test_path}")
-        except Exception as e:
-            console.print(f"[red]Failed {spec.id}:[/red] {e}")
+        elif result.ok:
+            manifest.record(
+                result.topic,
+                fingerprints[result.topic],
+                result.module_path,
+                result.test_path,
+                model=settings.model,
+            )
+            manifest.save()
+            repaired = f", {result.repairs} repair(s)" if result.repairs else ""
+            console.print(
+                f"{prefix} [green]OK {result.topic}[/green] ({result.seconds:.1f}s{repaired}): "
+                f"{result.module_path} | {result.test_path}"
+            )
+        else:
+            console.print(
+                f"{prefix} [red]Failed {result.topic}[/red] ({result.seconds:.1f}s): {result.error}"
+            )
+
+    with contextlib.ExitStack() as stack:
+        archive = None
+        if bundle is not None:
+            bundle.parent.mkdir(parents=True, exist_ok=True)
+            archive = stack.enter_context(Bundle(stack.enter_context(bundle.open("wb")), fmt))
+        summary = generate_all(
+            euri,
+            specs,
+            out_dir,
+            concurrency=concurrency,
+            max_tokens=max_tokens,
+            llm_tests=llm_tests,
+            max_repairs=max_repairs,
+            on_result=report,
+            write=not bundle_only,
+            bundle=archive,
+        )
+    console.rule("Summary")
+    console.print(
+        f"{summary.succeeded} ok, {summary.failed} failed in {summary.wall_seconds:.1f}s "
+        f"({summary.topics_per_min:.1f} topics/min, "
+        f"p50 {summary.latency_percentile(50):.1f}s, p95 {summary.latency_percentile(95):.1f}s), "
+        f"{summary.repairs} repair prompt(s)"
+    )
+    for r in summary.results:
+        if not r.ok:
+            console.print(f"[red]Failed {r.topic}:[/red] {r.error}")
+    if archive is not None:
+        console.print(
+            f"[green]Bundle:[/green] {bundle} ({archive.files} file(s), {archive.bytes} bytes)"
+        )
+    api = euri.resilience.snapshot()
+    console.print(
+        f"[dim]api: {api['calls']} call(s), {api['retries']} retr(y/ies), {api['throttled']} "
+        "throttled, "
+        f"concurrency limit {api['concurrency_limit']}, breaker {api['breaker']}[/dim]"
+    )
+    _print_cache_counters(euri)
+
+
+def _generate_all_via_daemon(**params) -> None:
+    reply = _daemon_call("generate_all", **params)
+    stale, results = reply["stale"], reply["results"]
+    if params["dry_run"]:
+        for topic, reason in stale.items():
+            console.print(f"{topic}: {reason}")
+        console.print(f"[cyan]{len(stale)} to rebuild, {reply['up_to_date']} up to date[/cyan]")
+        return
+    if not stale:
+        console.print(
+            f"[green]All {reply['up_to_date']} topic(s) up to date[/green] (use --force to rebuild)"
+        )
+        return
+    for r in results:
+        if r["ok"]:
+            console.print(
+                f"[green]OK {r['topic']}[/green] ({r['seconds']:.1f}s): {r['module_path']} | "
+                f"{r['test_path']}"
+            )
+        else:
+            console.print(f"[red]Failed {r['topic']}[/red] ({r['seconds']:.1f}s): {r['error']}")
+    failed = sum(1 for r in results if not r["ok"])
+    console.rule("Summary")
+    console.print(
+        f"{len(results) - failed} ok, {failed} failed in {reply['wall_seconds']:.1f}s "
+        f"({reply['up_to_date']} up to date), {sum(r['repairs'] for r in results)} repair prompt(s)"
+    )
 
 
 @app.command("validate-catalog")
 def cmd_validate_catalog() -> None:
-    """Validate the DSA catalog JSON against schema rules."""
+    """Validate every catalog spec against schema rules."""
     try:
-        specs = validate_specs(load_catalog())
-        console.print(f"[green]Catalog valid:[/green] {len(specs)} spec(s)")
+        store = _catalog()
     except Exception as e:
-        console.print(f"[red]Catalog validation failed:[/red] {e}")
+        console.print(f"[red]Catalog could not be loaded:[/red] {e}")
         raise typer.Exit(code=1)
+    failures = []
+    for spec_id in store.ids():
+        try:
+            store.spec(spec_id)
+        except Exception as err:
+            failures.append((spec_id, err))
+    for spec_id, problem in failures:
+        console.print(f"[red]{spec_id}:[/red] {problem}")
+    if failures:
+        console.print(
+            f"[red]Catalog validation failed:[/red] {len(failures)} of {len(store)} spec(s) invalid"
+        )
+        raise typer.Exit(code=1)
+    console.print(
+        f"[green]Catalog valid:[/green] {len(store)} spec(s) from {len(store.paths)} file(s)"
+    )
 
 
 @app.command("new-spec")
@@ -135,6 +601,8 @@ def cmd_new_spec(
     signature: str = typer.Option(..., help="Function signature or class decl"),
 ) -> None:
     """Print a JSON template for a new spec to add to the catalog."""
+    from .models import Spec
+
     spec = Spec(
         id=id,
         title=title,
@@ -148,24 +616,759 @@ def cmd_new_spec(
     console.print_json(data=spec.model_dump())
 
 
+def _stream_unless_hedged(euri: Euri, stream: bool) -> bool:
+    """Streams are never hedged, so with --hedge the response is fetched whole instead."""
+    if stream and euri.hedged:
+        console.print(
+            "[yellow]--hedge applies to whole responses only; streaming is turned off[/yellow]"
+        )
+        return False
+    return stream
+
+
+def _print_stream_timing(stream: CompletionStream) -> None:
+    source = "cache" if stream.cached else "model"
+    console.print(
+        f"[dim]{source}: first token {stream.ttft or 0:.2f}s, "
+        f"total {stream.total_seconds or 0:.2f}s[/dim]"
+    )
+
+
+def _optimize_gated(
+    euri: Optional[Euri],
+    path: Path,
+    code: str,
+    base: str,
+    level: str,
+    tests: Optional[Path],
+    topic: Optional[str],
+    *,
+    attempts: int,
+    min_speedup: float,
+    size: int,
+    fuzz_budget: float = 0.0,
+) -> None:
+    from .codegen.optimizer import optimize_code, settle_optimized
+    from .perf.gate import default_test_path, gated_optimize
+
+    test_path = tests or default_test_path(path)
+    if not test_path.exists():
+        console.print(f"[red]--gate needs a test file:[/red] {test_path} not found (use --tests)")
+        raise typer.Exit(code=1)
+    spec = _find_spec(topic or path.stem)
+    if spec is None:
+        console.print("[red]--gate needs a catalog spec for inputs:[/red] pass --topic")
+        raise typer.Exit(code=1)
+
+    def propose(feedback: Optional[str]) -> str:
+        if euri is None:  # offline: gate the local rewrites alone
+            return base
+        # Only a rewrite the gate accepts goes into the semantic cache (see settle_optimized below).
+        return optimize_code(euri, base, level=level, feedback=feedback, store_result=False)
+
+    if euri is None:
+        attempts = 1
+    report = gated_optimize(
+        code,
+        propose,
+        spec=spec,
+        module_name=path.stem,
+        test_path=test_path,
+        attempts=attempts,
+        min_speedup=min_speedup,
+        size=size,
+        fuzz_budget=fuzz_budget,
+    )
+    if euri is not None and report.error is None:
+        settle_optimized(euri, base, report.accepted_code, level=level)
+    if not report.original_tests_passed:
+        console.print("[yellow]Warning: the original code fails its own tests[/yellow]")
+    if report.error is not None:
+        console.print(f"[red]Gate failed:[/red] {report.error}; kept original: {path}")
+        raise typer.Exit(code=1)
+    table = Table(title=f"Gated optimization (n={size:,})")
+    for col in ("Attempt", "Tests", "Fuzzed", "Before", "After", "Speedup", "Result"):
+        table.add_column(col)
+    for a in report.attempts:
+        table.add_row(
+            str(a.attempt),
+            "pass" if a.tests_passed else "fail",
+            f"{a.fuzz_cases:,}" if a.fuzz_cases is not None else "-",
+            f"{a.original_s * 1e3:.3f} ms" if a.original_s else "-",
+            f"{a.candidate_s * 1e3:.3f} ms" if a.candidate_s else "-",
+            f"{a.speedup:.2f}x" if a.speedup else "-",
+            ("[green]accepted[/green] " if a.accepted else "[red]rejected[/red] ") + a.reason,
+        )
+    console.print(table)
+    if report.accepted_code is not None:
+        path.write_text(report.accepted_code, encoding="utf-8")
+        console.print(f"[green]Optimized file saved:[/green] {path}")
+    else:
+        console.print(f"[yellow]No rewrite met the gate; kept original:[/yellow] {path}")
+
+
+def _profile_hotspots(
+    path: Path,
+    code: str,
+    topic: Optional[str],
+    driver: Optional[Path],
+    *,
+    size: int,
+    top: int,
+    line_timing: bool,
+) -> dict[str, str]:
+    """Profile ``code`` (named after ``path``); {definition: profile text} for the hottest."""
+    import tempfile
+
+    from .perf.profiling import driver_workload, profile_module, spec_workload
+
+    if driver is not None:
+        workload, description = driver_workload(driver), f"driver {driver.name}"
+    else:
+        spec = _find_spec(topic or path.stem)
+        if spec is None:
+            console.print("[red]--profile needs --driver or a catalog spec:[/red] pass --topic")
+            raise typer.Exit(code=1)
+        try:
+            workload = spec_workload(spec, size=size)
+        except ValueError as e:
+            console.print(f"[red]{e}[/red]")
+            raise typer.Exit(code=1)
+        description = f"{spec.id} examples + 3 inputs at n={size:,}"
+    with tempfile.TemporaryDirectory(prefix="euri_profile_") as tmp:
+        target = Path(tmp) / path.name
+        target.write_text(code, encoding="utf-8")
+        try:
+            report = profile_module(
+                target, workload, description=description, line_timing=line_timing
+            )
+        except Exception as e:
+            console.print(f"[red]Profiling workload failed:[/red] {type(e).__name__}: {e}")
+            raise typer.Exit(code=1)
+    if not report.hotspots:
+        console.print("[red]The workload never ran code defined in this module[/red]")
+        raise typer.Exit(code=1)
+    chosen = report.top(top)
+    table = Table(title=f"Profile: {report.workload} ({report.seconds:.2f}s)")
+    for col in ("Definition", "Share", "Self", "Calls", "Sent"):
+        table.add_column(col)
+    for h in report.hotspots:
+        table.add_row(
+            h.name,
+            f"{h.share:.0%}",
+            f"{h.self_s * 1e3:.1f} ms",
+            f"{sum(f.calls for f in h.functions):,}",
+            "yes" if h in chosen else "",
+        )
+    console.print(table)
+    lines = code.splitlines()
+    return {h.name: h.summary(lines) for h in chosen}
+
+
 @app.command("optimize")
 def cmd_optimize(
     path: Path = typer.Option(..., exists=True, file_okay=True, dir_okay=False),
-    level: str = typer.Option("all", help="one|readability|performance|memory|all"),
+    level: str = typer.Option("all", help="one|readability|performance|memory|all|offline"),
+    offline: bool = typer.Option(
+        False, "--offline", help="Local rewrite rules only; never call the model"
+    ),
+    rule: Optional[list[str]] = typer.Option(
+        None,
+        "--rule",
+        "--rules",
+        help="Local rewrite rule to run first (repeatable; none run by default)",
+    ),
+    stream: bool = typer.Option(
+        True, "--stream/--no-stream", help="Render the rewrite as it arrives"
+    ),
+    gate: bool = typer.Option(
+        False, "--gate", help="Keep the rewrite only if tests pass and it is faster"
+    ),
+    tests: Optional[Path] = typer.Option(
+        None, help="Test file for --gate (default: test_<name>.py alongside)"
+    ),
+    topic: Optional[str] = typer.Option(
+        None, help="Catalog topic for --gate inputs (default: file stem)"
+    ),
+    attempts: int = typer.Option(3, min=1, help="Rewrites to try under --gate"),
+    min_speedup: float = typer.Option(
+        1.05, help="Required speedup under --gate (1.05 = 5% faster)"
+    ),
+    bench_size: int = typer.Option(10_000, help="Input size for --gate timings"),
+    fuzz: float = typer.Option(
+        0.0,
+        "--fuzz",
+        min=0.0,
+        help="Seconds of differential fuzzing against the original under --gate",
+    ),
+    chunked: bool = typer.Option(
+        False, "--chunked", help="Optimize top-level functions/classes in parallel"
+    ),
+    concurrency: int = typer.Option(
+        4, min=1, help="Parallel chunk requests with --chunked/--profile"
+    ),
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Profile a workload and send only the hottest definitions, with their stats",
+    ),
+    driver: Optional[Path] = typer.Option(
+        None,
+        exists=True,
+        dir_okay=False,
+        help="Workload script for --profile (default: the spec's inputs)",
+    ),
+    profile_size: int = typer.Option(
+        10_000, min=1, help="Input size of the spec workload for --profile"
+    ),
+    hot: int = typer.Option(3, min=1, help="Definitions to send under --profile"),
+    line_timing: bool = typer.Option(
+        False, "--line-timing", help="Add per-line timings to --profile stats"
+    ),
 ) -> None:
-    settings = Settings.load()
-    euri = Euri(settings)
-    new_content = optimize_code(euri, path.read_text(encoding="utf-8"), level=level)
+    if (offline or level == "offline") and not rule:
+        raise typer.BadParameter(
+            "--offline needs at least one --rule (see the rules in codegen/rewrites.py)"
+        )
+    if _daemon_opts["enabled"]:
+        _reject_via_daemon(gate=gate, profile=profile)
+        reply = _daemon_call(
+            "optimize",
+            code=path.read_text(encoding="utf-8"),
+            level="offline" if offline else level,
+            rules=rule,
+            chunked=chunked,
+            concurrency=concurrency,
+        )
+        for r in reply["applied"]:
+            console.print(f"[cyan]rewrite[/cyan] line {r['line']}: {r['rule']} ({r['detail']})")
+        path.write_text(reply["code"], encoding="utf-8")
+        console.print(f"[green]Optimized file saved:[/green] {path}")
+        return
+    from .codegen.generator import strip_code_fences_stream
+    from .codegen.optimizer import (
+        optimize_code,
+        optimize_code_chunked,
+        optimize_code_profiled,
+        optimize_code_stream,
+    )
+    from .codegen.rewrites import apply_rules
+
+    if offline:
+        level = "offline"
+    code = path.read_text(encoding="utf-8")
+    try:
+        local_code, applied = apply_rules(code, rule)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    for r in applied:
+        console.print(f"[cyan]rewrite[/cyan] line {r.line}: {r.rule} ({r.detail})")
+    if rule and not applied:
+        console.print("[dim]No local rewrites applied[/dim]")
+    if profile and gate:
+        raise typer.BadParameter("--profile cannot be combined with --gate")
+    profiles = (
+        _profile_hotspots(
+            path, local_code, topic, driver, size=profile_size, top=hot, line_timing=line_timing
+        )
+        if profile
+        else None
+    )
+    euri = None if level == "offline" else _make_euri(Settings.load())
+    if gate:
+        _optimize_gated(
+            euri,
+            path,
+            code,
+            local_code,
+            level,
+            tests,
+            topic,
+            attempts=attempts,
+            min_speedup=min_speedup,
+            size=bench_size,
+            fuzz_budget=fuzz,
+        )
+        if euri is not None:
+            _print_cache_counters(euri)
+        return
+    if euri is None:
+        new_content = local_code
+    elif profiles is not None:
+        try:
+            new_content = optimize_code_profiled(
+                euri, local_code, profiles, level=level, concurrency=concurrency
+            )
+        except ValueError as e:
+            console.print(f"[red]Profile-guided optimization rejected:[/red] {e}")
+            raise typer.Exit(code=1)
+    elif chunked:
+        try:
+            new_content = optimize_code_chunked(
+                euri, local_code, level=level, concurrency=concurrency
+            )
+        except ValueError as e:
+            console.print(f"[red]Chunked optimization rejected:[/red] {e}")
+            raise typer.Exit(code=1)
+    elif _stream_unless_hedged(euri, stream):
+        completion = optimize_code_stream(euri, local_code, level=level)
+        parts = []
+        for chunk in strip_code_fences_stream(completion):
+            parts.append(chunk)
+            console.out(chunk, end="", highlight=False)
+        console.out("")
+        new_content = "".join(parts)
+        _print_stream_timing(completion)
+    else:
+        new_content = optimize_code(euri, local_code, level=level)
     path.write_text(new_content, encoding="utf-8")
     console.print(f"[green]Optimized file saved:[/green] {path}")
+    if euri is not None:
+        _print_cache_counters(euri)
+
+
+@app.command("fuzz")
+def cmd_fuzz(
+    original: Path = typer.Option(
+        ..., exists=True, dir_okay=False, help="Module before optimization"
+    ),
+    optimized: Path = typer.Option(
+        ..., exists=True, dir_okay=False, help="Module after optimization"
+    ),
+    topic: Optional[str] = typer.Option(
+        None, help="Catalog topic for input types (default: file stem)"
+    ),
+    function: Optional[str] = typer.Option(
+        None, help="Function to compare (default: the topic's function)"
+    ),
+    budget: float = typer.Option(10.0, min=0.1, help="Time budget in seconds"),
+    cases: Optional[int] = typer.Option(None, min=1, help="Stop after this many cases"),
+    workers: Optional[int] = typer.Option(
+        None, min=1, help="Worker processes (default: CPU count)"
+    ),
+    max_size: int = typer.Option(21, min=0, help="Largest generated collection size"),
+    seed: int = typer.Option(0, help="Seed; the same seed replays the same cases"),
+) -> None:
+    """Check that two versions of a function behave the same on generated inputs (exit 1 if not)."""
+    from .perf.fuzz import fuzz_equivalence
+    from .perf.inputs import function_name
+
+    spec = _find_spec(topic or original.stem)
+    name = function or (function_name(spec) if spec else None)
+    if not name:
+        console.print("[red]Pass --function (no catalog function spec matches)[/red]")
+        raise typer.Exit(code=2)
+    report = fuzz_equivalence(
+        original.read_text(encoding="utf-8"),
+        optimized.read_text(encoding="utf-8"),
+        function=name,
+        spec=spec,
+        budget_s=budget,
+        max_cases=cases,
+        workers=workers,
+        max_size=max_size,
+        seed=seed,
+    )
+    for error in report.errors:
+        console.print(f"[red]{error}[/red]")
+    console.print(
+        f"{report.cases:,} case(s) in {report.seconds:.1f}s ({report.cases_per_s:,.0f} cases/s, "
+        f"{report.workers} worker(s)); both raised on {report.both_raised:,}"
+    )
+    found = report.counterexample
+    if found is not None:
+        console.print(
+            f"[red]Behavior differs[/red] (case {found.index}, shrunk in {found.shrink_steps} "
+            "step(s)):"
+        )
+        console.print(f"  input:     {', '.join(f'{k}={v!r}' for k, v in found.kwargs.items())}")
+        console.print(f"  original:  {found.original}")
+        console.print(f"  optimized: {found.candidate}")
+    if not report.equivalent:
+        raise typer.Exit(code=1)
+    console.print(f"[green]No difference found[/green] for {name}()")
+
+
+def _parse_sizes(text: str) -> list[int]:
+    try:
+        return [int(float(part)) for part in text.split(",") if part.strip()]
+    except ValueError:
+        raise typer.BadParameter(f"Invalid sizes: {text!r} (expected e.g. 1000,1e4,1e5)")
+
+
+def _select_specs(topic: Optional[str], all_topics: bool) -> list[Spec]:
+    if all_topics:
+        return _catalog().specs()
+    if not topic:
+        console.print("[red]Pass --topic ID or --all[/red]")
+        raise typer.Exit(code=2)
+    spec = _find_spec(topic)
+    if spec is None:
+        console.print(f"[red]Topic not found:[/red] {topic}")
+        raise typer.Exit(code=1)
+    return [spec]
+
+
+@app.command("benchmark")
+def cmd_benchmark(
+    topic: Optional[str] = typer.Option(None, help="Topic id from the catalog"),
+    all_topics: bool = typer.Option(False, "--all", help="Benchmark every generated topic"),
+    out_dir: Path = typer.Option(Path("generated"), help="Directory with generated modules"),
+    sizes: str = typer.Option(
+        ",".join(str(s) for s in DEFAULT_SIZES), help="Comma-separated input sizes"
+    ),
+    warmup: int = typer.Option(1, min=0, help="Untimed warmup calls per size"),
+    repeats: int = typer.Option(5, min=1, help="Timed calls per size"),
+    budget: float = typer.Option(
+        10.0, help="Stop scaling a topic once one size takes this many seconds"
+    ),
+    threshold: float = typer.Option(
+        0.10, help="Flag regressions slower than previous run by this fraction"
+    ),
+    history: Optional[Path] = typer.Option(
+        None, help=f"SQLite history (default: <out-dir>/{HISTORY_NAME})"
+    ),
+) -> None:
+    """Micro-benchmark generated modules on spec-derived inputs at scaled sizes."""
+    from .codegen.manifest import BuildManifest
+    from .perf.benchmark import BenchmarkHistory, benchmark_spec, file_digest
+
+    specs = _select_specs(topic, all_topics)
+    size_list = _parse_sizes(sizes)
+    manifest = BuildManifest(out_dir)
+    store = BenchmarkHistory(history or out_dir / HISTORY_NAME)
+    table = Table(title="Benchmarks (median of repeats)")
+    for col in ("Topic", "Size", "Median", "Min", "Previous", "Model"):
+        table.add_column(col)
+    regressions = []
+    for spec in specs:
+        module_path = out_dir / f"{spec.id}.py"
+        if not module_path.exists():
+            console.print(f"[yellow]Skip {spec.id}:[/yellow] {module_path} not generated")
+            continue
+        try:
+            results = benchmark_spec(
+                spec, module_path, sizes=size_list, warmup=warmup, repeats=repeats, budget_s=budget
+            )
+        except Exception as e:
+            console.print(f"[red]Failed {spec.id}:[/red] {e}")
+            continue
+        model = manifest.entries.get(spec.id, {}).get("model")
+        for r in results:
+            prev = store.previous(r.topic, r.size)
+            table.add_row(
+                r.topic,
+                f"{r.size:,}",
+                f"{r.median_s * 1e3:.3f} ms",
+                f"{r.min_s * 1e3:.3f} ms",
+                f"{prev[0] * 1e3:.3f} ms" if prev else "-",
+                model or "?",
+            )
+        regressions.extend(store.regressions(results, threshold=threshold))
+        store.record(results, model=model, code_hash=file_digest(module_path))
+    console.print(table)
+    for r, prev_median in regressions:
+        console.print(
+            f"[red]Regression {r.topic} @ {r.size:,}:[/red] {r.median_s * 1e3:.3f} ms "
+            f"vs {prev_median * 1e3:.3f} ms ({r.median_s / prev_median:.2f}x)"
+        )
+    store.close()
+    if regressions:
+        raise typer.Exit(code=1)
+
+
+@app.command("verify")
+def cmd_verify(
+    out_dir: Path = typer.Option(
+        Path("generated"), help="Directory with generated modules and tests"
+    ),
+    topic: Optional[list[str]] = typer.Option(None, help="Only verify these topics (repeatable)"),
+    workers: Optional[int] = typer.Option(
+        None, min=1, help="Parallel sandboxes (default: CPU count)"
+    ),
+    timeout: float = typer.Option(60.0, help="Wall-clock seconds per topic"),
+    cpu: int = typer.Option(30, help="CPU seconds per topic (rlimit)"),
+    memory_mb: int = typer.Option(1024, help="Address-space limit per topic in MiB (rlimit)"),
+    report: Optional[Path] = typer.Option(None, help="Write a JSON report to this path"),
+) -> None:
+    """Run each generated module's tests in an isolated, resource-limited subprocess."""
+    from .sandbox import SandboxLimits, TestRun, verify_dir
+
+    limits = SandboxLimits(wall_seconds=timeout, cpu_seconds=cpu, memory_mb=memory_mb)
+    colors = {"passed": "green", "failed": "red", "timeout": "yellow", "error": "red"}
+
+    def show(run: TestRun) -> None:
+        color = colors.get(run.status, "white")
+        console.print(
+            f"[{color}]{run.status.upper():8}[/{color}] {run.topic} "
+            f"({run.passed} passed, {run.failed} failed, {run.seconds:.1f}s)"
+        )
+
+    results = verify_dir(
+        out_dir, topics=topic or None, limits=limits, workers=workers, on_result=show
+    )
+    if not results:
+        console.print(f"[yellow]No module/test pairs found in {out_dir}[/yellow]")
+        raise typer.Exit(code=1)
+    bad = [r for r in results if not r.ok]
+    console.rule("Summary")
+    console.print(f"{len(results) - len(bad)}/{len(results)} topic(s) passed")
+    for r in bad:
+        console.print(f"[red]{r.topic} ({r.status}):[/red]\n{r.output[-600:]}")
+    if report:
+        report.write_text(json.dumps([r.to_dict() for r in results], indent=2), encoding="utf-8")
+        console.print(f"[green]Report written:[/green] {report}")
+    if bad:
+        raise typer.Exit(code=1)
+
+
+@app.command("cache")
+def cmd_cache(
+    clear: bool = typer.Option(False, "--clear", help="Delete all cached completions")
+) -> None:
+    """Show completion cache statistics, or clear it."""
+    from .cache import CompletionCache
+
+    cache = CompletionCache(_cache_path())
+    if clear:
+        console.print(f"[green]Removed {cache.clear()} cached completion(s)[/green]")
+    stats = cache.stats()
+    console.print(f"[cyan]Cache:[/cyan] {stats['path']}")
+    console.print(f"{stats['entries']} entries, {stats['bytes'] / 1024:.1f} KiB")
+
+
+@app.command("semantic-cache")
+def cmd_semantic_cache(
+    invalidate: bool = typer.Option(
+        False, "--invalidate", help="Delete stored results (all, or those matching --kind/--model)"
+    ),
+    kind: Optional[str] = typer.Option(
+        None, help="Only this kind: optimize, optimize-def, explain, explain-chunk"
+    ),
+    model: Optional[str] = typer.Option(None, help="Only results from this model"),
+) -> None:
+    """Show the semantic (normalized-AST) cache of optimize/explain results, or invalidate it."""
+    from .semantic_cache import KINDS, SemanticCache
+
+    if kind is not None and kind not in KINDS:
+        raise typer.BadParameter(f"--kind must be one of: {', '.join(KINDS)}")
+    if (kind or model) and not invalidate:
+        raise typer.BadParameter("--kind and --model select what --invalidate removes")
+    cache = SemanticCache(_semantic_cache_path())
+    if invalidate:
+        removed = cache.invalidate(kind=kind, model=model)
+        console.print(f"[green]Invalidated {removed} stored result(s)[/green]")
+    stats = cache.stats()
+    console.print(f"[cyan]Semantic cache:[/cyan] {stats['path']}")
+    console.print(
+        f"{stats['entries']} entries, {stats['bytes'] / 1024:.1f} KiB, "
+        f"hit rate {stats['hit_rate']:.0%} ({stats['hits']} hit(s), {stats['misses']} miss(es))"
+    )
+    if stats["kinds"]:
+        table = Table()
+        for col in ("Kind", "Entries", "KiB", "Hits", "Misses", "Hit rate"):
+            table.add_column(col)
+        for name, k in stats["kinds"].items():
+            table.add_row(
+                name,
+                str(k["entries"]),
+                f"{k['bytes'] / 1024:.1f}",
+                str(k["hits"]),
+                str(k["misses"]),
+                f"{k['hit_rate']:.0%}",
+            )
+        console.print(table)
 
 
 @app.command("explain")
-def cmd_explain(path: Path = typer.Option(..., exists=True)) -> None:
+def cmd_explain(
+    path: Path = typer.Option(..., exists=True),
+    stream: bool = typer.Option(
+        True, "--stream/--no-stream", help="Render the explanation as it arrives"
+    ),
+    chunked: bool = typer.Option(
+        False, "--chunked", help="Explain chunks in parallel, then combine"
+    ),
+    concurrency: int = typer.Option(4, min=1, help="Parallel chunk requests with --chunked"),
+) -> None:
+    if _daemon_opts["enabled"]:
+        code = path.read_text(encoding="utf-8")
+        reply = _daemon_call("explain", code=code, chunked=chunked, concurrency=concurrency)
+        console.print(reply["text"], markup=False)
+        return
+    from .codegen.generator import explain_code, explain_code_chunked, explain_code_stream
+
+    settings = Settings.load()
+    euri = _make_euri(settings)
+    code = path.read_text(encoding="utf-8")
+    if chunked:
+        console.print(explain_code_chunked(euri, code, concurrency=concurrency), markup=False)
+    elif _stream_unless_hedged(euri, stream):
+        completion = explain_code_stream(euri, code)
+        for chunk in completion:
+            console.out(chunk, end="", highlight=False)
+        console.out("")
+        _print_stream_timing(completion)
+    else:
+        console.print(explain_code(euri, code))
+    _print_cache_counters(euri)
+
+
+@app.command("prompt-tokens")
+def cmd_prompt_tokens(
+    topic: Optional[str] = typer.Option(None, help="Only this catalog topic"),
+    path: Optional[Path] = typer.Option(
+        None,
+        exists=True,
+        dir_okay=False,
+        help="Also report optimize/explain/tests prompts for this file",
+    ),
+) -> None:
+    """Estimate prompt tokens per template and topic, compact vs. uncompacted rendering."""
+    from .prompts.report import catalog_prompt_tokens, code_prompt_tokens, shared_prefix_tokens
+
+    store = _catalog()
+    specs = store.raw() if topic is None else [d for d in [store.get(topic)] if d is not None]
+    if topic and not specs:
+        console.print(f"[red]Topic not found:[/red] {topic}")
+        raise typer.Exit(code=1)
+    rows = catalog_prompt_tokens(specs)
+    if path is not None:
+        rows += code_prompt_tokens(path.read_text(encoding="utf-8"), specs[0] if topic else None)
+    table = Table(title="Estimated prompt tokens")
+    for col in ("Template", "Topic", "Tokens", "Uncompacted", "Saved"):
+        table.add_column(col)
+    for r in rows:
+        table.add_row(
+            r.template,
+            r.topic or str(path),
+            f"{r.tokens:,}",
+            f"{r.baseline_tokens:,}",
+            f"{r.saved_pct:.0f}%",
+        )
+    console.print(table)
+    total, baseline = sum(r.tokens for r in rows), sum(r.baseline_tokens for r in rows)
+    saved = 100.0 * (baseline - total) / baseline if baseline else 0.0
+    console.print(f"Total: {total:,} tokens ({baseline:,} uncompacted, {saved:.0f}% saved)")
+    console.print(
+        f"Shared prefix (cacheable by the provider): {shared_prefix_tokens(rows):,} tokens per "
+        "prompt"
+    )
+
+
+@app.command("serve")
+def cmd_serve(
+    address: Optional[str] = typer.Option(
+        None,
+        help=(
+            "unix:<path> or host:port (default: EURI_DAEMON, else a Unix socket in "
+            "~/.cache/euri_codegen)"
+        ),
+    ),
+    workers: int = typer.Option(8, min=1, help="Requests executed in parallel"),
+    root: Path = typer.Option(
+        Path("."),
+        file_okay=False,
+        help="Directory that generate/generate_all output must stay inside",
+    ),
+) -> None:
+    """Run a local JSON-RPC daemon that keeps the client, catalog and caches warm (--via-daemon)."""
+    import asyncio
+
+    from .daemon import Daemon
+    from .daemon_client import daemon_address
+
     settings = Settings.load()
-    euri = Euri(settings)
-    explanation = explain_code(euri, path.read_text(encoding="utf-8"))
-    console.print(explanation)
+    daemon = Daemon(
+        settings,
+        make_euri=lambda: _make_euri(settings),
+        catalog_paths=_catalog_opts["paths"],
+        workers=workers,
+        root=root,
+    )
+    daemon.warm()
+
+    def ready(bound: str) -> None:
+        console.print(
+            f"[green]Serving JSON-RPC on[/green] {bound} ({', '.join(sorted(daemon.methods))})"
+        )
+
+    try:
+        asyncio.run(daemon.run(daemon_address(address), on_ready=ready))
+    except KeyboardInterrupt:
+        pass
+    stats = daemon.stats()
+    console.print(
+        f"[dim]{stats['requests']} request(s), {stats['coalesced']} coalesced, {stats['errors']} "
+        "error(s)[/dim]"
+    )
+
+
+@app.command("stats")
+def cmd_stats(
+    path: Optional[Path] = typer.Option(
+        None, help=f"Telemetry JSONL (default: {DEFAULT_TELEMETRY_PATH})"
+    ),
+    since_hours: Optional[float] = typer.Option(
+        None, "--since-hours", help="Only calls from the last N hours"
+    ),
+    command: Optional[str] = typer.Option(None, help="Only calls made by this CLI command"),
+    prometheus: Optional[Path] = typer.Option(
+        None, help="Also write a Prometheus text-format file here"
+    ),
+) -> None:
+    """Aggregate recorded LLM calls: latency percentiles and token throughput by stage and model."""
+    from .telemetry import aggregate, load_records, write_prometheus
+
+    source = path or _telemetry_path()
+    since = time.time() - since_hours * 3600 if since_hours else None
+    records = [
+        r for r in load_records(source, since=since) if command is None or r.command == command
+    ]
+    if not records:
+        console.print(f"[yellow]No telemetry records in {source}[/yellow]")
+        return
+    stats = aggregate(records)
+    table = Table(title=f"LLM calls ({len(records)} records)")
+    for col in (
+        "Stage",
+        "Model",
+        "Calls",
+        "Cached",
+        "Errors",
+        "Retries",
+        "p50",
+        "p95",
+        "p99",
+        "Prompt tok",
+        "Compl. tok",
+        "Tok/s",
+    ):
+        table.add_column(col)
+    for s in stats:
+        table.add_row(
+            s.stage,
+            s.model,
+            str(s.calls),
+            str(s.cached),
+            str(s.errors),
+            str(s.retries),
+            f"{s.p50_s:.2f}s",
+            f"{s.p95_s:.2f}s",
+            f"{s.p99_s:.2f}s",
+            f"{s.prompt_tokens:,}",
+            f"{s.completion_tokens:,}",
+            f"{s.tokens_per_s:.1f}",
+        )
+    console.print(table)
+    if any(r.tokens_estimated for r in records):
+        console.print(
+            "[dim]Some token counts are estimated (~4 chars/token) where the API omitted "
+            "usage[/dim]"
+        )
+    if prometheus:
+        write_prometheus(prometheus, stats)
+        console.print(f"[green]Prometheus metrics written:[/green] {prometheus}")
 
 
 def main():
@@ -0,0 +1,224 @@
+"""Process-wide pool of Euri API clients with HTTP keep-alive.
+
+Clients post straight to the Euri chat-completions endpoint (``Settings.endpoint``)
+instead of going through the euriai SDK, which opens a new connection for every
+request and binds the model when the client is built. Pooled clients are immutable and are
+keyed by ``(model, temperature, max_tokens)``. Per-call overrides go into the
+request payload and never touch the client. Every client of a pool shares one
+``requests.Session``, so TLS connections to the endpoint are reused across
+models, threads and commands.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# The endpoint the euriai SDK uses; override with EURI_ENDPOINT.
+DEFAULT_ENDPOINT = "https://api.euron.one/api/v1/euri/chat/completions"
+
+ClientKey = Tuple[str, float, int]
+# (connect, read) seconds, as ``requests`` takes them; the read timeout applies between bytes
+# of a stream.
+Timeout = Tuple[float, float]
+DEFAULT_TIMEOUT: Timeout = (10.0, 120.0)
+
+
+class PooledClient:
+    """A client for one model and sampling defaults; same call interface as ``EuriaiClient``."""
+
+    __slots__ = ("_pool", "model", "temperature", "max_tokens")
+
+    def __init__(self, pool: ClientPool, model: str, temperature: float, max_tokens: int):
+        self._pool = pool
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+
+    @property
+    def key(self) -> ClientKey:
+        return (self.model, self.temperature, self.max_tokens)
+
+    def _payload(
+        self,
+        prompt: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        options: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": self.temperature if temperature is None else temperature,
+            "max_tokens": self.max_tokens if max_tokens is None else max_tokens,
+        }
+        # top_p, frequency_penalty, presence_penalty, stop: sent only when set, as the SDK does.
+        payload.update({k: v for k, v in options.items() if v is not None})
+        return payload
+
+    def generate_completion(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **options: Any,
+    ) -> Dict[str, Any]:
+        response = self._pool.post(self._payload(prompt, temperature, max_tokens, options))
+        response.raise_for_status()
+        return response.json()
+
+    def stream_completion(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **options: Any,
+    ) -> Iterator[str]:
+        payload = self._payload(prompt, temperature, max_tokens, options)
+        payload["stream"] = True
+        with self._pool.post(payload, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield line.decode("utf-8")
+
+
+def _requests_session(max_connections: int) -> Any:
+    import requests  # imported lazily: offline commands never need it
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class ClientPool:
+    """Thread-safe, bounded pool of :class:`PooledClient` sharing one keep-alive session.
+
+    Clients unused for ``idle_seconds`` are dropped, and so are the least recently used
+    ones beyond ``max_clients``. Once every client has gone idle, the session is closed
+    too, which releases its sockets. The next request opens a new session.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        endpoint: str = DEFAULT_ENDPOINT,
+        max_clients: int = 32,
+        idle_seconds: float = 300.0,
+        max_connections: int = 16,
+        timeout: Timeout = DEFAULT_TIMEOUT,
+        session_factory: Optional[Callable[[int], Any]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.endpoint = endpoint
+        self.max_clients = max_clients
+        self.idle_seconds = idle_seconds
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._headers = {"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"}
+        self._session_factory = session_factory or _requests_session
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._clients: "OrderedDict[ClientKey, Tuple[PooledClient, float]]" = OrderedDict()
+        self._session: Any = None
+        self._last_request = clock()
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+        self.sessions = 0
+        self.requests = 0
+
+    def client(self, model: str, temperature: float, max_tokens: int) -> PooledClient:
+        key: ClientKey = (model, float(temperature), int(max_tokens))
+        now = self._clock()
+        with self._lock:
+            self._evict(now)
+            entry = self._clients.pop(key, None)
+            if entry is None:
+                client = PooledClient(self, *key)
+                self.created += 1
+            else:
+                client = entry[0]
+                self.reused += 1
+            self._clients[key] = (client, now)
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+                self.evicted += 1
+            return client
+
+    def _evict(self, now: float) -> None:
+        idle: List[ClientKey] = [
+            k for k, (_, used) in self._clients.items() if now - used > self.idle_seconds
+        ]
+        for k in idle:
+            del self._clients[k]
+        self.evicted += len(idle)
+        if (
+            not self._clients
+            and self._session is not None
+            and now - self._last_request > self.idle_seconds
+        ):
+            self._session.close()
+            self._session = None
+
+    def post(self, payload: Dict[str, Any], *, stream: bool = False) -> Any:
+        now = self._clock()
+        with self._lock:
+            self._last_request = now
+            key = (payload["model"], float(payload["temperature"]), int(payload["max_tokens"]))
+            entry = self._clients.get(key)
+            if entry is not None:
+                self._clients[key] = (entry[0], now)
+                self._clients.move_to_end(key)
+            if self._session is None:
+                self._session = self._session_factory(self.max_connections)
+                self.sessions += 1
+            session = self._session
+            self.requests += 1
+        # The session's connection pool is thread-safe; concurrent posts reuse idle connections.
+        return session.post(
+            self.endpoint, headers=self._headers, json=payload, stream=stream, timeout=self.timeout
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "created": self.created,
+                "reused": self.reused,
+                "evicted": self.evicted,
+                "sessions": self.sessions,
+                "requests": self.requests,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._clients.clear()
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+_pools: Dict[Tuple[str, str, Timeout], ClientPool] = {}
+_pools_lock = threading.Lock()
+
+
+def shared_pool(
+    api_key: str, endpoint: str = DEFAULT_ENDPOINT, timeout: Timeout = DEFAULT_TIMEOUT
+) -> ClientPool:
+    """The process-wide pool for ``api_key``, ``endpoint`` and ``timeout``.
+
+    The CLI, the daemon and the Streamlit app share it.
+    """
+    key = (api_key, endpoint, timeout)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ClientPool(api_key, endpoint=endpoint, timeout=timeout)
+        return pool
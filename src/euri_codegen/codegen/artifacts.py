@@ -0,0 +1,192 @@
+"""Generated files as in-memory artifacts: atomic batched writes and streamed bundles.
+
+Generation produces :class:`Artifact` objects (a file name and its text). They
+can be shown and downloaded straight from memory. Writes are atomic: each batch
+is first written to temporary files in the target directory and then renamed
+into place, so readers never see half-written files. Files whose content is
+unchanged are not rewritten. Bundles (zip or tar) are written one artifact at a
+time to any binary stream, so a whole run never has to be staged on disk.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import tarfile
+import threading
+import time
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterable, List, Optional, Sequence, Tuple, Union
+
+_O_TMP = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+
+
+@dataclass(frozen=True)
+class Artifact:
+    name: str  # relative path inside the output directory or bundle
+    content: str
+
+    @property
+    def data(self) -> bytes:
+        return self.content.encode("utf-8")
+
+
+def _unchanged(path: Path, data: bytes) -> bool:
+    try:
+        if path.stat().st_size != len(data):
+            return False
+        return path.read_bytes() == data
+    except OSError:
+        return False
+
+
+def write_artifacts(artifacts: Sequence[Artifact], out_dir: Path) -> List[Path]:
+    """Write ``artifacts`` under ``out_dir`` atomically; returns every artifact's path.
+
+    All temporary files are written before any is renamed, so an error leaves the
+    previous files untouched. Artifacts whose file already has the same bytes are skipped.
+    """
+    out_dir = Path(out_dir)
+    paths = [out_dir / a.name for a in artifacts]
+    staged: List[Tuple[str, Path]] = []
+    try:
+        for artifact, path in zip(artifacts, paths):
+            data = artifact.data
+            if _unchanged(path, data):
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Unique per thread; 0o666 minus the umask, like a plain write.
+            tmp = str(path.parent / f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            fd = os.open(tmp, _O_TMP, 0o666)
+            staged.append((tmp, path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+        for tmp, path in staged:
+            os.replace(tmp, path)
+        staged = []
+    finally:
+        for tmp, _ in staged:
+            Path(tmp).unlink(missing_ok=True)
+    return paths
+
+
+def read_artifacts(paths: Iterable[Path]) -> List[Artifact]:
+    return [Artifact(Path(p).name, Path(p).read_text(encoding="utf-8")) for p in paths]
+
+
+class ArtifactWriter:
+    """Collects artifacts and writes them in batches.
+
+    :meth:`add` flushes once ``batch_size`` artifacts are queued or the oldest has
+    waited ``max_delay_s``. Nothing flushes in the background: a caller that may
+    not add again soon flushes when :meth:`due_in` reaches 0.
+    """
+
+    def __init__(self, out_dir: Path, *, batch_size: int = 32, max_delay_s: float = 1.0):
+        self.out_dir = Path(out_dir)
+        self.batch_size = batch_size
+        self.max_delay_s = max_delay_s
+        self.batches = 0
+        self._pending: List[Artifact] = []
+        self._since: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add(self, artifacts: Iterable[Artifact]) -> bool:
+        """Queue ``artifacts``; returns True if this flushed the batch to disk."""
+        with self._lock:
+            self._pending.extend(artifacts)
+            if self._since is None:
+                self._since = time.monotonic()
+            due = (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._since >= self.max_delay_s
+            )
+        if due:
+            self.flush()
+        return due
+
+    def due_in(self) -> Optional[float]:
+        """Seconds until the queued artifacts are due for a flush; None when nothing is queued."""
+        with self._lock:
+            if self._since is None:
+                return None
+            return max(0.0, self._since + self.max_delay_s - time.monotonic())
+
+    def flush(self) -> List[Path]:
+        with self._lock:
+            batch, self._pending, self._since = self._pending, [], None
+            if not batch:
+                return []
+            self.batches += 1
+            return write_artifacts(batch, self.out_dir)
+
+
+def bundle_format(path: Union[str, Path]) -> str:
+    """``zip``, ``tar`` or ``tar.gz``, from the file name."""
+    name = str(path).lower()
+    if name.endswith((".tar.gz", ".tgz")):
+        return "tar.gz"
+    if name.endswith(".tar"):
+        return "tar"
+    if name.endswith(".zip"):
+        return "zip"
+    raise ValueError(f"Bundle must end in .zip, .tar, .tar.gz or .tgz: {path}")
+
+
+class Bundle:
+    """Streams artifacts into a zip or tar archive on a binary file object, one at a time."""
+
+    def __init__(self, fileobj: BinaryIO, fmt: str = "zip"):
+        self.files = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._tar: Optional[tarfile.TarFile] = None
+        if fmt == "zip":
+            # Works on unseekable streams too: sizes go into data descriptors after each file.
+            self._zip = zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED)
+        elif fmt in ("tar", "tar.gz"):
+            self._tar = tarfile.open(fileobj=fileobj, mode="w|gz" if fmt == "tar.gz" else "w|")
+        else:
+            raise ValueError(f"Unknown bundle format: {fmt}")
+
+    def add(self, artifacts: Iterable[Artifact]) -> None:
+        now = time.time()
+        with self._lock:
+            for a in artifacts:
+                data = a.data
+                if self._zip is not None:
+                    zinfo = zipfile.ZipInfo(a.name, date_time=time.localtime(now)[:6])
+                    zinfo.compress_type = zipfile.ZIP_DEFLATED
+                    zinfo.external_attr = 0o644 << 16
+                    self._zip.writestr(zinfo, data)
+                else:
+                    assert self._tar is not None
+                    tinfo = tarfile.TarInfo(a.name)
+                    tinfo.size, tinfo.mtime, tinfo.mode = len(data), int(now), 0o644
+                    self._tar.addfile(tinfo, io.BytesIO(data))
+                self.files += 1
+                self.bytes += len(data)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._zip is not None:
+                self._zip.close()
+            if self._tar is not None:
+                self._tar.close()
+
+    def __enter__(self) -> "Bundle":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def bundle_bytes(artifacts: Iterable[Artifact], fmt: str = "zip") -> bytes:
+    """The whole bundle in memory (for download buttons)."""
+    buf = io.BytesIO()
+    with Bundle(buf, fmt) as bundle:
+        bundle.add(artifacts)
+    return buf.getvalue()
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import math
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from ..euri_client import Euri
+from ..models import Spec
+from .artifacts import Artifact, ArtifactWriter, Bundle, write_artifacts
+from .generator import DEFAULT_MAX_REPAIRS, generate_topic_artifacts
+from .repair import CodeIssue
+
+
+@dataclass
+class TopicResult:
+    topic: str
+    ok: bool
+    seconds: float
+    module_path: Optional[Path] = None
+    test_path: Optional[Path] = None
+    error: Optional[str] = None
+    repairs: int = 0
+    artifacts: List[Artifact] = field(default_factory=list)  # module, then tests
+
+
+@dataclass
+class BatchSummary:
+    results: List[TopicResult] = field(default_factory=list)
+    wall_seconds: float = 0.0
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for r in self.results if r.ok)
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for r in self.results if not r.ok)
+
+    @property
+    def repairs(self) -> int:
+        return sum(r.repairs for r in self.results)
+
+    @property
+    def topics_per_min(self) -> float:
+        if self.wall_seconds <= 0:
+            return 0.0
+        return len(self.results) * 60.0 / self.wall_seconds
+
+    def latency_percentile(self, p: float) -> float:
+        return percentile([r.seconds for r in self.results], p)
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile; returns 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), math.ceil(p / 100.0 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def run_topic(
+    euri: Euri,
+    spec: Spec,
+    out_dir: Path,
+    max_tokens: Optional[int],
+    llm_tests: str = "auto",
+    max_repairs: int = DEFAULT_MAX_REPAIRS,
+    *,
+    write: bool = True,
+) -> TopicResult:
+    """Generate one topic; failures are reported in the result instead of raised.
+
+    With ``write=False`` nothing touches the disk: the files are only in ``artifacts``
+    (the paths say where they belong).
+    """
+    start = time.perf_counter()
+    issues: List[CodeIssue] = []
+    try:
+        artifacts = list(
+            generate_topic_artifacts(
+                euri,
+                spec.model_dump(),
+                max_tokens=max_tokens,
+                llm_tests=llm_tests,
+                max_repairs=max_repairs,
+                on_repair=issues.append,
+            )
+        )
+        if write:
+            write_artifacts(artifacts, out_dir)
+    except Exception as e:
+        return TopicResult(
+            spec.id, False, time.perf_counter() - start, error=str(e), repairs=len(issues)
+        )
+    module_path, test_path = (out_dir / a.name for a in artifacts)
+    return TopicResult(
+        spec.id,
+        True,
+        time.perf_counter() - start,
+        module_path,
+        test_path,
+        repairs=len(issues),
+        artifacts=artifacts,
+    )
+
+
+def generate_all(
+    euri: Euri,
+    specs: List[Spec],
+    out_dir: Path,
+    *,
+    concurrency: int = 1,
+    max_tokens: Optional[int] = None,
+    llm_tests: str = "auto",
+    max_repairs: int = DEFAULT_MAX_REPAIRS,
+    on_result: Optional[Callable[[TopicResult], None]] = None,
+    write: bool = True,
+    bundle: Optional[Bundle] = None,
+    batch_size: int = 32,
+    max_delay_s: float = 1.0,
+) -> BatchSummary:
+    """Generate every spec using a bounded thread pool.
+
+    Files are written from the calling thread in atomic batches of ``batch_size``,
+    or at most ``max_delay_s`` after a topic finishes; with ``write=False`` nothing
+    is written. Successful topics are also streamed into ``bundle`` as they finish.
+    ``on_result`` is invoked as each topic finishes (completion order), after its
+    files are on disk. If a batch cannot be written, its topics are marked failed
+    and the run goes on. The returned summary lists results in catalog order so
+    reports are deterministic.
+    """
+    if write:
+        out_dir.mkdir(parents=True, exist_ok=True)
+    writer = (
+        ArtifactWriter(out_dir, batch_size=batch_size, max_delay_s=max_delay_s) if write else None
+    )
+    unreported: List[TopicResult] = []
+
+    def report(done: List[TopicResult]) -> None:
+        if on_result:
+            for r in done:
+                on_result(r)
+
+    def write_batch(artifacts: Optional[List[Artifact]] = None) -> None:
+        """Queue ``artifacts`` (None: flush the queue); report the topics of a written batch."""
+        nonlocal unreported
+        assert writer is not None
+        try:
+            if artifacts is None:
+                writer.flush()
+            elif not writer.add(artifacts):
+                return
+        except OSError as e:
+            # The batch is atomic: none of its files were replaced, so all of its topics failed.
+            for r in unreported:
+                r.ok, r.module_path, r.test_path = False, None, None
+                r.error = f"could not write files: {e}"
+        report(unreported)
+        unreported = []
+
+    start = time.perf_counter()
+    results: List[Optional[TopicResult]] = [None] * len(specs)
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {
+            pool.submit(
+                run_topic, euri, spec, out_dir, max_tokens, llm_tests, max_repairs, write=False
+            ): i
+            for i, spec in enumerate(specs)
+        }
+        running = set(futures)
+        while running:
+            # Wake up when the queued files are due even if no other topic finishes by then.
+            timeout = writer.due_in() if writer is not None else None
+            done, running = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            for fut in done:
+                result = fut.result()
+                results[futures[fut]] = result
+                if result.ok and bundle is not None:
+                    bundle.add(result.artifacts)
+                if writer is None or not result.ok:
+                    report([result])
+                    continue
+                unreported.append(result)
+                write_batch(result.artifacts)
+            if writer is not None and unreported and writer.due_in() == 0:
+                write_batch()
+    if writer is not None:
+        write_batch()
+    return BatchSummary(
+        results=[r for r in results if r is not None],
+        wall_seconds=time.perf_counter() - start,
+    )
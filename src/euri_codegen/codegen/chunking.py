@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import ast
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_DEFS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+@dataclass
+class Segment:
+    """A verbatim slice of the module; ``names`` is set for function/class definitions."""
+
+    source: str
+    names: List[str] = field(default_factory=list)
+
+    @property
+    def is_definition(self) -> bool:
+        return bool(self.names)
+
+
+@dataclass
+class Chunk:
+    """One unit of LLM work: consecutive definitions small enough to send together."""
+
+    index: int
+    segments: List[int]
+    names: List[str]
+    source: str
+
+
+@dataclass
+class ModuleLayout:
+    segments: List[Segment]
+    context: str  # imports and top-level assignments every chunk may depend on
+    chunks: List[Chunk] = field(default_factory=list)
+
+    def reassemble(
+        self, replacements: Dict[int, str], extra_imports: Optional[List[str]] = None
+    ) -> str:
+        """Rebuild the module, substituting rewritten chunk text by chunk index."""
+        by_first_segment: Dict[int, str] = {}
+        skipped: Set[int] = set()
+        for chunk in self.chunks:
+            if chunk.index in replacements:
+                by_first_segment[chunk.segments[0]] = replacements[chunk.index].strip("\n") + "\n"
+                skipped.update(range(chunk.segments[0] + 1, chunk.segments[-1] + 1))
+        parts = [
+            by_first_segment.get(i, seg.source)
+            for i, seg in enumerate(self.segments)
+            if i not in skipped
+        ]
+        text = "".join(parts)
+        if extra_imports:
+            text = _insert_imports(text, extra_imports)
+        return text
+
+
+def _group(segments: List[Segment], target_chars: int) -> List[Chunk]:
+    """Group adjacent definitions into chunks of roughly ``target_chars``."""
+    groups: List[List[int]] = []
+    size = 0
+    for i, seg in enumerate(segments):
+        if not seg.is_definition:
+            continue
+        # Only merge definitions separated by blank lines (no code or comments in between).
+        adjacent = bool(groups) and all(
+            not segments[j].source.strip() for j in range(groups[-1][-1] + 1, i)
+        )
+        if adjacent and size + len(seg.source) <= target_chars:
+            groups[-1].append(i)
+            size += len(seg.source)
+        else:
+            groups.append([i])
+            size = len(seg.source)
+    chunks = []
+    for index, ids in enumerate(groups):
+        names = [n for i in ids for n in segments[i].names]
+        source = "\n\n\n".join(segments[i].source.strip("\n") for i in ids)
+        chunks.append(Chunk(index, ids, names, source))
+    return chunks
+
+
+def regroup(layout: ModuleLayout, alone: Set[int], *, target_chars: int = 4000) -> ModuleLayout:
+    """Regroup ``layout`` with the definition segments in ``alone`` as single-definition chunks.
+
+    Those chunks come last; the other definitions are grouped as :func:`split_module` would.
+    """
+    masked = [Segment(seg.source) if i in alone else seg for i, seg in enumerate(layout.segments)]
+    chunks = _group(masked, target_chars)
+    for i in sorted(alone):
+        seg = layout.segments[i]
+        chunks.append(Chunk(len(chunks), [i], list(seg.names), seg.source.strip("\n")))
+    return ModuleLayout(layout.segments, layout.context, chunks)
+
+
+def _first_line(node: ast.stmt) -> int:
+    decorators = getattr(node, "decorator_list", [])
+    return min([node.lineno] + [d.lineno for d in decorators])
+
+
+def split_module(code: str, *, target_chars: int = 4000) -> ModuleLayout:
+    """Split source into verbatim segments (definitions and the text between them) and chunks."""
+    tree = ast.parse(code)
+    lines = code.splitlines(keepends=True)
+    segments: List[Segment] = []
+    context: List[str] = []
+    cursor = 0  # 0-based line index of the first line not yet assigned to a segment
+    for node in tree.body:
+        start, end = _first_line(node) - 1, node.end_lineno or node.lineno
+        if isinstance(node, _DEFS):
+            if start > cursor:
+                segments.append(Segment("".join(lines[cursor:start])))
+            segments.append(Segment("".join(lines[start:end]), [node.name]))
+            cursor = end
+        elif isinstance(node, (ast.Import, ast.ImportFrom, ast.Assign, ast.AnnAssign)):
+            context.append("".join(lines[start:end]).rstrip("\n"))
+    if cursor < len(lines):
+        segments.append(Segment("".join(lines[cursor:])))
+    return ModuleLayout(segments, "\n".join(context), _group(segments, target_chars))
+
+
+def _insert_imports(code: str, imports: List[str]) -> str:
+    """Add import statements after the module's existing imports (or docstring)."""
+    tree = ast.parse(code)
+    insert_at = 0
+    for i, node in enumerate(tree.body):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            insert_at = node.end_lineno or node.lineno
+        elif (
+            i == 0
+            and isinstance(node, ast.Expr)
+            and isinstance(getattr(node, "value", None), ast.Constant)
+        ):
+            insert_at = node.end_lineno or node.lineno
+        elif not isinstance(node, (ast.Import, ast.ImportFrom)) and insert_at:
+            break
+    lines = code.splitlines(keepends=True)
+    block = "".join(line.rstrip("\n") + "\n" for line in imports)
+    return "".join(lines[:insert_at]) + block + "".join(lines[insert_at:])
+
+
+def extract_rewrite(
+    text: str, names: List[str], existing_imports: str
+) -> Optional[Tuple[str, List[str]]]:
+    """Validate a chunk rewrite: it must parse and define exactly-named top-level ``names``.
+
+    Returns ``(definitions_source, new_import_lines)`` or None if the rewrite is unusable.
+    """
+    try:
+        tree = ast.parse(text)
+    except SyntaxError:
+        return None
+    lines = text.splitlines(keepends=True)
+    defined = [n.name for n in tree.body if isinstance(n, _DEFS)]
+    if sorted(set(defined)) != sorted(set(names)):
+        return None
+    known = {line.strip() for line in existing_imports.splitlines()}
+    new_imports: List[str] = []
+    body: List[str] = []
+    for node in tree.body:
+        start, end = _first_line(node) - 1, node.end_lineno or node.lineno
+        src = "".join(lines[start:end]).rstrip("\n")
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            if src.strip() not in known:
+                new_imports.append(src.strip())
+        elif isinstance(node, _DEFS):
+            body.append(src)
+        # Anything else (stray constants, __main__ blocks) is dropped: chunks own only their defs.
+    return "\n\n\n".join(body), new_imports
+
+
+def split_definitions(code: str) -> Dict[str, str]:
+    """Source of each top-level function/class in ``code`` by name (decorators included)."""
+    lines = code.splitlines(keepends=True)
+    return {
+        node.name: "".join(lines[_first_line(node) - 1 : node.end_lineno or node.lineno]).rstrip(
+            "\n"
+        )
+        for node in ast.parse(code).body
+        if isinstance(node, _DEFS)
+    }
+
+
+def public_api(code: str) -> Dict[str, str]:
+    """Map each public top-level function/class to a comparable signature string."""
+    api: Dict[str, str] = {}
+    for node in ast.parse(code).body:
+        if isinstance(node, _DEFS) and not node.name.startswith("_"):
+            if isinstance(node, ast.ClassDef):
+                methods = sorted(
+                    m.name
+                    for m in node.body
+                    if isinstance(m, (ast.FunctionDef, ast.AsyncFunctionDef))
+                    and not m.name.startswith("_")
+                )
+                api[node.name] = "class:" + ",".join(methods)
+            else:
+                a = node.args
+                params = [p.arg for p in a.posonlyargs + a.args + a.kwonlyargs]
+                api[node.name] = "def:" + ",".join(params)
+    return api
+
+
+def map_chunks(
+    layout: ModuleLayout, work: Callable[[Chunk], T], *, concurrency: int = 4
+) -> Dict[int, T]:
+    """Run ``work`` over every chunk in parallel; returns results keyed by chunk index."""
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        results = list(pool.map(work, layout.chunks))
+    return {chunk.index: result for chunk, result in zip(layout.chunks, results)}
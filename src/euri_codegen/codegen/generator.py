@@ -1,10 +1,27 @@
 from __future__ import annotations
 
+import ast
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, Literal, Optional, Tuple
 
-from ..euri_client import Euri
-from ..prompts.templates import generation_prompt, tests_prompt, explanation_prompt
+from ..euri_client import CompletionStream, Euri
+from ..prompts.templates import (
+    chunk_explanation_prompt,
+    combine_explanations_prompt,
+    edge_case_tests_prompt,
+    explanation_prompt,
+    generation_prompt,
+    repair_prompt,
+)
+from ..semantic_cache import remember, remember_stream
+from .artifacts import Artifact, write_artifacts
+from .chunking import map_chunks, split_module
+from .repair import CodeCheckError, CodeIssue, check_module, offending_span, splice
+from .spec_tests import has_example_tests, merge_test_modules, spec_test_module
+
+LLM_TESTS_MODES = ("auto", "always", "never")
+DEFAULT_MAX_REPAIRS = 2
 
 
 def _strip_code_fences(text: str) -> str:
@@ -23,27 +40,292 @@ def _strip_code_fences(text: str) -> str:
     return t
 
 
-def generate_code_for_topic(
+_FENCE = "```"
+
+
+class FenceStripper:
+    """Incremental counterpart of :func:`_strip_code_fences` for streamed text.
+
+    Feed chunks as they arrive and emit whatever is already known to be part of
+    the final result; text that may still be trimmed (trailing whitespace, a
+    possible closing fence) is held back until more input or :meth:`finish`.
+    Concatenating all outputs equals ``_strip_code_fences`` of the full text.
+    """
+
+    def __init__(self) -> None:
+        self._head = ""  # text before the fence decision / opening fence line
+        self._fenced: Optional[bool] = None
+        self._held = ""  # body text not yet emitted
+        self._held_at_line_start = True
+        self._emitted_any = False
+
+    def feed(self, chunk: str) -> str:
+        if self._fenced is None or (self._fenced and self._head):
+            self._head += chunk
+            if not self._consume_head():
+                return ""
+        else:
+            self._held += chunk
+        return self._drain(final=False)
+
+    def finish(self) -> str:
+        if self._fenced is None:
+            # Stream ended before we could tell; decide on what we have.
+            self._fenced = self._head.lstrip().startswith(_FENCE)
+            self._consume_head()
+        if self._fenced and self._head:
+            # Only the opening fence line was ever received.
+            return ""
+        return self._drain(final=True)
+
+    def _consume_head(self) -> bool:
+        """Resolve the opening fence; return True once body text can flow."""
+        head = self._head.lstrip()
+        if self._fenced is None:
+            if len(head) < len(_FENCE) and _FENCE.startswith(head):
+                return False
+            self._fenced = head.startswith(_FENCE)
+        if self._fenced:
+            newline = head.find("\n")
+            if newline < 0:
+                self._head = head
+                return False
+            head = head[newline + 1 :]
+        self._head = ""
+        self._held = head
+        return True
+
+    def _drain(self, *, final: bool) -> str:
+        held = self._held
+        if not self._emitted_any:
+            held = held.lstrip()
+            self._held_at_line_start = True
+        limit = len(held)
+        last = len(held.rstrip())
+        if self._fenced and last:
+            line_start = held.rfind("\n", 0, last) + 1
+            if line_start > 0 or self._held_at_line_start:
+                line = held[line_start:last].lstrip()
+                # The last non-blank line may turn out to be the closing fence.
+                if line.startswith(_FENCE) or (not final and _FENCE.startswith(line)):
+                    limit = line_start
+        out = held[:limit].rstrip()
+        if final:
+            self._held = ""
+        else:
+            self._held = held[len(out) :]
+            if out:
+                # ``out`` is right-stripped, so the held text continues its last line.
+                self._held_at_line_start = False
+        if out:
+            self._emitted_any = True
+        return out
+
+
+def strip_code_fences_stream(chunks: Iterable[str]) -> Iterator[str]:
+    """Yield fence-stripped text incrementally from a stream of chunks."""
+    stripper = FenceStripper()
+    for chunk in chunks:
+        out = stripper.feed(chunk)
+        if out:
+            yield out
+    tail = stripper.finish()
+    if tail:
+        yield tail
+
+
+def repair_code(
     euri: Euri,
+    code: str,
     spec: Dict[str, Any],
-    out_dir: Path,
     *,
+    max_repairs: int = DEFAULT_MAX_REPAIRS,
     max_tokens: Optional[int] = None,
-) -> Tuple[Path, Path]:
-    """Generate a Python module and its pytest file for a DSA spec."""
+    on_repair: Optional[Callable[[CodeIssue], None]] = None,
+) -> str:
+    """Check ``code`` against ``spec`` and fix failures with small span-only repair prompts.
+
+    Raises :class:`CodeCheckError` if the module still fails after ``max_repairs`` attempts.
+    """
+    attempts = 0
+    issue = check_module(code, spec)
+    while issue is not None:
+        if attempts >= max_repairs:
+            raise CodeCheckError(f"{issue.message} (after {attempts} repair attempt(s))")
+        attempts += 1
+        if on_repair:
+            on_repair(issue)
+        prompt = repair_prompt(
+            issue.message,
+            offending_span(code, issue),
+            issue.start,
+            issue.end,
+            spec.get("function_signature", ""),
+        )
+        reply = euri.complete(prompt, max_tokens=max_tokens, stage="repair", topic=spec.get("id"))
+        code = splice(code, issue, reply)
+        issue = check_module(code, spec)
+    return code
+
+
+def generate_topic_artifacts(
+    euri: Euri,
+    spec: Dict[str, Any],
+    *,
+    max_tokens: Optional[int] = None,
+    llm_tests: Literal["auto", "always", "never"] = "auto",
+    max_repairs: int = DEFAULT_MAX_REPAIRS,
+    on_repair: Optional[Callable[[CodeIssue], None]] = None,
+    on_warning: Optional[Callable[[str], None]] = None,
+) -> Tuple[Artifact, Artifact]:
+    """Generate a Python module and its pytest file for a DSA spec, in memory.
+
+    Tests are built from the spec's examples without a model call. ``llm_tests``
+    adds model-written edge cases: "auto" only when the spec has no examples,
+    "always" on top of them, "never" not at all. That prompt needs only the spec,
+    so it runs concurrently with code generation.
+
+    The code must compile and define the signature's function before it is
+    returned; failures get up to ``max_repairs`` targeted repairs (see :func:`repair_code`).
+    Edge-case tests must compile too and get the same repairs; if they still fail
+    they are dropped (``on_warning`` says why) and only the spec tests are written.
+    """
+    if llm_tests not in LLM_TESTS_MODES:
+        raise ValueError(f"llm_tests must be one of {LLM_TESTS_MODES}, got {llm_tests!r}")
     module_name = spec["id"]
-    module_path = out_dir / f"{module_name}.py"
-    test_path = out_dir / f"test_{module_name}.py"
 
     prompt = generation_prompt(spec)
-    code = _strip_code_fences(euri.complete(prompt, max_tokens=max_tokens))
+    examples = has_example_tests(spec)
+    extra_tests = None
+    if llm_tests == "always" or (llm_tests == "auto" and not examples):
+        tests_prompt = edge_case_tests_prompt(spec, has_examples=examples)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending = pool.submit(
+                euri.complete, tests_prompt, max_tokens=max_tokens, stage="tests", topic=module_name
+            )
+            code = _strip_code_fences(
+                euri.complete(prompt, max_tokens=max_tokens, stage="generate", topic=module_name)
+            )
+            extra_tests = _strip_code_fences(pending.result())
+    else:
+        code = _strip_code_fences(
+            euri.complete(prompt, max_tokens=max_tokens, stage="generate", topic=module_name)
+        )
+
+    code = repair_code(
+        euri, code, spec, max_repairs=max_repairs, max_tokens=max_tokens, on_repair=on_repair
+    )
+    test_code = spec_test_module(spec)
+    if extra_tests:
+        test_code = _merge_extra_tests(
+            euri,
+            test_code,
+            extra_tests,
+            f"test_{module_name}",
+            max_repairs=max_repairs,
+            max_tokens=max_tokens,
+            on_repair=on_repair,
+            on_warning=on_warning,
+        )
+    return Artifact(f"{module_name}.py", code), Artifact(f"test_{module_name}.py", test_code)
 
-    test_code = _strip_code_fences(euri.complete(tests_prompt(spec, code), max_tokens=max_tokens))
 
-    module_path.write_text(code, encoding="utf-8")
-    test_path.write_text(test_code, encoding="utf-8")
+def _merge_extra_tests(
+    euri: Euri,
+    spec_tests: str,
+    extra_tests: str,
+    name: str,
+    *,
+    max_repairs: int,
+    max_tokens: Optional[int],
+    on_repair: Optional[Callable[[CodeIssue], None]],
+    on_warning: Optional[Callable[[str], None]],
+) -> str:
+    """Spec tests plus the model's edge cases, repaired like the code; dropped if they still fail.
+
+    The spec tests never depend on the model, so they always survive.
+    """
+    try:
+        extra_tests = repair_code(
+            euri,
+            extra_tests,
+            {"id": name},
+            max_repairs=max_repairs,
+            max_tokens=max_tokens,
+            on_repair=on_repair,
+        )
+        merged = merge_test_modules(spec_tests, extra_tests)
+        ast.parse(merged)
+        return merged
+    except (CodeCheckError, SyntaxError) as e:
+        reason = f"model-written edge-case tests dropped from {name}.py: {e}"
+    if on_warning:
+        on_warning(reason)
+    return spec_tests + f"\n# {reason.splitlines()[0]}\n"
+
+
+def generate_code_for_topic(
+    euri: Euri,
+    spec: Dict[str, Any],
+    out_dir: Path,
+    *,
+    max_tokens: Optional[int] = None,
+    llm_tests: Literal["auto", "always", "never"] = "auto",
+    max_repairs: int = DEFAULT_MAX_REPAIRS,
+    on_repair: Optional[Callable[[CodeIssue], None]] = None,
+    on_warning: Optional[Callable[[str], None]] = None,
+) -> Tuple[Path, Path]:
+    """:func:`generate_topic_artifacts`, then write both files atomically to ``out_dir``."""
+    module, tests = generate_topic_artifacts(
+        euri,
+        spec,
+        max_tokens=max_tokens,
+        llm_tests=llm_tests,
+        max_repairs=max_repairs,
+        on_repair=on_repair,
+        on_warning=on_warning,
+    )
+    module_path, test_path = write_artifacts([module, tests], out_dir)
     return module_path, test_path
 
 
 def explain_code(euri: Euri, code: str) -> str:
-    return euri.complete(explanation_prompt(code), max_tokens=2000)
+    prompt = explanation_prompt(code)
+    return remember(
+        euri, "explain", code, lambda: euri.complete(prompt, max_tokens=2000, stage="explain")
+    )
+
+
+def explain_code_stream(euri: Euri, code: str) -> CompletionStream:
+    prompt = explanation_prompt(code)
+    return remember_stream(
+        euri,
+        "explain",
+        code,
+        lambda: euri.complete_stream(prompt, max_tokens=2000, stage="explain"),
+    )
+
+
+def explain_code_chunked(
+    euri: Euri, code: str, *, concurrency: int = 4, target_chars: int = 4000
+) -> str:
+    """Map-reduce explanation: explain chunks concurrently, then combine the summaries."""
+    layout = split_module(code, target_chars=target_chars)
+    if len(layout.chunks) <= 1:
+        return explain_code(euri, code)
+
+    def work(chunk):
+        def compute() -> str:
+            return euri.complete(
+                chunk_explanation_prompt(layout.context, chunk.source),
+                max_tokens=800,
+                stage="explain-chunk",
+            )
+
+        return remember(euri, "explain-chunk", chunk.source, compute, context=layout.context)
+
+    parts = map_chunks(layout, work, concurrency=concurrency)
+    summaries = [parts[i] for i in sorted(parts)]
+    return euri.complete(
+        combine_explanations_prompt(layout.context, summaries), max_tokens=2000, stage="explain"
+    )
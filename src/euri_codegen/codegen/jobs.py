@@ -0,0 +1,327 @@
+"""Background generation jobs with their state persisted in SQLite.
+
+A job generates a list of topics on a worker pool, driven by a daemon thread
+that outlives the request (or Streamlit script run) that submitted it. Every
+change of a topic's state is written to the store, so any rerun, browser tab or
+new process can show progress. Cancelling a job lets topics in flight finish
+and marks the queued ones ``cancelled``. Resuming queues every topic that is
+not ``done`` again. A job whose process died is reported as ``interrupted``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..euri_client import Euri
+from ..models import Spec
+from .batch import run_topic
+from .generator import DEFAULT_MAX_REPAIRS
+
+DEFAULT_JOBS_PATH = Path.home() / ".cache" / "euri_codegen" / "jobs.sqlite3"
+
+# Topic states; a job is running, cancelling, done, cancelled or interrupted.
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+TOPIC_STATES = (QUEUED, RUNNING, DONE, FAILED, CANCELLED)
+FINISHED_JOB_STATES = ("done", "cancelled", "interrupted")
+
+
+@dataclass
+class TopicState:
+    topic: str
+    status: str = QUEUED
+    seconds: float = 0.0
+    module_path: Optional[str] = None
+    test_path: Optional[str] = None
+    error: Optional[str] = None
+    repairs: int = 0
+
+
+@dataclass
+class JobState:
+    id: str
+    created: float
+    status: str
+    out_dir: str
+    options: Dict[str, Any]
+    topics: List[TopicState] = field(default_factory=list)
+
+    def counts(self) -> Dict[str, int]:
+        counts = {s: 0 for s in TOPIC_STATES}
+        for t in self.topics:
+            counts[t.status] += 1
+        return counts
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_JOB_STATES
+
+    @property
+    def progress(self) -> float:
+        """Fraction of topics that reached a final state."""
+        if not self.topics:
+            return 1.0
+        return sum(1 for t in self.topics if t.status in (DONE, FAILED, CANCELLED)) / len(
+            self.topics
+        )
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """Job and per-topic state in one SQLite file; safe to share between threads and processes."""
+
+    def __init__(self, path: Path = DEFAULT_JOBS_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, created REAL NOT NULL, status "
+            "TEXT NOT NULL,"
+            " out_dir TEXT NOT NULL, options TEXT NOT NULL, pid INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_topics (job TEXT NOT NULL, pos INTEGER NOT NULL,"
+            " topic TEXT NOT NULL, spec TEXT NOT NULL, status TEXT NOT NULL, seconds REAL NOT NULL "
+            "DEFAULT 0,"
+            " module_path TEXT, test_path TEXT, error TEXT, repairs INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (job, pos))"
+        )
+
+    def _execute(self, sql: str, args: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            return self._conn.execute(sql, args).fetchall()
+
+    def create(self, specs: Sequence[Spec], out_dir: Path, options: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "INSERT INTO jobs VALUES (?, ?, 'running', ?, ?, ?)",
+                (job_id, time.time(), str(out_dir), json.dumps(options), os.getpid()),
+            )
+            self._conn.executemany(
+                "INSERT INTO job_topics (job, pos, topic, spec, status) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (job_id, i, s.id, json.dumps(s.model_dump(mode="json")), QUEUED)
+                    for i, s in enumerate(specs)
+                ],
+            )
+            self._conn.execute("COMMIT")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[JobState]:
+        rows = self._execute(
+            "SELECT id, created, status, out_dir, options, pid FROM jobs WHERE id = ?", (job_id,)
+        )
+        if not rows:
+            return None
+        job_id, created, status, out_dir, options, pid = rows[0]
+        if status in ("running", "cancelling") and pid != os.getpid() and not _pid_alive(pid):
+            status = "interrupted"
+        topics = [
+            TopicState(*row)
+            for row in self._execute(
+                "SELECT topic, status, seconds, module_path, test_path, error, repairs FROM "
+                "job_topics"
+                " WHERE job = ? ORDER BY pos",
+                (job_id,),
+            )
+        ]
+        return JobState(job_id, created, status, out_dir, json.loads(options), topics)
+
+    def recent(self, limit: int = 10) -> List[JobState]:
+        ids = self._execute("SELECT id FROM jobs ORDER BY created DESC LIMIT ?", (limit,))
+        return [job for (job_id,) in ids if (job := self.get(job_id)) is not None]
+
+    def set_status(self, job_id: str, status: str) -> None:
+        self._execute(
+            "UPDATE jobs SET status = ?, pid = ? WHERE id = ?", (status, os.getpid(), job_id)
+        )
+
+    def cancel_interrupted(self, job_id: str) -> bool:
+        """Mark the job cancelled if it is running or cancelling but its owner process died."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, pid FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None or row[0] not in ("running", "cancelling"):
+                return False
+            status, pid = row
+            if pid == os.getpid() or _pid_alive(pid):
+                return False
+            return (
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'cancelled' WHERE id = ? AND status = ? AND pid = ?",
+                    (job_id, status, pid),
+                ).rowcount
+                == 1
+            )
+
+    def set_topic(self, job_id: str, pos: int, status: str, **fields: Any) -> None:
+        cols = ", ".join(f"{k} = ?" for k in fields)
+        sets = f"status = ?, {cols}" if cols else "status = ?"
+        sql = f"UPDATE job_topics SET {sets} WHERE job = ? AND pos = ?"
+        self._execute(sql, (status, *fields.values(), job_id, pos))
+
+    def pending(self, job_id: str) -> List[Tuple[int, Dict[str, Any]]]:
+        """``(pos, spec)`` of every queued topic."""
+        rows = self._execute(
+            "SELECT pos, spec FROM job_topics WHERE job = ? AND status = ? ORDER BY pos",
+            (job_id, QUEUED),
+        )
+        return [(pos, json.loads(spec)) for pos, spec in rows]
+
+    def requeue(self, job_id: str) -> int:
+        """Queue every topic that is not done again (failed, cancelled, or lost mid-run)."""
+        with self._lock:
+            return self._conn.execute(
+                "UPDATE job_topics SET status = ?, error = NULL WHERE job = ? AND status != ?",
+                (QUEUED, job_id, DONE),
+            ).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class JobRunner:
+    """Runs jobs from a :class:`JobStore` on background threads of this process."""
+
+    def __init__(self, store: JobStore):
+        self.store = store
+        self._lock = threading.Lock()
+        self._threads: Dict[str, threading.Thread] = {}
+        self._cancel: Dict[str, threading.Event] = {}
+
+    def submit(
+        self,
+        euri: Euri,
+        specs: Sequence[Spec],
+        out_dir: Path,
+        *,
+        concurrency: int = 4,
+        llm_tests: str = "auto",
+        max_tokens: Optional[int] = None,
+        max_repairs: int = DEFAULT_MAX_REPAIRS,
+    ) -> str:
+        options = {
+            "concurrency": concurrency,
+            "llm_tests": llm_tests,
+            "max_tokens": max_tokens,
+            "max_repairs": max_repairs,
+        }
+        job_id = self.store.create(specs, out_dir, options)
+        self._start(euri, job_id)
+        return job_id
+
+    def resume(self, euri: Euri, job_id: str) -> bool:
+        """Run the job's unfinished topics again; False if it is still running here or unknown."""
+        job = self.store.get(job_id)
+        if job is None or self.is_alive(job_id):
+            return False
+        self.store.requeue(job_id)
+        self.store.set_status(job_id, "running")
+        self._start(euri, job_id)
+        return True
+
+    def cancel(self, job_id: str) -> bool:
+        """Stop a job running here, or mark an interrupted one cancelled.
+
+        Returns False, changing nothing, for a finished job or one that another live process runs.
+        """
+        with self._lock:
+            event = self._cancel.get(job_id)
+        if event is not None and self.is_alive(job_id):
+            event.set()
+            self.store.set_status(job_id, "cancelling")
+            return True
+        return self.store.cancel_interrupted(job_id)
+
+    def is_alive(self, job_id: str) -> bool:
+        with self._lock:
+            thread = self._threads.get(job_id)
+        return thread is not None and thread.is_alive()
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            thread = self._threads.get(job_id)
+        if thread is not None:
+            thread.join(timeout)
+
+    def _start(self, euri: Euri, job_id: str) -> None:
+        with self._lock:
+            cancel = self._cancel[job_id] = threading.Event()
+            thread = threading.Thread(
+                target=self._run,
+                args=(euri, job_id, cancel),
+                name=f"euri-job-{job_id}",
+                daemon=True,
+            )
+            self._threads[job_id] = thread
+        thread.start()
+
+    def _run(self, euri: Euri, job_id: str, cancel: threading.Event) -> None:
+        job = self.store.get(job_id)
+        assert job is not None
+        opts = job.options
+        out_dir = Path(job.out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        def work(pos: int, data: Dict[str, Any]) -> None:
+            if cancel.is_set():
+                self.store.set_topic(job_id, pos, CANCELLED)
+                return
+            self.store.set_topic(job_id, pos, RUNNING)
+            try:
+                spec = Spec.model_validate(data)
+            except Exception as e:
+                self.store.set_topic(job_id, pos, FAILED, error=f"invalid spec: {e}")
+                return
+            r = run_topic(
+                euri,
+                spec,
+                out_dir,
+                opts.get("max_tokens"),
+                opts.get("llm_tests", "auto"),
+                opts.get("max_repairs", DEFAULT_MAX_REPAIRS),
+            )
+            self.store.set_topic(
+                job_id,
+                pos,
+                DONE if r.ok else FAILED,
+                seconds=r.seconds,
+                error=r.error,
+                repairs=r.repairs,
+                module_path=str(r.module_path) if r.module_path else None,
+                test_path=str(r.test_path) if r.test_path else None,
+            )
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, int(opts.get("concurrency", 4)))) as pool:
+                for fut in [
+                    pool.submit(work, pos, data) for pos, data in self.store.pending(job_id)
+                ]:
+                    fut.result()
+        finally:
+            self.store.set_status(job_id, "cancelled" if cancel.is_set() else "done")
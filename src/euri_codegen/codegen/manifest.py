@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..models import Spec
+from ..prompts import templates
+from . import spec_tests
+
+MANIFEST_NAME = ".euri_manifest.json"
+
+
+@lru_cache(maxsize=1)
+def _templates_digest() -> str:
+    source = inspect.getsource(templates) + inspect.getsource(spec_tests)
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def fingerprint(
+    spec: Spec,
+    *,
+    model: str,
+    temperature: float,
+    max_tokens: Optional[int],
+    llm_tests: str = "auto",
+) -> str:
+    """Hash everything that influences a topic's generated output."""
+    payload = json.dumps(
+        {
+            "spec": spec.model_dump(mode="json"),
+            "templates": _templates_digest(),
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "llm_tests": llm_tests,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BuildManifest:
+    """Records the fingerprint each generated topic was built from, like a make stamp file."""
+
+    def __init__(self, out_dir: Path):
+        self.out_dir = Path(out_dir)
+        self.path = self.out_dir / MANIFEST_NAME
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding="utf-8")).get("topics", {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def stale_reason(self, topic: str, fp: str) -> Optional[str]:
+        """Return why ``topic`` needs rebuilding, or None when it is up to date."""
+        entry = self.entries.get(topic)
+        if entry is None:
+            return "new"
+        if entry.get("fingerprint") != fp:
+            return "changed"
+        for key in ("module", "tests"):
+            if not (self.out_dir / entry.get(key, "")).is_file():
+                return "missing output"
+        return None
+
+    def record(
+        self,
+        topic: str,
+        fp: str,
+        module_path: Path,
+        test_path: Path,
+        *,
+        model: Optional[str] = None,
+    ) -> None:
+        self.entries[topic] = {
+            "fingerprint": fp,
+            "module": Path(module_path).name,
+            "tests": Path(test_path).name,
+            "model": model,
+        }
+
+    def save(self) -> None:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"version": 1, "topics": self.entries}, indent=2, sort_keys=True),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
@@ -1,9 +1,23 @@
 from __future__ import annotations
 
-from typing import Literal
+import json
+from typing import Callable, Dict, List, Literal, Optional, Tuple
 
-from ..euri_client import Euri
-from ..prompts.templates import optimization_prompt
+from ..euri_client import CompletionStream, Euri
+from ..prompts.templates import chunk_optimization_prompt, optimization_prompt
+from ..semantic_cache import lookup, remember, remember_stream, settle, store
+from .chunking import (
+    Chunk,
+    ModuleLayout,
+    extract_rewrite,
+    map_chunks,
+    public_api,
+    regroup,
+    split_definitions,
+    split_module,
+)
+
+Rewrite = Tuple[str, List[str]]  # definitions source, new import lines
 
 
 def _strip_code_fences(text: str) -> str:
@@ -18,6 +32,187 @@ def _strip_code_fences(text: str) -> str:
     return t
 
 
-def optimize_code(euri: Euri, code: str, *, level: Literal["one", "readability", "performance", "memory", "all"] = "all") -> str:
-    prompt = optimization_prompt(code, level)
-    return _strip_code_fences(euri.complete(prompt, max_tokens=2500))
+def optimize_code(
+    euri: Euri,
+    code: str,
+    *,
+    level: Literal["one", "readability", "performance", "memory", "all"] = "all",
+    feedback: Optional[str] = None,
+    store_result: bool = True,
+) -> str:
+    """Optimize ``code``, reusing the semantic cache.
+
+    With ``store_result=False`` a fresh rewrite is not cached; the caller
+    verifies it first and records its verdict with :func:`settle_optimized`.
+    """
+
+    def compute() -> str:
+        prompt = optimization_prompt(code, level, feedback)
+        return _strip_code_fences(euri.complete(prompt, max_tokens=2500, stage="optimize"))
+
+    if feedback is not None:  # a retry after a rejected rewrite must not get that rewrite back
+        return compute()
+    if not store_result:
+        _, cached = lookup(euri, "optimize", code, level=level)
+        return cached if cached is not None else compute()
+    return remember(euri, "optimize", code, compute, level=level)
+
+
+def settle_optimized(
+    euri: Euri,
+    code: str,
+    accepted: Optional[str],
+    *,
+    level: Literal["one", "readability", "performance", "memory", "all"] = "all",
+) -> None:
+    """Cache the verified rewrite of ``code``, or forget a cached one that was rejected."""
+    settle(euri, "optimize", code, accepted, level=level)
+
+
+def optimize_code_stream(
+    euri: Euri,
+    code: str,
+    *,
+    level: Literal["one", "readability", "performance", "memory", "all"] = "all",
+) -> CompletionStream:
+    """Stream the raw optimization reply; wrap with ``strip_code_fences_stream`` to sanitize."""
+    return remember_stream(
+        euri,
+        "optimize",
+        code,
+        lambda: euri.complete_stream(
+            optimization_prompt(code, level), max_tokens=2500, stage="optimize"
+        ),
+        keep=_strip_code_fences,
+        level=level,
+    )
+
+
+def _rewrite_chunks(
+    euri: Euri,
+    code: str,
+    layout: ModuleLayout,
+    make_prompt: Callable[[Chunk], str],
+    *,
+    stage: str,
+    concurrency: int,
+    known: Optional[Dict[int, Rewrite]] = None,
+    on_rewrite: Optional[Callable[[Chunk, Rewrite], None]] = None,
+) -> str:
+    """Rewrite ``layout.chunks`` concurrently and splice the usable rewrites back into ``code``.
+
+    Chunks in ``known`` (by index) are not sent; their rewrite is used as is.
+    Rewrites that do not parse or rename definitions are dropped in favour of the
+    original chunk, and the reassembled module must parse and keep the public API.
+    """
+    known = known or {}
+
+    def work(chunk):
+        # Budget output by chunk size (~4 chars/token, with room to grow).
+        reply = euri.complete(
+            make_prompt(chunk), max_tokens=min(2500, max(512, len(chunk.source) // 2)), stage=stage
+        )
+        rewrite = extract_rewrite(_strip_code_fences(reply), chunk.names, layout.context)
+        if rewrite is not None and on_rewrite is not None:
+            on_rewrite(chunk, rewrite)
+        return rewrite
+
+    todo = ModuleLayout(
+        layout.segments, layout.context, [c for c in layout.chunks if c.index not in known]
+    )
+    results: Dict[int, Optional[Rewrite]] = {
+        **known,
+        **map_chunks(todo, work, concurrency=concurrency),
+    }
+    replacements = {i: r[0] for i, r in results.items() if r is not None}
+    imports = list(dict.fromkeys(line for r in results.values() if r is not None for line in r[1]))
+    new_code = layout.reassemble(replacements, imports)
+    try:
+        new_api = public_api(new_code)
+    except SyntaxError as e:
+        raise ValueError(f"Reassembled module does not parse: {e}") from e
+    if new_api != public_api(code):
+        raise ValueError("Rewritten module changed the public API")
+    return new_code
+
+
+def optimize_code_chunked(
+    euri: Euri,
+    code: str,
+    *,
+    level: Literal["one", "readability", "performance", "memory", "all"] = "all",
+    concurrency: int = 4,
+    target_chars: int = 4000,
+) -> str:
+    """Optimize each top-level function/class (grouped up to ``target_chars``) concurrently.
+
+    Each chunk is sent with the module's imports/constants as context. Every
+    definition's rewrite is also kept in the semantic cache on its own, so a
+    definition unchanged since an earlier run (same normalized AST, level, model
+    and context) is reused and only the other definitions are sent.
+    """
+    layout = split_module(code, target_chars=target_chars)
+    if not layout.chunks:
+        return optimize_code(euri, code, level=level)
+    keys: Dict[int, str] = {}  # segment index -> semantic cache key
+    stored: Dict[int, Rewrite] = {}
+    for chunk in layout.chunks:
+        for i in chunk.segments:
+            source = layout.segments[i].source
+            key, hit = lookup(euri, "optimize-def", source, level=level, context=layout.context)
+            if hit is not None:
+                value = json.loads(hit)
+                stored[i] = (value["source"], value["imports"])
+            elif key is not None:
+                keys[i] = key
+    if stored:
+        layout = regroup(layout, set(stored), target_chars=target_chars)
+    known = {c.index: stored[c.segments[0]] for c in layout.chunks if c.segments[0] in stored}
+
+    def remember_definitions(chunk: Chunk, rewrite: Rewrite) -> None:
+        sources = split_definitions(rewrite[0])
+        for i in chunk.segments:
+            name = layout.segments[i].names[0]
+            if i in keys and name in sources:
+                value = json.dumps({"source": sources[name], "imports": rewrite[1]})
+                store(euri, keys[i], "optimize-def", value)
+
+    return _rewrite_chunks(
+        euri,
+        code,
+        layout,
+        lambda chunk: chunk_optimization_prompt(layout.context, chunk.source, chunk.names, level),
+        stage="optimize-chunk",
+        concurrency=concurrency,
+        known=known,
+        on_rewrite=remember_definitions,
+    )
+
+
+def optimize_code_profiled(
+    euri: Euri,
+    code: str,
+    profiles: Dict[str, str],
+    *,
+    level: Literal["one", "readability", "performance", "memory", "all"] = "all",
+    concurrency: int = 4,
+) -> str:
+    """Send only the hot top-level definitions (keys of ``profiles``), each with its profile text.
+
+    Everything else in the module is kept verbatim.
+    """
+    layout = split_module(code, target_chars=0)  # one definition per chunk
+    hot = [c for c in layout.chunks if c.names[0] in profiles]
+    if not hot:
+        raise ValueError("None of the profiled hotspots is a top-level definition of this module")
+    subset = ModuleLayout(layout.segments, layout.context, hot)
+    return _rewrite_chunks(
+        euri,
+        code,
+        subset,
+        lambda chunk: chunk_optimization_prompt(
+            layout.context, chunk.source, chunk.names, level, profile=profiles[chunk.names[0]]
+        ),
+        stage="optimize-profiled",
+        concurrency=concurrency,
+    )
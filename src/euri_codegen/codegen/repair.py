@@ -0,0 +1,128 @@
+"""Check generated modules and splice in targeted fixes.
+
+A module must compile and define the name from the spec's ``function_signature``.
+When it does not, only the offending top-level statement (or nothing, for a
+missing definition) is sent back to the model, and its reply replaces that span.
+"""
+
+from __future__ import annotations
+
+import ast
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .spec_tests import target_name
+
+# Larger statements fall back to a window around the error line.
+MAX_SPAN_LINES = 40
+WINDOW = 5
+
+# Top-level lines that continue the statement above them rather than start a new one.
+_CONTINUATIONS = ("else", "elif", "except", "finally", "case", ")", "]", "}")
+
+
+class CodeCheckError(ValueError):
+    """Raised when a module still fails its check after the allowed repairs."""
+
+
+@dataclass
+class CodeIssue:
+    message: str
+    # 1-based, inclusive; ``start == end + 1`` means "insert here" (nothing to replace).
+    start: int
+    end: int
+
+    @property
+    def is_insert(self) -> bool:
+        return self.start > self.end
+
+
+def _defined_names(tree: ast.Module) -> Set[str]:
+    names: Set[str] = set()
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            names.update(t.id for t in targets if isinstance(t, ast.Name))
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update((a.asname or a.name).split(".")[0] for a in node.names)
+    return names
+
+
+def _is_statement_start(line: str) -> bool:
+    return (
+        bool(line.strip())
+        and not line[0].isspace()
+        and not line.lstrip().startswith(_CONTINUATIONS)
+    )
+
+
+def _statement_span(lines: List[str], first: int, last: int) -> Tuple[int, int]:
+    """The top-level statement(s) around lines ``first``..``last`` (1-based)."""
+    start = first
+    while start > 1 and not _is_statement_start(lines[start - 1]):
+        start -= 1
+    while start > 1 and lines[start - 2].startswith("@"):
+        start -= 1
+    end = last
+    while end < len(lines) and not _is_statement_start(lines[end]):
+        end += 1
+    while end > start and not lines[end - 1].strip():
+        end -= 1
+    if end - start + 1 > MAX_SPAN_LINES:
+        return max(1, first - WINDOW), min(len(lines), last + WINDOW)
+    return start, end
+
+
+def check_module(code: str, spec: Dict[str, Any]) -> Optional[CodeIssue]:
+    """None when ``code`` compiles and defines the spec's target, else what is wrong and where."""
+    lines = code.splitlines()
+    try:
+        compile(code, f"{spec.get('id', 'module')}.py", "exec", dont_inherit=True)
+    except SyntaxError as e:
+        if not lines:
+            return CodeIssue(f"SyntaxError: {e.msg}", 1, 0)
+        first = min(max(e.lineno or 1, 1), len(lines))
+        last = min(max(getattr(e, "end_lineno", None) or first, first), len(lines))
+        start, end = _statement_span(lines, first, last)
+        return CodeIssue(f"SyntaxError: {e.msg} (line {e.lineno})", start, end)
+    name = target_name(spec)
+    if name and name not in _defined_names(ast.parse(code)):
+        kind = (
+            "class"
+            if spec.get("function_signature", "").lstrip().startswith("class")
+            else "function"
+        )
+        return CodeIssue(
+            f"{kind} `{name}` is not defined at module level", len(lines) + 1, len(lines)
+        )
+    return None
+
+
+def offending_span(code: str, issue: CodeIssue) -> str:
+    return "\n".join(code.splitlines()[issue.start - 1 : issue.end])
+
+
+def _reply_lines(reply: str) -> List[str]:
+    """Reply lines without markdown fences or surrounding blank lines; indentation is kept."""
+    lines = reply.splitlines()
+    while lines and not lines[0].strip():
+        lines.pop(0)
+    while lines and not lines[-1].strip():
+        lines.pop()
+    if lines and lines[0].lstrip().startswith("```"):
+        lines.pop(0)
+        if lines and lines[-1].strip().startswith("```"):
+            lines.pop()
+    return lines
+
+
+def splice(code: str, issue: CodeIssue, reply: str) -> str:
+    """Replace the issue's span (or insert at it) with the model's ``reply``."""
+    lines = code.splitlines()
+    new = _reply_lines(reply)
+    if issue.is_insert and lines and lines[-1].strip():
+        new = ["", ""] + new
+    lines[issue.start - 1 : issue.end] = new
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,603 @@
+"""Deterministic local rewrites applied before (or instead of) LLM optimization.
+
+Rules find well-known slow patterns with ``ast`` and emit text edits at exact
+node positions, so comments and formatting outside the rewritten spans are kept.
+A rule only fires where it can prove the rewrite keeps behaviour (types of the
+names involved, builtins not shadowed), and rules only run when named. Register
+new rules with :func:`register_rule`.
+"""
+
+from __future__ import annotations
+
+import ast
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Type
+
+Position = Tuple[int, int]  # (1-based line, UTF-8 byte column), as reported by ast
+
+
+@dataclass(frozen=True)
+class Edit:
+    start: Position
+    end: Position
+    text: str
+
+
+@dataclass
+class AppliedRewrite:
+    rule: str
+    line: int
+    detail: str
+
+
+@dataclass
+class Match:
+    line: int
+    detail: str
+    edits: List[Edit]
+
+
+class Rule:
+    """Base class: ``find`` yields matches whose edits must not overlap each other."""
+
+    name: str = ""
+    summary: str = ""
+    # Code defining ``run(n)`` that exhibits the pattern; used by the rule benchmark.
+    sample: str = ""
+
+    def find(self, tree: ast.Module, source: str) -> Iterable[Match]:
+        raise NotImplementedError
+
+
+RULES: Dict[str, Rule] = {}
+
+
+def register_rule(cls: Type[Rule]) -> Type[Rule]:
+    RULES[cls.name] = cls()
+    return cls
+
+
+def _span(node: ast.AST) -> Tuple[Position, Position]:
+    return (node.lineno, node.col_offset), (node.end_lineno, node.end_col_offset)  # type: ignore[attr-defined]
+
+
+def _segment(source: str, node: ast.AST) -> str:
+    return ast.get_source_segment(source, node) or ""
+
+
+def _indent_of(source_lines: Sequence[str], node: ast.stmt) -> str:
+    line = source_lines[node.lineno - 1]
+    return line[: len(line) - len(line.lstrip())]
+
+
+def _loops(tree: ast.AST) -> Iterator[ast.stmt]:
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.For, ast.While)):
+            yield node
+
+
+def _walk_no_defs(nodes: Iterable[ast.AST]) -> Iterator[ast.AST]:
+    """Walk nodes without descending into nested functions/classes/lambdas."""
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        yield node
+        for child in ast.iter_child_nodes(node):
+            if not isinstance(
+                child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+            ):
+                stack.append(child)
+
+
+def _stored_names(nodes: Iterable[ast.AST]) -> Set[str]:
+    names = set()
+    for node in _walk_no_defs(nodes):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            names.add(node.id)
+    return names
+
+
+def _used_names(tree: ast.AST) -> Set[str]:
+    return {n.id for n in ast.walk(tree) if isinstance(n, ast.Name)}
+
+
+def _fresh(base: str, taken: Set[str]) -> str:
+    name, i = base, 2
+    while name in taken:
+        name, i = f"{base}{i}", i + 1
+    taken.add(name)
+    return name
+
+
+def _enclosing_scopes(tree: ast.Module) -> Iterator[ast.AST]:
+    yield tree
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            yield node
+
+
+def _bound_names(tree: ast.AST) -> Set[str]:
+    """Every name the module binds anywhere; ``*`` if it star-imports (which may bind anything)."""
+    names: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            names.add(node.id)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, ast.alias):
+            names.add(node.asname or node.name.split(".")[0])
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            names.update(node.names)
+        for attr in ("name", "rest"):  # defs, except handlers, match captures
+            value = getattr(node, attr, None)
+            if isinstance(value, str) and not isinstance(node, ast.alias):
+                names.add(value)
+    return names
+
+
+def _builtin_call(node: ast.AST, names: Set[str], bound: Set[str]) -> bool:
+    """A call of one of the builtins ``names`` that the module never rebinds."""
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in names
+        and node.func.id not in bound
+        and "*" not in bound
+        and not any(isinstance(a, ast.Starred) for a in node.args)
+        and not node.keywords
+    )
+
+
+def _binding_sites(scope: ast.AST, name: str) -> Optional[List[ast.stmt]]:
+    """The ``name = value`` and ``for name in ...`` statements binding ``name`` in ``scope``.
+
+    None unless ``name`` is a plain local bound only that way: not a parameter,
+    global or nonlocal, never unpacked, augmented, deleted, imported or bound by
+    ``with``/``except``/walrus, and not mentioned by a nested function or class.
+    """
+    if not isinstance(scope, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        return None  # module globals can be rebound from anywhere
+    args = scope.args
+    params = (
+        args.posonlyargs + args.args + args.kwonlyargs + [a for a in (args.vararg, args.kwarg) if a]
+    )
+    if name in {a.arg for a in params}:
+        return None
+    sites: List[ast.stmt] = []
+    targets: Set[int] = set()
+    for node in _walk_no_defs(scope.body):
+        if isinstance(node, ast.Assign) and [getattr(t, "id", None) for t in node.targets] == [
+            name
+        ]:
+            sites.append(node)
+            targets.add(id(node.targets[0]))
+        elif isinstance(node, ast.For) and getattr(node.target, "id", None) == name:
+            sites.append(node)
+            targets.add(id(node.target))
+    for node in ast.walk(scope):
+        if node is scope:
+            continue
+        if isinstance(node, ast.Name) and node.id == name and not isinstance(node.ctx, ast.Load):
+            if id(node) not in targets:
+                return None
+        elif isinstance(node, (ast.Global, ast.Nonlocal)) and name in node.names:
+            return None
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+            if name in _bound_names(node) | _used_names(node):
+                return None
+        elif isinstance(
+            node, (ast.alias, ast.ExceptHandler, ast.MatchAs, ast.MatchStar, ast.MatchMapping)
+        ):
+            if name in _bound_names(node):
+                return None
+    return sites or None
+
+
+# Builtins that always return an exact int/float/bool/str (str() and repr() may return a subclass).
+_SCALAR_CALLS = {"len", "int", "float", "bool", "ord", "chr", "hash"}
+_SCALAR_TYPES = (int, float, str, bytes)
+
+
+def _scalar(node: ast.AST, scope: ast.AST, bound: Set[str]) -> bool:
+    """Provably an int, float, bool, str or bytes (all hashable)."""
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, _SCALAR_TYPES)
+    if isinstance(node, ast.JoinedStr) or _builtin_call(node, _SCALAR_CALLS, bound):
+        return True
+    if isinstance(node, ast.UnaryOp):
+        return _scalar(node.operand, scope, bound)
+    if isinstance(node, ast.BinOp) and not isinstance(node.op, ast.MatMult):
+        # Both sides builtin scalars: no user __add__ etc. can run, and the result is one too.
+        return _scalar(node.left, scope, bound) and _scalar(node.right, scope, bound)
+    if isinstance(node, ast.Name):
+        sites = _binding_sites(scope, node.id)
+        return sites is not None and all(
+            (isinstance(s, ast.For) and _builtin_call(s.iter, {"range"}, bound))
+            or (
+                isinstance(s, ast.Assign)
+                and isinstance(s.value, ast.Constant)
+                and isinstance(s.value.value, _SCALAR_TYPES)
+            )
+            for s in sites
+        )
+    return False
+
+
+def _sequence_value(node: ast.AST, bound: Set[str]) -> bool:
+    """Provably an exact list, tuple or str."""
+    if isinstance(node, (ast.List, ast.Tuple, ast.ListComp, ast.JoinedStr)):
+        return True
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, str)
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in {"list", "tuple", "sorted"}
+        and node.func.id not in bound
+        and "*" not in bound
+    )
+
+
+def _only_read(scope: ast.AST, name: str, bound: Set[str]) -> bool:
+    """Every load of ``name`` in ``scope`` reads it without it escaping (no aliases or calls)."""
+    parents = {id(child): node for node in ast.walk(scope) for child in ast.iter_child_nodes(node)}
+    for node in _walk_no_defs(scope.body):
+        if not (isinstance(node, ast.Name) and node.id == name and isinstance(node.ctx, ast.Load)):
+            continue
+        parent = parents[id(node)]
+        if isinstance(parent, ast.Subscript) and parent.value is node:
+            continue
+        if isinstance(parent, (ast.For, ast.comprehension)) and parent.iter is node:
+            continue
+        if isinstance(parent, ast.Return) or (
+            _builtin_call(parent, {"len"}, bound) and parent.args == [node]
+        ):
+            continue
+        if (
+            isinstance(parent, ast.Attribute)
+            and isinstance(parents.get(id(parent)), ast.Call)
+            and parents[id(parent)].func is parent
+        ):
+            continue  # seq.append(x): a method call on the sequence itself
+        return False
+    return True
+
+
+@register_rule
+class MembershipListLiteral(Rule):
+    name = "membership-set-literal"
+    # Only for a provably hashable scalar: an unhashable value would raise TypeError in a set.
+    summary = (
+        "`x in [consts]` -> `x in {consts}` for scalar `x` "
+        "(O(1) hashed lookup, folded to a frozenset)"
+    )
+    sample = (
+        "def run(n):\n"
+        "    hits = 0\n"
+        "    for i in range(n):\n"
+        "        if i % 17 in [1, 3, 5, 7, 9, 11, 13, 15]:\n"
+        "            hits += 1\n"
+        "    return hits\n"
+    )
+
+    def find(self, tree: ast.Module, source: str) -> Iterable[Match]:
+        bound = _bound_names(tree)
+        for scope in _enclosing_scopes(tree):
+            body = (
+                scope.body
+                if isinstance(scope, (ast.FunctionDef, ast.AsyncFunctionDef))
+                else [scope]
+            )
+            for node in _walk_no_defs(body):
+                if isinstance(node, ast.Compare):
+                    yield from self._match(node, scope, bound)
+
+    def _match(self, node: ast.Compare, scope: ast.AST, bound: Set[str]) -> Iterator[Match]:
+        for left, op, comp in zip([node.left, *node.comparators], node.ops, node.comparators):
+            if not isinstance(op, (ast.In, ast.NotIn)) or not isinstance(comp, ast.List):
+                continue
+            if not _scalar(left, scope, bound):
+                continue
+            elts = comp.elts
+            if len(elts) < 2 or not all(
+                isinstance(e, ast.Constant)
+                and isinstance(e.value, (int, str, bytes))
+                and not isinstance(e.value, bool)
+                for e in elts
+            ):
+                continue
+            # Set semantics would merge equal-but-distinct constants such as 1 and 1.0.
+            if len({repr(e.value) for e in elts}) != len(elts):
+                continue
+            start, end = _span(comp)
+            yield Match(
+                comp.lineno,
+                "list literal membership test -> set literal",
+                [Edit(start, (start[0], start[1] + 1), "{"), Edit((end[0], end[1] - 1), end, "}")],
+            )
+
+
+@register_rule
+class RangeLenToIteration(Rule):
+    name = "range-len-iteration"
+    # Only for a local provably bound to a list, tuple or str: a dict or any other type with its
+    # own __getitem__/__iter__ iterates differently from indexing it by position.
+    summary = (
+        "`for i in range(len(seq)): ... seq[i]` -> iterate the list/tuple/str (or enumerate it)"
+    )
+    sample = (
+        "def run(n):\n"
+        "    seq = list(range(n))\n"
+        "    total = 0\n"
+        "    for i in range(len(seq)):\n"
+        "        total += seq[i] * seq[i]\n"
+        "    return total\n"
+    )
+
+    def find(self, tree: ast.Module, source: str) -> Iterable[Match]:
+        bound = _bound_names(tree)
+        for scope in _enclosing_scopes(tree):
+            if not isinstance(scope, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue  # module-level names cannot be proven to hold a sequence
+            taken = _used_names(scope)
+            for loop in _walk_no_defs(scope.body):
+                match = self._match(loop, scope, source, taken, bound)
+                if match is not None:
+                    yield match
+
+    def _match(
+        self, loop: ast.AST, scope: ast.AST, source: str, taken: Set[str], bound: Set[str]
+    ) -> Optional[Match]:
+        if not (
+            isinstance(loop, ast.For) and isinstance(loop.target, ast.Name) and not loop.orelse
+        ):
+            return None
+        it = loop.iter
+        if not (_builtin_call(it, {"range"}, bound) and len(it.args) == 1):
+            return None
+        inner = it.args[0]
+        if not (
+            _builtin_call(inner, {"len"}, bound)
+            and len(inner.args) == 1
+            and isinstance(inner.args[0], ast.Name)
+        ):
+            return None
+        seq, idx = inner.args[0].id, loop.target.id
+        sites = _binding_sites(scope, seq)
+        if sites is None or not all(
+            isinstance(s, ast.Assign) and _sequence_value(s.value, bound) for s in sites
+        ):
+            return None
+        if not _only_read(scope, seq, bound):
+            return None
+        # The sequence must not be rebound or mutated through an index inside the loop.
+        if seq in _stored_names(loop.body) or idx in _stored_names(loop.body):
+            return None
+        loads: List[ast.Subscript] = []
+        for node in _walk_no_defs(loop.body):
+            if (
+                isinstance(node, ast.Subscript)
+                and isinstance(node.value, ast.Name)
+                and node.value.id == seq
+            ):
+                if isinstance(node.slice, ast.Name) and node.slice.id == idx:
+                    if not isinstance(node.ctx, ast.Load):
+                        return None
+                    loads.append(node)
+        # Any other reference (seq.append(x), f(seq), seq[j]) could observe or change it mid-loop.
+        load_values = {id(n.value) for n in loads}
+        if any(
+            isinstance(n, ast.Name) and n.id == seq and id(n) not in load_values
+            for n in _walk_no_defs(loop.body)
+        ):
+            return None
+        if not loads:
+            return None
+        load_ids = {id(n.slice) for n in loads}
+        other_idx_use = any(
+            isinstance(n, ast.Name)
+            and n.id == idx
+            and id(n) not in load_ids
+            and n is not loop.target
+            for n in _walk_no_defs([scope])
+        )
+        # "nums" -> "num", otherwise "<seq>_item".
+        item = _fresh(seq[:-1] if len(seq) > 3 and seq.endswith("s") else f"{seq}_item", taken)
+        edits = [Edit(*_span(n), item) for n in loads]
+        if other_idx_use:
+            edits.append(Edit(*_span(loop.target), f"{idx}, {item}"))
+            edits.append(Edit(*_span(it), f"enumerate({seq})"))
+            detail = f"range(len({seq})) indexing -> enumerate({seq})"
+        else:
+            edits.append(Edit(*_span(loop.target), item))
+            edits.append(Edit(*_span(it), seq))
+            detail = f"range(len({seq})) indexing -> direct iteration"
+        return Match(loop.lineno, detail, edits)
+
+
+# Statements that may let a function go on after an exception raised inside them.
+_EXCEPTION_GUARDS = (ast.Try, getattr(ast, "TryStar", ast.Try), ast.With, ast.AsyncWith)
+
+
+@register_rule
+class StringConcatInLoop(Rule):
+    name = "str-join-accumulate"
+    summary = (
+        "`s = ''` + `s += ...` in a loop -> collect parts and `''.join` once "
+        "(avoids O(n^2) copying)"
+    )
+    # CPython often resizes the string in place instead; the benchmark shows whether this pays off.
+    sample = (
+        "def run(n):\n"
+        "    out = ''\n"
+        "    for i in range(n):\n"
+        "        out += str(i % 10)\n"
+        "    return len(out)\n"
+    )
+
+    def find(self, tree: ast.Module, source: str) -> Iterable[Match]:
+        lines = source.splitlines()
+        for scope in _enclosing_scopes(tree):
+            if not isinstance(scope, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue  # a module global can be read by any function the loop calls
+            taken = _used_names(scope)
+            for block in self._blocks(scope):
+                for init, loop in zip(block, block[1:]):
+                    match = self._match(scope, init, loop, source, lines, taken)
+                    if match is not None:
+                        yield match
+
+    @staticmethod
+    def _blocks(scope: ast.AST) -> Iterator[List[ast.stmt]]:
+        """Statement blocks of ``scope`` outside any ``try`` or ``with``.
+
+        The join only runs once the loop completes. If an exception escapes the
+        loop and a ``try`` (or a ``with`` whose ``__exit__`` suppresses it) lets
+        the function go on, the string would be unbound or stale.
+        """
+        stack: List[ast.AST] = [scope]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, _EXCEPTION_GUARDS):
+                continue
+            for field_name in ("body", "orelse", "finalbody"):
+                block = getattr(node, field_name, None)
+                if isinstance(block, list) and block and isinstance(block[0], ast.stmt):
+                    yield block
+            stack.extend(
+                child
+                for child in ast.iter_child_nodes(node)
+                if not isinstance(
+                    child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+                )
+            )
+
+    def _match(
+        self,
+        scope: ast.AST,
+        init: ast.stmt,
+        loop: ast.stmt,
+        source: str,
+        lines: List[str],
+        taken: Set[str],
+    ) -> Optional[Match]:
+        if not (
+            isinstance(init, ast.Assign)
+            and len(init.targets) == 1
+            and isinstance(init.targets[0], ast.Name)
+            and isinstance(init.value, ast.Constant)
+            and init.value.value == ""
+            and isinstance(loop, (ast.For, ast.While))
+            and not loop.orelse
+        ):
+            return None
+        name = init.targets[0].id
+        # Code the loop calls could otherwise see the string before the join.
+        for node in ast.walk(scope):
+            if isinstance(node, (ast.Global, ast.Nonlocal)) and name in node.names:
+                return None
+            if node is not scope and isinstance(
+                node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+            ):
+                if name in _bound_names(node) | _used_names(node):
+                    return None
+        augs = [
+            node
+            for node in _walk_no_defs(loop.body)
+            if isinstance(node, ast.AugAssign)
+            and isinstance(node.target, ast.Name)
+            and node.target.id == name
+        ]
+        if not augs or any(not isinstance(a.op, ast.Add) for a in augs):
+            return None
+        # Any other use inside the loop (a read, a rebind) needs the string itself.
+        targets = {id(a.target) for a in augs}
+        scanned = loop.body + ([loop.test] if isinstance(loop, ast.While) else [])
+        if any(
+            isinstance(n, ast.Name) and n.id == name and id(n) not in targets
+            for n in _walk_no_defs(scanned)
+        ):
+            return None
+        if not all(self._alone_on_line(s, lines) for s in [init, *augs]):
+            return None
+        parts = _fresh(f"{name}_parts", taken)
+        indent = _indent_of(lines, loop)
+        end_line = loop.end_lineno or loop.lineno
+        after = len(lines[end_line - 1].encode("utf-8"))
+        edits = [Edit(*_span(init), f"{parts} = []")]
+        edits.extend(Edit(*_span(a), f"{parts}.append({_segment(source, a.value)})") for a in augs)
+        edits.append(
+            Edit((end_line, after), (end_line, after), f'\n{indent}{name} = "".join({parts})')
+        )
+        return Match(loop.lineno, f"'{name} +=' in loop -> list + ''.join", edits)
+
+    @staticmethod
+    def _alone_on_line(node: ast.stmt, lines: List[str]) -> bool:
+        if node.end_lineno != node.lineno:
+            return False
+        line = lines[node.lineno - 1].encode("utf-8")
+        return not line[: node.col_offset].strip() and not line[
+            node.end_col_offset :
+        ].strip().rstrip(b";")
+
+
+def apply_edits(source: str, edits: Sequence[Edit]) -> str:
+    """Apply non-overlapping edits (positions use ast's UTF-8 byte columns)."""
+    data = source.encode("utf-8")
+    starts = [0]
+    for line in data.splitlines(keepends=True):
+        starts.append(starts[-1] + len(line))
+
+    def offset(pos: Position) -> int:
+        return starts[pos[0] - 1] + pos[1]
+
+    out = data
+    for edit in sorted(edits, key=lambda e: (offset(e.start), offset(e.end)), reverse=True):
+        out = out[: offset(edit.start)] + edit.text.encode("utf-8") + out[offset(edit.end) :]
+    return out.decode("utf-8")
+
+
+def _overlaps(a: Edit, taken: List[Tuple[Position, Position]]) -> bool:
+    return any(not (a.end <= s or a.start >= e) or (a.start == a.end == s) for s, e in taken)
+
+
+def apply_rules(
+    code: str, rules: Optional[Sequence[str]] = None
+) -> Tuple[str, List[AppliedRewrite]]:
+    """Run the named rules in order; with no ``rules`` nothing is rewritten (the pass is opt-in).
+
+    Each rule's edits are applied only if the result still parses; matches whose
+    edits would overlap an earlier match are left for a later pass. Code that
+    does not parse is returned unchanged.
+    """
+    unknown = set(rules or ()) - set(RULES)
+    if unknown:
+        raise ValueError(f"Unknown rewrite rule(s): {', '.join(sorted(unknown))}")
+    applied: List[AppliedRewrite] = []
+    try:
+        ast.parse(code)
+    except SyntaxError:
+        return code, applied
+    for name in rules or ():
+        rule = RULES[name]
+        for _ in range(3):  # a few passes so overlapping matches are picked up
+            tree = ast.parse(code)
+            edits: List[Edit] = []
+            spans: List[Tuple[Position, Position]] = []
+            found: List[Match] = []
+            for match in rule.find(tree, code):
+                if any(_overlaps(e, spans) for e in match.edits):
+                    continue
+                edits.extend(match.edits)
+                spans.extend((e.start, e.end) for e in match.edits)
+                found.append(match)
+            if not found:
+                break
+            candidate = apply_edits(code, edits)
+            try:
+                ast.parse(candidate)
+            except SyntaxError:
+                break
+            code = candidate
+            applied.extend(AppliedRewrite(rule.name, m.line, m.detail) for m in found)
+    return code, applied
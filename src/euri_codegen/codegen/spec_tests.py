@@ -0,0 +1,86 @@
+"""Deterministic pytest modules built from a spec's structured ``examples``.
+
+No model call is needed: each example becomes a parametrized case. JSON has no
+tuples, so results are compared after turning tuples into lists.
+"""
+
+from __future__ import annotations
+
+import pprint
+import re
+from typing import Any, Dict, List, Optional
+
+LLM_TESTS_MARKER = "# --- Additional edge cases (model-generated) ---"
+
+
+def _function_name(spec: Dict[str, Any]) -> Optional[str]:
+    m = re.search(r"def\s+([A-Za-z_][A-Za-z_0-9]*)\s*\(", spec.get("function_signature", ""))
+    return m.group(1) if m else None
+
+
+def _class_name(spec: Dict[str, Any]) -> Optional[str]:
+    m = re.match(r"\s*class\s+([A-Za-z_][A-Za-z_0-9]*)", spec.get("function_signature", ""))
+    return m.group(1) if m else None
+
+
+def target_name(spec: Dict[str, Any]) -> Optional[str]:
+    """Name of the function (or class) the spec's ``function_signature`` declares."""
+    return _function_name(spec) or _class_name(spec)
+
+
+def has_example_tests(spec: Dict[str, Any]) -> bool:
+    """True when the spec is a function spec with at least one example."""
+    return bool(spec.get("examples")) and _function_name(spec) is not None
+
+
+def spec_test_module(spec: Dict[str, Any]) -> str:
+    """Render the test module for ``spec`` (which must have an ``id``).
+
+    Function specs with examples get one parametrized case per example; every
+    spec gets a smoke test that its function/class exists.
+    """
+    module = spec["id"]
+    fn = _function_name(spec)
+    target = target_name(spec)
+    examples = has_example_tests(spec)
+    lines: List[str] = [f'"""Tests generated from the {module} spec."""']
+    if examples:
+        lines += ["import pytest", ""]
+    lines.append(f"import {module}")
+    if target:
+        lines += [
+            "",
+            "",
+            "def test_spec_target_exists():",
+            f"    assert callable(getattr({module}, {target!r}, None))",
+        ]
+    if examples:
+        cases = [(ex["input"], ex["output"]) for ex in spec["examples"]]
+        ids = [f"example_{i}" for i in range(len(cases))]
+        lines += [
+            "",
+            "",
+            "def _plain(value):",
+            "    if isinstance(value, (list, tuple)):",
+            "        return [_plain(v) for v in value]",
+            "    if isinstance(value, dict):",
+            "        return {k: _plain(v) for k, v in value.items()}",
+            "    return value",
+            "",
+            "",
+            "EXAMPLES = " + pprint.pformat(cases, indent=4, width=100, sort_dicts=False),
+            "",
+            "",
+            f'@pytest.mark.parametrize("kwargs, expected", EXAMPLES, ids={ids!r})',
+            "def test_spec_example(kwargs, expected):",
+            f"    assert _plain({module}.{fn}(**kwargs)) == _plain(expected)",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def merge_test_modules(spec_tests: str, llm_tests: str) -> str:
+    """Append model-written tests after the spec tests, keeping ``__future__`` imports first."""
+    future = [ln for ln in llm_tests.splitlines() if ln.startswith("from __future__ import")]
+    body = "\n".join(ln for ln in llm_tests.splitlines() if ln not in future).strip()
+    head = "\n".join(future) + "\n" if future else ""
+    return head + spec_tests + "\n\n" + LLM_TESTS_MARKER + "\n" + body + "\n"
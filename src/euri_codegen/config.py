@@ -1,17 +1,22 @@
 from __future__ import annotations
 
 import os
+import sys
 from dataclasses import dataclass
 from typing import Optional
 
 from dotenv import load_dotenv
 
+from .client_pool import DEFAULT_ENDPOINT
+
 
 def _get_from_secrets(key: str) -> Optional[str]:
-    # Try to read from Streamlit secrets if available
+    # Read from Streamlit secrets only when running inside Streamlit (it is then already
+    # imported); importing it here would add seconds to every CLI start.
+    st = sys.modules.get("streamlit")
+    if st is None:
+        return None
     try:
-        import streamlit as st  # type: ignore
-
         if hasattr(st, "secrets") and key in st.secrets:
             return str(st.secrets[key])
     except Exception:
@@ -39,17 +44,30 @@ class Settings:
     model: str = DEFAULT_MODEL
     temperature: float = 0.2
     max_tokens: int = 3000
+    cache_path: Optional[str] = None
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    max_retries: int = 3
+    telemetry_path: Optional[str] = None
+    # Fallback models raced against ``model`` when it is slow (comma-separated in env).
+    hedge_models: Optional[str] = None
+    hedge_percentile: float = 0.95
+    # Seconds to open a connection / to wait for the next bytes of a response.
+    connect_timeout: float = 10.0
+    read_timeout: float = 120.0
+    endpoint: str = DEFAULT_ENDPOINT
 
     @staticmethod
-    def load(env_file: Optional[str] = None) -> "Settings":
+    def load(env_file: Optional[str] = None, *, require_key: bool = True) -> "Settings":
+        """Settings from the environment; ``require_key=False`` allows an empty key."""
         # Load .env for local dev; on Streamlit Cloud, secrets drive values
         if env_file:
             load_dotenv(env_file)
         else:
             load_dotenv()
 
-        key = _get_config("EURI_API_KEY")
-        if not key:
+        key = _get_config("EURI_API_KEY") or ""
+        if not key and require_key:
             raise RuntimeError(
                 "EURI_API_KEY is not set. Set it in environment, a .env file, or Streamlit secrets."
             )
@@ -58,4 +76,29 @@ class Settings:
         max_tokens_str = _get_config("EURI_MAX_TOKENS", "3000") or "3000"
         temp = float(temp_str)
         max_tokens = int(max_tokens_str)
-        return Settings(api_key=key, model=model, temperature=temp, max_tokens=max_tokens)
+        cache_path = _get_config("EURI_CACHE_PATH")
+        rpm = _get_config("EURI_RPM")
+        tpm = _get_config("EURI_TPM")
+        max_retries = int(_get_config("EURI_MAX_RETRIES", "3") or "3")
+        telemetry_path = _get_config("EURI_TELEMETRY_PATH")
+        hedge_models = _get_config("EURI_HEDGE_MODELS")
+        hedge_percentile = float(_get_config("EURI_HEDGE_PERCENTILE", "0.95") or "0.95")
+        connect_timeout = float(_get_config("EURI_CONNECT_TIMEOUT", "10") or "10")
+        read_timeout = float(_get_config("EURI_READ_TIMEOUT", "120") or "120")
+        endpoint = _get_config("EURI_ENDPOINT", DEFAULT_ENDPOINT) or DEFAULT_ENDPOINT
+        return Settings(
+            api_key=key,
+            model=model,
+            temperature=temp,
+            max_tokens=max_tokens,
+            cache_path=cache_path,
+            requests_per_minute=float(rpm) if rpm else None,
+            tokens_per_minute=float(tpm) if tpm else None,
+            max_retries=max_retries,
+            telemetry_path=telemetry_path,
+            hedge_models=hedge_models,
+            hedge_percentile=hedge_percentile,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            endpoint=endpoint,
+        )
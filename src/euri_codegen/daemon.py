@@ -0,0 +1,492 @@
+"""Long-running codegen daemon: JSON-RPC 2.0 over local HTTP or a Unix socket.
+
+``python -m euri_codegen serve`` keeps the settings, the model client, the
+completion cache and the catalog index warm across requests. Each request pays
+one round trip instead of interpreter start, imports and client setup. JSON-RPC
+batches (a JSON array) run concurrently. Identical requests that are in flight
+at the same time share one execution.
+
+Only the owner may call it: a Unix socket is created with mode 0600, and over
+TCP every request must carry the token written (mode 0600) to the token file.
+Requests must be ``application/json``, and output directories must lie under
+the daemon's root directory.
+
+The thin client used by ``--via-daemon`` lives in :mod:`.daemon_client`, which
+avoids importing asyncio so that client processes start quickly.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hmac
+import inspect
+import json
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Union
+
+from .daemon_client import SERVER_ERROR, daemon_token_path, host_port
+
+if TYPE_CHECKING:
+    from .config import Settings
+    from .euri_client import Euri
+    from .models import Spec
+
+MAX_BODY_BYTES = 64 << 20
+
+# JSON-RPC 2.0 error codes.
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+
+
+def _key(method: str, params: Union[Dict[str, Any], List[Any]]) -> str:
+    return method + "\0" + json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+    def to_dict(self) -> Dict[str, Any]:
+        err: Dict[str, Any] = {"code": self.code, "message": str(self)}
+        if self.data is not None:
+            err["data"] = self.data
+        return err
+
+
+class Daemon:
+    """Warm state plus the RPC methods; ``run`` serves them until ``stop`` is called."""
+
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        make_euri: Callable[[], Euri],
+        catalog_paths: Optional[Sequence[Path]] = None,
+        workers: int = 8,
+        root: Optional[Path] = None,
+        token_path: Optional[Path] = None,
+    ):
+        self.settings = settings
+        self.root = Path(root or os.getcwd()).resolve()
+        self.token_path = daemon_token_path(token_path)
+        self._token: Optional[str] = None
+        self._make_euri = make_euri
+        self._euri: Optional[Euri] = None
+        self._euri_lock = threading.Lock()
+        self._manifest_lock = threading.Lock()
+        self._catalog_paths = catalog_paths
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="euri-daemon"
+        )
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self.started = time.time()
+        self.requests = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.calls: Dict[str, int] = {}
+        self.methods: Dict[str, Callable[..., Any]] = {
+            "generate": self.generate,
+            "generate_all": self.generate_all,
+            "optimize": self.optimize,
+            "explain": self.explain,
+        }
+        # Cheap status methods answer on the event loop without coalescing.
+        self.inline: Dict[str, Callable[..., Any]] = {"ping": self.ping, "stats": self.stats}
+
+    # -- warm state --------------------------------------------------------
+
+    @property
+    def euri(self) -> Euri:
+        with self._euri_lock:
+            if self._euri is None:
+                self._euri = self._make_euri()
+            return self._euri
+
+    def warm(self) -> None:
+        """Create the client and open the catalog index before the first request."""
+        self.euri
+        self._catalog()
+
+    def _catalog(self):
+        from .catalog_store import open_catalog
+
+        return open_catalog(self._catalog_paths)
+
+    def _spec(self, topic: str) -> Spec:
+        try:
+            return self._catalog().spec(topic)
+        except KeyError:
+            raise ValueError(f"Topic not found: {topic}") from None
+
+    def _out_dir(self, out_dir: str) -> Path:
+        """``out_dir`` (relative to the root) resolved; it must not leave the root."""
+        out = (self.root / out_dir).resolve()
+        if not out.is_relative_to(self.root):
+            raise ValueError(f"out_dir must be inside {self.root}")
+        return out
+
+    def _fingerprint(self, spec: Spec, max_tokens: Optional[int], llm_tests: str) -> str:
+        from .codegen.manifest import fingerprint
+
+        return fingerprint(
+            spec,
+            model=self.settings.model,
+            temperature=self.settings.temperature,
+            max_tokens=max_tokens or self.settings.max_tokens,
+            llm_tests=llm_tests,
+        )
+
+    def _record(
+        self, out_dir: Path, topic: str, fp: str, module_path: Path, test_path: Path
+    ) -> None:
+        from .codegen.manifest import BuildManifest
+
+        # Concurrent requests may share an output directory: reload, record and save atomically.
+        with self._manifest_lock:
+            manifest = BuildManifest(out_dir)
+            manifest.record(topic, fp, module_path, test_path, model=self.settings.model)
+            manifest.save()
+
+    # -- methods -------------------------------------------------------------
+
+    def ping(self) -> Dict[str, Any]:
+        return {"pid": os.getpid(), "uptime_s": round(time.time() - self.started, 3)}
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            **self.ping(),
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "in_flight": len(self._inflight),
+            "calls": dict(self.calls),
+        }
+        cache = self._euri.cache if self._euri is not None else None
+        if cache is not None:
+            out["cache"] = {"hits": cache.hits, "misses": cache.misses}
+        semantic = self._euri.semantic if self._euri is not None else None
+        if semantic is not None:
+            out["semantic_cache"] = {"hits": semantic.hits, "misses": semantic.misses}
+        pool = getattr(self._euri, "pool", None)
+        if pool is not None:
+            out["clients"] = pool.stats()
+        return out
+
+    def generate(
+        self,
+        topic: str,
+        out_dir: str = "generated",
+        max_tokens: Optional[int] = None,
+        llm_tests: str = "auto",
+        max_repairs: int = 2,
+    ) -> Dict[str, Any]:
+        from .codegen.generator import generate_code_for_topic
+
+        spec = self._spec(topic)
+        out = self._out_dir(out_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        issues: List[Any] = []
+        module_path, test_path = generate_code_for_topic(
+            self.euri,
+            spec.model_dump(),
+            out,
+            max_tokens=max_tokens,
+            llm_tests=llm_tests,
+            max_repairs=max_repairs,
+            on_repair=issues.append,
+        )
+        self._record(
+            out, spec.id, self._fingerprint(spec, max_tokens, llm_tests), module_path, test_path
+        )
+        return {
+            "module_path": str(module_path),
+            "test_path": str(test_path),
+            "repairs": len(issues),
+        }
+
+    def generate_all(
+        self,
+        out_dir: str = "generated",
+        tag: Optional[str] = None,
+        force: bool = False,
+        dry_run: bool = False,
+        max_tokens: Optional[int] = None,
+        llm_tests: str = "auto",
+        max_repairs: int = 2,
+        concurrency: int = 1,
+    ) -> Dict[str, Any]:
+        """Rebuild stale topics like ``generate-all``; per-topic results in catalog order."""
+        from .codegen.batch import generate_all
+        from .codegen.manifest import BuildManifest
+
+        out = self._out_dir(out_dir)
+        all_specs = self._catalog().specs(tag)
+        manifest = BuildManifest(out)
+        fps = {s.id: self._fingerprint(s, max_tokens, llm_tests) for s in all_specs}
+        reasons = {
+            s.id: "forced" if force else manifest.stale_reason(s.id, fps[s.id]) for s in all_specs
+        }
+        specs = [s for s in all_specs if reasons[s.id]]
+        result: Dict[str, Any] = {
+            "stale": {s.id: reasons[s.id] for s in specs},
+            "up_to_date": len(all_specs) - len(specs),
+            "results": [],
+        }
+        if dry_run or not specs:
+            return result
+
+        def record(r) -> None:
+            if r.ok:
+                self._record(out, r.topic, fps[r.topic], r.module_path, r.test_path)
+
+        summary = generate_all(
+            self.euri,
+            specs,
+            out,
+            concurrency=concurrency,
+            max_tokens=max_tokens,
+            llm_tests=llm_tests,
+            max_repairs=max_repairs,
+            on_result=record,
+        )
+        result["results"] = [
+            {
+                "topic": r.topic,
+                "ok": r.ok,
+                "seconds": r.seconds,
+                "module_path": str(r.module_path) if r.module_path else None,
+                "test_path": str(r.test_path) if r.test_path else None,
+                "error": r.error,
+                "repairs": r.repairs,
+            }
+            for r in summary.results
+        ]
+        result["wall_seconds"] = summary.wall_seconds
+        return result
+
+    def optimize(
+        self,
+        code: str,
+        level: str = "all",
+        rules: Optional[List[str]] = None,
+        chunked: bool = False,
+        concurrency: int = 4,
+    ) -> Dict[str, Any]:
+        """The named local rewrite rules, then the model rewrite unless ``level`` is ``offline``."""
+        from .codegen.optimizer import optimize_code, optimize_code_chunked
+        from .codegen.rewrites import apply_rules
+
+        local_code, applied = apply_rules(code, rules)
+        if level == "offline":
+            new_code = local_code
+        elif chunked:
+            new_code = optimize_code_chunked(
+                self.euri, local_code, level=level, concurrency=concurrency
+            )
+        else:
+            new_code = optimize_code(self.euri, local_code, level=level)  # type: ignore[arg-type]
+        return {"code": new_code, "applied": [vars(r) for r in applied]}
+
+    def explain(self, code: str, chunked: bool = False, concurrency: int = 4) -> Dict[str, Any]:
+        from .codegen.generator import explain_code, explain_code_chunked
+
+        if chunked:
+            return {"text": explain_code_chunked(self.euri, code, concurrency=concurrency)}
+        return {"text": explain_code(self.euri, code)}
+
+    # -- JSON-RPC ------------------------------------------------------------
+
+    async def _invoke(self, method: str, params: Union[Dict[str, Any], List[Any]]) -> Any:
+        fn = self.inline.get(method) or self.methods.get(method)
+        if fn is None:
+            raise RpcError(METHOD_NOT_FOUND, f"Method not found: {method}")
+        try:
+            bound = (
+                inspect.signature(fn).bind(*params)
+                if isinstance(params, list)
+                else (inspect.signature(fn).bind(**params))
+            )
+        except TypeError as e:
+            raise RpcError(INVALID_PARAMS, str(e)) from None
+        self.calls[method] = self.calls.get(method, 0) + 1
+        if method in self.inline:
+            return fn(*bound.args, **bound.kwargs)
+        key = _key(method, params)
+        shared = self._inflight.get(key)
+        if shared is not None:
+            self.coalesced += 1
+        else:
+            loop = asyncio.get_running_loop()
+            shared = loop.run_in_executor(self._pool, lambda: fn(*bound.args, **bound.kwargs))
+            self._inflight[key] = shared
+            shared.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded: a client that disconnects must not cancel work other callers are waiting on.
+        return await asyncio.shield(shared)
+
+    async def _one(self, request: Any) -> Optional[Dict[str, Any]]:
+        self.requests += 1
+        req_id = request.get("id") if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+                raise RpcError(INVALID_REQUEST, "Invalid request")
+            params = request.get("params", {})
+            if not isinstance(params, (dict, list)):
+                raise RpcError(INVALID_PARAMS, "params must be an object or an array")
+            result = await self._invoke(request["method"], params)
+        except RpcError as e:
+            self.errors += 1
+            return {"jsonrpc": "2.0", "id": req_id, "error": e.to_dict()}
+        except Exception as e:
+            self.errors += 1
+            err = RpcError(SERVER_ERROR, str(e) or type(e).__name__, {"type": type(e).__name__})
+            return {"jsonrpc": "2.0", "id": req_id, "error": err.to_dict()}
+        if isinstance(request, dict) and "id" not in request:
+            return None  # notification
+        return {"jsonrpc": "2.0", "id": req_id, "result": result}
+
+    async def dispatch(self, body: bytes) -> Optional[bytes]:
+        """Handle one JSON-RPC payload (request or batch); None if there is nothing to return."""
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self.errors += 1
+            reply: Any = {
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {"code": PARSE_ERROR, "message": "Parse error"},
+            }
+        else:
+            if isinstance(payload, list):
+                if not payload:
+                    err = {"code": INVALID_REQUEST, "message": "Empty batch"}
+                    reply = {"jsonrpc": "2.0", "id": None, "error": err}
+                else:
+                    replies = await asyncio.gather(*(self._one(r) for r in payload))
+                    reply = [r for r in replies if r is not None] or None
+            else:
+                reply = await self._one(payload)
+        return None if reply is None else json.dumps(reply, default=str).encode("utf-8")
+
+    # -- transport -----------------------------------------------------------
+
+    async def _respond(
+        self, writer: asyncio.StreamWriter, status: str, body: bytes, keep_alive: bool
+    ) -> None:
+        head = (
+            f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    return
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                parts = request_line.decode("latin-1").split()
+                length = int(headers.get("content-length", "0") or 0)
+                if len(parts) < 2 or parts[0] != "POST":
+                    await self._respond(
+                        writer, "405 Method Not Allowed", b'{"error":"POST JSON-RPC to /"}', False
+                    )
+                    return
+                if length > MAX_BODY_BYTES:
+                    await self._respond(
+                        writer, "413 Payload Too Large", b'{"error":"too large"}', False
+                    )
+                    return
+                if (
+                    headers.get("content-type", "").partition(";")[0].strip().lower()
+                    != "application/json"
+                ):
+                    body = b'{"error":"send application/json"}'
+                    await self._respond(writer, "415 Unsupported Media Type", body, False)
+                    return
+                if self._token is not None and not hmac.compare_digest(
+                    headers.get("authorization", "").encode("latin-1"),
+                    f"Bearer {self._token}".encode("latin-1"),
+                ):
+                    await self._respond(
+                        writer, "401 Unauthorized", b'{"error":"bad or missing token"}', False
+                    )
+                    return
+                reply = await self.dispatch(await reader.readexactly(length))
+                if reply is None:
+                    await self._respond(writer, "204 No Content", b"", keep_alive)
+                else:
+                    await self._respond(writer, "200 OK", reply, keep_alive)
+                if not keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            return
+        finally:
+            writer.close()
+
+    async def run(self, address: str, *, on_ready: Optional[Callable[[str], None]] = None) -> None:
+        """Serve on ``address`` until :meth:`stop`; ``on_ready`` gets the bound address."""
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        if address.startswith("unix:"):
+            path = address[len("unix:") :]
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            if os.path.exists(path):
+                os.unlink(path)  # stale socket from a previous run
+            umask = os.umask(0o177)  # no window in which others could connect
+            try:
+                server = await asyncio.start_unix_server(self._handle, path=path)
+            finally:
+                os.umask(umask)
+            os.chmod(path, 0o600)
+            bound = address
+        else:
+            host, port = host_port(address)
+            self._token = secrets.token_urlsafe(32)
+            self._write_token()
+            server = await asyncio.start_server(self._handle, host, port)
+            sock_host, sock_port = server.sockets[0].getsockname()[:2]
+            bound = f"{sock_host}:{sock_port}"
+        try:
+            if on_ready is not None:
+                on_ready(bound)
+            await self._stop.wait()
+        finally:
+            server.close()
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            if address.startswith("unix:"):
+                Path(address[len("unix:") :]).unlink(missing_ok=True)
+            else:
+                self.token_path.unlink(missing_ok=True)
+
+    def _write_token(self) -> None:
+        self.token_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.token_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            os.chmod(self.token_path, 0o600)  # an older file may have had wider permissions
+            f.write(self._token or "")
+
+    def stop(self) -> None:
+        """Thread-safe shutdown request."""
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
@@ -0,0 +1,165 @@
+"""Thin JSON-RPC client for the ``serve`` daemon (see :mod:`.daemon`).
+
+Standard library only, and without asyncio, so processes that call a running
+daemon start quickly. One :class:`DaemonClient` keeps one HTTP keep-alive
+connection open. The default address is a Unix socket only the owner can open;
+over TCP the daemon requires the token it wrote to the token file.
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import socket
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+_STATE_DIR = Path.home() / ".cache" / "euri_codegen"
+# asyncio serves Unix sockets only on POSIX; elsewhere fall back to loopback TCP with a token.
+DEFAULT_DAEMON_ADDRESS = (
+    f"unix:{_STATE_DIR / 'daemon.sock'}"
+    if hasattr(socket, "AF_UNIX") and os.name != "nt"
+    else "127.0.0.1:8765"
+)
+DEFAULT_TOKEN_PATH = _STATE_DIR / "daemon.token"
+SERVER_ERROR = -32000  # JSON-RPC "server error", also used for HTTP-level failures
+
+
+def daemon_address(address: Optional[str] = None) -> str:
+    """``address``, else ``EURI_DAEMON``, else the default.
+
+    ``unix:<path>`` selects a Unix socket; anything else is ``host:port``.
+    """
+    return address or os.getenv("EURI_DAEMON") or DEFAULT_DAEMON_ADDRESS
+
+
+def daemon_token_path(path: Optional[Path] = None) -> Path:
+    """``path``, else ``EURI_DAEMON_TOKEN_FILE``, else the default token file."""
+    return Path(path or os.getenv("EURI_DAEMON_TOKEN_FILE") or DEFAULT_TOKEN_PATH)
+
+
+def host_port(address: str) -> Tuple[str, int]:
+    host, sep, port = address.rpartition(":")
+    if not sep or not port.isdigit():
+        raise ValueError(f"Daemon address must be host:port or unix:<path>, got {address!r}")
+    return host or "127.0.0.1", int(port)
+
+
+class DaemonUnavailable(ConnectionError):
+    pass
+
+
+class DaemonError(RuntimeError):
+    """A JSON-RPC error returned by the daemon."""
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: Optional[float]):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+class DaemonClient:
+    """Keep-alive JSON-RPC client; one instance per thread."""
+
+    def __init__(
+        self,
+        address: Optional[str] = None,
+        *,
+        timeout: Optional[float] = 600.0,
+        token_path: Optional[Path] = None,
+    ):
+        self.address = daemon_address(address)
+        self.timeout = timeout
+        self.token_path = daemon_token_path(token_path)
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._next_id = 0
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if not self.address.startswith("unix:"):
+            try:
+                headers["Authorization"] = (
+                    "Bearer " + self.token_path.read_text(encoding="utf-8").strip()
+                )
+            except FileNotFoundError:
+                pass  # the daemon will answer 401
+        return headers
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._conn is None:
+            if self.address.startswith("unix:"):
+                self._conn = _UnixHTTPConnection(self.address[len("unix:") :], self.timeout)
+            else:
+                host, port = host_port(self.address)
+                self._conn = http.client.HTTPConnection(host, port, timeout=self.timeout)
+        return self._conn
+
+    def _post(self, payload: Any) -> Any:
+        body = json.dumps(payload).encode("utf-8")
+        headers = self._headers()
+        for attempt in (1, 2):
+            conn = self._connection()
+            try:
+                conn.request("POST", "/", body, headers)
+                resp = conn.getresponse()
+                data = resp.read()
+                break
+            except (ConnectionRefusedError, FileNotFoundError) as e:
+                self.close()
+                raise DaemonUnavailable(f"No daemon at {self.address}: {e}") from None
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                self.close()  # the server closed an idle keep-alive connection; reconnect once
+                if attempt == 2:
+                    raise
+        if resp.status == 204:
+            return None
+        if resp.status != 200:
+            raise DaemonError(
+                SERVER_ERROR, f"HTTP {resp.status}: {data.decode('utf-8', 'replace')}"
+            )
+        return json.loads(data)
+
+    def _request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        self._next_id += 1
+        return {"jsonrpc": "2.0", "id": self._next_id, "method": method, "params": params}
+
+    @staticmethod
+    def _unwrap(reply: Dict[str, Any]) -> Any:
+        if "error" in reply:
+            err = reply["error"]
+            return DaemonError(
+                err.get("code", SERVER_ERROR), err.get("message", ""), err.get("data")
+            )
+        return reply.get("result")
+
+    def call(self, method: str, **params: Any) -> Any:
+        result = self._unwrap(self._post(self._request(method, params)))
+        if isinstance(result, DaemonError):
+            raise result
+        return result
+
+    def batch(self, calls: Sequence[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+        """Send ``(method, params)`` pairs as one batch; failures come back as DaemonError."""
+        requests = [self._request(method, params) for method, params in calls]
+        replies = {r.get("id"): r for r in self._post(requests) or []}
+        return [
+            self._unwrap(replies.get(req["id"], {"error": {"message": "no reply"}}))
+            for req in requests
+        ]
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -1,19 +1,202 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
-
-from euriai import EuriaiClient
+import json
+import time
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from .cache import CompletionCache
+from .client_pool import ClientPool, shared_pool
 from .config import Settings
+from .hedging import HedgePolicy, LatencyTracker, race
+from .resilience import Resilience
+from .semantic_cache import SemanticCache
+from .telemetry import CallRecord, Telemetry
+
+
+class CompletionStream:
+    """Iterable of completion text chunks that records timing as it is consumed.
+
+    ``ttft`` (time to first token) and ``total_seconds`` are measured from the
+    start of iteration and are available once the stream has been exhausted.
+    """
+
+    def __init__(
+        self,
+        chunks: Iterable[str],
+        *,
+        cached: bool = False,
+        on_done: Optional[Callable[[str], None]] = None,
+    ):
+        self._chunks = chunks
+        self._on_done = on_done
+        self.cached = cached
+        self.ttft: Optional[float] = None
+        self.total_seconds: Optional[float] = None
+        self.text = ""
+
+    def __iter__(self) -> Iterator[str]:
+        start = time.perf_counter()
+        parts = []
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            if self.ttft is None:
+                self.ttft = time.perf_counter() - start
+            parts.append(chunk)
+            yield chunk
+        self.total_seconds = time.perf_counter() - start
+        if self.ttft is None:
+            self.ttft = self.total_seconds
+        self.text = "".join(parts).strip()
+        if self._on_done is not None:
+            self._on_done(self.text)
 
 
 class Euri:
-    """Thin wrapper around the EuriaiClient to standardize calls and error handling."""
+    """Standardizes completion calls and error handling on top of pooled API clients."""
 
-    def __init__(self, settings: Settings):
-        self._client = EuriaiClient(api_key=settings.api_key, model=settings.model)
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        cache: Optional[CompletionCache] = None,
+        refresh: bool = False,
+        resilience: Optional[Resilience] = None,
+        telemetry: Optional[Telemetry] = None,
+        hedge: Optional[HedgePolicy] = None,
+        pool: Optional[ClientPool] = None,
+        semantic: Optional[SemanticCache] = None,
+    ):
+        self._pool = (
+            pool
+            if pool is not None
+            else shared_pool(
+                settings.api_key,
+                settings.endpoint,
+                timeout=(settings.connect_timeout, settings.read_timeout),
+            )
+        )
+        self._client = self._pool.client(settings.model, settings.temperature, settings.max_tokens)
+        # Clients for other models (hedging, explicit ``model=``) come from the same pool.
+        self._client_factory: Callable[[str], Any] = lambda m: self._pool.client(
+            m, settings.temperature, settings.max_tokens
+        )
+        self._model = settings.model
         self._temperature = settings.temperature
         self._max_tokens = settings.max_tokens
+        self._cache = cache
+        self._semantic = semantic
+        # refresh: skip cache reads (both caches) but still store fresh results
+        self._refresh = refresh
+        self._resilience = resilience or Resilience(
+            requests_per_minute=settings.requests_per_minute,
+            tokens_per_minute=settings.tokens_per_minute,
+            max_attempts=settings.max_retries + 1,
+        )
+        self._telemetry = telemetry
+        self._hedge = hedge
+        # Latency of successful uncached calls per model; drives hedge deadlines.
+        self._latency = hedge.tracker if hedge is not None else LatencyTracker()
+
+    @property
+    def pool(self) -> ClientPool:
+        return self._pool
+
+    @property
+    def resilience(self) -> Resilience:
+        return self._resilience
+
+    @property
+    def cache(self) -> Optional[CompletionCache]:
+        return self._cache
+
+    @property
+    def semantic(self) -> Optional[SemanticCache]:
+        return self._semantic
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    @property
+    def refresh(self) -> bool:
+        return self._refresh
+
+    @property
+    def telemetry(self) -> Optional[Telemetry]:
+        return self._telemetry
+
+    @property
+    def latency(self) -> LatencyTracker:
+        return self._latency
+
+    @property
+    def hedged(self) -> bool:
+        """Whether :meth:`complete` races several models; :meth:`complete_stream` never does."""
+        return self._hedge is not None and len(self._hedge.models) > 1
+
+    def _client_for(self, model: Optional[str]) -> Any:
+        if not model or model == self._model:
+            return self._client
+        return self._client_factory(model)
+
+    def _record(
+        self,
+        params: Dict[str, Any],
+        model: Optional[str],
+        stage: Optional[str],
+        topic: Optional[str],
+        *,
+        text: str = "",
+        usage: Optional[Dict[str, Any]] = None,
+        **fields: Any,
+    ) -> None:
+        if self._telemetry is None:
+            return
+        usage = usage or {}
+        prompt_tokens = usage.get("prompt_tokens")
+        completion_tokens = usage.get("completion_tokens")
+        self._telemetry.record(
+            CallRecord(
+                stage=stage or "other",
+                model=model or self._model,
+                topic=topic,
+                prompt_chars=len(params["prompt"]),
+                prompt_tokens=(
+                    int(prompt_tokens) if prompt_tokens is not None else len(params["prompt"]) // 4
+                ),
+                completion_tokens=(
+                    int(completion_tokens) if completion_tokens is not None else len(text) // 4
+                ),
+                tokens_estimated=prompt_tokens is None or completion_tokens is None,
+                **fields,
+            )
+        )
+
+    def _prepare(
+        self,
+        prompt: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        model: Optional[str],
+    ) -> Tuple[Dict[str, Any], Optional[str], Optional[str]]:
+        """Build request params, the cache key (if caching) and any cached text."""
+        params: Dict[str, Any] = {
+            "prompt": prompt,
+            "temperature": self._temperature if temperature is None else temperature,
+            "max_tokens": self._max_tokens if max_tokens is None else max_tokens,
+        }
+        if self._cache is None:
+            return params, None, None
+        key = CompletionCache.key(
+            prompt,
+            model=model or self._model,
+            temperature=params["temperature"],
+            max_tokens=params["max_tokens"],
+        )
+        cached = None if self._refresh else self._cache.get(key)
+        return params, key, cached
 
     def complete(
         self,
@@ -22,29 +205,258 @@ class Euri:
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         model: Optional[str] = None,
+        stage: Optional[str] = None,
+        topic: Optional[str] = None,
     ) -> str:
         """Generate a completion string from Euri AI, returning text content only.
 
-        Falls back gracefully if the expected shape changes slightly.
+        Falls back gracefully if the expected shape changes slightly. Results are
+        served from / stored in the completion cache when one is configured.
+        ``stage`` and ``topic`` only label the telemetry record. With a hedge policy
+        and no explicit ``model``, the request is raced across the policy's models.
         """
-        params: Dict[str, Any] = {
-            "prompt": prompt,
-            "temperature": self._temperature if temperature is None else temperature,
-            "max_tokens": self._max_tokens if max_tokens is None else max_tokens,
-        }
-        if model:
-            # Some SDKs accept model in constructor only; try both.
+        if self.hedged and model is None:
+            return self._complete_hedged(prompt, temperature, max_tokens, stage, topic)
+        start = time.perf_counter()
+        params, key, cached = self._prepare(prompt, temperature, max_tokens, model)
+        if cached is not None:
+            self._record(
+                params,
+                model,
+                stage,
+                topic,
+                text=cached,
+                cached=True,
+                latency_s=time.perf_counter() - start,
+            )
+            return cached
+        attempts = [0]
+        try:
+            text, usage = self._request(params, model, attempts)
+        except Exception as exc:
+            self._record(
+                params,
+                model,
+                stage,
+                topic,
+                status="error",
+                error=repr(exc)[:200],
+                retries=max(0, attempts[0] - 1),
+                latency_s=time.perf_counter() - start,
+            )
+            raise
+        latency = time.perf_counter() - start
+        self._latency.observe(model or self._model, latency)
+        self._record(
+            params,
+            model,
+            stage,
+            topic,
+            text=text,
+            usage=usage,
+            retries=attempts[0] - 1,
+            latency_s=latency,
+        )
+        cache = self._cache
+        if key is not None and cache is not None:
+            cache.put(key, text)
+        return text
+
+    def _complete_hedged(
+        self,
+        prompt: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        stage: Optional[str],
+        topic: Optional[str],
+    ) -> str:
+        """Race the hedge models (primary first); cache hits for any of them win outright."""
+        hedge = self._hedge
+        assert hedge is not None
+        models = list(hedge.models)
+        prepared = {}
+        for m in models:
+            params, key, cached = self._prepare(prompt, temperature, max_tokens, m)
+            if cached is not None:
+                self._record(params, m, stage, topic, text=cached, cached=True)
+                return cached
+            prepared[m] = (params, key)
+
+        def attempt(m: str) -> str:
+            params = dict(prepared[m][0])
+            start = time.perf_counter()
+            attempts = [0]
             try:
-                self._client.model = model  # type: ignore[attr-defined]
-            except Exception:
-                params["model"] = model
-        resp = self._client.generate_completion(**params)
+                text, usage = self._request(params, m, attempts)
+            except Exception as exc:
+                self._record(
+                    params,
+                    m,
+                    stage,
+                    topic,
+                    status="error",
+                    error=repr(exc)[:200],
+                    hedged=True,
+                    retries=max(0, attempts[0] - 1),
+                    latency_s=time.perf_counter() - start,
+                )
+                raise
+            latency = time.perf_counter() - start
+            self._latency.observe(m, latency)
+            self._record(
+                params,
+                m,
+                stage,
+                topic,
+                text=text,
+                usage=usage,
+                hedged=True,
+                retries=attempts[0] - 1,
+                latency_s=latency,
+            )
+            return text
+
+        winner, text = race(
+            [(m, partial(attempt, m)) for m in models],
+            deadline=hedge.deadline,
+            accept=lambda t: hedge.validate(t, stage),
+        )
+        key = prepared[winner][1]
+        cache = self._cache
+        if key is not None and cache is not None:
+            cache.put(key, text)
+        return text
+
+    def complete_stream(
+        self,
+        prompt: str,
+        *,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        model: Optional[str] = None,
+        stage: Optional[str] = None,
+        topic: Optional[str] = None,
+    ) -> CompletionStream:
+        """Like :meth:`complete`, but yields text chunks as the model produces them.
+
+        A cache hit is replayed as a single chunk; a fresh stream is cached once fully consumed.
+        """
+        params, key, cached = self._prepare(prompt, temperature, max_tokens, model)
+        if cached is not None:
+            self._record(params, model, stage, topic, text=cached, cached=True, streamed=True)
+            return CompletionStream([cached], cached=True)
+        attempts = [0]
+
+        def on_done(text: str) -> None:
+            self._record(
+                params,
+                model,
+                stage,
+                topic,
+                text=text,
+                streamed=True,
+                retries=attempts[0] - 1,
+                latency_s=stream.total_seconds or 0.0,
+                ttft_s=stream.ttft,
+            )
+            cache = self._cache
+            if key is not None and cache is not None:
+                cache.put(key, text)
+
+        def on_error(exc: Exception) -> None:
+            self._record(
+                params,
+                model,
+                stage,
+                topic,
+                streamed=True,
+                status="error",
+                error=repr(exc)[:200],
+                retries=max(0, attempts[0] - 1),
+            )
+
+        stream = CompletionStream(
+            self._stream_request(params, model, attempts, on_error), on_done=on_done
+        )
+        return stream
+
+    @staticmethod
+    def _estimate_tokens(params: Dict[str, Any]) -> int:
+        # ~4 characters per token, plus the completion budget.
+        return len(params["prompt"]) // 4 + int(params["max_tokens"])
+
+    def _request(
+        self, params: Dict[str, Any], model: Optional[str], attempts: Optional[List[int]] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Return the completion text and the response's ``usage`` (empty if absent).
+
+        ``attempts[0]`` is incremented on every try so callers can report retries.
+        """
+        client = self._client_for(model)
+        counter = attempts if attempts is not None else [0]
+
+        def attempt() -> Any:
+            counter[0] += 1
+            return client.generate_completion(**params)
+
+        resp = self._resilience.call(attempt, tokens=self._estimate_tokens(params))
+        usage = resp.get("usage") if isinstance(resp, dict) else None
+        usage = usage if isinstance(usage, dict) else {}
         # Expected: response["choices"][0]["message"]["content"]
         try:
-            return resp["choices"][0]["message"]["content"].strip()
+            return resp["choices"][0]["message"]["content"].strip(), usage
         except Exception:
             # Try alternative keys
             for key in ("content", "text"):
                 if key in resp:
-                    return str(resp[key]).strip()
-            return str(resp)
+                    return str(resp[key]).strip(), usage
+            return str(resp), usage
+
+    def _stream_request(
+        self,
+        params: Dict[str, Any],
+        model: Optional[str],
+        attempts: Optional[List[int]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ) -> Iterator[str]:
+        client = self._client_for(model)
+        counter = attempts if attempts is not None else [0]
+        stream = getattr(client, "stream_completion", None)
+        try:
+            if stream is None:
+                yield self._request(params, model, counter)[0]
+                return
+
+            def chunks() -> Iterator[str]:
+                counter[0] += 1
+                for line in stream(**params):
+                    chunk = _parse_stream_line(line)
+                    if chunk is None:
+                        break
+                    yield chunk
+
+            yield from self._resilience.stream(chunks, tokens=self._estimate_tokens(params))
+        except Exception as exc:
+            if on_error is not None:
+                on_error(exc)
+            raise
+
+
+def _parse_stream_line(line: str) -> Optional[str]:
+    """Extract text from one server-sent-events line; None marks end of stream."""
+    data = line.strip()
+    if data.startswith("data:"):
+        data = data[len("data:") :].strip()
+    if data == "[DONE]":
+        return None
+    try:
+        payload = json.loads(data)
+    except ValueError:
+        return ""
+    try:
+        choice = payload["choices"][0]
+    except (KeyError, IndexError, TypeError):
+        return ""
+    # Streaming chunks carry "delta"; some gateways send full "message" objects.
+    part = (choice.get("delta") or choice.get("message") or {}).get("content")
+    return part or ""
@@ -0,0 +1,183 @@
+"""Hedged requests: race a primary model against fallbacks to cut tail latency.
+
+The primary model is called first. If no acceptable answer arrives within that
+model's latency percentile (learned from past calls), the next model is called
+too; the first answer that passes a cheap validity check wins.
+"""
+
+from __future__ import annotations
+
+import ast
+import bisect
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Stages whose replies must be Python source to be usable.
+CODE_STAGES = {"generate", "tests", "optimize", "optimize-chunk", "optimize-profiled"}
+
+
+def _bucket_bounds(start: float = 0.05, factor: float = 1.25, limit: float = 600.0) -> List[float]:
+    bounds = [start]
+    while bounds[-1] < limit:
+        bounds.append(bounds[-1] * factor)
+    return bounds
+
+
+_BOUNDS = _bucket_bounds()
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram (25% wide buckets from 50 ms to 10 min)."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(_BOUNDS) + 1)
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(_BOUNDS, seconds)] += 1
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (a slight overestimate)."""
+        if not self.count:
+            return None
+        target = max(1, math.ceil(q * self.count))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return _BOUNDS[min(i, len(_BOUNDS) - 1)]
+        return _BOUNDS[-1]
+
+
+class LatencyTracker:
+    """Per-model latency histograms; safe to share between threads."""
+
+    def __init__(self) -> None:
+        self._hists: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, model: str, seconds: float) -> None:
+        with self._lock:
+            self._hists.setdefault(model, LatencyHistogram()).observe(seconds)
+
+    def quantile(self, model: str, q: float) -> Tuple[Optional[float], int]:
+        """The q-quantile for ``model`` and how many samples it is based on."""
+        with self._lock:
+            hist = self._hists.get(model)
+            return (hist.quantile(q), hist.count) if hist else (None, 0)
+
+    def seed(self, samples: Iterable[Tuple[str, float]]) -> None:
+        """Load (model, seconds) pairs, e.g. from past telemetry records."""
+        for model, seconds in samples:
+            self.observe(model, seconds)
+
+
+def _strip_fences(text: str) -> str:
+    lines = text.strip().splitlines()
+    if lines and lines[0].startswith("```"):
+        lines = lines[1:]
+        if lines and lines[-1].strip().startswith("```"):
+            lines = lines[:-1]
+    return "\n".join(lines)
+
+
+def acceptable(text: str, stage: Optional[str]) -> bool:
+    """Cheap validity check: code stages must parse, anything else must be non-empty."""
+    if not text.strip():
+        return False
+    if stage not in CODE_STAGES:
+        return True
+    try:
+        ast.parse(_strip_fences(text))
+    except SyntaxError:
+        return False
+    return True
+
+
+@dataclass
+class HedgePolicy:
+    """``models`` in preference order; the first is the primary."""
+
+    models: Sequence[str]
+    percentile: float = 0.95
+    min_samples: int = 5
+    # Used until a model has ``min_samples`` observations.
+    default_deadline: float = 10.0
+    min_deadline: float = 0.5
+    max_deadline: float = 120.0
+    tracker: LatencyTracker = field(default_factory=LatencyTracker)
+    validate: Callable[[str, Optional[str]], bool] = acceptable
+
+    def deadline(self, model: str) -> float:
+        value, n = self.tracker.quantile(model, self.percentile)
+        if value is None or n < self.min_samples:
+            return self.default_deadline
+        return min(self.max_deadline, max(self.min_deadline, value))
+
+
+def race(
+    candidates: Sequence[Tuple[str, Callable[[], T]]],
+    *,
+    deadline: Callable[[str], float],
+    accept: Callable[[T], bool],
+) -> Tuple[str, T]:
+    """Run ``candidates`` in order, starting the next one when the latest has not
+    produced an accepted result within its ``deadline`` (or everything started has
+    finished without one). Returns ``(name, result)`` for the first accepted result.
+
+    If nothing is accepted, the earliest-started completed result is returned; if
+    every candidate raised, the primary's exception is re-raised. Calls still in
+    flight are abandoned (their threads finish in the background, results unused).
+    """
+    if not candidates:
+        raise ValueError("race() needs at least one candidate")
+    pool = ThreadPoolExecutor(max_workers=len(candidates), thread_name_prefix="hedge")
+    started: List[Future] = []
+    names: Dict[Future, str] = {}
+    pending: set = set()
+    fallback: Optional[Tuple[int, str, T]] = None
+    errors: List[Tuple[int, BaseException]] = []
+
+    def launch() -> float:
+        name, fn = candidates[len(started)]
+        future = pool.submit(fn)
+        started.append(future)
+        names[future] = name
+        pending.add(future)
+        return time.monotonic() + deadline(name)
+
+    hedge_at = launch()
+    try:
+        while True:
+            more = len(started) < len(candidates)
+            timeout = max(0.0, hedge_at - time.monotonic()) if more else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=started.index):
+                pending.discard(future)
+                exc = future.exception()
+                if exc is not None:
+                    errors.append((started.index(future), exc))
+                    continue
+                value = future.result()
+                if accept(value):
+                    return names[future], value
+                rank = started.index(future)
+                if fallback is None or rank < fallback[0]:
+                    fallback = (rank, names[future], value)
+            if more and (not pending or time.monotonic() >= hedge_at):
+                hedge_at = launch()
+            elif not pending and not more:
+                if fallback is not None:
+                    return fallback[1], fallback[2]
+                raise min(errors, key=lambda e: e[0])[1]
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=False)
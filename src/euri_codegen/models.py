@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from typing import Any, List, Optional, Tuple, Union
-from pydantic import BaseModel, Field, ValidationError, field_validator
+from typing import Any, List
+from pydantic import BaseModel, Field, field_validator
 
 
 class SpecInput(BaseModel):
@@ -24,6 +24,7 @@ class Spec(BaseModel):
     outputs: dict[str, Any]
     constraints: List[str] = Field(default_factory=list)
     examples: List[SpecExample] = Field(default_factory=list)
+    tags: List[str] = Field(default_factory=list)
 
     @field_validator("function_signature")
     @classmethod
@@ -0,0 +1,125 @@
+"""Writing a catalog-sized run: per-file writes vs. batched atomic writes and streamed bundles.
+
+Run ``python -m euri_codegen.perf.artifact_bench 1000``. It needs no API key or
+network: it builds synthetic module/test pairs the size of typical generated
+files and measures only the I/O. Each strategy runs in a fresh directory:
+
+- ``per-file``: ``write_text`` per file, then read it back (the old generate path);
+- ``batched``: :class:`ArtifactWriter` with atomic batches and no read-back;
+- ``batched (unchanged)``: the same artifacts again, so every file is skipped;
+- ``files + zip``: write the files, then zip them from disk;
+- ``streamed zip``: zip straight from memory, with no output directory.
+"""
+
+from __future__ import annotations
+
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List
+
+from ..codegen.artifacts import Artifact, ArtifactWriter, Bundle
+
+
+@dataclass
+class WriteStats:
+    strategy: str
+    files: int
+    median_ms: float
+
+    @property
+    def files_per_s(self) -> float:
+        return self.files / (self.median_ms / 1e3) if self.median_ms else float("inf")
+
+
+def synthetic_artifacts(topics: int) -> List[Artifact]:
+    """A module (~2 KB) and a test file (~1.5 KB) per topic."""
+    out: List[Artifact] = []
+    for i in range(topics):
+        body = "".join(f"    total += value * {j}  # step {j}\n" for j in range(40))
+        out.append(
+            Artifact(
+                f"topic_{i}.py",
+                f'"""Topic {i}."""\n\ndef topic_{i}(value):\n    total = 0\n{body}'
+                "    return total\n",
+            )
+        )
+        cases = "".join(
+            f"def test_case_{j}():\n    assert topic_{i}({j}) == {j * 780}\n\n" for j in range(25)
+        )
+        out.append(Artifact(f"test_topic_{i}.py", f"from topic_{i} import topic_{i}\n\n\n{cases}"))
+    return out
+
+
+def _per_file(artifacts: List[Artifact], out_dir: Path) -> None:
+    for a in artifacts:
+        path = out_dir / a.name
+        path.write_text(a.content, encoding="utf-8")
+        path.read_text(encoding="utf-8")
+
+
+def _batched(artifacts: List[Artifact], out_dir: Path) -> None:
+    writer = ArtifactWriter(out_dir)
+    for i in range(0, len(artifacts), 2):
+        writer.add(artifacts[i : i + 2])
+    writer.flush()
+
+
+def _files_then_zip(artifacts: List[Artifact], out_dir: Path) -> None:
+    _per_file(artifacts, out_dir)
+    with zipfile.ZipFile(out_dir / "bundle.zip", "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for a in artifacts:
+            zf.write(out_dir / a.name, a.name)
+
+
+def _streamed_zip(artifacts: List[Artifact], out_dir: Path) -> None:
+    with (out_dir / "bundle.zip").open("wb") as f, Bundle(f, "zip") as bundle:
+        for i in range(0, len(artifacts), 2):
+            bundle.add(artifacts[i : i + 2])
+
+
+def _time(
+    fn: Callable[[List[Artifact], Path], None],
+    artifacts: List[Artifact],
+    runs: int,
+    *,
+    prewrite: bool = False,
+) -> float:
+    seconds = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            out_dir = Path(tmp)
+            if prewrite:
+                _batched(artifacts, out_dir)
+            start = time.perf_counter()
+            fn(artifacts, out_dir)
+            seconds.append(time.perf_counter() - start)
+    return statistics.median(seconds) * 1e3
+
+
+def bench_artifacts(topics: int = 1000, runs: int = 5) -> List[WriteStats]:
+    artifacts = synthetic_artifacts(topics)
+    n = len(artifacts)
+    return [
+        WriteStats("per-file", n, _time(_per_file, artifacts, runs)),
+        WriteStats("batched", n, _time(_batched, artifacts, runs)),
+        WriteStats("batched (unchanged)", n, _time(_batched, artifacts, runs, prewrite=True)),
+        WriteStats("files + zip", n, _time(_files_then_zip, artifacts, runs)),
+        WriteStats("streamed zip", n, _time(_streamed_zip, artifacts, runs)),
+    ]
+
+
+def main() -> None:
+    topics = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    results = bench_artifacts(topics)
+    print(f"{'strategy':<22} {'files':>6} {'median':>11} {'files/s':>10}")
+    for r in results:
+        print(f"{r.strategy:<22} {r.files:>6} {r.median_ms:>8.1f} ms {r.files_per_s:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
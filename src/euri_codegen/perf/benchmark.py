@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import statistics
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .inputs import clone_args, load_target, scaled_inputs
+
+if TYPE_CHECKING:
+    from ..models import Spec
+
+
+DEFAULT_SIZES = (10**3, 10**4, 10**5, 10**6)
+HISTORY_NAME = ".benchmarks.sqlite3"
+
+
+@dataclass
+class BenchResult:
+    topic: str
+    size: int
+    repeats: int
+    min_s: float
+    median_s: float
+    mean_s: float
+
+
+def time_call(
+    fn: Callable[..., Any], kwargs: Dict[str, Any], *, warmup: int = 1, repeats: int = 5
+) -> List[float]:
+    """Time ``fn(**kwargs)``; each call gets a fresh deep copy so in-place algorithms stay fair."""
+    for _ in range(warmup):
+        fn(**clone_args(kwargs))
+    timings = []
+    for _ in range(repeats):
+        args = clone_args(kwargs)
+        start = time.perf_counter()
+        fn(**args)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def benchmark_function(
+    fn: Callable[..., Any],
+    spec: Spec,
+    *,
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    warmup: int = 1,
+    repeats: int = 5,
+    budget_s: float = 10.0,
+    seed: int = 0,
+) -> List[BenchResult]:
+    """Benchmark ``fn`` on spec-derived inputs at increasing sizes.
+
+    Scaling stops early once one size consumes more than ``budget_s`` seconds,
+    so quadratic implementations do not run for hours at 10^6.
+    """
+    results = []
+    for size in sorted(sizes):
+        kwargs = scaled_inputs(spec, size, seed=seed)
+        start = time.perf_counter()
+        timings = time_call(fn, kwargs, warmup=warmup, repeats=repeats)
+        elapsed = time.perf_counter() - start
+        results.append(
+            BenchResult(
+                topic=spec.id,
+                size=size,
+                repeats=repeats,
+                min_s=min(timings),
+                median_s=statistics.median(timings),
+                mean_s=statistics.fmean(timings),
+            )
+        )
+        if elapsed > budget_s:
+            break
+    return results
+
+
+def benchmark_spec(spec: Spec, module_path: Path, **kwargs: Any) -> List[BenchResult]:
+    """Import the generated module for ``spec`` and benchmark its target function."""
+    return benchmark_function(load_target(module_path, spec), spec, **kwargs)
+
+
+def file_digest(path: Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()[:16]
+
+
+class BenchmarkHistory:
+    """SQLite log of benchmark runs, used to compare models/regenerations over time."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " run_id TEXT NOT NULL, ts REAL NOT NULL, topic TEXT NOT NULL, size INTEGER NOT NULL,"
+            " model TEXT, code_hash TEXT, repeats INTEGER,"
+            " min_s REAL, median_s REAL, mean_s REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_topic_size ON results(topic, size, ts)")
+        self.run_id = uuid.uuid4().hex[:12]
+
+    def previous(
+        self, topic: str, size: int
+    ) -> Optional[Tuple[float, Optional[str], Optional[str]]]:
+        """Most recent (median_s, model, code_hash) for topic/size from an earlier run."""
+        row = self._conn.execute(
+            "SELECT median_s, model, code_hash FROM results"
+            " WHERE topic = ? AND size = ? AND run_id != ? ORDER BY ts DESC LIMIT 1",
+            (topic, size, self.run_id),
+        ).fetchone()
+        return tuple(row) if row else None  # type: ignore[return-value]
+
+    def record(
+        self, results: Sequence[BenchResult], *, model: Optional[str], code_hash: Optional[str]
+    ) -> None:
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        self.run_id,
+                        now,
+                        r.topic,
+                        r.size,
+                        model,
+                        code_hash,
+                        r.repeats,
+                        r.min_s,
+                        r.median_s,
+                        r.mean_s,
+                    )
+                    for r in results
+                ],
+            )
+
+    def regressions(
+        self, results: Sequence[BenchResult], *, threshold: float = 0.10
+    ) -> List[Tuple[BenchResult, float]]:
+        """Results whose median is more than ``threshold`` slower than the previous run."""
+        flagged = []
+        for r in results:
+            prev = self.previous(r.topic, r.size)
+            if prev and r.median_s > prev[0] * (1.0 + threshold):
+                flagged.append((r, prev[0]))
+        return flagged
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,127 @@
+"""Catalog load-time benchmark on synthetic catalogs.
+
+Run ``python -m euri_codegen.perf.catalog_bench 1000,10000,100000`` to compare
+parsing and validating the whole JSON file (what every command used to do) with
+the indexed store: cold build, warm open, listing ids, and one validated lookup.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+from ..catalog_store import CatalogStore
+
+TAGS = (
+    "arrays",
+    "graphs",
+    "sorting",
+    "search",
+    "dynamic-programming",
+    "hashing",
+    "strings",
+    "design",
+)
+
+
+def synthetic_spec(i: int) -> Dict[str, object]:
+    return {
+        "id": f"topic_{i:06d}",
+        "title": f"Topic {i}",
+        "summary": f"Synthetic spec number {i} for load benchmarks.",
+        "tags": [TAGS[i % len(TAGS)], TAGS[(i * 7 + 3) % len(TAGS)]],
+        "function_signature": f"def topic_{i:06d}(nums: list[int], k: int) -> int:",
+        "inputs": [
+            {"name": "nums", "type": "list[int]", "desc": "Values"},
+            {"name": "k", "type": "int", "desc": "K"},
+        ],
+        "outputs": {"type": "int", "desc": "Result"},
+        "constraints": ["O(n) time", "Handle empty list"],
+        "examples": [{"input": {"nums": [1, 2, 3], "k": 2}, "output": i % 5}],
+    }
+
+
+def write_catalog(path: Path, n: int) -> Path:
+    path.write_text(json.dumps([synthetic_spec(i) for i in range(n)]), encoding="utf-8")
+    return path
+
+
+@dataclass
+class CatalogBench:
+    specs: int
+    full_parse_validate_s: float
+    cold_build_s: float
+    warm_open_s: float
+    list_ids_s: float
+    tag_filter_s: float
+    lookup_s: float
+
+
+def _timed(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench_catalog(n: int) -> CatalogBench:
+    from ..models import validate_specs
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = write_catalog(Path(tmp) / "catalog.json", n)
+        cache_dir = Path(tmp) / "cache"
+        target = f"topic_{n // 2:06d}"
+
+        def full() -> None:
+            data = json.loads(source.read_text(encoding="utf-8"))
+            specs = {s.id: s for s in validate_specs(data)}
+            specs[target]
+
+        full_s = _timed(full)
+        cold_s = _timed(lambda: CatalogStore([source], cache_dir=cache_dir).close())
+        start = time.perf_counter()
+        store = CatalogStore([source], cache_dir=cache_dir)
+        warm_s = time.perf_counter() - start
+        assert store.rebuilds == 0, "warm open rebuilt the index"
+        try:
+            return CatalogBench(
+                specs=n,
+                full_parse_validate_s=full_s,
+                cold_build_s=cold_s,
+                warm_open_s=warm_s,
+                list_ids_s=_timed(store.ids),
+                tag_filter_s=_timed(lambda: store.ids("graphs")),
+                lookup_s=_timed(lambda: store.spec(target)),
+            )
+        finally:
+            store.close()
+
+
+def bench_catalogs(sizes: Sequence[int]) -> List[CatalogBench]:
+    return [bench_catalog(n) for n in sizes]
+
+
+def main() -> None:
+    sizes = [
+        int(float(s))
+        for s in (sys.argv[1] if len(sys.argv) > 1 else "1000,10000,100000").split(",")
+    ]
+    print(
+        f"{'specs':>8} {'parse+validate':>15} {'cold build':>11} {'warm open':>10} "
+        f"{'list ids':>9} {'by tag':>8} {'lookup':>8}"
+    )
+    for r in bench_catalogs(sizes):
+        print(
+            f"{r.specs:>8,} {r.full_parse_validate_s * 1e3:>12.1f} ms "
+            f"{r.cold_build_s * 1e3:>8.1f} ms {r.warm_open_s * 1e3:>7.2f} ms "
+            f"{r.list_ids_s * 1e3:>6.1f} ms {r.tag_filter_s * 1e3:>5.1f} ms "
+            f"{r.lookup_s * 1e3:>5.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
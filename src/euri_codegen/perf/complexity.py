@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import math
+import re
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..sandbox import SandboxLimits, run_limited
+from .inputs import clone_args, load_target, scaled_inputs
+
+if TYPE_CHECKING:
+    from ..models import Spec
+
+
+# Growth classes in increasing order; names match what parse_bound returns.
+GROWTH_CLASSES: List[Tuple[str, Callable[[float], float]]] = [
+    ("1", lambda n: 1.0),
+    ("log n", lambda n: math.log2(n)),
+    ("n", lambda n: n),
+    ("n log n", lambda n: n * math.log2(n)),
+    ("n^2", lambda n: n * n),
+    ("n^3", lambda n: n**3),
+]
+_RANK = {name: i for i, (name, _) in enumerate(GROWTH_CLASSES)}
+DEFAULT_SIZES = tuple(2**k for k in range(9, 17))
+
+
+def classify_expr(expr: str) -> Optional[str]:
+    """Map a big-O body such as ``(V+E)logV`` or ``n*W`` to a growth class name."""
+    e = expr.lower().replace(" ", "").replace("²", "^2").replace("³", "^3")
+    # Multi-variable sizes (graph V/E, knapsack W, ...) all scale with n in our inputs.
+    e = re.sub(r"\b[vewmk]\b|(?<=[*(+])[vewmk]|[vewmk](?=[*)+]|log|$)", "n", e)
+    e = e.replace("(n+n)", "n")
+    if re.search(r"n\^3|n\*n\*n", e):
+        return "n^3"
+    if re.search(r"n\^2|n\*n", e):
+        return "n^2"
+    if "nlogn" in e or "n*logn" in e or re.search(r"n\)?\*?log", e):
+        return "n log n"
+    if "log" in e:
+        return "log n"
+    if "n" in e:
+        return "n"
+    if e in ("1", "c"):
+        return "1"
+    return None
+
+
+def parse_bound(constraints: Sequence[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Extract (time, space) growth classes from spec constraint strings.
+
+    ``"O(log n) time, O(1) space"`` -> ``("log n", "1")``. A bare O(...) without a
+    qualifier is treated as time; for "average ..., worst ..." the worst case wins.
+    """
+    time_cls: Optional[str] = None
+    space_cls: Optional[str] = None
+    for text in constraints:
+        for m in re.finditer(r"O\(((?:[^()]|\([^()]*\))*)\)\s*(\w+)?", text):
+            cls = classify_expr(m.group(1))
+            if cls is None:
+                continue
+            qualifier = (m.group(2) or "").lower()
+            if qualifier.startswith("space") or qualifier.startswith("memory"):
+                space_cls = cls
+            elif time_cls is None or _RANK[cls] > _RANK[time_cls]:
+                time_cls = cls
+    return time_cls, space_cls
+
+
+def fit_growth(sizes: Sequence[int], values: Sequence[float]) -> Tuple[str, Dict[str, float]]:
+    """Fit ``values ≈ c·f(n)`` for every growth class by relative least squares.
+
+    Returns the best class and the residual error of every class.
+    """
+    errors: Dict[str, float] = {}
+    for name, f in GROWTH_CLASSES:
+        fs = [f(n) for n in sizes]
+        ratios = [fx / max(v, 1e-12) for fx, v in zip(fs, values)]
+        c = sum(ratios) / sum(r * r for r in ratios)
+        errors[name] = sum((1.0 - c * r) ** 2 for r in ratios) / len(ratios)
+    best = min(GROWTH_CLASSES, key=lambda item: errors[item[0]])[0]
+    return best, errors
+
+
+def _time_once(fn: Callable[..., Any], kwargs: Dict[str, Any], min_total: float = 0.005) -> float:
+    """Per-call time, batching fast calls (timeit-style) so microsecond work is measurable.
+
+    Arguments are re-cloned per call only when the function mutates them.
+    """
+    args = clone_args(kwargs)
+    start = time.perf_counter()
+    fn(**args)
+    elapsed = time.perf_counter() - start
+    if elapsed >= min_total:
+        return elapsed
+    mutates = args != kwargs
+    number = min(1 << 14, int(min_total / max(elapsed, 1e-7)) + 1)
+    batch = [clone_args(kwargs) for _ in range(number)] if mutates else [args] * number
+    start = time.perf_counter()
+    for call_args in batch:
+        fn(**call_args)
+    return (time.perf_counter() - start) / number
+
+
+def _peak_memory(fn: Callable[..., Any], kwargs: Dict[str, Any]) -> int:
+    args = clone_args(kwargs)
+    tracemalloc.start()
+    try:
+        fn(**args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+@dataclass
+class ComplexityReport:
+    topic: str
+    sizes: List[int] = field(default_factory=list)
+    seconds: List[float] = field(default_factory=list)
+    peak_bytes: List[int] = field(default_factory=list)
+    time_bound: Optional[str] = None
+    space_bound: Optional[str] = None
+    time_class: Optional[str] = None
+    space_class: Optional[str] = None
+    problems: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+
+def _exceeds(
+    bound: Optional[str], measured: str, errors: Dict[str, float], tolerance: float
+) -> bool:
+    # Only fail when the stated bound fits clearly worse than the measured class;
+    # neighbouring classes (n vs n log n) are hard to separate on noisy timings.
+    if bound is None or _RANK[measured] <= _RANK[bound]:
+        return False
+    return errors[bound] > tolerance * max(errors[measured], 1e-3)
+
+
+def verify_complexity(
+    fn: Callable[..., Any],
+    spec: Spec,
+    *,
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    repeats: int = 3,
+    budget_s: float = 5.0,
+    tolerance: float = 2.0,
+) -> ComplexityReport:
+    """Measure ``fn`` over geometric sizes and check it against the spec's O(...) bounds."""
+    time_bound, space_bound = parse_bound(spec.constraints)
+    report = ComplexityReport(topic=spec.id, time_bound=time_bound, space_bound=space_bound)
+    for size in sorted(sizes):
+        kwargs = scaled_inputs(spec, size, seed=size)
+        start = time.perf_counter()
+        report.seconds.append(min(_time_once(fn, kwargs) for _ in range(repeats)))
+        # A small floor keeps O(1)-space peaks from fitting pure noise.
+        report.peak_bytes.append(_peak_memory(fn, kwargs) + 1024)
+        report.sizes.append(size)
+        if time.perf_counter() - start > budget_s:
+            break
+    if len(report.sizes) < 4:
+        report.problems.append(f"only {len(report.sizes)} size(s) finished within budget")
+        return report
+    report.time_class, time_errors = fit_growth(report.sizes, report.seconds)
+    report.space_class, space_errors = fit_growth(report.sizes, report.peak_bytes)
+    if _exceeds(time_bound, report.time_class, time_errors, tolerance):
+        report.problems.append(
+            f"time grows like O({report.time_class}), spec allows O({time_bound})"
+        )
+    if _exceeds(space_bound, report.space_class, space_errors, tolerance):
+        report.problems.append(
+            f"memory grows like O({report.space_class}), spec allows O({space_bound})"
+        )
+    return report
+
+
+def _verify_module(path: str, spec: Spec) -> ComplexityReport:
+    return verify_complexity(load_target(Path(path), spec), spec)
+
+
+def verify_module_complexity(
+    module_path: Path, spec: Spec, *, limits: Optional[SandboxLimits] = None
+) -> ComplexityReport:
+    """:func:`verify_complexity` on a generated module, imported and measured in a limited child.
+
+    Generated code that hangs or exhausts memory at the larger sizes raises
+    :class:`~euri_codegen.sandbox.SandboxError` instead of taking this process down.
+    """
+    return run_limited(_verify_module, str(module_path), spec, limits=limits)
@@ -0,0 +1,181 @@
+"""Per-request latency: cold CLI runs vs. the same request through the daemon.
+
+Run ``python -m euri_codegen.perf.daemon_bench 20``. No API key or network is
+needed. Two requests are measured:
+
+- an offline ``optimize``, which applies the local rewrite rules only;
+- an ``explain`` answered from a pre-seeded completion cache.
+
+So the numbers isolate per-invocation overhead. Each request is sent three ways:
+
+- ``cold``: a fresh ``python -m euri_codegen ...`` process;
+- ``thin``: the same command with ``--via-daemon`` (still starts an interpreter);
+- ``client``: a script calling the daemon over one keep-alive connection.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+from ..daemon_client import DaemonClient, DaemonUnavailable
+
+SAMPLE = """def pick(items):
+    out = ""
+    for i in range(len(items)):
+        if items[i] in ["a", "b", "c"]:
+            out += items[i]
+    return sorted(items)[0], out
+"""
+
+
+@dataclass
+class LatencyStats:
+    request: str
+    path: str
+    runs: int
+    median_ms: float
+    p95_ms: float
+
+    @classmethod
+    def of(cls, request: str, path: str, seconds: List[float]) -> "LatencyStats":
+        ordered = sorted(seconds)
+        p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+        return cls(request, path, len(seconds), statistics.median(ordered) * 1e3, p95 * 1e3)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _env(address: str, tmp: Path) -> Dict[str, str]:
+    env = dict(
+        os.environ,
+        EURI_DAEMON=address,
+        EURI_CACHE_PATH=str(tmp / "completions.sqlite3"),
+        EURI_DAEMON_TOKEN_FILE=str(tmp / "daemon.token"),
+    )
+    env.setdefault(
+        "EURI_API_KEY", "offline-benchmark"
+    )  # never sent: every request is local or a cache hit
+    return env
+
+
+def _seed_explanation(env: Dict[str, str]) -> None:
+    """Cache the explanation of SAMPLE under the key the CLI and daemon will compute."""
+    from ..cache import CompletionCache
+    from ..config import Settings
+    from ..prompts.templates import explanation_prompt
+
+    saved = dict(os.environ)
+    os.environ.update(env)
+    try:
+        settings = Settings.load()
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+    cache = CompletionCache(Path(env["EURI_CACHE_PATH"]))
+    key = CompletionCache.key(
+        explanation_prompt(SAMPLE),
+        model=settings.model,
+        temperature=settings.temperature,
+        max_tokens=2000,
+    )
+    cache.put(key, "`pick` keeps the letters a-c and returns the smallest item.")
+    cache.close()
+
+
+def _wait_ready(client: DaemonClient, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"daemon exited with code {proc.returncode}")
+        try:
+            client.call("ping")
+            return
+        except DaemonUnavailable:
+            time.sleep(0.05)
+    raise RuntimeError("daemon did not start in time")
+
+
+def bench_daemon(runs: int = 20) -> List[LatencyStats]:
+    address = f"127.0.0.1:{_free_port()}"
+    cli = [sys.executable, "-m", "euri_codegen", "--no-telemetry"]
+    with tempfile.TemporaryDirectory() as tmp:
+        target = Path(tmp) / "sample.py"
+        env = _env(address, Path(tmp))
+        _seed_explanation(env)
+        requests = {
+            "optimize --offline": (
+                [
+                    "optimize",
+                    "--path",
+                    str(target),
+                    "--offline",
+                    "--rule",
+                    "membership-set-literal",
+                ],
+                "optimize",
+                {"level": "offline", "rules": ["membership-set-literal"]},
+            ),
+            "explain (cached)": (["explain", "--path", str(target), "--no-stream"], "explain", {}),
+        }
+
+        def timed_cli(extra: List[str], args: List[str]) -> List[float]:
+            out = []
+            for _ in range(runs):
+                target.write_text(SAMPLE, encoding="utf-8")
+                start = time.perf_counter()
+                subprocess.run(cli + extra + args, env=env, check=True, capture_output=True)
+                out.append(time.perf_counter() - start)
+            return out
+
+        results = [
+            LatencyStats.of(name, "cold", timed_cli([], args))
+            for name, (args, _, _) in requests.items()
+        ]
+        proc = subprocess.Popen(
+            cli + ["serve", "--address", address], env=env, stdout=subprocess.DEVNULL
+        )
+        client = DaemonClient(address, token_path=Path(env["EURI_DAEMON_TOKEN_FILE"]))
+        try:
+            _wait_ready(client, proc)
+            for name, (args, method, params) in requests.items():
+                results.append(LatencyStats.of(name, "thin", timed_cli(["--via-daemon"], args)))
+                direct = []
+                for _ in range(runs):
+                    start = time.perf_counter()
+                    client.call(method, code=SAMPLE, **params)
+                    direct.append(time.perf_counter() - start)
+                results.append(LatencyStats.of(name, "client", direct))
+        finally:
+            client.close()
+            proc.terminate()
+            proc.wait(timeout=10)
+    return results
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    results = bench_daemon(runs)
+    cold = {r.request: r.median_ms for r in results if r.path == "cold"}
+    print(f"{'request':<20} {'path':>7} {'runs':>5} {'median':>10} {'p95':>10} {'speedup':>8}")
+    for r in sorted(results, key=lambda r: r.request):
+        print(
+            f"{r.request:<20} {r.path:>7} {r.runs:>5} {r.median_ms:>7.1f} ms {r.p95_ms:>7.1f} ms "
+            f"{cold[r.request] / r.median_ms:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
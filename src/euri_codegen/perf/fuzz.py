@@ -0,0 +1,491 @@
+"""Differential fuzzing: run an original and a rewritten function on the same inputs.
+
+Inputs come from the spec's ``inputs`` types, falling back to the original
+function's annotations. Cases are split into batches and run across a process
+pool. Return values, in-place mutations of the arguments and exception types
+must all match. The first mismatch is shrunk to a small counterexample.
+
+The modules are only ever executed in the workers, which run under sandbox
+rlimits, and loading them is time-limited like each case.
+"""
+
+from __future__ import annotations
+
+import inspect
+import math
+import multiprocessing
+import os
+import random
+import signal
+import sys
+import time
+import types
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..sandbox import SandboxLimits, apply_limits
+from .inputs import TypeNode, clone_args, generate_value, parse_type, type_of_value
+
+if TYPE_CHECKING:
+    from ..models import Spec
+
+# (parameter name, type, description) for each generated argument.
+InputPlan = List[Tuple[str, TypeNode, str]]
+# ("ok", result, arguments after the call) | ("raise", exception type name) | ("timeout",)
+Outcome = Tuple[Any, ...]
+
+_SIZES = (0, 1, 2, 3, 4, 5, 8, 13, 21)
+_EDGE_CASES = 4  # cases 0..3 use sizes 0..3 with in-domain values
+_WILD_INTS = (0, 1, -1, 2, -2, 7, -7, 2**31 - 1, -(2**31), 2**63, -(2**63))
+_WILD_FLOATS = (0.0, -0.0, 1.0, -1.0, 0.5, 1e-9, -1e9, 1e300)
+_WILD_CHARS = "ab é中\n"
+SHRINK_GRACE_S = 2.0
+
+
+def _annotation_text(annotation: Any) -> str:
+    if isinstance(annotation, str):
+        return annotation
+    if isinstance(annotation, type) and not getattr(annotation, "__args__", None):
+        return annotation.__name__
+    return str(annotation)  # list[int], typing.List[int], int | None, ...
+
+
+def input_plan(fn: Callable[..., Any], spec: Optional[Spec] = None) -> InputPlan:
+    """Argument types for ``fn``: the spec's ``inputs`` first, then annotations.
+
+    Parameters with a default and no known type are left to their default.
+    """
+    by_name = {inp.name: inp for inp in spec.inputs} if spec else {}
+    example = spec.examples[0].input if spec and spec.examples else {}
+    plan: InputPlan = []
+    for param in inspect.signature(fn).parameters.values():
+        if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+            continue
+        inp = by_name.get(param.name)
+        texts = [inp.type] if inp else []
+        if param.annotation is not param.empty:
+            texts.append(_annotation_text(param.annotation))
+        node = None
+        for text in texts:
+            try:
+                node = parse_type(text)
+                break
+            except ValueError:
+                continue
+        if node is None and param.name in example:
+            node = type_of_value(example[param.name])
+        if node is None:
+            if param.default is not param.empty:
+                continue
+            raise ValueError(
+                f"cannot derive inputs for parameter {param.name!r}: no spec type or annotation"
+            )
+        plan.append((param.name, node, inp.desc if inp else ""))
+    return plan
+
+
+def _wild_value(node: TypeNode, rng: random.Random, size: int) -> Any:
+    """Out-of-the-usual-domain values: negatives, extremes, duplicates, unicode."""
+    name, args = node
+    if name == "int":
+        return rng.choice(_WILD_INTS) if rng.random() < 0.3 else rng.randint(-size - 2, size + 2)
+    if name == "float":
+        return rng.choice(_WILD_FLOATS) if rng.random() < 0.3 else rng.uniform(-size - 1, size + 1)
+    if name == "bool":
+        return rng.random() < 0.5
+    if name == "str":
+        return "".join(rng.choice(_WILD_CHARS) for _ in range(rng.randint(0, size)))
+    if name in ("list", "set", "frozenset", "sequence", "iterable"):
+        inner = args[0] if args else ("int", [])
+        pool = [_wild_value(inner, rng, 3) for _ in range(max(1, size // 2))]  # forces duplicates
+        items = [
+            rng.choice(pool) if rng.random() < 0.5 else _wild_value(inner, rng, 3)
+            for _ in range(size)
+        ]
+        return set(items) if name == "set" else frozenset(items) if name == "frozenset" else items
+    if name == "tuple":
+        if len(args) == 2 and args[1][0] == "...":
+            return tuple(_wild_value(args[0], rng, 3) for _ in range(size))
+        return tuple(_wild_value(a, rng, 3) for a in args)
+    if name == "dict":
+        key_t = args[0] if args else ("int", [])
+        val_t = args[1] if len(args) > 1 else ("int", [])
+        return {_wild_value(key_t, rng, 3): _wild_value(val_t, rng, 3) for _ in range(size)}
+    raise ValueError(f"Unsupported type for input generation: {name}")
+
+
+def make_case(plan: InputPlan, index: int, *, seed: int = 0, max_size: int = 21) -> Dict[str, Any]:
+    """Keyword arguments for case ``index``; the same (plan, index, seed) gives the same case.
+
+    The first cases are in-domain inputs of size 0..3. After that, every third
+    case uses wild values and the rest use in-domain values of random size.
+    """
+    rng = random.Random(seed * 1_000_003 + index)
+    if index < _EDGE_CASES:
+        n, wild = index, False
+    else:
+        n, wild = min(max_size, rng.choice(_SIZES + (max_size,))), index % 3 == 2
+    if wild:
+        return {name: _wild_value(node, rng, n) for name, node, _ in plan}
+    return {name: generate_value(node, n, rng, desc=desc) for name, node, desc in plan}
+
+
+def same_value(a: Any, b: Any) -> bool:
+    """Equality that also requires matching types (``1 != True``, ``[1] != (1,)``); NaN == NaN."""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, float):
+        return a == b or (math.isnan(a) and math.isnan(b))
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(same_value(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(same_value(a[k], b[k]) for k in a)
+    try:
+        return bool(a == b)
+    except Exception:
+        return repr(a) == repr(b)
+
+
+def same_outcome(a: Outcome, b: Outcome) -> bool:
+    if a[0] != b[0]:
+        return False
+    if a[0] == "ok":
+        return same_value(a[1], b[1]) and same_value(a[2], b[2])
+    return a[1:] == b[1:]
+
+
+class _CaseTimeout(BaseException):
+    pass
+
+
+def _on_alarm(signum: int, frame: Any) -> None:
+    raise _CaseTimeout()
+
+
+def run_case(fn: Callable[..., Any], kwargs: Dict[str, Any], *, timeout: float = 0.0) -> Outcome:
+    """Call ``fn`` on a copy of ``kwargs``.
+
+    ``timeout`` only applies in fuzz workers on POSIX, where the SIGALRM handler is installed.
+    """
+    args = clone_args(kwargs)
+    alarm = (
+        timeout > 0 and hasattr(signal, "SIGALRM") and signal.getsignal(signal.SIGALRM) is _on_alarm
+    )
+    if alarm:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        result = fn(**args)
+    except _CaseTimeout:
+        return ("timeout",)
+    except RecursionError:
+        return ("raise", "RecursionError")
+    except Exception as e:
+        return ("raise", type(e).__name__)
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return ("ok", result, args)
+
+
+def _describe(outcome: Outcome, *, with_args: bool = False) -> str:
+    if outcome[0] != "ok":
+        return "times out" if outcome[0] == "timeout" else f"raises {outcome[1]}"
+    text = f"returns {outcome[1]!r}" + (
+        f", leaves arguments as {outcome[2]!r}" if with_args else ""
+    )
+    return text if len(text) <= 300 else text[:297] + "..."
+
+
+def _smaller(value: Any) -> Iterator[Any]:
+    """Simpler candidates for ``value``, most aggressive first."""
+    if isinstance(value, bool):
+        if value:
+            yield False
+    elif isinstance(value, int):
+        for c in (
+            0,
+            value // 2 if value > 0 else -(-value // 2),
+            value - 1 if value > 0 else value + 1,
+        ):
+            if abs(c) < abs(value):
+                yield c
+    elif isinstance(value, float) and math.isfinite(value):
+        for c in (0.0, float(round(value)), value / 2):
+            if c != value and abs(c) <= abs(value):
+                yield c
+    elif isinstance(value, str):
+        if value:
+            yield ""
+            if len(value) > 1:
+                yield value[: len(value) // 2]
+            yield from (value[:i] + value[i + 1 :] for i in range(min(len(value), 16)))
+    elif isinstance(value, (list, set, frozenset)):
+        items = list(value)
+        wrap = type(value)
+        if items:
+            yield wrap()
+            if len(items) > 1:
+                yield wrap(items[: len(items) // 2])
+                yield wrap(items[len(items) // 2 :])
+            yield from (wrap(items[:i] + items[i + 1 :]) for i in range(min(len(items), 32)))
+            if isinstance(value, list):
+                for i, item in enumerate(items[:32]):
+                    yield from (items[:i] + [c] + items[i + 1 :] for c in _smaller(item))
+    elif isinstance(value, tuple):
+        for i, item in enumerate(value):
+            yield from (value[:i] + (c,) + value[i + 1 :] for c in _smaller(item))
+    elif isinstance(value, dict):
+        if value:
+            yield {}
+            for k in list(value)[:32]:
+                yield {kk: v for kk, v in value.items() if kk != k}
+            for k in list(value)[:32]:
+                yield from ({**value, k: c} for c in _smaller(value[k]))
+
+
+def shrink(
+    kwargs: Dict[str, Any],
+    differs: Callable[[Dict[str, Any]], bool],
+    *,
+    max_steps: int = 2000,
+    deadline: Optional[float] = None,
+) -> Tuple[Dict[str, Any], int]:
+    """Greedily simplify ``kwargs`` while ``differs`` stays true; returns (smallest, steps used)."""
+    steps = 0
+    improved = True
+    while improved and steps < max_steps and (deadline is None or time.time() < deadline):
+        improved = False
+        for name in kwargs:
+            for candidate in _smaller(kwargs[name]):
+                if same_value(candidate, kwargs[name]):
+                    continue
+                steps += 1
+                trial = {**kwargs, name: candidate}
+                if differs(trial):
+                    kwargs, improved = trial, True
+                    break
+                if steps >= max_steps or (deadline is not None and time.time() >= deadline):
+                    return kwargs, steps
+            if improved:
+                break
+    return kwargs, steps
+
+
+@dataclass
+class Counterexample:
+    index: int
+    kwargs: Dict[str, Any]
+    original: str
+    candidate: str
+    shrink_steps: int = 0
+
+
+@dataclass
+class FuzzReport:
+    cases: int
+    seconds: float
+    workers: int
+    both_raised: int = 0
+    counterexample: Optional[Counterexample] = None
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def equivalent(self) -> bool:
+        return self.counterexample is None and not self.errors
+
+    @property
+    def cases_per_s(self) -> float:
+        return self.cases / self.seconds if self.seconds else 0.0
+
+
+def _load_function(code: str, module_name: str, function: str) -> Callable[..., Any]:
+    module = types.ModuleType(module_name)
+    sys.modules[module_name] = module  # dataclasses and pickling look modules up by name
+    exec(compile(code, f"<{module_name}>", "exec"), module.__dict__)
+    fn = getattr(module, function, None)
+    if not callable(fn):
+        raise AttributeError(f"{module_name} does not define {function}()")
+    return fn
+
+
+# Per-process state set up by ``_init_worker``.
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(
+    original: str,
+    candidate: str,
+    function: str,
+    case_timeout: float,
+    stop: Any,
+    limits: SandboxLimits,
+    load_timeout: float,
+) -> None:
+    """Limit this worker, then load both modules; a failure is kept for :func:`_prepare`."""
+    _worker["stop"] = stop
+    _worker["timeout"] = case_timeout
+    apply_limits(limits)
+    alarm = hasattr(signal, "SIGALRM")
+    if alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, load_timeout)
+    try:
+        _worker["original"] = _load_function(original, "_euri_fuzz_original", function)
+        _worker["candidate"] = _load_function(candidate, "_euri_fuzz_candidate", function)
+    except _CaseTimeout:
+        _worker["error"] = f"loading the modules took longer than {load_timeout:g}s"
+    except (Exception, SystemExit) as e:
+        _worker["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _prepare(
+    spec: Optional[Spec], plan: Optional[InputPlan]
+) -> Tuple[Optional[InputPlan], Optional[str]]:
+    """(input plan, None), or (None, why the modules cannot be fuzzed); runs in a worker."""
+    if "error" in _worker:
+        return None, _worker["error"]
+    try:
+        return (plan if plan is not None else input_plan(_worker["original"], spec)), None
+    except ValueError as e:
+        return None, f"ValueError: {e}"
+
+
+def _compare(kwargs: Dict[str, Any]) -> Tuple[Outcome, Outcome]:
+    timeout = _worker["timeout"]
+    return (
+        run_case(_worker["original"], kwargs, timeout=timeout),
+        run_case(_worker["candidate"], kwargs, timeout=timeout),
+    )
+
+
+def _run_batch(
+    plan: InputPlan, start: int, count: int, seed: int, max_size: int, deadline: float
+) -> Tuple[int, int, Optional[Counterexample]]:
+    """Run cases ``start..start+count`` until ``deadline``.
+
+    Returns (cases run, cases where both raised, counterexample or None).
+    """
+    both_raised = 0
+    for i in range(start, start + count):
+        if time.time() >= deadline or _worker["stop"].is_set():
+            return i - start, both_raised, None
+        kwargs = make_case(plan, i, seed=seed, max_size=max_size)
+        a, b = _compare(kwargs)
+        if same_outcome(a, b):
+            both_raised += a[0] == "raise"
+            continue
+        # A case where the original itself times out says nothing about the rewrite.
+        if a[0] == "timeout":
+            continue
+
+        def differs(trial: Dict[str, Any]) -> bool:
+            x, y = _compare(trial)
+            return x[0] != "timeout" and not same_outcome(x, y)
+
+        # Shrinking may overrun the budget a little: a small counterexample is worth it.
+        small, steps = shrink(kwargs, differs, deadline=max(deadline, time.time() + SHRINK_GRACE_S))
+        a, b = _compare(small)
+        with_args = a[0] == b[0] == "ok" and same_value(a[1], b[1])
+        found = Counterexample(
+            i, small, _describe(a, with_args=with_args), _describe(b, with_args=with_args), steps
+        )
+        return i - start + 1, both_raised, found
+    return count, both_raised, None
+
+
+def fuzz_equivalence(
+    original: str,
+    candidate: str,
+    *,
+    function: str,
+    spec: Optional[Spec] = None,
+    plan: Optional[InputPlan] = None,
+    budget_s: float = 10.0,
+    max_cases: Optional[int] = None,
+    workers: Optional[int] = None,
+    batch_size: int = 250,
+    max_size: int = 21,
+    case_timeout: float = 1.0,
+    load_timeout: float = 5.0,
+    limits: Optional[SandboxLimits] = None,
+    seed: int = 0,
+) -> FuzzReport:
+    """Compare ``function`` in two module sources on generated inputs until the budget runs out.
+
+    Stops at ``max_cases``, at ``budget_s`` seconds, or at the first (shrunk)
+    counterexample. Modules that fail to load (or take over ``load_timeout``
+    seconds) are reported in ``errors``. ``limits`` default to the sandbox's,
+    with enough CPU time for a worker to last the whole budget.
+    """
+    start = time.perf_counter()
+    limits = limits or SandboxLimits(
+        cpu_seconds=math.ceil(load_timeout + budget_s + SHRINK_GRACE_S) + 5
+    )
+    workers = max(1, workers or os.cpu_count() or 1)
+    deadline = time.time() + budget_s
+    report = FuzzReport(cases=0, seconds=0.0, workers=workers)
+    context = multiprocessing.get_context()
+    stop = context.Event()  # tells in-flight batches to return once a counterexample is found
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(original, candidate, function, case_timeout, stop, limits, load_timeout),
+    )
+    pending: Dict[Future, int] = {}
+    next_index = 0
+
+    def submit() -> None:
+        nonlocal next_index
+        count = batch_size if max_cases is None else min(batch_size, max_cases - next_index)
+        if count > 0 and time.time() < deadline:
+            pending[pool.submit(_run_batch, plan, next_index, count, seed, max_size, deadline)] = (
+                next_index
+            )
+            next_index += count
+
+    try:
+        try:
+            plan, error = pool.submit(_prepare, spec, plan).result()
+        except Exception as e:  # the worker died loading the modules, e.g. on a resource limit
+            error = f"worker failed: {type(e).__name__}: {e}"
+        if error is not None:
+            report.errors.append(error)
+        else:
+            for _ in range(2 * workers):  # keep every worker busy while results come back
+                submit()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.pop(future)
+                try:
+                    ran, raised, found = future.result()
+                except Exception as e:
+                    report.errors.append(f"worker failed: {type(e).__name__}: {e}")
+                    continue
+                report.cases += ran
+                report.both_raised += raised
+                best = report.counterexample
+                if found is not None and (best is None or found.index < best.index):
+                    report.counterexample = found
+            best = report.counterexample
+            if report.errors or (
+                best is not None and all(i >= best.index for i in pending.values())
+            ):
+                break
+            if best is not None:
+                continue  # an earlier batch may still find a smaller-index counterexample
+            while len(pending) < 2 * workers and (max_cases is None or next_index < max_cases):
+                before = len(pending)
+                submit()
+                if len(pending) == before:
+                    break
+    finally:
+        stop.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+    report.seconds = time.perf_counter() - start
+    return report
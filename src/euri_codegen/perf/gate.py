@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+
+from ..sandbox import SandboxLimits, run_limited, run_pytest_isolated
+from .benchmark import benchmark_function
+from .fuzz import FuzzReport, fuzz_equivalence
+from .inputs import function_name, load_module
+
+if TYPE_CHECKING:
+    from ..models import Spec
+
+
+@dataclass
+class GateAttempt:
+    attempt: int
+    tests_passed: bool
+    original_s: Optional[float] = None
+    candidate_s: Optional[float] = None
+    accepted: bool = False
+    reason: str = ""
+    fuzz_cases: Optional[int] = None
+
+    @property
+    def speedup(self) -> Optional[float]:
+        if not self.original_s or not self.candidate_s:
+            return None
+        return self.original_s / self.candidate_s
+
+
+@dataclass
+class GateReport:
+    original_tests_passed: bool
+    attempts: List[GateAttempt] = field(default_factory=list)
+    accepted_code: Optional[str] = None
+    error: Optional[str] = None  # why no candidate could be judged at all
+
+    @property
+    def accepted(self) -> bool:
+        return self.accepted_code is not None
+
+
+def run_tests(
+    code: str, module_name: str, test_path: Path, *, limits: Optional[SandboxLimits] = None
+) -> Tuple[bool, str]:
+    """Run ``test_path`` with pytest against ``code`` saved as ``<module_name>.py`` in a sandbox."""
+    test_path = Path(test_path)
+    run = run_pytest_isolated(
+        module_name,
+        {f"{module_name}.py": code, test_path.name: test_path.read_text(encoding="utf-8")},
+        test_path.name,
+        limits,
+    )
+    if run.status == "timeout":
+        return False, "tests timed out or exceeded their CPU limit"
+    return run.ok, run.output
+
+
+def _median_time(
+    code: str,
+    module_name: str,
+    spec: Spec,
+    *,
+    size: int,
+    repeats: int,
+    limits: Optional[SandboxLimits] = None,
+) -> float:
+    """Median time of the module's function at ``size``, measured in a limited child process.
+
+    A rewrite that passed the small tests may still hang or exhaust memory at
+    ``size``; that raises :class:`~euri_codegen.sandbox.SandboxError` here.
+    """
+    return run_limited(_time_module, code, module_name, spec, size, repeats, limits=limits)
+
+
+def _time_module(code: str, module_name: str, spec: Spec, size: int, repeats: int) -> float:
+    with tempfile.TemporaryDirectory(prefix="euri_gate_") as tmp:
+        path = Path(tmp) / f"{module_name}.py"
+        path.write_text(code, encoding="utf-8")
+        fn = getattr(load_module(path), function_name(spec) or "", None)
+        if not callable(fn):
+            raise AttributeError(f"{function_name(spec)}() missing from rewritten module")
+        # Identical seed => both versions see exactly the same inputs.
+        results = benchmark_function(fn, spec, sizes=[size], warmup=1, repeats=repeats, seed=0)
+    return results[0].median_s
+
+
+def _fuzz_feedback(report: FuzzReport) -> str:
+    found = report.counterexample
+    if found is None:
+        return "equivalence fuzzing could not run: " + "; ".join(report.errors)
+    args = ", ".join(f"{k}={v!r}" for k, v in found.kwargs.items())
+    return (
+        f"it changed behavior: with {args} the original {found.original} "
+        f"but the rewrite {found.candidate}"
+    )
+
+
+def gated_optimize(
+    original: str,
+    propose: Callable[[Optional[str]], str],
+    *,
+    spec: Spec,
+    module_name: str,
+    test_path: Path,
+    attempts: int = 3,
+    min_speedup: float = 1.05,
+    size: int = 10_000,
+    repeats: int = 5,
+    fuzz_budget: float = 0.0,
+    limits: Optional[SandboxLimits] = None,
+) -> GateReport:
+    """Accept a rewrite only if it passes the tests and beats ``min_speedup``.
+
+    With ``fuzz_budget`` > 0 it must also match the original on that many seconds
+    of differential fuzzing (see :func:`~euri_codegen.perf.fuzz.fuzz_equivalence`).
+    Tests and benchmarks run in child processes under ``limits``.
+
+    ``propose(feedback)`` returns a candidate module; ``feedback`` explains why
+    the previous candidate was rejected (None on the first attempt).
+    """
+    passed, _ = run_tests(original, module_name, test_path, limits=limits)
+    report = GateReport(original_tests_passed=passed)
+    try:
+        baseline = _median_time(
+            original, module_name, spec, size=size, repeats=repeats, limits=limits
+        )
+    except Exception as e:
+        report.error = f"original could not be benchmarked: {e}"
+        return report
+    feedback: Optional[str] = None
+    for n in range(1, attempts + 1):
+        candidate = propose(feedback)
+        ok, output = run_tests(candidate, module_name, test_path, limits=limits)
+        attempt = GateAttempt(attempt=n, tests_passed=ok, original_s=baseline)
+        report.attempts.append(attempt)
+        if not ok:
+            attempt.reason = "tests failed"
+            feedback = "it failed the existing tests:\n" + output[-800:]
+            continue
+        if fuzz_budget > 0:
+            fuzz = fuzz_equivalence(
+                original,
+                candidate,
+                function=function_name(spec) or "",
+                spec=spec,
+                budget_s=fuzz_budget,
+            )
+            attempt.fuzz_cases = fuzz.cases
+            if not fuzz.equivalent:
+                attempt.reason = (
+                    "fuzzing found a difference" if fuzz.counterexample else "fuzzing failed"
+                )
+                feedback = _fuzz_feedback(fuzz)
+                continue
+        try:
+            attempt.candidate_s = _median_time(
+                candidate, module_name, spec, size=size, repeats=repeats, limits=limits
+            )
+        except Exception as e:
+            attempt.reason = f"benchmark failed: {e}"
+            feedback = attempt.reason
+            continue
+        speedup = attempt.speedup or 0.0
+        if speedup >= min_speedup:
+            attempt.accepted = True
+            attempt.reason = f"{speedup:.2f}x faster"
+            report.accepted_code = candidate
+            break
+        attempt.reason = f"only {speedup:.2f}x (need {min_speedup:.2f}x)"
+        feedback = (
+            f"it was not measurably faster ({speedup:.2f}x vs the original at n={size}); "
+            "focus on algorithmic or constant-factor speedups"
+        )
+    return report
+
+
+def default_test_path(path: Path) -> Path:
+    return Path(path).with_name(f"test_{Path(path).stem}.py")
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import copy
+import importlib.util
+import random
+import re
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from ..models import Spec
+
+
+# A parsed type annotation: (name, [argument types]); e.g. ("list", [("int", [])]).
+TypeNode = Tuple[str, List["TypeNode"]]
+
+_NODE_HINTS = ("node", "vertex", "index", "start", "source", "src")
+_COUNT_HINTS = ("number of", "count of", "size of")
+_NESTED_SIZE = 8
+
+
+def parse_type(text: str) -> TypeNode:
+    """Parse a simple annotation string such as ``dict[int, list[int]]``."""
+    tokens = re.findall(r"[A-Za-z_][A-Za-z_0-9.]*|[\[\],|]", text)
+    pos = 0
+
+    def parse() -> TypeNode:
+        nonlocal pos
+        if pos >= len(tokens):
+            raise ValueError(f"Unexpected end of type: {text!r}")
+        name = tokens[pos].split(".")[-1].lower()
+        pos += 1
+        args: List[TypeNode] = []
+        if pos < len(tokens) and tokens[pos] == "[":
+            pos += 1
+            args.append(parse())
+            while pos < len(tokens) and tokens[pos] == ",":
+                pos += 1
+                args.append(parse())
+            if pos >= len(tokens) or tokens[pos] != "]":
+                raise ValueError(f"Unbalanced brackets in type: {text!r}")
+            pos += 1
+        return name, args
+
+    node = parse()
+    # "X | None" unions: generate the non-None member.
+    while pos < len(tokens) and tokens[pos] == "|":
+        pos += 1
+        other = parse()
+        if node[0] == "none":
+            node = other
+    return node
+
+
+def type_of_value(value: Any) -> TypeNode:
+    """Infer a TypeNode from an example value (fallback when a type string is unusable)."""
+    if isinstance(value, bool):
+        return "bool", []
+    if isinstance(value, int):
+        return "int", []
+    if isinstance(value, float):
+        return "float", []
+    if isinstance(value, str):
+        return "str", []
+    if isinstance(value, (list, tuple)):
+        inner = type_of_value(value[0]) if value else ("int", [])
+        return ("list" if isinstance(value, list) else "tuple"), [inner]
+    if isinstance(value, dict):
+        if value:
+            k, v = next(iter(value.items()))
+            return "dict", [type_of_value(k), type_of_value(v)]
+        return "dict", [("int", []), ("int", [])]
+    raise ValueError(f"Cannot infer type of {value!r}")
+
+
+def generate_value(
+    node: TypeNode, n: int, rng: random.Random, *, desc: str = "", size: Optional[int] = None
+) -> Any:
+    """Generate a value of the given type at problem size ``n``.
+
+    Top-level collections get ``size`` (default ``n``) elements while nested ones
+    stay small. Integers are drawn from ``[0, n)`` so they double as valid node
+    ids / indices.
+    """
+    name, args = node
+    lowered = desc.lower()
+    length = n if size is None else size
+    nested = min(_NESTED_SIZE, n)
+    if name == "int":
+        if any(h in lowered for h in _COUNT_HINTS):
+            return n
+        if any(h in lowered for h in _NODE_HINTS):
+            return 0
+        return rng.randrange(max(1, n))
+    if name == "float":
+        return rng.random() * n
+    if name == "bool":
+        return rng.random() < 0.5
+    if name == "str":
+        return "".join(rng.choice("abcdefghij") for _ in range(length))
+    if name in ("list", "set", "frozenset", "sequence", "iterable"):
+        inner = args[0] if args else ("int", [])
+        items = [generate_value(inner, n, rng, size=nested) for _ in range(length)]
+        if "sorted" in lowered:
+            items.sort()
+        if name == "set":
+            return set(items)
+        if name == "frozenset":
+            return frozenset(items)
+        return items
+    if name == "tuple":
+        if len(args) == 2 and args[1][0] == "...":
+            return tuple(generate_value(args[0], n, rng, size=nested) for _ in range(length))
+        return tuple(generate_value(a, n, rng, size=nested) for a in args)
+    if name == "dict":
+        key_t = args[0] if args else ("int", [])
+        val_t = args[1] if len(args) > 1 else ("int", [])
+        if key_t[0] == "int":
+            # Keys 0..n-1 so adjacency-list style dicts are closed over their nodes.
+            keys: List[Any] = list(range(length))
+        else:
+            keys = [generate_value(key_t, n, rng, size=nested) for _ in range(length)]
+        return {k: generate_value(val_t, n, rng, size=min(3, n)) for k in keys}
+    raise ValueError(f"Unsupported type for input generation: {name}")
+
+
+_ATOMIC = (int, float, bool, str, bytes, type(None))
+
+
+def clone(value: Any) -> Any:
+    """Fast deep copy for generated inputs (homogeneous containers of scalars/tuples).
+
+    ``copy.deepcopy`` dominates timings of sub-millisecond functions; generated
+    collections are homogeneous, so the first element decides the copy strategy.
+    """
+    if isinstance(value, _ATOMIC):
+        return value
+    if isinstance(value, list):
+        if (
+            not value
+            or isinstance(value[0], _ATOMIC)
+            or (isinstance(value[0], tuple) and all(isinstance(x, _ATOMIC) for x in value[0]))
+        ):
+            return value[:]
+        return [clone(x) for x in value]
+    if isinstance(value, dict):
+        return {k: clone(v) for k, v in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return type(value)(value)
+    if isinstance(value, tuple):
+        return tuple(clone(x) for x in value)
+    return copy.deepcopy(value)
+
+
+def clone_args(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: clone(v) for k, v in kwargs.items()}
+
+
+def scaled_inputs(spec: Spec, n: int, *, seed: int = 0) -> Dict[str, Any]:
+    """Build keyword arguments for ``spec``'s function at problem size ``n``."""
+    rng = random.Random(seed)
+    example = spec.examples[0].input if spec.examples else {}
+    kwargs: Dict[str, Any] = {}
+    for inp in spec.inputs:
+        try:
+            node = parse_type(inp.type)
+        except ValueError:
+            if inp.name not in example:
+                raise
+            node = type_of_value(example[inp.name])
+        kwargs[inp.name] = generate_value(node, n, rng, desc=inp.desc)
+    return kwargs
+
+
+def function_name(spec: Spec) -> Optional[str]:
+    """Name of the spec's target function, or None for class specs."""
+    m = re.search(r"def\s+([A-Za-z_][A-Za-z_0-9]*)\s*\(", spec.function_signature)
+    return m.group(1) if m else None
+
+
+def load_module(path: Path, name: Optional[str] = None) -> ModuleType:
+    """Import a generated module from a file path without touching ``sys.path``."""
+    path = Path(path)
+    mod_name = name or f"_euri_generated_{path.stem}_{abs(hash(str(path.resolve())))}"
+    module_spec = importlib.util.spec_from_file_location(mod_name, path)
+    if module_spec is None or module_spec.loader is None:
+        raise ImportError(f"Cannot import {path}")
+    module = importlib.util.module_from_spec(module_spec)
+    sys.modules[mod_name] = module
+    try:
+        module_spec.loader.exec_module(module)
+    except BaseException:
+        sys.modules.pop(mod_name, None)
+        raise
+    return module
+
+
+def load_target(path: Path, spec: Spec) -> Callable[..., Any]:
+    """Load the generated module at ``path`` and return the spec's target function."""
+    fn_name = function_name(spec)
+    if fn_name is None:
+        raise ValueError(f"{spec.id}: only function specs can be executed, not classes")
+    fn = getattr(load_module(path), fn_name, None)
+    if not callable(fn):
+        raise AttributeError(f"{path} does not define {fn_name}()")
+    return fn
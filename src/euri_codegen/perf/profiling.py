@@ -0,0 +1,217 @@
+"""Profile a module on a representative workload and rank its top-level definitions.
+
+The workload is either the spec's function on scaled-up inputs or a user driver
+script. ``cProfile`` self time is attributed to the top-level function or class
+that contains each profiled function. Optional line timing uses ``sys.settrace``
+and only traces frames of the profiled file.
+"""
+
+from __future__ import annotations
+
+import ast
+import cProfile
+import pstats
+import runpy
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import FrameType, ModuleType
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from .inputs import clone_args, function_name, load_module, scaled_inputs
+
+if TYPE_CHECKING:
+    from ..models import Spec
+
+Workload = Callable[[ModuleType], None]
+_DEFS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+@dataclass
+class FunctionStat:
+    name: str  # ``Class.method`` for methods; nested functions keep their bare name
+    line: int
+    calls: int
+    self_s: float
+    cumulative_s: float
+
+
+@dataclass
+class Hotspot:
+    """A top-level function or class and the profiled time spent inside it."""
+
+    name: str
+    start: int
+    end: int
+    self_s: float = 0.0
+    share: float = 0.0  # of all self time spent in the module
+    functions: List[FunctionStat] = field(default_factory=list)
+    lines: List[Tuple[int, int, float]] = field(default_factory=list)  # (line, hits, seconds)
+
+    def summary(self, source_lines: List[str], *, max_lines: int = 5) -> str:
+        """Compact profile text for prompts."""
+        out = [f"- {self.name}: {self.share:.0%} of module time ({self.self_s * 1e3:.1f} ms self)"]
+        for f in self.functions[:5]:
+            out.append(
+                f"  {f.name} (line {f.line}): {f.calls:,} call(s), {f.self_s * 1e3:.1f} ms self, "
+                f"{f.cumulative_s * 1e3:.1f} ms cumulative"
+            )
+        total = sum(s for _, _, s in self.lines) or 1.0
+        for line, hits, seconds in self.lines[:max_lines]:
+            text = source_lines[line - 1].strip() if 0 < line <= len(source_lines) else ""
+            out.append(
+                f"  line {line}: {seconds / total:.0%} of line time, {hits:,} hit(s): {text}"
+            )
+        return "\n".join(out)
+
+
+@dataclass
+class ProfileReport:
+    workload: str
+    seconds: float
+    hotspots: List[Hotspot]  # every top-level definition that ran, hottest first
+
+    def top(self, n: int = 3, *, min_share: float = 0.05) -> List[Hotspot]:
+        """The ``n`` hottest definitions above ``min_share``; always at least the hottest one."""
+        picked = [h for h in self.hotspots[:n] if h.share >= min_share]
+        return picked or self.hotspots[:1]
+
+
+# (name, first line, last line, is_class) of each top-level definition.
+_Range = Tuple[str, int, int, bool]
+
+
+def _top_level_ranges(code: str) -> List[_Range]:
+    ranges = []
+    for node in ast.parse(code).body:
+        if isinstance(node, _DEFS):
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            ranges.append(
+                (node.name, start, node.end_lineno or node.lineno, isinstance(node, ast.ClassDef))
+            )
+    return ranges
+
+
+def _owner(ranges: List[_Range], line: int) -> Optional[_Range]:
+    return next((r for r in ranges if r[1] <= line <= r[2]), None)
+
+
+class _LineTimer:
+    """Per-line hit counts and wall time for frames from one file (a minimal line profiler)."""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.hits: Dict[int, int] = {}
+        self.times: Dict[int, float] = {}
+        self._last: Dict[int, Tuple[int, float]] = {}  # frame id -> (line, timestamp)
+
+    def _global(self, frame: FrameType, event: str, arg: Any) -> Optional[Callable[..., Any]]:
+        if event == "call" and frame.f_code.co_filename == self.filename:
+            return self._local
+        return None
+
+    def _local(self, frame: FrameType, event: str, arg: Any) -> Optional[Callable[..., Any]]:
+        # Time between two events of a frame is charged to the earlier line (including callees).
+        now = time.perf_counter()
+        key = id(frame)
+        previous = self._last.pop(key, None)
+        if previous is not None:
+            self.times[previous[0]] = self.times.get(previous[0], 0.0) + now - previous[1]
+        if event == "line":
+            self.hits[frame.f_lineno] = self.hits.get(frame.f_lineno, 0) + 1
+            self._last[key] = (frame.f_lineno, time.perf_counter())
+        elif event != "return" and previous is not None:
+            self._last[key] = (previous[0], time.perf_counter())
+        return self._local
+
+    def run(self, fn: Callable[[], None]) -> None:
+        old = sys.gettrace()
+        sys.settrace(self._global)
+        try:
+            fn()
+        finally:
+            sys.settrace(old)
+
+
+def spec_workload(spec: Spec, *, size: int = 10_000, runs: int = 3) -> Workload:
+    """Call the spec's function on its examples, then on ``runs`` scaled inputs of ``size``."""
+    fn_name = function_name(spec)
+    if fn_name is None:
+        raise ValueError(f"{spec.id}: class specs need a --driver workload")
+    inputs = [dict(ex.input) for ex in spec.examples]
+    inputs += [scaled_inputs(spec, size, seed=seed) for seed in range(runs)]
+
+    def run(module: ModuleType) -> None:
+        fn = getattr(module, fn_name)
+        for kwargs in inputs:
+            fn(**clone_args(kwargs))
+
+    return run
+
+
+def driver_workload(driver: Path) -> Workload:
+    """Run ``driver`` as ``__main__``; it imports the profiled module by its file name."""
+
+    def run(module: ModuleType) -> None:
+        name = Path(module.__file__ or "").stem
+        saved = sys.modules.get(name)
+        sys.modules[name] = module  # the driver's ``import <name>`` gets the profiled copy
+        sys.path.insert(0, str(Path(driver).resolve().parent))
+        try:
+            runpy.run_path(str(driver), run_name="__main__")
+        finally:
+            sys.path.pop(0)
+            if saved is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = saved
+
+    return run
+
+
+def profile_module(
+    path: Path, workload: Workload, *, description: str = "", line_timing: bool = False
+) -> ProfileReport:
+    """Import ``path``, run ``workload`` under cProfile, and rank its top-level definitions."""
+    path = Path(path)
+    code = path.read_text(encoding="utf-8")
+    ranges = _top_level_ranges(code)
+    module = load_module(path)
+    filename = module.__file__ or str(path)
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.runcall(workload, module)
+    seconds = time.perf_counter() - start
+
+    spots: Dict[str, Hotspot] = {}
+    raw: Dict[Tuple[str, int, str], Tuple[Any, ...]] = pstats.Stats(profiler).stats  # type: ignore[attr-defined]
+    for (file, line, func), (_, calls, self_s, cumulative_s, _) in raw.items():
+        owner = _owner(ranges, line) if file == filename else None
+        if owner is None:
+            continue
+        name, first, last, is_class = owner
+        spot = spots.setdefault(name, Hotspot(name, first, last))
+        spot.self_s += self_s
+        label = f"{name}.{func}" if is_class else func
+        spot.functions.append(FunctionStat(label, line, calls, self_s, cumulative_s))
+    total = sum(s.self_s for s in spots.values()) or 1.0
+    for spot in spots.values():
+        spot.share = spot.self_s / total
+        spot.functions.sort(key=lambda f: f.self_s, reverse=True)
+
+    if line_timing and spots:
+        timer = _LineTimer(filename)
+        timer.run(lambda: workload(module))
+        for spot in spots.values():
+            spot.lines = sorted(
+                (
+                    (ln, timer.hits.get(ln, 0), t)
+                    for ln, t in timer.times.items()
+                    if spot.start <= ln <= spot.end
+                ),
+                key=lambda item: item[2],
+                reverse=True,
+            )
+    hotspots = sorted(spots.values(), key=lambda s: s.self_s, reverse=True)
+    return ProfileReport(description or path.name, seconds, hotspots)
@@ -0,0 +1,64 @@
+"""Per-rule speedup of the local rewrite pass, measured on each rule's sample.
+
+Run ``python -m euri_codegen.perf.rewrite_bench [n]`` to print a table.
+"""
+
+from __future__ import annotations
+
+import statistics
+import sys
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ..codegen.rewrites import RULES, apply_rules
+from .benchmark import time_call
+
+
+@dataclass
+class RuleBench:
+    rule: str
+    before_s: float
+    after_s: float
+    same_result: bool
+
+    @property
+    def speedup(self) -> float:
+        return self.before_s / self.after_s if self.after_s else 0.0
+
+
+def _compile_run(code: str) -> Callable[..., Any]:
+    namespace: Dict[str, Any] = {}
+    exec(compile(code, "<rule-sample>", "exec"), namespace)
+    return namespace["run"]
+
+
+def bench_rule(name: str, *, n: int = 100_000, repeats: int = 5) -> RuleBench:
+    rule = RULES[name]
+    rewritten, applied = apply_rules(rule.sample, [name])
+    if not applied:
+        raise ValueError(f"rule {name!r} does not match its own sample")
+    before, after = _compile_run(rule.sample), _compile_run(rewritten)
+    return RuleBench(
+        rule=name,
+        before_s=statistics.median(time_call(before, {"n": n}, repeats=repeats)),
+        after_s=statistics.median(time_call(after, {"n": n}, repeats=repeats)),
+        same_result=before(n) == after(n),
+    )
+
+
+def bench_rules(names: Optional[Sequence[str]] = None, **kwargs: Any) -> List[RuleBench]:
+    return [bench_rule(name, **kwargs) for name in names or list(RULES)]
+
+
+def main() -> None:
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 100_000
+    for r in bench_rules(n=n):
+        print(
+            f"{r.rule:24} {r.before_s * 1e3:9.3f} ms -> {r.after_s * 1e3:9.3f} ms  "
+            f"{r.speedup:5.2f}x"
+            f"{'' if r.same_result else '  RESULT MISMATCH'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Import-time measurement for CLI startup, driven by ``python -X importtime``.
+
+Run ``python -m euri_codegen.perf.startup`` to see the slowest imports.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+
+def import_times(
+    module: str = "euri_codegen.cli", *, env: Optional[Dict[str, str]] = None
+) -> Dict[str, int]:
+    """Cumulative import time (microseconds) per module for ``module`` in a fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env or dict(os.environ),
+        check=True,
+    )
+    times: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        # "import time:   self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def slowest(times: Dict[str, int], n: int = 15) -> List[Tuple[str, int]]:
+    return sorted(times.items(), key=lambda kv: kv[1], reverse=True)[:n]
+
+
+def main() -> None:
+    module = sys.argv[1] if len(sys.argv) > 1 else "euri_codegen.cli"
+    times = import_times(module)
+    print(f"{module}: {times.get(module, 0) / 1000:.1f} ms cumulative")
+    for name, us in slowest(times):
+        print(f"{us / 1000:9.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
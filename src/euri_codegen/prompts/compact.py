@@ -0,0 +1,143 @@
+"""Compact prompt payloads and token estimates.
+
+Specs are serialized as canonical JSON (sorted keys, no whitespace, empty fields
+dropped) so equal specs always render to identical bytes. Code that is only
+context for the model can be minified by dropping comments and docstrings.
+"""
+
+from __future__ import annotations
+
+import ast
+import io
+import json
+import math
+import re
+import tokenize
+from functools import lru_cache
+from typing import Any, Dict, List, Set, Tuple
+
+
+def compact_spec(spec: Dict[str, Any]) -> str:
+    """Canonical, whitespace-free JSON for a spec; empty lists/dicts/strings are omitted."""
+    trimmed = {k: v for k, v in spec.items() if v not in ([], {}, "", None)}
+    return json.dumps(
+        trimmed, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+
+
+def _docstring_lines(tree: ast.AST) -> Tuple[Set[int], Set[int]]:
+    """Lines covered by docstrings, and the subset that are a body's only statement."""
+    lines: Set[int] = set()
+    sole: Set[int] = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        body = node.body
+        first = body[0] if body else None
+        if (
+            isinstance(first, ast.Expr)
+            and isinstance(first.value, ast.Constant)
+            and isinstance(first.value.value, str)
+        ):
+            span = range(first.lineno, (first.end_lineno or first.lineno) + 1)
+            lines.update(span)
+            if len(body) == 1:
+                sole.add(first.lineno)
+    return lines, sole
+
+
+def minify_code(code: str, *, docstrings: bool = True, comments: bool = True) -> str:
+    """Drop comments and/or docstrings and blank lines; ``code`` unchanged if it does not parse.
+
+    A docstring that is a body's only statement becomes ``...`` so the result stays valid.
+    """
+    try:
+        tree = ast.parse(code)
+        tokens = list(tokenize.generate_tokens(io.StringIO(code).readline))
+    except (SyntaxError, tokenize.TokenError):
+        return code
+    lines = code.splitlines()
+    # Continuation lines of multi-line strings are content: never drop them, even if blank.
+    protected = {
+        row
+        for t in tokens
+        if t.type == tokenize.STRING and t.end[0] > t.start[0]
+        for row in range(t.start[0] + 1, t.end[0] + 1)
+    }
+    if comments:
+        # Remove comments right-to-left per line so earlier columns stay valid.
+        found = [t for t in tokens if t.type == tokenize.COMMENT]
+        for tok in sorted(found, key=lambda t: t.start, reverse=True):
+            row, col = tok.start
+            lines[row - 1] = lines[row - 1][:col].rstrip()
+    if docstrings:
+        drop, sole = _docstring_lines(tree)
+        protected -= drop
+        for row in sorted(drop):
+            if row in sole:
+                line = lines[row - 1]
+                lines[row - 1] = line[: len(line) - len(line.lstrip())] + "..."
+            else:
+                lines[row - 1] = ""
+    out = (
+        "\n".join(line for row, line in enumerate(lines, 1) if line.strip() or row in protected)
+        + "\n"
+    )
+    try:
+        ast.parse(out)
+    except SyntaxError:
+        return code
+    return out
+
+
+_PIECE = re.compile(r"[A-Za-z]+|\d+|[ \t]{2,}|\n|[^\sA-Za-z\d]+")
+
+
+@lru_cache(maxsize=1)
+def _tiktoken_encoder() -> Any:
+    try:
+        import tiktoken  # optional: exact counts for OpenAI-family models
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:  # not installed, or the encoding cannot be downloaded
+        return None
+
+
+def _heuristic_tokens(text: str) -> int:
+    total = 0
+    for piece in _PIECE.findall(text):
+        if piece[0].isalpha():
+            total += 1 + (len(piece) - 1) // 8  # common words are one token
+        elif piece[0].isdigit():
+            total += math.ceil(len(piece) / 3)
+        elif piece[0] in " \t\n":
+            total += 1  # newline or indentation run
+        else:
+            total += math.ceil(len(piece) / 2)  # punctuation merges in pairs, e.g. '":' or '],'
+    return total
+
+
+def estimate_tokens(text: str) -> int:
+    """Prompt tokens: exact with ``tiktoken`` installed, otherwise a BPE-like heuristic.
+
+    The heuristic counts single spaces as part of the next word, as GPT-style
+    tokenizers do, so it tracks code and JSON better than a flat chars/4.
+    """
+    encoder = _tiktoken_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text))
+    return _heuristic_tokens(text)
+
+
+def common_prefix_len(prompts: List[str]) -> int:
+    """Characters shared at the start of every prompt (what provider prefix caches can reuse)."""
+    if not prompts:
+        return 0
+    first, n = prompts[0], len(prompts[0])
+    for p in prompts[1:]:
+        n = min(n, len(p))
+        i = 0
+        while i < n and p[i] == first[i]:
+            i += 1
+        n = i
+    return n
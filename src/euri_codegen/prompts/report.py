@@ -0,0 +1,81 @@
+"""Estimated prompt tokens per template, compact vs. the uncompacted rendering."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from ..codegen.spec_tests import has_example_tests
+from . import templates
+from .compact import common_prefix_len, estimate_tokens
+
+
+@dataclass
+class PromptTokens:
+    template: str
+    topic: Optional[str]
+    tokens: int
+    baseline_tokens: int
+    prompt: str
+
+    @property
+    def saved_pct(self) -> float:
+        if not self.baseline_tokens:
+            return 0.0
+        return 100.0 * (self.baseline_tokens - self.tokens) / self.baseline_tokens
+
+
+def _row(template: str, topic: Optional[str], prompt: str, baseline: str) -> PromptTokens:
+    return PromptTokens(template, topic, estimate_tokens(prompt), estimate_tokens(baseline), prompt)
+
+
+def catalog_prompt_tokens(specs: Sequence[Dict[str, Any]]) -> List[PromptTokens]:
+    """Rows for every spec-driven template (generation and model-written tests)."""
+    rows = []
+    for spec in specs:
+        examples = has_example_tests(spec)
+        rows.append(
+            _row(
+                "generation",
+                spec["id"],
+                templates.generation_prompt(spec),
+                templates.generation_prompt(spec, compact=False),
+            )
+        )
+        rows.append(
+            _row(
+                "edge_case_tests",
+                spec["id"],
+                templates.edge_case_tests_prompt(spec, has_examples=examples),
+                templates.edge_case_tests_prompt(spec, has_examples=examples, compact=False),
+            )
+        )
+    return rows
+
+
+def code_prompt_tokens(code: str, spec: Optional[Dict[str, Any]] = None) -> List[PromptTokens]:
+    """Rows for the code-carrying templates as explain/optimize send them.
+
+    The baseline column is the code sent verbatim.
+    """
+    topic = spec["id"] if spec else None
+    return [
+        _row(
+            "optimization",
+            topic,
+            templates.optimization_prompt(code, "all"),
+            templates.optimization_prompt(code, "all"),
+        ),
+        _row(
+            "explanation",
+            topic,
+            templates.explanation_prompt(code),
+            templates.explanation_prompt(code, minify=False),
+        ),
+    ]
+
+
+def shared_prefix_tokens(rows: Sequence[PromptTokens]) -> int:
+    """Tokens at the start of every prompt that a provider prefix cache can reuse."""
+    prompts = [r.prompt for r in rows]
+    return estimate_tokens(prompts[0][: common_prefix_len(prompts)]) if prompts else 0
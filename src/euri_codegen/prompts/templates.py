@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
+from .compact import compact_spec, minify_code
 
 SYSTEM_SAFETY = """
 You are a senior Python engineer and performance-minded code reviewer.
@@ -12,8 +13,17 @@ You are a senior Python engineer and performance-minded code reviewer.
 - Ensure deterministic behavior and avoid randomness.
 """.strip()
 
+# Every template starts with exactly this text, and variable content (specs, code)
+# comes after the task instructions, so provider-side prefix caching can reuse it.
+PROMPT_PREFIX = SYSTEM_SAFETY + "\n\n"
 
-def generation_prompt(spec: Dict[str, Any]) -> str:
+
+def _spec_text(spec: Dict[str, Any], compact: bool) -> str:
+    spec = {k: v for k, v in spec.items() if k != "tags"}  # catalog metadata, not part of the task
+    return compact_spec(spec) if compact else str(spec)
+
+
+def generation_prompt(spec: Dict[str, Any], *, compact: bool = True) -> str:
     return f"""
 {SYSTEM_SAFETY}
 
@@ -25,30 +35,43 @@ Task: Implement the following DSA specification as a complete Python module with
 - minimal inline tests in `if __name__ == '__main__':` guarded block (optional)
 
 Specification (JSON):
-{spec}
+{_spec_text(spec, compact)}
 
 Output ONLY valid Python code for a single .py file, with no markdown.
 """.strip()
 
 
-def tests_prompt(spec: Dict[str, Any], code: str) -> str:
-    header = f"""
+def edge_case_tests_prompt(
+    spec: Dict[str, Any], *, has_examples: bool, compact: bool = True
+) -> str:
+    """Tests from the spec alone, so the call can run alongside code generation."""
+    scope = (
+        "The spec's examples are already tested; add only edge cases and invariants they miss."
+        if has_examples
+        else "Include happy-path tests and at least 2 edge cases."
+    )
+    return f"""
 {SYSTEM_SAFETY}
 
-Task: Write a pytest test module for the implementation below, reflecting the spec.
-- Include happy-path tests and at least 2 edge cases.
+Task: Write pytest tests for a module named `{spec.get("id")}` implementing the spec below.
+- Import what you test from `{spec.get("id")}`; the implementation is not shown.
+- {scope}
 - Use parameterized tests when appropriate.
 - Avoid network or file I/O.
 
 Spec (JSON):
-{spec}
+{_spec_text(spec, compact)}
 
-Implementation code:
+Output ONLY valid Python test code, no markdown.
 """.strip()
-    return header + "\n" + code + "\n\n" + "Output ONLY valid Python test code for a single test_*.py file, no markdown.".strip()
 
 
-def optimization_prompt(code: str, level: str) -> str:
+def optimization_prompt(code: str, level: str, feedback: Optional[str] = None) -> str:
+    retry = (
+        f"\nA previous rewrite was rejected: {feedback}\nAddress this in the new version.\n"
+        if feedback
+        else ""
+    )
     header = f"""
 {SYSTEM_SAFETY}
 
@@ -57,13 +80,20 @@ Refactor and optimize the following Python code. Apply these levels: {level}.
 - Improve readability (naming, structure) and add type hints.
 - Optimize algorithmic complexity if feasible; otherwise micro-optimizations.
 - Avoid premature optimization that harms clarity.
-
+{retry}
 Original code:
 """.strip()
-    return header + "\n" + code + "\n\n" + "Output ONLY the optimized code as a single Python file.".strip()
+    return (
+        header
+        + "\n"
+        + code
+        + "\n\n"
+        + "Output ONLY the optimized code as a single Python file.".strip()
+    )
 
 
-def explanation_prompt(code: str) -> str:
+def explanation_prompt(code: str, *, minify: bool = True) -> str:
+    """``minify`` drops comments and docstrings: the model explains the code, not its notes."""
     header = f"""
 {SYSTEM_SAFETY}
 
@@ -74,4 +104,101 @@ Explain the code below for a mid-level Python developer.
 
 Code:
 """.strip()
-    return header + "\n" + code + "\n\n" + "Return a concise explanation in plain text.".strip()
+    body = minify_code(code) if minify else code
+    return header + "\n" + body + "\n\n" + "Return a concise explanation in plain text.".strip()
+
+
+def chunk_optimization_prompt(
+    context: str, chunk: str, names: List[str], level: str, profile: Optional[str] = None
+) -> str:
+    """``profile`` is measured hotspot data for these definitions (profile-guided mode)."""
+    hot = (
+        "\nProfile of a representative workload; spend the effort where the time goes:\n"
+        f"{profile}\n"
+        if profile
+        else ""
+    )
+    header = f"""
+{SYSTEM_SAFETY}
+
+Refactor and optimize ONLY the definition(s) below ({", ".join(names)}), which are part of a larger
+module. Apply these levels: {level}.
+- Keep the same names, signatures and behavior; other code depends on them.
+- Do not redefine the shared module context shown below.
+- Put any NEW imports you need at the top of your answer.
+
+Shared module context (imports and constants, for reference only):
+{minify_code(context) if context else "(none)"}
+{hot}
+Definition(s) to optimize:
+""".strip()
+    return (
+        header
+        + "\n"
+        + chunk
+        + "\n\n"
+        + "Output ONLY the rewritten definition(s) as Python code, no markdown."
+    )
+
+
+def chunk_explanation_prompt(context: str, chunk: str) -> str:
+    header = f"""
+{SYSTEM_SAFETY}
+
+Explain the following part of a larger Python module for a mid-level Python developer.
+- What each function/class does and the algorithm used
+- Complexity and notable edge cases
+
+Shared module context:
+{minify_code(context) if context else "(none)"}
+
+Code:
+""".strip()
+    return header + "\n" + chunk + "\n\n" + "Return a short plain-text explanation."
+
+
+def combine_explanations_prompt(context: str, parts: List[str]) -> str:
+    joined = "\n\n".join(f"Part {i + 1}:\n{p}" for i, p in enumerate(parts))
+    return f"""
+{SYSTEM_SAFETY}
+
+Below are explanations of the individual parts of one Python module, plus its imports/constants.
+Combine them into a single explanation for a mid-level Python developer:
+- Overview, key functions, algorithm choice
+- Complexity analysis
+- Potential failure modes and tests worth adding
+
+Module context:
+{minify_code(context) if context else "(none)"}
+
+{joined}
+
+Return a concise explanation in plain text.
+""".strip()
+
+
+def repair_prompt(error: str, span: str, start: int, end: int, signature: str) -> str:
+    """Targeted fix for one failing span; the rest of the module is not resent."""
+    if span:
+        where = f"Lines {start}-{end} of the module:\n{span}"
+        ask = (
+            "Output ONLY the corrected replacement for these lines, with the same indentation, "
+            "no markdown."
+        )
+    else:
+        where = "The module does not define it."
+        ask = (
+            "Output ONLY Python code to append to the end of the module that fixes this, "
+            "no markdown."
+        )
+    return f"""
+{SYSTEM_SAFETY}
+
+A generated Python module failed a check. Fix only the part shown.
+Required signature: {signature or "(none)"}
+Error: {error}
+
+{where}
+
+{ask}
+""".strip()
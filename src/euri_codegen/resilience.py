@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+_TRANSIENT_ERRORS = {
+    "ConnectionError",
+    "ConnectTimeout",
+    "ReadTimeout",
+    "Timeout",
+    "ChunkedEncodingError",
+    "RemoteDisconnected",
+}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the API while the circuit breaker is open."""
+
+
+def status_code(exc: BaseException) -> Optional[int]:
+    """HTTP status of an SDK/requests error, if it carries one."""
+    for obj in (exc, getattr(exc, "response", None)):
+        code = getattr(obj, "status_code", None)
+        if isinstance(code, int):
+            return code
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    code = status_code(exc)
+    if code is not None:
+        return code in (408, 409, 425, 429) or code >= 500
+    return (
+        isinstance(exc, (ConnectionError, TimeoutError)) or type(exc).__name__ in _TRANSIENT_ERRORS
+    )
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``per_minute`` tokens per minute."""
+
+    def __init__(
+        self,
+        per_minute: float,
+        *,
+        burst: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst or per_minute)
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+        self._sleep = sleep
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Block until ``amount`` tokens are available; return seconds waited."""
+        amount = min(amount, self.capacity)  # oversized requests would otherwise wait forever
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self.rate
+            delay = min(delay, 1.0)
+            self._sleep(delay)
+            waited += delay
+
+
+class CircuitBreaker:
+    """Opens after ``threshold`` consecutive failures; half-opens after ``reset_seconds``.
+
+    While half-open a single probe call is let through; everyone else is refused
+    until that probe succeeds (closing the circuit) or fails (re-opening it).
+    """
+
+    def __init__(self, threshold: int = 5, reset_seconds: float = 30.0):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now: float) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if now - self.opened_at >= self.reset_seconds else "open"
+
+    def before_call(self) -> bool:
+        """Raise while open or while a half-open probe is in flight; True if this is the probe."""
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == "closed":
+                return False
+            if state == "half-open" and not self._probing:
+                self._probing = True
+                return True
+            raise CircuitOpenError(
+                f"Euri API circuit open after {self.failures} consecutive failures; "
+                f"retrying in up to {self.reset_seconds:.0f}s"
+            )
+
+    def end_probe(self) -> None:
+        """Let another probe through if this one ended without recording a success or failure."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.failures >= self.threshold:
+                # Re-arm on every failure (including a failed half-open probe).
+                self.opened_at = time.monotonic()
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on in-flight requests: +1 per window of successes, halve on throttling."""
+
+    def __init__(self, initial: int = 4, *, minimum: int = 1, maximum: int = 32):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, outcome: str) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            if outcome == "throttled":
+                self.limit = max(float(self.minimum), self.limit / 2.0)
+            elif outcome == "ok":
+                self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+class Resilience:
+    """Shared policy for API calls: rate limits, AIMD concurrency, retries and a circuit breaker.
+
+    One instance is meant to be shared by every ``Euri`` talking to the same account.
+    """
+
+    def __init__(
+        self,
+        *,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        breaker_threshold: int = 5,
+        breaker_reset_seconds: float = 30.0,
+        initial_concurrency: int = 4,
+        max_concurrency: int = 32,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.requests = (
+            TokenBucket(requests_per_minute, sleep=sleep) if requests_per_minute else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute, sleep=sleep) if tokens_per_minute else None
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset_seconds)
+        self.concurrency = AdaptiveConcurrency(initial_concurrency, maximum=max_concurrency)
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {"calls": 0, "retries": 0, "throttled": 0, "failures": 0}
+
+    def _bump(self, key: str) -> None:
+        with self._lock:
+            self.counters[key] += 1
+
+    def _admit(self, tokens: int) -> bool:
+        """Wait for rate and concurrency slots; True if this is the breaker's half-open probe."""
+        probe = self.breaker.before_call()
+        try:
+            if self.requests:
+                self.requests.acquire(1)
+            if self.tokens and tokens:
+                self.tokens.acquire(tokens)
+            self.concurrency.acquire()
+        except BaseException:
+            if probe:
+                self.breaker.end_probe()
+            raise
+        return probe
+
+    def _on_error(self, exc: Exception, attempt: int) -> Optional[float]:
+        """Classify a failure; return the backoff delay, or None to give up."""
+        throttled = status_code(exc) == 429
+        if throttled:
+            self._bump("throttled")
+        retryable = is_retryable(exc)
+        if retryable:
+            self.breaker.record_failure()
+        if not retryable or attempt >= self.max_attempts:
+            self._bump("failures")
+            return None
+        self._bump("retries")
+        # Full jitter, but never sooner than the server's Retry-After.
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        return max(delay, _retry_after(exc) or 0.0)
+
+    def call(self, fn: Callable[[], T], *, tokens: int = 0) -> T:
+        self._bump("calls")
+        attempt = 0
+        while True:
+            attempt += 1
+            probe = self._admit(tokens)
+            outcome = "error"
+            try:
+                result = fn()
+                outcome = "ok"
+            except Exception as exc:
+                if status_code(exc) == 429:
+                    outcome = "throttled"
+                delay = self._on_error(exc, attempt)
+                if delay is None:
+                    raise
+            else:
+                self.breaker.record_success()
+                return result
+            finally:
+                self.concurrency.release(outcome)
+                if probe:
+                    self.breaker.end_probe()
+            self._sleep(delay)
+
+    def stream(self, fn: Callable[[], Iterator[str]], *, tokens: int = 0) -> Iterator[str]:
+        """Like :meth:`call` for streams; only failures before the first chunk are retried."""
+        self._bump("calls")
+        attempt = 0
+        while True:
+            attempt += 1
+            probe = self._admit(tokens)
+            outcome = "error"
+            started = False
+            try:
+                for chunk in fn():
+                    started = True
+                    yield chunk
+                outcome = "ok"
+            except Exception as exc:
+                if status_code(exc) == 429:
+                    outcome = "throttled"
+                delay = None if started else self._on_error(exc, attempt)
+                if delay is None:
+                    raise
+            else:
+                self.breaker.record_success()
+                return
+            finally:
+                self.concurrency.release(outcome)
+                if probe:
+                    self.breaker.end_probe()
+            self._sleep(delay)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "breaker": self.breaker.state,
+        }
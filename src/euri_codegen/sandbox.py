@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+try:  # POSIX only; on other platforms only the wall-clock timeout applies.
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None  # type: ignore[assignment]
+
+
+@dataclass
+class SandboxLimits:
+    wall_seconds: float = 60.0
+    cpu_seconds: int = 30
+    memory_mb: int = 1024
+
+
+class SandboxError(RuntimeError):
+    """A :func:`run_limited` call that raised, timed out, hit a limit or crashed."""
+
+
+@dataclass
+class TestRun:
+    topic: str
+    status: str  # passed | failed | timeout | error
+    seconds: float
+    passed: int = 0
+    failed: int = 0
+    output: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "passed"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def apply_limits(limits: SandboxLimits) -> None:
+    """Apply the CPU and memory ``limits`` to this process; a no-op without rlimit support."""
+    if resource is None:
+        return
+    cpu = int(limits.cpu_seconds)
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    mem = int(limits.memory_mb) * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (mem, mem))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))  # no core dumps from crashing generated code
+
+
+# Run by the child itself: applies the limits with apply_limits, then execs the real command
+# (limits survive exec). Unlike preexec_fn this is safe when the parent has threads, as
+# verify_dir's pool does. The child's PYTHONPATH is the scratch directory, so the package's
+# own location is passed in.
+_LIMITED_EXEC = (
+    "import os, sys\n"
+    "sys.path.insert(0, sys.argv[1])\n"
+    "from euri_codegen.sandbox import SandboxLimits, apply_limits\n"
+    "apply_limits(SandboxLimits(cpu_seconds=int(sys.argv[2]), memory_mb=int(sys.argv[3])))\n"
+    "os.execv(sys.executable, [sys.executable] + sys.argv[4:])\n"
+)
+_PACKAGE_PARENT = str(Path(__file__).resolve().parent.parent)
+
+
+def _limited(cmd: List[str], limits: SandboxLimits) -> List[str]:
+    """``cmd`` (a ``python`` command line) run under ``limits`` where rlimits are supported."""
+    if os.name != "posix" or resource is None:
+        return cmd
+    return [
+        sys.executable,
+        "-c",
+        _LIMITED_EXEC,
+        _PACKAGE_PARENT,
+        str(int(limits.cpu_seconds)),
+        str(int(limits.memory_mb)),
+        *cmd[1:],
+    ]
+
+
+def _run_limited_child(
+    conn: Any, limits: SandboxLimits, fn: Callable[..., Any], args: tuple
+) -> None:
+    try:
+        apply_limits(limits)
+        result = ("ok", fn(*args))
+    except BaseException as e:  # including SystemExit from generated code
+        result = ("error", f"{type(e).__name__}: {e}")
+    try:
+        conn.send(result)
+    except Exception as e:
+        conn.send(("error", f"the result could not be sent back: {e}"))
+    conn.close()
+
+
+def run_limited(fn: Callable[..., Any], *args: Any, limits: Optional[SandboxLimits] = None) -> Any:
+    """``fn(*args)`` in a child process under ``limits``, for code that must not take us down.
+
+    ``fn``, its arguments and its result must be picklable. The child is killed
+    after ``limits.wall_seconds``. Raises :class:`SandboxError` if ``fn`` raised,
+    or if the child timed out, hit an rlimit or died.
+    """
+    limits = limits or SandboxLimits()
+    context = multiprocessing.get_context()
+    receiver, sender = context.Pipe(duplex=False)
+    proc = context.Process(target=_run_limited_child, args=(sender, limits, fn, args), daemon=True)
+    proc.start()
+    sender.close()
+    try:
+        if not receiver.poll(limits.wall_seconds):
+            raise SandboxError(f"timed out after {limits.wall_seconds:g}s")
+        try:
+            status, value = receiver.recv()
+        except EOFError:
+            proc.join()
+            if proc.exitcode is not None and -proc.exitcode == getattr(signal, "SIGXCPU", None):
+                raise SandboxError(f"exceeded the {limits.cpu_seconds}s CPU limit") from None
+            raise SandboxError(f"the worker died (exit code {proc.exitcode})") from None
+    finally:
+        if proc.is_alive():
+            proc.kill()
+        proc.join()
+        receiver.close()
+    if status != "ok":
+        raise SandboxError(value)
+    return value
+
+
+def _count(pattern: str, text: str) -> int:
+    m = re.search(r"(\d+) " + pattern, text)
+    return int(m.group(1)) if m else 0
+
+
+def run_pytest_isolated(
+    topic: str,
+    files: Dict[str, str],
+    test_file: str,
+    limits: Optional[SandboxLimits] = None,
+) -> TestRun:
+    """Run ``test_file`` with pytest in a fresh subprocess and scratch directory.
+
+    ``files`` maps file names to contents (module + tests). The child gets CPU and
+    address-space rlimits where supported and is killed with its whole process
+    group when it exceeds the wall-clock timeout.
+    """
+    limits = limits or SandboxLimits()
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="euri_sandbox_") as tmp:
+        work = Path(tmp)
+        for name, content in files.items():
+            (work / name).write_text(content, encoding="utf-8")
+        env = {
+            "PATH": os.environ.get("PATH", ""),
+            "PYTHONPATH": str(work),
+            "PYTHONDONTWRITEBYTECODE": "1",
+            "PYTHONHASHSEED": "0",
+        }
+        cmd = [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", test_file]
+        posix = os.name == "posix"
+        proc = subprocess.Popen(
+            _limited(cmd, limits),
+            cwd=work,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            start_new_session=posix,
+        )
+        try:
+            output, _ = proc.communicate(timeout=limits.wall_seconds)
+        except subprocess.TimeoutExpired:
+            if posix:
+                os.killpg(proc.pid, signal.SIGKILL)
+            else:  # pragma: no cover
+                proc.kill()
+            output, _ = proc.communicate()
+            return TestRun(
+                topic, "timeout", time.perf_counter() - start, output=(output or "")[-2000:]
+            )
+    seconds = time.perf_counter() - start
+    passed, failed = _count("passed", output), _count("failed", output) + _count("error", output)
+    if proc.returncode == 0:
+        status = "passed"
+    elif proc.returncode == 1 and (passed or failed):
+        status = "failed"
+    elif proc.returncode < 0 and -proc.returncode in (signal.SIGXCPU, signal.SIGKILL):
+        status = "timeout"
+    else:
+        status = "error"
+    return TestRun(topic, status, seconds, passed, failed, output[-2000:])
+
+
+def discover_pairs(out_dir: Path, topics: Optional[List[str]] = None) -> Dict[str, Path]:
+    """Map topic -> test file for every ``test_<topic>.py`` with a matching module."""
+    pairs = {}
+    for test_path in sorted(Path(out_dir).glob("test_*.py")):
+        topic = test_path.stem[len("test_") :]
+        if (test_path.parent / f"{topic}.py").exists() and (not topics or topic in topics):
+            pairs[topic] = test_path
+    return pairs
+
+
+def verify_dir(
+    out_dir: Path,
+    *,
+    topics: Optional[List[str]] = None,
+    limits: Optional[SandboxLimits] = None,
+    workers: Optional[int] = None,
+    on_result: Optional[Callable[[TestRun], None]] = None,
+) -> List[TestRun]:
+    """Run every generated module/test pair in its own sandboxed subprocess, in parallel.
+
+    Results are returned sorted by topic.
+    """
+    pairs = discover_pairs(out_dir, topics)
+
+    def job(topic: str, test_path: Path) -> TestRun:
+        module_path = test_path.parent / f"{topic}.py"
+        files = {
+            module_path.name: module_path.read_text(encoding="utf-8"),
+            test_path.name: test_path.read_text(encoding="utf-8"),
+        }
+        return run_pytest_isolated(topic, files, test_path.name, limits)
+
+    results = []
+    # Threads only dispatch and wait; the work happens in one subprocess per topic.
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        futures = [pool.submit(job, topic, path) for topic, path in pairs.items()]
+        for fut in as_completed(futures):
+            run = fut.result()
+            results.append(run)
+            if on_result:
+                on_result(run)
+    return sorted(results, key=lambda r: r.topic)
@@ -0,0 +1,272 @@
+"""Optimize and explain results keyed on the code's normalized AST.
+
+Files that differ only in formatting, comments or docstrings parse to the same
+tree once docstrings are dropped, so they share an entry. Keys also include the
+kind of result, the model and the request's own parameters (level, module
+context). A hit returns the result produced for the earlier input, so it carries
+that input's comments and docstrings. Eviction works as in the completion cache.
+Hit and miss counts per kind are kept in the database, so rates cover every process.
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import sqlite3
+import textwrap
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .euri_client import CompletionStream, Euri
+
+DEFAULT_SEMANTIC_CACHE_PATH = Path.home() / ".cache" / "euri_codegen" / "semantic.sqlite3"
+
+# optimize / explain: whole files; optimize-def: one top-level definition; explain-chunk: one chunk.
+KINDS = ("optimize", "optimize-def", "explain", "explain-chunk")
+
+_DOC_OWNERS = (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+def normalize(code: str) -> Optional[str]:
+    """``ast.dump`` of ``code`` without docstrings; None if it does not parse."""
+    try:
+        tree = ast.parse(textwrap.dedent(code))
+    except SyntaxError:
+        return None
+    for node in ast.walk(tree):
+        if not isinstance(node, _DOC_OWNERS) or not node.body:
+            continue
+        first = node.body[0]
+        if isinstance(first, ast.Expr) and isinstance(getattr(first.value, "value", None), str):
+            node.body = node.body[1:] or [ast.Pass()]
+    return ast.dump(tree)
+
+
+class SemanticCache:
+    """SQLite store of results by normalized AST; LRU eviction by entry count, bytes and age."""
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_SEMANTIC_CACHE_PATH,
+        *,
+        max_entries: int = 5_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_age_seconds: float = 30 * 24 * 3600,
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY, kind TEXT NOT NULL, model TEXT NOT NULL, value TEXT NOT NULL,"
+            " size INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_accessed ON results(accessed)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS lookups (kind TEXT PRIMARY KEY,"
+            " hits INTEGER NOT NULL DEFAULT 0, misses INTEGER NOT NULL DEFAULT 0)"
+        )
+
+    @staticmethod
+    def key(kind: str, code: str, *, model: str, context: str = "", **params: Any) -> Optional[str]:
+        """Key for ``code``'s normalized AST and the request parameters; None if it does not parse.
+
+        ``context`` (the module's imports and constants sent with a chunk) is normalized too.
+        """
+        tree = normalize(code)
+        if tree is None:
+            return None
+        payload = json.dumps(
+            {
+                "kind": kind,
+                "ast": tree,
+                "context": normalize(context) or context,
+                "model": model,
+                **params,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, kind: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            hit = row is not None and now - row[1] <= self.max_age_seconds
+            if hit:
+                self._conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+                self.hits += 1
+            else:
+                if row is not None:
+                    self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self.misses += 1
+            self._conn.execute(
+                "INSERT INTO lookups (kind, hits, misses) VALUES (?, ?, ?) ON CONFLICT(kind) DO "
+                "UPDATE"
+                " SET hits = hits + excluded.hits, misses = misses + excluded.misses",
+                (kind, int(hit), int(not hit)),
+            )
+            return row[0] if hit else None
+
+    def put(self, key: str, value: str, *, kind: str, model: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, kind, model, value, size, created, accessed)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, kind, model, value, len(value.encode("utf-8")), now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM results WHERE created < ?", (now - self.max_age_seconds,))
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM results ORDER BY accessed"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM results WHERE key = ?", doomed)
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._conn.execute("DELETE FROM results WHERE key = ?", (key,)).rowcount == 1
+
+    def invalidate(self, *, kind: Optional[str] = None, model: Optional[str] = None) -> int:
+        """Delete every entry, or those of ``kind`` and/or ``model``; returns the number removed."""
+        where = [(col, v) for col, v in (("kind", kind), ("model", model)) if v is not None]
+        sql = "DELETE FROM results" + (
+            " WHERE " + " AND ".join(f"{c} = ?" for c, _ in where) if where else ""
+        )
+        with self._lock:
+            removed = self._conn.execute(sql, [v for _, v in where]).rowcount
+            if not where:
+                self._conn.execute("DELETE FROM lookups")
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stored = {
+                kind: (count, size)
+                for kind, count, size in self._conn.execute(
+                    "SELECT kind, COUNT(*), COALESCE(SUM(size), 0) FROM results GROUP BY kind"
+                )
+            }
+            lookups = {
+                kind: (h, m)
+                for kind, h, m in self._conn.execute("SELECT kind, hits, misses FROM lookups")
+            }
+        kinds = {}
+        for kind in sorted(set(stored) | set(lookups)):
+            count, size = stored.get(kind, (0, 0))
+            hits, misses = lookups.get(kind, (0, 0))
+            kinds[kind] = {
+                "entries": count,
+                "bytes": size,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            }
+        all_hits = sum(k["hits"] for k in kinds.values())
+        all_lookups = all_hits + sum(k["misses"] for k in kinds.values())
+        return {
+            "path": str(self.path),
+            "entries": sum(k["entries"] for k in kinds.values()),
+            "bytes": sum(k["bytes"] for k in kinds.values()),
+            "hits": all_hits,
+            "misses": all_lookups - all_hits,
+            "hit_rate": all_hits / all_lookups if all_lookups else 0.0,
+            "kinds": kinds,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _key(euri: Euri, kind: str, code: str, **params: Any) -> Optional[str]:
+    if euri.semantic is None:
+        return None
+    return SemanticCache.key(kind, code, model=euri.model, **params)
+
+
+def lookup(euri: Euri, kind: str, code: str, **params: Any) -> Tuple[Optional[str], Optional[str]]:
+    """The key for ``code`` in ``euri``'s semantic cache and any result stored under it.
+
+    The key is None without a semantic cache or when ``code`` does not parse;
+    the result is None on a miss or when ``euri`` refreshes.
+    """
+    key = _key(euri, kind, code, **params)
+    if key is None or euri.refresh:
+        return key, None
+    return key, euri.semantic.get(key, kind)
+
+
+def store(euri: Euri, key: str, kind: str, value: str) -> None:
+    if euri.semantic is not None:
+        euri.semantic.put(key, value, kind=kind, model=euri.model)
+
+
+def settle(euri: Euri, kind: str, code: str, accepted: Optional[str], **params: Any) -> None:
+    """Keep ``accepted`` as the result for ``code``, or drop the stored one if it is None."""
+    key = _key(euri, kind, code, **params)
+    if key is None:
+        return
+    if accepted is not None:
+        store(euri, key, kind, accepted)
+    else:
+        euri.semantic.delete(key)
+
+
+def remember(euri: Euri, kind: str, code: str, compute: Callable[[], str], **params: Any) -> str:
+    """``compute()``'s result for ``code``, reused for any code with the same normalized AST."""
+    key, cached = lookup(euri, kind, code, **params)
+    if cached is not None:
+        return cached
+    text = compute()
+    if key is not None:
+        store(euri, key, kind, text)
+    return text
+
+
+def remember_stream(
+    euri: Euri,
+    kind: str,
+    code: str,
+    start: Callable[[], CompletionStream],
+    *,
+    keep: Callable[[str], str] = lambda text: text,
+    **params: Any,
+) -> CompletionStream:
+    """Streaming :func:`remember`: a hit is replayed as one chunk; ``keep(text)`` once read."""
+    from .euri_client import CompletionStream
+
+    key, cached = lookup(euri, kind, code, **params)
+    if cached is not None:
+        return CompletionStream([cached], cached=True)
+    stream = start()
+    if key is None:
+        return stream
+    return CompletionStream(
+        stream, cached=stream.cached, on_done=lambda text: store(euri, key, kind, keep(text))
+    )
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_TELEMETRY_PATH = Path.home() / ".cache" / "euri_codegen" / "telemetry.jsonl"
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+@dataclass
+class CallRecord:
+    """One LLM call. Token counts come from the API's ``usage`` if present, else ~4 chars/token."""
+
+    stage: str = "other"
+    model: str = ""
+    command: Optional[str] = None
+    topic: Optional[str] = None
+    prompt_chars: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    tokens_estimated: bool = True
+    latency_s: float = 0.0
+    ttft_s: Optional[float] = None
+    cached: bool = False
+    streamed: bool = False
+    hedged: bool = False
+    retries: int = 0
+    status: str = "ok"
+    error: Optional[str] = None
+    ts: float = field(default_factory=time.time)
+
+
+def rotated_paths(path: Path, backups: int) -> List[Path]:
+    """``path.N`` ... ``path.1`` then ``path``: oldest records first."""
+    path = Path(path)
+    return [path.with_name(f"{path.name}.{i}") for i in range(backups, 0, -1)] + [path]
+
+
+class Telemetry:
+    """Append-only JSONL sink for :class:`CallRecord`; safe to share between threads.
+
+    Once the file reaches ``max_bytes`` it is renamed to ``<path>.1`` (shifting
+    older ones up to ``<path>.<backups>``, the oldest being dropped), so the log
+    takes at most about ``(backups + 1) * max_bytes`` on disk.
+    """
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_TELEMETRY_PATH,
+        *,
+        command: Optional[str] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backups: int = 1,
+    ):
+        self.path = Path(path)
+        self.command = command
+        self.max_bytes = max_bytes
+        self.backups = max(1, backups)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _rotate_if_full(self) -> None:
+        try:
+            if self.path.stat().st_size < self.max_bytes:
+                return
+            chain = rotated_paths(self.path, self.backups)
+            for src, dst in zip(chain[1:], chain):
+                if src.exists():
+                    os.replace(src, dst)
+        except FileNotFoundError:
+            pass  # not written yet, or another process rotated it first
+
+    def record(self, rec: CallRecord) -> None:
+        if rec.command is None:
+            rec.command = self.command
+        line = json.dumps(asdict(rec), separators=(",", ":")) + "\n"
+        with self._lock:
+            self._rotate_if_full()
+            # One write per line in append mode keeps records whole across processes too.
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(line)
+
+
+def load_records(
+    path: Path, *, since: Optional[float] = None, backups: int = 1
+) -> List[CallRecord]:
+    """Read records from ``path`` and its rotated files, skipping malformed lines.
+
+    A malformed line is e.g. a write cut short by a crash.
+    """
+    known = {f.name for f in fields(CallRecord)}
+    records = []
+    for file in rotated_paths(path, backups):
+        if not file.exists():
+            continue
+        with file.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                    rec = CallRecord(**{k: v for k, v in data.items() if k in known})
+                except (ValueError, TypeError):
+                    continue
+                if since is None or rec.ts >= since:
+                    records.append(rec)
+    return records
+
+
+def _quantile(sorted_values: Sequence[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+@dataclass
+class StageStats:
+    stage: str
+    model: str
+    calls: int
+    errors: int
+    cached: int
+    retries: int
+    prompt_tokens: int
+    completion_tokens: int
+    p50_s: float
+    p95_s: float
+    p99_s: float
+    busy_s: float
+
+    @property
+    def tokens_per_s(self) -> float:
+        """Completion tokens per second of (uncached) model time."""
+        return self.completion_tokens / self.busy_s if self.busy_s else 0.0
+
+
+def aggregate(records: Iterable[CallRecord]) -> List[StageStats]:
+    """Per (stage, model) latency percentiles and token totals.
+
+    Percentiles and throughput only count calls that reached the model, so cache
+    hits do not drag the numbers down.
+    """
+    groups: Dict[Tuple[str, str], List[CallRecord]] = {}
+    for rec in records:
+        groups.setdefault((rec.stage, rec.model), []).append(rec)
+    out = []
+    for (stage, model), recs in sorted(groups.items()):
+        live = [r for r in recs if not r.cached and r.status == "ok"]
+        latencies = sorted(r.latency_s for r in live)
+        out.append(
+            StageStats(
+                stage=stage,
+                model=model,
+                calls=len(recs),
+                errors=sum(r.status != "ok" for r in recs),
+                cached=sum(r.cached for r in recs),
+                retries=sum(r.retries for r in recs),
+                prompt_tokens=sum(r.prompt_tokens for r in live),
+                completion_tokens=sum(r.completion_tokens for r in live),
+                p50_s=_quantile(latencies, 0.50),
+                p95_s=_quantile(latencies, 0.95),
+                p99_s=_quantile(latencies, 0.99),
+                busy_s=sum(latencies),
+            )
+        )
+    return out
+
+
+def _labels(s: StageStats, **extra: str) -> str:
+    items = {"stage": s.stage, "model": s.model, **extra}
+    return ",".join(f'{k}="{v}"' for k, v in items.items())
+
+
+def prometheus_text(stats: Sequence[StageStats]) -> str:
+    """Render stats in the Prometheus text format (for node_exporter's textfile collector)."""
+    lines = [
+        "# HELP euri_llm_calls_total LLM calls by outcome.",
+        "# TYPE euri_llm_calls_total counter",
+    ]
+    for s in stats:
+        lines.append(
+            f"euri_llm_calls_total{{{_labels(s, outcome='ok')}}} {s.calls - s.errors - s.cached}"
+        )
+        lines.append(f"euri_llm_calls_total{{{_labels(s, outcome='cached')}}} {s.cached}")
+        lines.append(f"euri_llm_calls_total{{{_labels(s, outcome='error')}}} {s.errors}")
+    lines += [
+        "# HELP euri_llm_retries_total Retried attempts.",
+        "# TYPE euri_llm_retries_total counter",
+    ]
+    lines += [f"euri_llm_retries_total{{{_labels(s)}}} {s.retries}" for s in stats]
+    lines += [
+        "# HELP euri_llm_tokens_total Tokens sent and received.",
+        "# TYPE euri_llm_tokens_total counter",
+    ]
+    for s in stats:
+        lines.append(f"euri_llm_tokens_total{{{_labels(s, kind='prompt')}}} {s.prompt_tokens}")
+        lines.append(
+            f"euri_llm_tokens_total{{{_labels(s, kind='completion')}}} {s.completion_tokens}"
+        )
+    lines += [
+        "# HELP euri_llm_latency_seconds Call latency.",
+        "# TYPE euri_llm_latency_seconds summary",
+    ]
+    for s in stats:
+        for q, v in (("0.5", s.p50_s), ("0.95", s.p95_s), ("0.99", s.p99_s)):
+            lines.append(f"euri_llm_latency_seconds{{{_labels(s, quantile=q)}}} {v:.6f}")
+        lines.append(f"euri_llm_latency_seconds_sum{{{_labels(s)}}} {s.busy_s:.6f}")
+        lines.append(
+            f"euri_llm_latency_seconds_count{{{_labels(s)}}} {s.calls - s.errors - s.cached}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: Path, stats: Sequence[StageStats]) -> None:
+    """Write atomically so a scraping collector never sees a half-written file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix=".prom.tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(prometheus_text(stats))
+    os.replace(tmp, path)
@@ -0,0 +1,182 @@
+import io
+import os
+import stat
+import tarfile
+import zipfile
+
+import pytest
+
+from euri_codegen.catalog_loader import load_catalog
+from euri_codegen.codegen.artifacts import (
+    Artifact,
+    ArtifactWriter,
+    Bundle,
+    bundle_bytes,
+    bundle_format,
+    write_artifacts,
+)
+from euri_codegen.codegen.batch import generate_all
+from euri_codegen.codegen.spec_tests import target_name
+from euri_codegen.models import validate_specs
+
+SPECS = validate_specs(load_catalog())[:3]
+
+
+class FakeEuri:
+    def complete(self, prompt, **kwargs):
+        return "\n\n".join(
+            (
+                f"class {target_name(s.model_dump())}:\n    pass"
+                if s.function_signature.startswith("class ")
+                else f"def {target_name(s.model_dump())}(*args):\n    return None"
+            )
+            for s in SPECS
+        )
+
+
+class Unseekable(io.RawIOBase):
+    """A write-only stream like a pipe or HTTP response body."""
+
+    def __init__(self):
+        self.buf = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.buf += b
+        return len(b)
+
+
+def test_write_is_atomic_and_skips_unchanged_files(tmp_path):
+    a, b = Artifact("a.py", "x = 1\n"), Artifact("b.py", "y = 2\n")
+    paths = write_artifacts([a, b], tmp_path)
+    assert [p.read_text(encoding="utf-8") for p in paths] == ["x = 1\n", "y = 2\n"]
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(paths[0].stat().st_mode) == 0o666 & ~umask
+
+    before = paths[0].stat().st_mtime_ns
+    os.utime(paths[0], ns=(before - 10**9, before - 10**9))
+    write_artifacts([a], tmp_path)
+    assert paths[0].stat().st_mtime_ns == before - 10**9  # same bytes: not rewritten
+
+    class Broken(Artifact):
+        @property
+        def data(self):
+            raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        write_artifacts([Artifact("a.py", "x = 3\n"), Broken("b.py", "")], tmp_path)
+    # The batch failed before any rename: old content stays, no temp files are left.
+    assert paths[0].read_text(encoding="utf-8") == "x = 1\n"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.py", "b.py"]
+
+
+def test_writer_flushes_in_batches(tmp_path):
+    writer = ArtifactWriter(tmp_path, batch_size=4, max_delay_s=60)
+    flushed = [writer.add([Artifact(f"m{i}.py", ""), Artifact(f"t{i}.py", "")]) for i in range(5)]
+    assert flushed == [False, True, False, True, False]
+    assert len(list(tmp_path.iterdir())) == 8
+    writer.flush()
+    assert len(list(tmp_path.iterdir())) == 10 and writer.batches == 3
+
+
+@pytest.mark.parametrize("fmt", ["zip", "tar", "tar.gz"])
+def test_bundle_streams_to_unseekable_output(fmt):
+    out = Unseekable()
+    with Bundle(out, fmt) as bundle:
+        bundle.add([Artifact("a.py", "x = 1\n")])
+        bundle.add([Artifact("test_a.py", "def test(): pass\n")])
+    data = io.BytesIO(bytes(out.buf))
+    if fmt == "zip":
+        with zipfile.ZipFile(data) as zf:
+            assert zf.read("a.py") == b"x = 1\n" and zf.namelist() == ["a.py", "test_a.py"]
+    else:
+        with tarfile.open(fileobj=data) as tf:
+            assert tf.extractfile("a.py").read() == b"x = 1\n" and tf.getnames() == [
+                "a.py",
+                "test_a.py",
+            ]
+    assert bundle.files == 2
+
+
+def test_bundle_format():
+    assert [bundle_format(n) for n in ("x.zip", "x.tar", "x.tgz", "X.TAR.GZ")] == [
+        "zip",
+        "tar",
+        "tar.gz",
+        "tar.gz",
+    ]
+    with pytest.raises(ValueError):
+        bundle_format("x.rar")
+
+
+def test_generate_all_bundles_without_writing(tmp_path):
+    out = io.BytesIO()
+    seen = []
+    with Bundle(out, "zip") as bundle:
+        summary = generate_all(
+            FakeEuri(),
+            SPECS,
+            tmp_path / "out",
+            concurrency=2,
+            write=False,
+            bundle=bundle,
+            on_result=seen.append,
+        )
+    assert summary.failed == 0 and len(seen) == 3
+    assert not (tmp_path / "out").exists()
+    names = zipfile.ZipFile(io.BytesIO(out.getvalue())).namelist()
+    assert sorted(names) == sorted(n for s in SPECS for n in (f"{s.id}.py", f"test_{s.id}.py"))
+    assert bundle_bytes(summary.results[0].artifacts)[:2] == b"PK"
+
+
+def test_failed_batch_marks_its_topics_failed_and_the_run_continues(tmp_path, monkeypatch):
+    from euri_codegen.codegen import artifacts
+
+    real = artifacts.write_artifacts
+    calls = []
+
+    def flaky(batch, out_dir):
+        calls.append(batch)
+        if len(calls) == 1:
+            raise OSError("disk full")
+        return real(batch, out_dir)
+
+    monkeypatch.setattr(artifacts, "write_artifacts", flaky)
+    seen = []
+    summary = generate_all(
+        FakeEuri(), SPECS, tmp_path, concurrency=1, batch_size=2, on_result=seen.append
+    )
+    assert [r.ok for r in summary.results] == [False, True, True] and len(seen) == 3
+    assert "disk full" in summary.results[0].error and summary.results[0].module_path is None
+    assert (tmp_path / f"{SPECS[1].id}.py").exists() and not (
+        tmp_path / f"{SPECS[0].id}.py"
+    ).exists()
+
+
+def test_finished_topics_are_flushed_without_waiting_for_the_next_one(tmp_path):
+    import threading
+
+    reported = threading.Event()
+    seen_before_second = []
+
+    class BlockingEuri(FakeEuri):
+        calls = 0
+
+        def complete(self, prompt, **kwargs):
+            BlockingEuri.calls += 1
+            if BlockingEuri.calls == 2:
+                # The second topic only finishes after the first one is reported (or 5 s pass).
+                seen_before_second.append(reported.wait(5))
+            return super().complete(prompt, **kwargs)
+
+    def on_result(result):
+        assert (tmp_path / f"{result.topic}.py").exists()
+        reported.set()
+
+    summary = generate_all(
+        BlockingEuri(), SPECS[:2], tmp_path, concurrency=1, max_delay_s=0.01, on_result=on_result
+    )
+    assert summary.failed == 0 and seen_before_second == [True]
@@ -0,0 +1,71 @@
+import threading
+import time
+
+from euri_codegen.catalog_loader import load_catalog
+from euri_codegen.codegen.batch import generate_all, percentile
+from euri_codegen.codegen.spec_tests import target_name
+from euri_codegen.models import validate_specs
+
+# Defines every catalog target so generated modules pass the compile/definition check.
+TRIVIAL = "\n\n".join(
+    (
+        f"class {target_name(s)}:\n    pass"
+        if s["function_signature"].startswith("class ")
+        else f"def {target_name(s)}(*args):\n    return None"
+    )
+    for s in load_catalog()
+)
+
+
+class SlowFakeEuri:
+    """Stands in for Euri: returns trivial code after an artificial delay."""
+
+    def __init__(self, delay: float = 0.05, fail_on: str | None = None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def complete(self, prompt: str, **kwargs) -> str:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.fail_on and self.fail_on in prompt:
+            raise RuntimeError("boom")
+        return f"```python\n{TRIVIAL}\n```"
+
+
+def test_generate_all_concurrent_is_faster_and_ordered(tmp_path):
+    specs = validate_specs(load_catalog())
+    fake = SlowFakeEuri(delay=0.05)
+    summary = generate_all(fake, specs, tmp_path, concurrency=len(specs))
+    assert [r.topic for r in summary.results] == [s.id for s in specs]
+    # Specs with examples get their tests without a model call.
+    needs_llm_tests = sum(
+        1 for s in specs if not s.examples or s.function_signature.startswith("class ")
+    )
+    assert summary.failed == 0 and fake.calls == len(specs) + needs_llm_tests
+    # Serial would take 2 * delay * len(specs); parallel should be far below that.
+    assert summary.wall_seconds < 2 * 0.05 * len(specs) / 2
+    assert (tmp_path / "binary_search.py").read_text(encoding="utf-8") == TRIVIAL
+
+
+def test_generate_all_reports_failures_per_topic(tmp_path):
+    specs = validate_specs(load_catalog())
+    seen = []
+    summary = generate_all(
+        SlowFakeEuri(delay=0, fail_on="two_sum"),
+        specs,
+        tmp_path,
+        concurrency=4,
+        on_result=seen.append,
+    )
+    assert len(seen) == len(specs)
+    failed = [r.topic for r in summary.results if not r.ok]
+    assert failed == ["two_sum"]
+
+
+def test_percentile():
+    assert percentile([], 50) == 0.0
+    assert percentile([3.0, 1.0, 2.0], 50) == 2.0
+    assert percentile([float(i) for i in range(1, 101)], 95) == 95.0
@@ -0,0 +1,39 @@
+from euri_codegen.catalog_loader import load_catalog
+from euri_codegen.models import validate_specs
+from euri_codegen.perf.benchmark import BenchResult, BenchmarkHistory, benchmark_spec
+from euri_codegen.perf.inputs import parse_type, scaled_inputs
+
+
+def _spec(topic):
+    return next(s for s in validate_specs(load_catalog()) if s.id == topic)
+
+
+def test_parse_type():
+    assert parse_type("dict[int,list[int]]") == ("dict", [("int", []), ("list", [("int", [])])])
+    assert parse_type("tuple[int, int] | None") == ("tuple", [("int", []), ("int", [])])
+
+
+def test_scaled_inputs_follow_spec():
+    kwargs = scaled_inputs(_spec("binary_search"), 500)
+    assert len(kwargs["nums"]) == 500 and kwargs["nums"] == sorted(kwargs["nums"])
+    dj = scaled_inputs(_spec("dijkstra"), 50)
+    assert dj["n"] == 50 and dj["src"] == 0
+    assert all(0 <= u < 50 and 0 <= v < 50 for u, v, _ in dj["edges"])
+
+
+def test_benchmark_spec_runs_generated_module(tmp_path):
+    module = tmp_path / "merge_sort.py"
+    module.write_text("def merge_sort(nums):\n    return sorted(nums)\n", encoding="utf-8")
+    results = benchmark_spec(_spec("merge_sort"), module, sizes=[10, 100], warmup=0, repeats=2)
+    assert [r.size for r in results] == [10, 100]
+    assert all(r.min_s <= r.median_s for r in results)
+
+
+def test_history_flags_regressions(tmp_path):
+    path = tmp_path / "h.sqlite3"
+    first = BenchmarkHistory(path)
+    first.record([BenchResult("t", 10, 1, 1.0, 1.0, 1.0)], model="a", code_hash="x")
+    second = BenchmarkHistory(path)
+    slow = BenchResult("t", 10, 1, 2.0, 2.0, 2.0)
+    assert second.regressions([slow], threshold=0.5) == [(slow, 1.0)]
+    assert second.regressions([BenchResult("t", 10, 1, 1.1, 1.1, 1.1)], threshold=0.5) == []
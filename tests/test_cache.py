@@ -0,0 +1,54 @@
+import time
+
+from euri_codegen.cache import CompletionCache
+from euri_codegen.config import Settings
+from euri_codegen.euri_client import Euri
+
+
+class CountingClient:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_completion(self, **params):
+        self.calls += 1
+        return {"choices": [{"message": {"content": f"reply {self.calls}"}}]}
+
+
+def _euri(cache, refresh=False):
+    euri = Euri(Settings(api_key="test", model="m"), cache=cache, refresh=refresh)
+    euri._client = CountingClient()
+    return euri
+
+
+def test_euri_serves_repeat_prompts_from_cache(tmp_path):
+    cache = CompletionCache(tmp_path / "c.sqlite3")
+    euri = _euri(cache)
+    assert euri.complete("hi") == "reply 1"
+    assert euri.complete("hi") == "reply 1"
+    assert euri.complete("hi", temperature=0.9) == "reply 2"
+    assert euri._client.calls == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_cache_persists_and_refresh_bypasses_reads(tmp_path):
+    path = tmp_path / "c.sqlite3"
+    _euri(CompletionCache(path)).complete("hi")
+    euri = _euri(CompletionCache(path))
+    assert euri.complete("hi") == "reply 1" and euri._client.calls == 0
+    fresh = _euri(CompletionCache(path), refresh=True)
+    assert fresh.complete("hi") == "reply 1" and fresh._client.calls == 1
+
+
+def test_lru_and_age_eviction(tmp_path):
+    cache = CompletionCache(tmp_path / "c.sqlite3", max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    time.sleep(0.01)
+    assert cache.get("a") == "1"  # touch a so b becomes LRU
+    cache.put("c", "3")
+    assert cache.get("b") is None and cache.get("a") == "1" and cache.get("c") == "3"
+
+    aged = CompletionCache(tmp_path / "aged.sqlite3", max_age_seconds=0)
+    aged.put("k", "v")
+    time.sleep(0.01)
+    assert aged.get("k") is None
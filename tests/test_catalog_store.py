@@ -0,0 +1,70 @@
+import json
+import os
+
+import pytest
+from pydantic import ValidationError
+
+from euri_codegen.catalog_store import CatalogStore, builtin_catalog_path, open_catalog
+from euri_codegen.perf.catalog_bench import bench_catalog, synthetic_spec
+
+
+def _write(path, specs, jsonl=False):
+    if jsonl:
+        path.write_text("".join(json.dumps(s) + "\n" for s in specs), encoding="utf-8")
+    else:
+        path.write_text(json.dumps(specs), encoding="utf-8")
+    return path
+
+
+def test_multiple_files_override_by_id_and_filter_by_tag(tmp_path):
+    base = _write(tmp_path / "a.json", [synthetic_spec(i) for i in range(4)])
+    extra = dict(synthetic_spec(1), title="Overridden", tags=["custom"])
+    overlay = _write(tmp_path / "b.jsonl", [extra, synthetic_spec(9)], jsonl=True)
+    store = CatalogStore([base, overlay], cache_dir=tmp_path / "cache")
+    assert store.ids() == [
+        "topic_000000",
+        "topic_000002",
+        "topic_000003",
+        "topic_000001",
+        "topic_000009",
+    ]
+    assert store.get("topic_000001")["title"] == "Overridden"
+    assert store.ids("custom") == ["topic_000001"]
+    assert "topic_000001" not in store.ids(synthetic_spec(1)["tags"][0])
+    assert store.tags()["custom"] == 1 and len(store) == 5 and "topic_000009" in store
+
+
+def test_cache_is_reused_until_content_changes(tmp_path):
+    source = _write(tmp_path / "c.json", [synthetic_spec(i) for i in range(3)])
+    cache = tmp_path / "cache"
+    assert CatalogStore([source], cache_dir=cache).rebuilds == 1
+    assert CatalogStore([source], cache_dir=cache).rebuilds == 0
+    st = source.stat()
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+    store = CatalogStore([source], cache_dir=cache)
+    assert store.rebuilds == 0  # touched, same bytes
+    _write(source, [synthetic_spec(i) for i in range(5)])
+    assert store.refresh() and store.rebuilds == 1 and len(store) == 5
+
+
+def test_validation_is_lazy_per_spec(tmp_path):
+    bad = dict(synthetic_spec(1), function_signature="topic_000001()")
+    store = CatalogStore([_write(tmp_path / "d.json", [synthetic_spec(0), bad])], cache_dir=None)
+    assert store.ids() == ["topic_000000", "topic_000001"]
+    assert store.spec("topic_000000") is store.spec("topic_000000")
+    with pytest.raises(ValidationError):
+        store.spec("topic_000001")
+    with pytest.raises(KeyError):
+        store.spec("missing")
+
+
+def test_default_catalog_includes_builtin_specs():
+    store = open_catalog()
+    assert store.paths[0] == builtin_catalog_path().resolve()
+    assert store.spec("binary_search").tags == ["search", "arrays"]
+    assert "two_sum" in store.ids("hashing")
+
+
+def test_bench_catalog_smoke():
+    r = bench_catalog(200)
+    assert r.specs == 200 and r.warm_open_s < r.cold_build_s
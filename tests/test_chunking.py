@@ -0,0 +1,91 @@
+import threading
+import time
+
+
+from euri_codegen.codegen.chunking import split_module
+from euri_codegen.codegen.generator import explain_code_chunked
+from euri_codegen.codegen.optimizer import optimize_code_chunked
+
+MODULE = '''"""Utilities."""
+import math
+
+SCALE = 2
+
+
+def area(r):
+    return math.pi * r * r * SCALE
+
+
+# comment kept verbatim
+def total(xs):
+    s = 0
+    for x in xs:
+        s += x
+    return s
+
+
+class Box:
+    def volume(self):
+        return 1
+
+
+if __name__ == "__main__":
+    print(total([1, 2]))
+'''
+
+
+class ChunkEuri:
+    """Fake Euri that 'optimizes' by tagging each function and records concurrency."""
+
+    semantic = None
+
+    def __init__(self, delay=0.05, rename=False):
+        self.delay = delay
+        self.rename = rename
+        self.active = self.peak = 0
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def complete(self, prompt, **kwargs):
+        with self._lock:
+            self.prompts.append(prompt)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        if "Combine them" in prompt:
+            return "combined"
+        if "Explain the following part" in prompt:
+            return "part"
+        body = prompt.split("Definition(s) to optimize:\n", 1)[1].rsplit("\n\nOutput ONLY", 1)[0]
+        if self.rename:
+            body = body.replace("def total", "def summed")
+        return "```python\nimport functools\n" + body.replace("return 1", "return 2") + "\n```"
+
+
+def test_split_and_reassemble_roundtrip():
+    layout = split_module(MODULE, target_chars=10)
+    assert [c.names for c in layout.chunks] == [["area"], ["total"], ["Box"]]
+    assert "import math" in layout.context and "SCALE = 2" in layout.context
+    assert layout.reassemble({}) == MODULE
+
+
+def test_optimize_chunked_runs_in_parallel_and_keeps_api():
+    euri = ChunkEuri()
+    out = optimize_code_chunked(euri, MODULE, target_chars=10, concurrency=3)
+    assert euri.peak == 3 and len(euri.prompts) == 3
+    assert "return 2" in out and "# comment kept verbatim" in out
+    assert out.count("import functools") == 1 and 'if __name__ == "__main__":' in out
+    compile(out, "<chunked>", "exec")
+
+
+def test_optimize_chunked_drops_renamed_chunks():
+    out = optimize_code_chunked(ChunkEuri(delay=0, rename=True), MODULE, target_chars=10)
+    assert "def total(xs)" in out and "summed" not in out
+
+
+def test_explain_chunked_map_reduce():
+    euri = ChunkEuri(delay=0)
+    assert explain_code_chunked(euri, MODULE, target_chars=10) == "combined"
+    assert len(euri.prompts) == 4
@@ -5,3 +5,36 @@ def test_cli_module_entrypoint():
     # Ensure the package exposes __main__ and cli
     m = importlib.import_module("euri_codegen.__main__")
     assert hasattr(m, "main")
+
+
+def test_via_daemon_rejects_global_flags_it_cannot_honour():
+    from typer.testing import CliRunner
+
+    from euri_codegen.cli import app
+
+    for flag in (
+        ["--no-cache"],
+        ["--refresh"],
+        ["--no-telemetry"],
+        ["--hedge", "m2"],
+        ["--catalog", "x.json"],
+    ):
+        result = CliRunner().invoke(app, ["--via-daemon", *flag, "explain", "--path", __file__])
+        assert (
+            result.exit_code == 2 and "cannot be combined with --via-daemon" in result.output
+        ), flag
+
+
+def test_generate_all_dry_run_needs_no_api_key(tmp_path, monkeypatch):
+    from typer.testing import CliRunner
+
+    from euri_codegen.cli import app
+
+    monkeypatch.delenv("EURI_API_KEY", raising=False)
+    # load_dotenv() finds a .env by walking up from config.py, not from the working directory.
+    monkeypatch.setattr("euri_codegen.config.load_dotenv", lambda *args, **kwargs: False)
+    result = CliRunner().invoke(
+        app, ["generate-all", "--out-dir", str(tmp_path / "out"), "--dry-run"]
+    )
+    assert result.exit_code == 0, result.output
+    assert "to rebuild, 0 up to date" in result.output
@@ -0,0 +1,170 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from euri_codegen.client_pool import DEFAULT_TIMEOUT, ClientPool, shared_pool
+from euri_codegen.config import Settings
+from euri_codegen.euri_client import Euri
+from euri_codegen.resilience import Resilience
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {
+            "choices": [
+                {"message": {"content": f"{self.payload['model']}@{self.payload['temperature']}"}}
+            ]
+        }
+
+
+class FakeSession:
+    def __init__(self):
+        self.payloads = []
+        self.timeouts = []
+        self.closed = False
+
+    def post(self, url, *, headers, json, stream, timeout):
+        self.payloads.append(json)
+        self.timeouts.append(timeout)
+        return FakeResponse(json)
+
+    def close(self):
+        self.closed = True
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _pool(**kwargs):
+    sessions = []
+
+    def factory(max_connections):
+        sessions.append(FakeSession())
+        return sessions[-1]
+
+    return ClientPool("key", session_factory=factory, **kwargs), sessions
+
+
+def test_clients_are_shared_per_key_and_never_mutated():
+    pool, sessions = _pool()
+    a = pool.client("m", 0.2, 100)
+    assert pool.client("m", 0.2, 100) is a
+    assert pool.client("m", 0.7, 100) is not a
+    assert a.generate_completion("hi", temperature=0.9) == {
+        "choices": [{"message": {"content": "m@0.9"}}]
+    }
+    assert (a.model, a.temperature, a.max_tokens) == ("m", 0.2, 100)
+    assert a.generate_completion("hi")["choices"][0]["message"]["content"] == "m@0.2"
+    assert len(sessions) == 1 and len(sessions[0].payloads) == 2
+
+
+def test_concurrent_lookups_create_one_client_per_key():
+    pool, _ = _pool()
+    seen = []
+    barrier = threading.Barrier(8)
+
+    def grab():
+        barrier.wait()
+        seen.append(pool.client("m", 0.2, 100))
+
+    threads = [threading.Thread(target=grab) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(c) for c in seen}) == 1
+    assert pool.stats()["created"] == 1 and pool.stats()["reused"] == 7
+
+
+def test_pool_is_bounded_and_evicts_idle_clients_and_connections():
+    clock = Clock()
+    pool, sessions = _pool(max_clients=2, idle_seconds=10, clock=clock)
+    first = pool.client("a", 0.2, 100)
+    pool.client("b", 0.2, 100)
+    pool.client("c", 0.2, 100)
+    assert pool.stats()["clients"] == 2 and pool.client("a", 0.2, 100) is not first
+    first.generate_completion("x")
+    clock.now = 11
+    pool.client("d", 0.2, 100)
+    assert pool.stats()["clients"] == 1
+    clock.now = 30
+    pool.client("e", 0.2, 100)  # everything idle: the old session is closed
+    assert sessions[0].closed
+    pool.client("e", 0.2, 100).generate_completion("y")
+    assert len(sessions) == 2
+
+
+def test_euri_takes_other_models_from_its_pool():
+    pool, sessions = _pool()
+    euri = Euri(Settings(api_key="key", model="primary"), pool=pool, resilience=Resilience())
+    assert euri.complete("p") == "primary@0.2"
+    assert euri.complete("p", model="backup", temperature=0.5) == "backup@0.5"
+    assert euri._client_for("backup") is pool.client("backup", 0.2, 3000)
+    assert [p["model"] for p in sessions[0].payloads] == ["primary", "backup"]
+
+
+@pytest.fixture()
+def local_api():
+    ports = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            ports.add(self.client_address[1])
+            self.rfile.read(int(self.headers["Content-Length"]))
+            body = b'{"choices": [{"message": {"content": "ok"}}]}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/", ports
+    server.shutdown()
+    server.server_close()
+
+
+def test_requests_reuse_one_keep_alive_connection(local_api):
+    endpoint, ports = local_api
+    pool = ClientPool("key", endpoint=endpoint)
+    for model in ("a", "b", "a", "c", "b"):
+        assert (
+            pool.client(model, 0.2, 50).generate_completion("hi")["choices"][0]["message"][
+                "content"
+            ]
+            == "ok"
+        )
+    assert len(ports) == 1
+    pool.close()
+
+
+def test_timeout_and_endpoint_come_from_settings(monkeypatch):
+    pool, sessions = _pool()
+    pool.client("m", 0.2, 100).generate_completion("hi")
+    assert sessions[0].timeouts == [DEFAULT_TIMEOUT]
+    monkeypatch.setenv("EURI_API_KEY", "k")
+    monkeypatch.setenv("EURI_CONNECT_TIMEOUT", "3")
+    monkeypatch.setenv("EURI_READ_TIMEOUT", "45")
+    monkeypatch.setenv("EURI_ENDPOINT", "http://127.0.0.1:9/v1/chat")
+    settings = Settings.load()
+    assert Euri(settings).pool is shared_pool(
+        "k", "http://127.0.0.1:9/v1/chat", timeout=(3.0, 45.0)
+    )
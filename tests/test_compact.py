@@ -0,0 +1,102 @@
+import json
+
+from euri_codegen.catalog_loader import load_catalog
+from euri_codegen.codegen.generator import explain_code
+from euri_codegen.prompts import templates
+from euri_codegen.prompts.compact import (
+    common_prefix_len,
+    compact_spec,
+    estimate_tokens,
+    minify_code,
+)
+from euri_codegen.prompts.report import (
+    catalog_prompt_tokens,
+    code_prompt_tokens,
+    shared_prefix_tokens,
+)
+
+CODE = '''"""Module docstring."""
+import os  # why os
+
+
+# helper
+def f(x):
+    """Docstring.
+
+    More detail.
+    """
+    text = """keep
+
+this"""  # trailing
+    return x, text
+
+
+class Empty:
+    """Only a docstring."""
+'''
+
+
+def test_compact_spec_is_canonical_and_drops_empty_fields():
+    spec = load_catalog()[0]
+    reordered = dict(reversed(list(spec.items())), constraints=spec["constraints"], examples=[])
+    assert compact_spec(spec) != compact_spec(reordered)  # examples differ
+    reordered["examples"] = spec["examples"]
+    assert compact_spec(spec) == compact_spec(reordered)
+    assert '"examples"' not in compact_spec({**spec, "examples": []})
+    text = compact_spec(spec)
+    assert text == json.dumps(
+        json.loads(text), sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+
+
+def test_minify_strips_comments_and_docstrings_but_not_strings():
+    out = minify_code(CODE)
+    assert "#" not in out and "docstring" not in out.lower()
+    assert '"""keep\n\nthis"""' in out
+    ns = {}
+    exec(out, ns)
+    assert ns["f"](1) == (1, "keep\n\nthis")
+    assert estimate_tokens(out) < estimate_tokens(CODE)
+    assert minify_code("def broken(:\n") == "def broken(:\n"
+
+
+def test_all_templates_share_a_stable_prefix():
+    spec = load_catalog()[0]
+    prompts = [
+        templates.generation_prompt(spec),
+        templates.edge_case_tests_prompt(spec, has_examples=True),
+        templates.optimization_prompt(CODE, "all"),
+        templates.explanation_prompt(CODE),
+        templates.chunk_optimization_prompt("import os", CODE, ["f"], "all"),
+        templates.chunk_explanation_prompt("", CODE),
+        templates.combine_explanations_prompt("", ["a", "b"]),
+    ]
+    assert all(p.startswith(templates.PROMPT_PREFIX) for p in prompts)
+    assert common_prefix_len(prompts) >= len(templates.PROMPT_PREFIX)
+
+
+def test_token_report_rows():
+    specs = load_catalog()
+    rows = catalog_prompt_tokens(specs)
+    assert len(rows) == 2 * len(specs)
+    assert all(0 < r.tokens <= r.baseline_tokens for r in rows)
+    code_rows = code_prompt_tokens(CODE, specs[0])
+    assert [r.template for r in code_rows] == ["optimization", "explanation"]
+    assert code_rows[1].tokens < code_rows[1].baseline_tokens
+    assert shared_prefix_tokens(rows + code_rows) == estimate_tokens(
+        templates.PROMPT_PREFIX.rstrip("\n") + "\n\n"
+    )
+
+
+def test_explain_sends_the_minified_code_the_report_measures():
+    class Recorder:
+        semantic = None
+
+        def complete(self, prompt, **kwargs):
+            self.prompt = prompt
+            return "ok"
+
+    euri = Recorder()
+    explain_code(euri, CODE)
+    assert minify_code(CODE) in euri.prompt and "# why os" not in euri.prompt
+    assert euri.prompt == code_prompt_tokens(CODE)[1].prompt
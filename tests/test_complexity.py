@@ -0,0 +1,94 @@
+import math
+import random
+
+import pytest
+
+from euri_codegen.catalog_loader import load_catalog
+from euri_codegen.models import validate_specs
+from euri_codegen.perf import complexity
+from euri_codegen.sandbox import SandboxError, SandboxLimits
+from euri_codegen.perf.complexity import (
+    fit_growth,
+    parse_bound,
+    verify_complexity,
+    verify_module_complexity,
+)
+
+
+def _spec(topic):
+    return next(s for s in validate_specs(load_catalog()) if s.id == topic)
+
+
+def test_parse_bound():
+    assert parse_bound(["O(log n) time, O(1) space"]) == ("log n", "1")
+    assert parse_bound(["Average O(n log n), worst O(n^2)"]) == ("n^2", None)
+    assert parse_bound(["Use heap-based O((V+E)logV)"]) == ("n log n", None)
+    assert parse_bound(["O(V+E)"]) == ("n", None)
+    assert parse_bound(["Stable sort"]) == (None, None)
+
+
+def test_fit_growth_on_synthetic_curves():
+    sizes = [2**k for k in range(8, 16)]
+    assert fit_growth(sizes, [3e-6 * n for n in sizes])[0] == "n"
+    assert fit_growth(sizes, [1e-9 * n * n for n in sizes])[0] == "n^2"
+    assert fit_growth(sizes, [5e-7] * len(sizes))[0] == "1"
+
+
+def test_fit_growth_tolerates_timing_noise():
+    rng = random.Random(7)
+    sizes = [2**k for k in range(9, 17)]
+    for name, f in (("log n", math.log2), ("n", float), ("n^2", lambda n: n * n)):
+        for _ in range(20):
+            noisy = [f(n) * 1e-8 * rng.uniform(0.8, 1.25) for n in sizes]
+            assert fit_growth(sizes, noisy)[0] == name
+
+
+def _fake_measurements(monkeypatch, seconds, peak_bytes=lambda n: 0):
+    """Make verify_complexity 'measure' ``seconds(n)`` and ``peak_bytes(n)`` instead of timing."""
+    monkeypatch.setattr(complexity, "scaled_inputs", lambda spec, size, seed: {"n": size})
+    monkeypatch.setattr(complexity, "_time_once", lambda fn, kwargs: seconds(kwargs["n"]))
+    monkeypatch.setattr(complexity, "_peak_memory", lambda fn, kwargs: peak_bytes(kwargs["n"]))
+
+
+def test_verify_judges_measurements_against_the_bound(monkeypatch):
+    spec = _spec("binary_search")
+    _fake_measurements(monkeypatch, lambda n: 2e-7 * math.log2(n))
+    assert verify_complexity(None, spec).ok
+
+    _fake_measurements(monkeypatch, lambda n: 1e-8 * n)
+    report = verify_complexity(None, spec)
+    assert (
+        not report.ok and report.time_class == "n" and "spec allows O(log n)" in report.problems[0]
+    )
+
+    _fake_measurements(monkeypatch, lambda n: 1e-8, peak_bytes=lambda n: 8 * n)
+    report = verify_complexity(None, spec)
+    assert not report.ok and report.space_class == "n" and "memory grows" in report.problems[0]
+
+
+def linear_search(nums, target):
+    # Always scans the whole list, so the timing does not depend on where the target is.
+    found = -1
+    for i, x in enumerate(nums):
+        if x == target and found < 0:
+            found = i
+    return found
+
+
+def test_verify_flags_linear_binary_search_on_real_timings():
+    # The only test that times real code. O(log n) fits a full scan ~80x worse than
+    # O(n) does, so even a 20x tolerance (default 2x) leaves plenty of margin.
+    report = verify_complexity(linear_search, _spec("binary_search"), tolerance=20.0)
+    assert not report.ok and report.time_class in ("n", "n log n")
+
+
+def test_generated_modules_are_measured_in_a_limited_child(tmp_path):
+    path = tmp_path / "binary_search.py"
+    path.write_text(
+        "def binary_search(nums, target):\n    while len(nums) > 1000:\n        pass\n"
+        "    return -1\n"
+    )
+    with pytest.raises(SandboxError, match="timed out|CPU limit"):
+        verify_module_complexity(
+            path, _spec("binary_search"), limits=SandboxLimits(wall_seconds=3, cpu_seconds=2)
+        )
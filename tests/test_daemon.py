@@ -0,0 +1,165 @@
+import asyncio
+import http.client
+import json
+import os
+import socket
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from euri_codegen.config import Settings
+from euri_codegen.daemon import Daemon
+from euri_codegen.daemon_client import DaemonClient, DaemonError, DaemonUnavailable
+
+
+class FakeEuri:
+    cache = None
+    semantic = None
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def complete(self, prompt, *, stage=None, **kwargs):
+        self.calls += 1
+        self.release.wait(5)
+        if stage == "generate":
+            return "def two_sum(nums, target):\n    return None\n"
+        return "It adds two numbers."
+
+
+def _serve(daemon, address):
+    ready = threading.Event()
+    bound = []
+
+    def on_ready(address):
+        bound.append(address)
+        ready.set()
+
+    thread = threading.Thread(
+        target=lambda: asyncio.run(daemon.run(address, on_ready=on_ready)), daemon=True
+    )
+    thread.start()
+    assert ready.wait(5)
+    return thread, bound[0]
+
+
+@pytest.fixture()
+def served(tmp_path):
+    euri = FakeEuri()
+    token = tmp_path / "daemon.token"
+    daemon = Daemon(
+        Settings(api_key="test"), make_euri=lambda: euri, workers=4, root=tmp_path, token_path=token
+    )
+    thread, address = _serve(daemon, "127.0.0.1:0")
+    yield daemon, euri, lambda: DaemonClient(address, token_path=token)
+    daemon.stop()
+    thread.join(5)
+
+
+def test_methods_and_errors_over_http(served):
+    daemon, euri, connect = served
+    client = connect()
+    assert client.call("ping")["pid"] > 0
+    reply = client.call(
+        "optimize",
+        code="def f(x):\n    return len(x) in [1, 2]\n",
+        level="offline",
+        rules=["membership-set-literal"],
+    )
+    assert "{1, 2}" in reply["code"] and reply["applied"][0]["rule"]
+    assert euri.calls == 0  # offline never touches the model
+    assert client.call("explain", code="def add(a, b):\n    return a + b\n") == {
+        "text": "It adds two numbers."
+    }
+    with pytest.raises(DaemonError) as e:
+        client.call("nope")
+    assert e.value.code == -32601
+    with pytest.raises(DaemonError) as e:
+        client.call("explain", source="x")
+    assert e.value.code == -32602
+    with pytest.raises(DaemonError, match="Topic not found"):
+        client.call("generate", topic="no_such_topic")
+    client.close()
+
+
+def test_batch_runs_every_request_and_keeps_failures_separate(served):
+    _, _, connect = served
+    client = connect()
+    results = client.batch([("ping", {}), ("explain", {"code": "x = 1\n"}), ("missing", {})])
+    assert results[0]["pid"] > 0
+    assert results[1] == {"text": "It adds two numbers."}
+    assert isinstance(results[2], DaemonError)
+
+
+def test_identical_in_flight_requests_are_coalesced(served):
+    daemon, euri, connect = served
+    euri.release.clear()
+
+    def call(_):
+        client = connect()
+        try:
+            return client.call("explain", code="def slow():\n    pass\n")
+        finally:
+            client.close()
+
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(call, i) for i in range(4)]
+        while daemon.calls.get("explain", 0) < 4:
+            time.sleep(0.01)
+        euri.release.set()
+        replies = [f.result(5) for f in futures]
+    assert all(r == {"text": "It adds two numbers."} for r in replies)
+    assert euri.calls == 1
+    assert daemon.stats()["coalesced"] == 3
+
+
+def test_generate_writes_files_and_records_the_manifest(served, tmp_path):
+    _, _, connect = served
+    reply = connect().call("generate", topic="two_sum", out_dir=str(tmp_path))
+    assert reply["module_path"].endswith("two_sum.py") and reply["repairs"] == 0
+    manifest = json.loads((tmp_path / ".euri_manifest.json").read_text(encoding="utf-8"))
+    assert manifest["topics"]["two_sum"]["module"] == "two_sum.py"
+
+
+def test_client_reports_missing_daemon(tmp_path):
+    with pytest.raises(DaemonUnavailable):
+        DaemonClient(f"unix:{tmp_path / 'none.sock'}").call("ping")
+
+
+def test_tcp_requires_the_token_and_json(served, tmp_path):
+    _, _, connect = served
+    assert stat.S_IMODE(os.stat(tmp_path / "daemon.token").st_mode) == 0o600
+    address = connect().address
+    with pytest.raises(DaemonError, match="401"):
+        DaemonClient(address, token_path=tmp_path / "missing.token").call("ping")
+    host, port = address.rsplit(":", 1)
+    conn = http.client.HTTPConnection(host, int(port), timeout=5)
+    conn.request(
+        "POST",
+        "/",
+        b'{"jsonrpc": "2.0", "id": 1, "method": "ping"}',
+        {"Content-Type": "text/plain"},
+    )
+    assert conn.getresponse().status == 415
+    with pytest.raises(DaemonError, match="out_dir must be inside"):
+        connect().call("generate", topic="two_sum", out_dir=str(tmp_path.parent / "elsewhere"))
+    with pytest.raises(DaemonError, match="out_dir must be inside"):
+        connect().call("generate", topic="two_sum", out_dir="../elsewhere")
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX") or os.name == "nt", reason="needs Unix sockets")
+def test_unix_socket_is_owner_only(tmp_path):
+    daemon = Daemon(Settings(api_key="test"), make_euri=FakeEuri, root=tmp_path)
+    path = tmp_path / "d.sock"
+    thread, address = _serve(daemon, f"unix:{path}")
+    try:
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        assert DaemonClient(address).call("ping")["pid"] > 0
+    finally:
+        daemon.stop()
+        thread.join(5)
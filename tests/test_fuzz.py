@@ -0,0 +1,98 @@
+from euri_codegen.catalog_store import open_catalog
+from euri_codegen.perf.fuzz import fuzz_equivalence, input_plan, make_case, same_value, shrink
+
+SORT = "def merge_sort(nums: list[int]) -> list[int]:\n    return sorted(nums)\n"
+IN_PLACE = "def merge_sort(nums: list[int]) -> list[int]:\n    nums.sort()\n    return nums\n"
+DEDUP = "def merge_sort(nums: list[int]) -> list[int]:\n    return sorted(set(nums))\n"
+HANGS = (
+    "def merge_sort(nums: list[int]) -> list[int]:\n"
+    "    while len(nums) > 2:\n        pass\n    return sorted(nums)\n"
+)
+
+
+def _spec(topic):
+    return open_catalog().spec(topic)
+
+
+def test_equivalent_rewrite_passes_within_case_budget():
+    report = fuzz_equivalence(
+        SORT,
+        SORT.replace("sorted(nums)", "list(sorted(nums))"),
+        function="merge_sort",
+        spec=_spec("merge_sort"),
+        max_cases=600,
+        workers=2,
+    )
+    assert report.equivalent and report.cases == 600 and report.cases_per_s > 0
+
+
+def test_difference_is_found_and_shrunk():
+    report = fuzz_equivalence(
+        SORT, DEDUP, function="merge_sort", spec=_spec("merge_sort"), workers=2, budget_s=5
+    )
+    found = report.counterexample
+    assert found is not None and found.kwargs == {"nums": [0, 0]}
+    assert found.original == "returns [0, 0]" and found.candidate == "returns [0]"
+
+
+def test_argument_mutation_counts_as_a_difference():
+    report = fuzz_equivalence(SORT, IN_PLACE, function="merge_sort", workers=1, budget_s=5)
+    assert report.counterexample is not None and len(report.counterexample.kwargs["nums"]) == 2
+    assert "leaves arguments" in report.counterexample.candidate
+
+
+def test_hanging_rewrite_times_out_per_case():
+    report = fuzz_equivalence(
+        SORT, HANGS, function="merge_sort", workers=1, budget_s=5, case_timeout=0.2
+    )
+    assert report.counterexample is not None and report.counterexample.candidate == "times out"
+
+
+def test_load_errors_are_reported():
+    report = fuzz_equivalence(SORT, "def merge_sort(:\n", function="merge_sort", budget_s=1)
+    assert not report.equivalent and report.errors and report.cases == 0
+
+
+def test_modules_load_only_in_limited_workers():
+    import os
+
+    parent_only = (
+        f"import os\nif os.getpid() == {os.getpid()}:\n"
+        "    raise SystemExit('ran in the CLI process')\n"
+    )
+    report = fuzz_equivalence(
+        SORT, parent_only + SORT, function="merge_sort", workers=1, max_cases=50
+    )
+    assert report.equivalent and report.cases == 50
+    hangs = "while True:\n    pass\n" + SORT
+    report = fuzz_equivalence(
+        SORT, hangs, function="merge_sort", workers=1, budget_s=1, load_timeout=0.5
+    )
+    assert report.errors == ["loading the modules took longer than 0.5s"]
+    greedy = "BLOB = bytearray(2 << 30)\n" + SORT
+    report = fuzz_equivalence(SORT, greedy, function="merge_sort", workers=1, budget_s=1)
+    assert report.errors and "MemoryError" in report.errors[0]
+
+
+def test_plan_uses_spec_types_then_annotations():
+    ns = {}
+    exec("def dijkstra(n, edges, src, *, verbose=False):\n    pass\n", ns)
+    plan = input_plan(ns["dijkstra"], _spec("dijkstra"))
+    assert [name for name, _, _ in plan] == ["n", "edges", "src"]
+    exec("def f(xs: 'dict[str, list[int]]', k: int = 3):\n    pass\n", ns)
+    assert input_plan(ns["f"]) == [
+        ("xs", ("dict", [("str", []), ("list", [("int", [])])]), ""),
+        ("k", ("int", []), ""),
+    ]
+    assert make_case(plan, 7, seed=1) == make_case(plan, 7, seed=1)
+    assert make_case(plan, 0)["edges"] == []
+
+
+def test_same_value_and_shrink():
+    assert (
+        not same_value(1, True)
+        and not same_value([1], (1,))
+        and same_value(float("nan"), float("nan"))
+    )
+    small, _ = shrink({"xs": [5, 9, 3, 7], "k": 40}, lambda kw: sum(kw["xs"]) > 6)
+    assert small == {"xs": [7], "k": 0}
@@ -0,0 +1,153 @@
+from euri_codegen.catalog_loader import load_catalog
+from euri_codegen.models import validate_specs
+from euri_codegen.perf.gate import gated_optimize
+from euri_codegen.sandbox import SandboxLimits
+
+SLOW = """
+def two_sum(nums, target):
+    for _ in range(len(nums) * 200):  # deliberately wasteful
+        pass
+    for i in range(len(nums)):
+        for j in range(i + 1, len(nums)):
+            if nums[i] + nums[j] == target:
+                return (i, j)
+    return None
+"""
+
+FAST = """
+def two_sum(nums, target):
+    seen = {}
+    for i, x in enumerate(nums):
+        if target - x in seen:
+            return (seen[target - x], i)
+        seen[x] = i
+    return None
+"""
+
+BROKEN = "def two_sum(nums, target):\n    return None\n"
+
+TESTS = """
+from two_sum import two_sum
+
+def test_examples():
+    assert tuple(two_sum([2, 7, 11, 15], 9)) == (0, 1)
+    assert two_sum([1, 2], 10) is None
+"""
+
+
+def test_gate_rejects_broken_then_accepts_faster(tmp_path):
+    spec = next(s for s in validate_specs(load_catalog()) if s.id == "two_sum")
+    test_path = tmp_path / "test_two_sum.py"
+    test_path.write_text(TESTS, encoding="utf-8")
+    candidates = iter([BROKEN, FAST])
+    feedbacks = []
+
+    def propose(feedback):
+        feedbacks.append(feedback)
+        return next(candidates)
+
+    report = gated_optimize(
+        SLOW, propose, spec=spec, module_name="two_sum", test_path=test_path, size=400, repeats=2
+    )
+    assert report.original_tests_passed
+    assert [a.tests_passed for a in report.attempts] == [False, True]
+    assert report.accepted_code == FAST and report.attempts[-1].speedup > 1.05
+    assert feedbacks[0] is None and "failed the existing tests" in feedbacks[1]
+
+
+def test_gate_keeps_original_when_not_faster(tmp_path):
+    spec = next(s for s in validate_specs(load_catalog()) if s.id == "two_sum")
+    test_path = tmp_path / "test_two_sum.py"
+    test_path.write_text(TESTS, encoding="utf-8")
+    report = gated_optimize(
+        FAST,
+        lambda fb: FAST,
+        spec=spec,
+        module_name="two_sum",
+        test_path=test_path,
+        attempts=2,
+        min_speedup=10.0,
+        size=200,
+        repeats=2,
+    )
+    assert report.accepted_code is None and len(report.attempts) == 2
+
+
+def test_gate_fuzzing_rejects_behavior_changes_the_tests_miss(tmp_path):
+    spec = next(s for s in validate_specs(load_catalog()) if s.id == "two_sum")
+    test_path = tmp_path / "test_two_sum.py"
+    test_path.write_text(TESTS, encoding="utf-8")
+    # Same pairs as SLOW without the wasted loop; FAST can return a different valid pair.
+    tight = SLOW.replace(
+        "    for _ in range(len(nums) * 200):  # deliberately wasteful\n        pass\n", ""
+    )
+    candidates = iter([FAST, tight])
+    feedbacks = []
+
+    def propose(feedback):
+        feedbacks.append(feedback)
+        return next(candidates)
+
+    report = gated_optimize(
+        SLOW,
+        propose,
+        spec=spec,
+        module_name="two_sum",
+        test_path=test_path,
+        size=400,
+        repeats=2,
+        fuzz_budget=2,
+    )
+    first, second = report.attempts
+    assert (
+        first.tests_passed and not first.accepted and first.reason == "fuzzing found a difference"
+    )
+    assert "changed behavior" in feedbacks[1]
+    assert second.accepted and second.fuzz_cases > 0 and report.accepted_code == tight
+
+
+def test_gate_reports_an_original_it_cannot_benchmark(tmp_path):
+    spec = next(s for s in validate_specs(load_catalog()) if s.id == "two_sum")
+    test_path = tmp_path / "test_two_sum.py"
+    test_path.write_text(TESTS, encoding="utf-8")
+    proposed = []
+    report = gated_optimize(
+        "def other():\n    pass\n",
+        proposed.append,
+        spec=spec,
+        module_name="two_sum",
+        test_path=test_path,
+        size=50,
+        repeats=1,
+    )
+    assert (
+        report.error.startswith("original could not be benchmarked")
+        and not report.original_tests_passed
+    )
+    assert report.attempts == [] and proposed == [] and report.accepted_code is None
+
+
+def test_gate_rejects_a_candidate_that_hangs_at_the_benchmark_size(tmp_path):
+    spec = next(s for s in validate_specs(load_catalog()) if s.id == "two_sum")
+    test_path = tmp_path / "test_two_sum.py"
+    test_path.write_text(TESTS, encoding="utf-8")
+    hangs = FAST.replace(
+        "    seen = {}\n", "    seen = {}\n    while len(nums) > 100:\n        pass\n"
+    )
+    report = gated_optimize(
+        FAST,
+        lambda fb: hangs,
+        spec=spec,
+        module_name="two_sum",
+        test_path=test_path,
+        attempts=1,
+        size=200,
+        repeats=1,
+        limits=SandboxLimits(wall_seconds=3, cpu_seconds=2),
+    )
+    (attempt,) = report.attempts
+    assert (
+        attempt.tests_passed
+        and not attempt.accepted
+        and attempt.reason.startswith("benchmark failed")
+    )
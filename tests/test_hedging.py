@@ -0,0 +1,125 @@
+import threading
+import time
+
+import pytest
+
+from euri_codegen.config import Settings
+from euri_codegen.euri_client import Euri
+from euri_codegen.hedging import HedgePolicy, LatencyHistogram, LatencyTracker, acceptable, race
+from euri_codegen.resilience import Resilience
+
+
+def _after(delay, value, calls=None, name=None):
+    def fn():
+        if calls is not None:
+            calls.append(name)
+        time.sleep(delay)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    return fn
+
+
+def test_race_returns_primary_when_it_is_fast():
+    calls = []
+    name, value = race(
+        [("a", _after(0.01, "A", calls, "a")), ("b", _after(0, "B", calls, "b"))],
+        deadline=lambda m: 0.5,
+        accept=bool,
+    )
+    assert (name, value, calls) == ("a", "A", ["a"])
+
+
+def test_race_hedges_after_deadline_and_takes_first_valid():
+    start = time.monotonic()
+    name, value = race(
+        [("slow", _after(1.0, "late")), ("fast", _after(0.02, "quick"))],
+        deadline=lambda m: 0.05,
+        accept=bool,
+    )
+    assert (name, value) == ("fast", "quick")
+    assert time.monotonic() - start < 0.5  # did not wait for the slow primary
+
+
+def test_race_hedges_immediately_on_invalid_or_failed_primary():
+    assert race(
+        [("a", _after(0, "")), ("b", _after(0, "B"))], deadline=lambda m: 5, accept=bool
+    ) == ("b", "B")
+    assert race(
+        [("a", _after(0, RuntimeError("down"))), ("b", _after(0, "B"))],
+        deadline=lambda m: 5,
+        accept=bool,
+    ) == ("b", "B")
+    # Nothing valid: the primary's answer is the fallback; all failing raises the primary's error.
+    assert race(
+        [("a", _after(0, "")), ("b", _after(0, ""))], deadline=lambda m: 5, accept=bool
+    ) == ("a", "")
+    with pytest.raises(RuntimeError, match="first"):
+        race(
+            [("a", _after(0, RuntimeError("first"))), ("b", _after(0, RuntimeError("second")))],
+            deadline=lambda m: 5,
+            accept=bool,
+        )
+
+
+def test_histogram_drives_deadline():
+    hist = LatencyHistogram()
+    for i in range(1, 101):
+        hist.observe(i / 10)
+    assert 9.5 <= hist.quantile(0.95) <= 9.5 * 1.25
+    policy = HedgePolicy(["m"], min_samples=5, default_deadline=7)
+    assert policy.deadline("m") == 7
+    for _ in range(5):
+        policy.tracker.observe("m", 2.0)
+    assert 2.0 <= policy.deadline("m") <= 2.5
+
+
+def test_acceptable_checks_code_stages_only():
+    assert acceptable("```python\nx = 1\n```", "generate")
+    assert not acceptable("def broken(:", "optimize")
+    assert acceptable("Plain prose explanation.", "explain")
+    assert not acceptable("   ", "explain")
+
+
+class ModelClient:
+    def __init__(self, delay, content):
+        self.delay = delay
+        self.content = content
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_completion(self, **params):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return {"choices": [{"message": {"content": self.content}}]}
+
+
+def test_euri_hedges_slow_primary_and_learns_latency():
+    tracker = LatencyTracker()
+    euri = Euri(
+        Settings(api_key="test", model="primary"),
+        resilience=Resilience(),
+        hedge=HedgePolicy(["primary", "backup"], default_deadline=0.05, tracker=tracker),
+    )
+    euri._client = ModelClient(1.0, "x = 'slow'")
+    backup = ModelClient(0.01, "x = 'fast'")
+    euri._client_factory = lambda model: backup
+    assert euri.complete("p", stage="generate") == "x = 'fast'"
+    assert euri._client.calls == 1 and backup.calls == 1
+    assert tracker.quantile("backup", 0.5)[1] == 1
+    # An explicit model bypasses hedging and uses that model's own client.
+    assert euri.complete("p", model="backup") == "x = 'fast'" and backup.calls == 2
+
+
+def test_streaming_is_turned_off_when_hedged(capsys):
+    from euri_codegen.cli import _stream_unless_hedged
+
+    hedged = Euri(
+        Settings(api_key="test", model="primary"), hedge=HedgePolicy(["primary", "backup"])
+    )
+    assert hedged.hedged and _stream_unless_hedged(hedged, True) is False
+    assert "streaming is turned off" in capsys.readouterr().out
+    plain = Euri(Settings(api_key="test"), hedge=HedgePolicy(["primary"]))
+    assert not plain.hedged and _stream_unless_hedged(plain, True) is True
@@ -0,0 +1,96 @@
+import os
+import threading
+
+from euri_codegen.catalog_loader import load_catalog
+from euri_codegen.codegen.jobs import JobRunner, JobStore
+from euri_codegen.codegen.spec_tests import target_name
+from euri_codegen.models import validate_specs
+
+SPECS = validate_specs(load_catalog())[:4]
+
+
+class GateEuri:
+    """Returns a trivial implementation; blocks every call until ``gate`` is set."""
+
+    def __init__(self, fail_on=None):
+        self.gate = threading.Event()
+        self.started = threading.Semaphore(0)
+        self.fail_on = fail_on
+
+    def complete(self, prompt, **kwargs):
+        self.started.release()
+        self.gate.wait(5)
+        if self.fail_on and self.fail_on in prompt:
+            raise RuntimeError("boom")
+        return "\n\n".join(
+            (
+                f"class {target_name(s.model_dump())}:\n    pass"
+                if s.function_signature.startswith("class ")
+                else f"def {target_name(s.model_dump())}(*args):\n    return None"
+            )
+            for s in SPECS
+        )
+
+
+def test_job_state_is_persisted_per_topic(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    runner = JobRunner(store)
+    euri = GateEuri(fail_on=SPECS[1].id)
+    euri.gate.set()
+    job_id = runner.submit(euri, SPECS, tmp_path / "out", concurrency=2, llm_tests="never")
+    runner.wait(job_id, 10)
+    # A second store on the same file (another process or tab) sees the final state.
+    job = JobStore(tmp_path / "jobs.sqlite3").get(job_id)
+    assert job.status == "done" and job.progress == 1.0
+    assert [t.topic for t in job.topics] == [s.id for s in SPECS]
+    assert job.counts()["done"] == 3 and job.counts()["failed"] == 1
+    assert "boom" in job.topics[1].error
+    assert (tmp_path / "out" / f"{SPECS[0].id}.py").exists()
+
+
+def test_cancel_then_resume_finishes_the_remaining_topics(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    runner = JobRunner(store)
+    euri = GateEuri()
+    job_id = runner.submit(euri, SPECS, tmp_path / "out", concurrency=1, llm_tests="never")
+    assert euri.started.acquire(timeout=5)  # first topic is in flight
+    assert store.get(job_id).counts()["running"] == 1
+    runner.cancel(job_id)
+    assert store.get(job_id).status == "cancelling"
+    euri.gate.set()
+    runner.wait(job_id, 10)
+    job = store.get(job_id)
+    assert job.status == "cancelled" and job.finished
+    assert job.counts() == {"queued": 0, "running": 0, "done": 1, "failed": 0, "cancelled": 3}
+
+    assert runner.resume(euri, job_id)
+    runner.wait(job_id, 10)
+    job = store.get(job_id)
+    assert job.status == "done" and job.counts()["done"] == 4
+
+
+def test_job_of_a_dead_process_is_interrupted(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    job_id = store.create(SPECS[:1], tmp_path, {})
+    store._execute("UPDATE jobs SET pid = ? WHERE id = ?", (2**22 + 12345, job_id))
+    job = store.get(job_id)
+    assert job.status == "interrupted" and job.finished
+    assert [j.id for j in store.recent()] == [job_id]
+
+
+def test_cancel_only_touches_interrupted_jobs(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    runner = JobRunner(store)
+    live = store.create(SPECS[:1], tmp_path, {})
+    store._execute(
+        "UPDATE jobs SET pid = ? WHERE id = ?", (os.getppid(), live)
+    )  # another, live process
+    assert not runner.cancel(live) and store.get(live).status == "running"
+
+    done = store.create(SPECS[:1], tmp_path, {})
+    store.set_status(done, "done")
+    assert not runner.cancel(done) and store.get(done).status == "done"
+
+    dead = store.create(SPECS[:1], tmp_path, {})
+    store._execute("UPDATE jobs SET pid = ? WHERE id = ?", (2**22 + 12345, dead))
+    assert runner.cancel(dead) and store.get(dead).status == "cancelled"
@@ -0,0 +1,37 @@
+from euri_codegen.catalog_loader import load_catalog
+from euri_codegen.codegen.manifest import BuildManifest, fingerprint
+from euri_codegen.models import validate_specs
+
+
+def _fp(spec, **overrides):
+    params = {"model": "gpt-4.1-nano", "temperature": 0.2, "max_tokens": 3000}
+    params.update(overrides)
+    return fingerprint(spec, **params)
+
+
+def test_fingerprint_tracks_spec_and_settings():
+    spec = validate_specs(load_catalog())[0]
+    assert _fp(spec) == _fp(spec)
+    assert _fp(spec) != _fp(spec, model="gpt-4.1-mini")
+    assert _fp(spec) != _fp(spec, max_tokens=1000)
+    edited = spec.model_copy(update={"constraints": spec.constraints + ["Be iterative"]})
+    assert _fp(spec) != _fp(edited)
+
+
+def test_manifest_roundtrip_and_staleness(tmp_path):
+    spec = validate_specs(load_catalog())[0]
+    fp = _fp(spec)
+    manifest = BuildManifest(tmp_path)
+    assert manifest.stale_reason(spec.id, fp) == "new"
+
+    module, tests = tmp_path / f"{spec.id}.py", tmp_path / f"test_{spec.id}.py"
+    module.write_text("X = 1", encoding="utf-8")
+    tests.write_text("", encoding="utf-8")
+    manifest.record(spec.id, fp, module, tests)
+    manifest.save()
+
+    reloaded = BuildManifest(tmp_path)
+    assert reloaded.stale_reason(spec.id, fp) is None
+    assert reloaded.stale_reason(spec.id, _fp(spec, temperature=0.7)) == "changed"
+    tests.unlink()
+    assert reloaded.stale_reason(spec.id, fp) == "missing output"
@@ -0,0 +1,60 @@
+from euri_codegen.catalog_store import open_catalog
+from euri_codegen.codegen.optimizer import optimize_code_profiled
+from euri_codegen.perf.profiling import driver_workload, profile_module, spec_workload
+
+MODULE = """def merge_sort(nums):
+    return slow_copy(sorted(nums))
+
+
+def slow_copy(nums):
+    out = []
+    for x in nums:
+        out = out + [x]
+    return out
+
+
+class Unused:
+    def method(self):
+        return 1
+"""
+
+
+def test_spec_workload_ranks_hottest_definition(tmp_path):
+    path = tmp_path / "merge_sort.py"
+    path.write_text(MODULE, encoding="utf-8")
+    spec = open_catalog().spec("merge_sort")
+    report = profile_module(path, spec_workload(spec, size=2000, runs=1), line_timing=True)
+    assert [h.name for h in report.hotspots] == ["slow_copy", "merge_sort"]
+    hot = report.top(1)[0]
+    assert hot.name == "slow_copy" and hot.share > 0.5
+    assert hot.lines[0][0] == 8 and hot.lines[0][1] >= 2000
+    assert "line 8" in hot.summary(MODULE.splitlines())
+
+
+def test_driver_workload_imports_profiled_module(tmp_path):
+    path = tmp_path / "merge_sort.py"
+    path.write_text(MODULE, encoding="utf-8")
+    driver = tmp_path / "drive.py"
+    driver.write_text("import merge_sort\nmerge_sort.Unused().method()\n", encoding="utf-8")
+    report = profile_module(path, driver_workload(driver))
+    assert [h.name for h in report.hotspots] == ["Unused"]
+    assert report.hotspots[0].functions[0].name == "Unused.method"
+
+
+class FakeEuri:
+    def __init__(self):
+        self.prompts = []
+
+    def complete(self, prompt, *, stage=None, **kwargs):
+        self.prompts.append((stage, prompt))
+        return "def slow_copy(nums):\n    return list(nums)\n"
+
+
+def test_only_hot_definitions_are_sent_and_spliced_back():
+    euri = FakeEuri()
+    new = optimize_code_profiled(euri, MODULE, {"slow_copy": "- slow_copy: 97% of module time"})
+    ((stage, prompt),) = euri.prompts
+    assert stage == "optimize-profiled" and "97% of module time" in prompt
+    assert "class Unused" not in prompt.split("Definition(s) to optimize:")[1]
+    assert "return list(nums)" in new and "out = out + [x]" not in new
+    assert new.startswith("def merge_sort(nums):") and "class Unused:" in new
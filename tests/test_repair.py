@@ -0,0 +1,113 @@
+import pytest
+
+from euri_codegen.catalog_loader import load_catalog
+from euri_codegen.codegen.generator import generate_code_for_topic, repair_code
+from euri_codegen.codegen.repair import CodeCheckError, check_module, offending_span, splice
+
+SPEC = {
+    "id": "two_sum",
+    "function_signature": "def two_sum(nums: list[int], target: int) -> tuple[int, int] | None:",
+}
+
+BROKEN = """import os
+
+
+def helper(x):
+    return x
+
+
+def two_sum(nums, target):
+    seen = {}
+    for i, x in enumerate(nums)
+        seen[x] = i
+    return None
+"""
+
+
+class ScriptedEuri:
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def complete(self, prompt, *, stage=None, **kwargs):
+        self.prompts.append((stage, prompt))
+        return self.replies.pop(0)
+
+
+def test_check_reports_enclosing_statement_for_syntax_errors():
+    issue = check_module(BROKEN, SPEC)
+    assert "expected ':'" in issue.message and (issue.start, issue.end) == (8, 12)
+    assert offending_span(BROKEN, issue).startswith("def two_sum")
+    assert "def helper" not in offending_span(BROKEN, issue)
+
+
+def test_check_requires_signature_target():
+    issue = check_module("def twoSum(nums, target):\n    return None\n", SPEC)
+    assert "two_sum" in issue.message and issue.is_insert
+    fixed = splice(
+        "def twoSum(nums, target):\n    return None\n", issue, "```python\ntwo_sum = twoSum\n```"
+    )
+    assert check_module(fixed, SPEC) is None
+    assert check_module("from fast import two_sum\n", SPEC) is None
+
+
+def test_repair_sends_only_the_span_and_splices_the_reply():
+    euri = ScriptedEuri("def two_sum(nums, target):\n    return None\n")
+    seen = []
+    code = repair_code(euri, BROKEN, SPEC, on_repair=seen.append)
+    assert check_module(code, SPEC) is None and "def helper" in code
+    ((stage, prompt),) = euri.prompts
+    assert stage == "repair" and "Lines 8-12" in prompt and "def helper" not in prompt
+    assert len(seen) == 1
+
+
+def test_repair_gives_up_after_max_repairs():
+    euri = ScriptedEuri("still broken(", "still broken(")
+    with pytest.raises(CodeCheckError, match="after 2 repair"):
+        repair_code(euri, BROKEN, SPEC, max_repairs=2)
+    assert len(euri.prompts) == 2
+    with pytest.raises(CodeCheckError):
+        repair_code(ScriptedEuri(), BROKEN, SPEC, max_repairs=0)
+
+
+def test_generate_repairs_before_writing(tmp_path):
+    spec = next(s for s in load_catalog() if s["id"] == "two_sum")
+    euri = ScriptedEuri(BROKEN, "def two_sum(nums, target):\n    return None")
+    module_path, _ = generate_code_for_topic(euri, spec, tmp_path)
+    assert [stage for stage, _ in euri.prompts] == ["generate", "repair"]
+    assert check_module(module_path.read_text(encoding="utf-8"), spec) is None
+
+
+class StageEuri:
+    """Replies per stage, so the concurrent tests and generate calls can come in any order."""
+
+    def __init__(self, **replies):
+        self.replies = {stage: list(r) for stage, r in replies.items()}
+        self.stages = []
+
+    def complete(self, prompt, *, stage=None, **kwargs):
+        self.stages.append(stage)
+        return self.replies[stage].pop(0)
+
+
+@pytest.mark.parametrize(
+    "repair", ["def test_edge():\n    assert two_sum([1], 1) is None", "still broken("]
+)
+def test_broken_edge_case_tests_are_repaired_or_dropped(tmp_path, repair):
+    spec = next(s for s in load_catalog() if s["id"] == "two_sum")
+    euri = StageEuri(
+        generate=["def two_sum(nums, target):\n    return None"],
+        tests=["from two_sum import two_sum\n\ndef test_edge(:\n    pass"],
+        repair=[repair],
+    )
+    warnings = []
+    _, test_path = generate_code_for_topic(
+        euri, spec, tmp_path, llm_tests="always", max_repairs=1, on_warning=warnings.append
+    )
+    test_code = test_path.read_text(encoding="utf-8")
+    compile(test_code, str(test_path), "exec")  # the spec example tests always survive
+    assert "def test_spec_example" in test_code
+    if repair.startswith("def"):
+        assert "def test_edge():" in test_code and not warnings
+    else:
+        assert "test_edge" not in test_code and "dropped" in warnings[0]
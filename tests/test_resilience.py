@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pytest
+
+from euri_codegen.config import Settings
+from euri_codegen.euri_client import Euri
+from euri_codegen.resilience import (
+    AdaptiveConcurrency,
+    CircuitBreaker,
+    CircuitOpenError,
+    Resilience,
+    TokenBucket,
+)
+
+
+class HTTPError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status_code = status
+
+
+class FlakyClient:
+    """Fake EuriaiClient that fails according to a script and adds latency."""
+
+    def __init__(self, script, latency=0.0):
+        self.script = list(script)
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_completion(self, **params):
+        with self._lock:
+            self.calls += 1
+            step = self.script.pop(0) if self.script else None
+        time.sleep(self.latency)
+        if step is not None:
+            raise step
+        return {"choices": [{"message": {"content": "ok"}}]}
+
+
+def _euri(client, **policy):
+    policy.setdefault("base_delay", 0.001)
+    euri = Euri(Settings(api_key="test"), resilience=Resilience(**policy))
+    euri._client = client
+    return euri
+
+
+def test_retries_transient_errors_then_succeeds():
+    client = FlakyClient([HTTPError(429), HTTPError(503), ConnectionError("reset")])
+    euri = _euri(client, max_attempts=4)
+    assert euri.complete("hi") == "ok"
+    assert client.calls == 4
+    assert euri.resilience.counters["retries"] == 3 and euri.resilience.counters["throttled"] == 1
+
+
+def test_non_retryable_errors_raise_immediately():
+    client = FlakyClient([HTTPError(400)])
+    with pytest.raises(HTTPError):
+        _euri(client).complete("hi")
+    assert client.calls == 1
+
+
+def test_circuit_breaker_opens_after_consecutive_failures():
+    client = FlakyClient([HTTPError(500)] * 10)
+    euri = _euri(client, max_attempts=1, breaker_threshold=3, breaker_reset_seconds=60)
+    for _ in range(3):
+        with pytest.raises(HTTPError):
+            euri.complete("hi")
+    with pytest.raises(CircuitOpenError):
+        euri.complete("hi")
+    assert client.calls == 3
+
+
+def test_half_open_breaker_admits_a_single_probe():
+    breaker = CircuitBreaker(threshold=1, reset_seconds=0.0)
+    breaker.record_failure()
+    assert breaker.state == "half-open"
+    assert breaker.before_call() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # the probe is still in flight
+    breaker.record_failure()
+    assert breaker.before_call() is True  # re-opened, then half-open again: a new probe
+    breaker.end_probe()  # ended without a verdict (e.g. a 400): the next caller probes
+    assert breaker.before_call() is True
+    breaker.record_success()
+    assert (
+        breaker.state == "closed"
+        and breaker.before_call() is False
+        and breaker.before_call() is False
+    )
+
+
+def test_aimd_halves_on_throttle_and_ramps_up():
+    limiter = AdaptiveConcurrency(8, maximum=16)
+    limiter.acquire()
+    limiter.release("throttled")
+    assert limiter.limit == 4
+    for _ in range(20):
+        limiter.acquire()
+        limiter.release("ok")
+    assert 6 < limiter.limit <= 16
+
+
+def test_concurrency_limit_bounds_in_flight_requests():
+    client = FlakyClient([], latency=0.02)
+    euri = _euri(client, initial_concurrency=2, max_concurrency=2)
+    peak = 0
+    original = client.generate_completion
+
+    def tracking(**params):
+        nonlocal peak
+        peak = max(peak, euri.resilience.concurrency.in_flight)
+        return original(**params)
+
+    client.generate_completion = tracking
+    threads = [threading.Thread(target=euri.complete, args=(f"p{i}",)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert client.calls == 8 and peak <= 2
+
+
+def test_token_bucket_waits_when_empty():
+    bucket = TokenBucket(6000, burst=1)  # 100 tokens/s
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() > 0.0
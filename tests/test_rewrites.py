@@ -0,0 +1,134 @@
+import pytest
+
+from euri_codegen.codegen.rewrites import RULES, apply_rules
+from euri_codegen.perf.rewrite_bench import bench_rule
+
+SOURCE = """import os
+
+
+def f(text):
+    # comments survive
+    words = sorted(text.split())
+    res = []
+    for i in range(len(words)):
+        if len(words[i]) in [1, 2, 3]:
+            res.append(words[i])  # keep me
+    for j in range(len(words)):
+        print(j, words[j])
+    return res
+"""
+
+ALL = sorted(RULES)
+
+
+def _run(code, *args):
+    ns = {}
+    exec(code, ns)
+    return ns["f"](*args)
+
+
+def test_rules_rewrite_provable_patterns_and_preserve_behaviour(capsys):
+    assert apply_rules(SOURCE) == (SOURCE, [])  # opt-in: nothing runs unless named
+    out, applied = apply_rules(SOURCE, ALL)
+    assert "# comments survive" in out and "# keep me" in out
+    assert "in {1, 2, 3}" in out
+    assert "for word2 in words:" in out
+    assert "for j, word in enumerate(words):" in out
+    assert {a.rule for a in applied} == {"membership-set-literal", "range-len-iteration"}
+    assert _run(out, "a bb cccc dd e") == _run(SOURCE, "a bb cccc dd e")
+
+
+@pytest.mark.parametrize(
+    "code, args",
+    [
+        # A dict indexed by position: iterating it yields keys, not values.
+        (
+            "def f():\n    d = {0: 'a', 1: 'b'}\n    out = []\n    for i in range(len(d)):\n"
+            "        out.append(d[i])\n    return out\n",
+            (),
+        ),
+        # A parameter could be any type with __len__/__getitem__.
+        (
+            "def f(seq):\n    out = []\n    for i in range(len(seq)):\n"
+            "        out.append(seq[i])\n    return out\n",
+            ({0: "a", 1: "b"},),
+        ),
+        # An alias could grow the list mid-loop.
+        (
+            "def f():\n    seq = [1, 2]\n    alias = seq\n    out = []\n"
+            "    for i in range(len(seq)):\n"
+            "        out.append(seq[i])\n        alias.append(0) if i == 0 else None\n"
+            "    return out\n",
+            (),
+        ),
+        # Shadowed builtins.
+        (
+            "def len(x):\n    return 1\n\n\ndef f():\n    seq = [5, 6]\n    out = []\n"
+            "    for i in range(len(seq)):\n        out.append(seq[i])\n    return out\n",
+            (),
+        ),
+        # An unhashable value is fine in a list but a TypeError in a set.
+        ("def f(x):\n    return x in [1, 2]\n", ([1],)),
+        ("def f():\n    x = []\n    return x in [1, 2]\n", ()),
+        ("def f(xs):\n    return [x in [1, 2] for x in xs]\n", ([[1], 1],)),
+        # 1 and 1.0 would merge in a set.
+        ("def f():\n    return 1 in [1, 1.0]\n", ()),
+        # The join after the loop is skipped when the except lets the function go on.
+        (
+            "def f(items):\n    try:\n        out = ''\n        for x in items:\n"
+            "            out += str(10 // x)\n"
+            "    except ZeroDivisionError:\n        pass\n    return out\n",
+            ([1, 2, 0],),
+        ),
+        (
+            "import contextlib\n\n\ndef f(items):\n    out = 'x'\n"
+            "    with contextlib.suppress(ZeroDivisionError):\n"
+            "        out = ''\n        for x in items:\n            out += str(10 // x)\n"
+            "    return out\n",
+            ([1, 0],),
+        ),
+        # A closure sees the string while the loop runs.
+        (
+            "def f(items):\n    out = ''\n    def peek():\n        return len(out)\n"
+            "    for x in items:\n"
+            "        out += str(peek())\n    return out\n",
+            ([1, 2],),
+        ),
+        # Mutated in the loop body.
+        (
+            "def f():\n    seq = [1, 2]\n    for i in range(len(seq)):\n"
+            "        seq.append(seq[i])\n"
+            "        if i > 3:\n            break\n    return seq\n",
+            (),
+        ),
+    ],
+)
+def test_rules_skip_unprovable_patterns(code, args):
+    assert apply_rules(code, ALL) == (code, [])
+    _run(code, *args)  # the counterexample itself runs fine unrewritten
+
+
+def test_unsafe_rules_were_removed():
+    # sorted(x)[0] -> min(x) raises ValueError instead of IndexError on empty input and
+    # breaks if ``sorted`` is shadowed; hoisting ``obj.method`` out of a loop evaluates the
+    # attribute (AttributeError) or name (NameError) even when the loop runs zero times.
+    assert "sorted-index-min-max" not in RULES and "hoist-method-lookup" not in RULES
+    with pytest.raises(ValueError):
+        apply_rules("x = sorted([])[0]\n", ["sorted-index-min-max"])
+
+
+def test_explicit_rules_and_errors():
+    code = "def f(n):\n    s = ''\n    for i in range(n):\n        s += str(i)\n    return s\n"
+    out, applied = apply_rules(code, ["str-join-accumulate"])
+    assert [a.rule for a in applied] == ["str-join-accumulate"]
+    assert _run(out, 12) == _run(code, 12)
+    assert apply_rules("def broken(:\n") == ("def broken(:\n", [])
+    with pytest.raises(ValueError):
+        apply_rules(code, ["no-such-rule"])
+
+
+@pytest.mark.parametrize("name", sorted(RULES))
+def test_each_rule_matches_its_benchmark_sample(name):
+    result = bench_rule(name, n=2000, repeats=1)
+    assert result.same_result
+    assert result.before_s > 0 and result.after_s > 0
@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from euri_codegen.sandbox import SandboxError, SandboxLimits, run_limited, verify_dir
+
+MODULE = "def add(a, b):\n    return a + b\n"
+
+
+def _write(tmp_path, topic, module, tests):
+    (tmp_path / f"{topic}.py").write_text(module, encoding="utf-8")
+    (tmp_path / f"test_{topic}.py").write_text(tests, encoding="utf-8")
+
+
+def test_verify_dir_isolates_failures_and_hangs(tmp_path):
+    _write(
+        tmp_path,
+        "good",
+        MODULE,
+        "from good import add\n\ndef test_add():\n    assert add(1, 2) == 3\n",
+    )
+    _write(
+        tmp_path,
+        "bad",
+        MODULE,
+        "from bad import add\n\ndef test_add():\n    assert add(1, 2) == 4\n",
+    )
+    _write(
+        tmp_path,
+        "hang",
+        "def spin():\n    while True:\n        pass\n",
+        "from hang import spin\n\ndef test_spin():\n    spin()\n",
+    )
+    seen = []
+    results = verify_dir(
+        tmp_path,
+        limits=SandboxLimits(wall_seconds=20, cpu_seconds=2),
+        workers=3,
+        on_result=seen.append,
+    )
+    status = {r.topic: r.status for r in results}
+    assert status == {"bad": "failed", "good": "passed", "hang": "timeout"}
+    assert [r.topic for r in results] == ["bad", "good", "hang"] and len(seen) == 3
+    assert results[1].passed == 1 and results[0].failed == 1
+
+
+def test_limits_apply_inside_the_child(tmp_path):
+    _write(
+        tmp_path,
+        "greedy",
+        "def grab():\n    return bytearray(400 * 1024 * 1024)\n",
+        "from greedy import grab\n\ndef test_grab():\n    grab()\n",
+    )
+    (run,) = verify_dir(tmp_path, limits=SandboxLimits(wall_seconds=20, memory_mb=256))
+    assert run.status == "failed" and "MemoryError" in run.output
+
+
+def _boom(x):
+    raise ValueError(f"bad {x}")
+
+
+def test_run_limited_returns_results_and_contains_failures():
+    assert run_limited(divmod, 7, 2) == (3, 1)
+    with pytest.raises(SandboxError, match="ValueError: bad 1"):
+        run_limited(_boom, 1)
+    start = time.perf_counter()
+    with pytest.raises(SandboxError, match="timed out"):
+        run_limited(time.sleep, 30, limits=SandboxLimits(wall_seconds=0.5))
+    assert time.perf_counter() - start < 10
+    with pytest.raises(SandboxError, match="MemoryError"):
+        run_limited(bytearray, 512 * 1024 * 1024, limits=SandboxLimits(memory_mb=256))
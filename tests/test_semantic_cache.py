@@ -0,0 +1,140 @@
+from euri_codegen.codegen.generator import explain_code, explain_code_stream
+from euri_codegen.codegen.optimizer import optimize_code, optimize_code_chunked, settle_optimized
+from euri_codegen.semantic_cache import SemanticCache, normalize
+
+MODULE = '''import math
+
+
+def area(r):
+    """Area of a circle."""
+    return math.pi * r * r
+
+
+def total(xs):
+    s = 0
+    for x in xs:
+        s += x
+    return s
+'''
+
+# Same code: other docstring, comments and formatting.
+REFORMATTED = '''import math
+def area(r):
+    # circle
+    return math.pi*r*r
+def total(xs):
+    """Sum."""
+    s = 0
+    for x in xs:   s += x
+    return s
+'''
+
+
+class CachingEuri:
+    """Fake Euri with a semantic cache; 'optimizes' by swapping ``s`` for ``acc``."""
+
+    model = "test-model"
+    refresh = False
+
+    def __init__(self, cache):
+        self.semantic = cache
+        self.prompts = []
+
+    def complete(self, prompt, *, stage=None, **kwargs):
+        self.prompts.append((stage, prompt))
+        if stage == "explain":
+            return "It computes areas and sums."
+        if stage == "optimize-chunk":
+            body = prompt.split("Definition(s) to optimize:\n", 1)[1].rsplit("\n\nOutput ONLY", 1)[
+                0
+            ]
+            for old, new in (
+                ("s = 0", "acc = 0"),
+                ("s += x", "acc += x"),
+                ("return s", "return acc"),
+            ):
+                body = body.replace(old, new)
+            return body
+        return "```python\nimport math\n\n\ndef area(r):\n    return math.pi * r ** 2\n```"
+
+    def complete_stream(self, prompt, **kwargs):
+        from euri_codegen.euri_client import CompletionStream
+
+        return CompletionStream([self.complete(prompt, **kwargs)])
+
+
+def test_normalize_ignores_formatting_comments_and_docstrings():
+    assert normalize(MODULE) == normalize(REFORMATTED)
+    assert normalize(MODULE) != normalize(MODULE.replace("r * r", "r ** 2"))
+    assert normalize("def broken(:\n") is None
+
+
+def test_store_evicts_counts_and_invalidates(tmp_path):
+    cache = SemanticCache(tmp_path / "semantic.sqlite3", max_entries=2)
+    keys = [SemanticCache.key("explain", f"x = {i}\n", model="m") for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, f"text {i}", kind="explain", model="m")
+    assert cache.get(keys[0], "explain") is None  # least recently used, evicted
+    assert cache.get(keys[2], "explain") == "text 2"
+    key = SemanticCache.key("optimize", "y = 1\n", model="m", level="all")
+    cache.put(key, "y = 1", kind="optimize", model="m")
+    cache.close()
+
+    reopened = SemanticCache(tmp_path / "semantic.sqlite3")
+    stats = reopened.stats()
+    assert stats["kinds"]["explain"]["hits"] == 1 and stats["kinds"]["explain"]["misses"] == 1
+    assert stats["entries"] == 2
+    assert reopened.invalidate(kind="explain") == 1
+    assert reopened.stats()["entries"] == 1
+    assert reopened.invalidate() == 1 and reopened.stats()["hits"] == 0
+
+
+def test_reformatted_file_reuses_optimize_and_explain_results(tmp_path):
+    euri = CachingEuri(SemanticCache(tmp_path / "semantic.sqlite3"))
+    first = optimize_code(euri, MODULE, level="all")
+    assert optimize_code(euri, REFORMATTED, level="all") == first
+    assert (
+        optimize_code(euri, REFORMATTED, level="memory") == first
+    )  # the level is part of the key...
+    assert len(euri.prompts) == 2  # ...so that one was a miss
+    assert optimize_code(euri, REFORMATTED, level="all", feedback="too slow") == first
+    assert len(euri.prompts) == 3  # retries with feedback are never served from the cache
+
+    assert explain_code(euri, MODULE) == "It computes areas and sums."
+    stream = explain_code_stream(euri, REFORMATTED)
+    assert "".join(stream) == "It computes areas and sums." and stream.cached
+    assert len(euri.prompts) == 4
+
+
+def test_chunked_optimize_only_sends_changed_definitions(tmp_path):
+    euri = CachingEuri(SemanticCache(tmp_path / "semantic.sqlite3"))
+    first = optimize_code_chunked(
+        euri, MODULE, target_chars=10_000
+    )  # both definitions in one chunk
+    assert "acc += x" in first and len(euri.prompts) == 1
+
+    edited = REFORMATTED.replace("math.pi*r*r", "r * r * math.pi")
+    second = optimize_code_chunked(euri, edited, target_chars=10_000)
+    ((stage, prompt),) = euri.prompts[1:]
+    sent = prompt.split("Definition(s) to optimize:", 1)[1]
+    assert stage == "optimize-chunk" and "def area" in sent and "def total" not in sent
+    assert "acc += x" in second and "r * r * math.pi" in second
+
+    assert optimize_code_chunked(euri, MODULE, target_chars=10_000) == first
+    assert len(euri.prompts) == 2
+    kinds = euri.semantic.stats()["kinds"]
+    assert kinds["optimize-def"]["hits"] == 3 and kinds["optimize-def"]["entries"] == 3
+
+
+def test_gated_rewrites_are_cached_only_once_accepted(tmp_path):
+    euri = CachingEuri(SemanticCache(tmp_path / "semantic.sqlite3"))
+    optimize_code(euri, MODULE, store_result=False)
+    optimize_code(euri, MODULE, store_result=False)
+    assert len(euri.prompts) == 2  # unverified rewrites are not stored
+
+    settle_optimized(euri, MODULE, "accepted = True")
+    assert optimize_code(euri, REFORMATTED, store_result=False) == "accepted = True"
+    assert optimize_code(euri, REFORMATTED) == "accepted = True" and len(euri.prompts) == 2
+
+    settle_optimized(euri, MODULE, None)  # the gate rejected the cached rewrite: forget it
+    assert optimize_code(euri, MODULE) != "accepted = True" and len(euri.prompts) == 3
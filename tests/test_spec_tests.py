@@ -0,0 +1,88 @@
+import threading
+import time
+
+from euri_codegen.catalog_loader import load_catalog
+from euri_codegen.codegen.generator import generate_code_for_topic
+from euri_codegen.codegen.spec_tests import LLM_TESTS_MARKER, merge_test_modules, spec_test_module
+from euri_codegen.sandbox import run_pytest_isolated
+
+TWO_SUM = """def two_sum(nums, target):
+    seen = {}
+    for i, x in enumerate(nums):
+        if target - x in seen:
+            return (seen[target - x], i)
+        seen[x] = i
+    return None
+"""
+
+
+def _spec(topic):
+    return next(s for s in load_catalog() if s["id"] == topic)
+
+
+def test_example_tests_pass_for_correct_code_and_fail_for_wrong_code():
+    tests = spec_test_module(_spec("two_sum"))
+    ok = run_pytest_isolated(
+        "two_sum", {"two_sum.py": TWO_SUM, "test_two_sum.py": tests}, "test_two_sum.py"
+    )
+    assert ok.ok and ok.passed == 3  # exists + two examples; tuple result matches JSON list
+    wrong = TWO_SUM.replace("(seen[target - x], i)", "(i, seen[target - x])")
+    bad = run_pytest_isolated(
+        "two_sum", {"two_sum.py": wrong, "test_two_sum.py": tests}, "test_two_sum.py"
+    )
+    assert not bad.ok and bad.failed == 2
+
+
+def test_merge_keeps_future_imports_first():
+    merged = merge_test_modules(
+        spec_test_module(_spec("lru_cache")),
+        "from __future__ import annotations\nimport lru_cache\n",
+    )
+    assert merged.startswith("from __future__ import annotations\n")
+    assert LLM_TESTS_MARKER in merged
+    compile(merged, "test_lru_cache.py", "exec")
+
+
+DEFS = (
+    "def binary_search(nums, target):\n    return -1\n\n\n"
+    "def dijkstra(n, edges, src):\n    return []\n"
+)
+
+
+class RecordingEuri:
+    def __init__(self):
+        self.stages = []
+        self.active = 0
+        self.overlapped = False
+        self._lock = threading.Lock()
+
+    def complete(self, prompt, *, stage=None, **kwargs):
+        with self._lock:
+            self.stages.append(stage)
+            self.active += 1
+            self.overlapped |= self.active > 1
+        time.sleep(0.05)
+        with self._lock:
+            self.active -= 1
+        return (
+            "import binary_search\n\ndef test_extra():\n    assert True"
+            if stage == "tests"
+            else DEFS
+        )
+
+
+def test_llm_tests_modes(tmp_path):
+    spec = _spec("binary_search")
+    euri = RecordingEuri()
+    _, test_path = generate_code_for_topic(euri, spec, tmp_path)
+    assert euri.stages == ["generate"]
+    assert "test_spec_example" in test_path.read_text(encoding="utf-8")
+
+    euri = RecordingEuri()
+    _, test_path = generate_code_for_topic(euri, spec, tmp_path, llm_tests="always")
+    assert sorted(euri.stages) == ["generate", "tests"] and euri.overlapped
+    assert "def test_extra" in test_path.read_text(encoding="utf-8")
+
+    euri = RecordingEuri()
+    generate_code_for_topic(euri, _spec("dijkstra"), tmp_path, llm_tests="never")
+    assert euri.stages == ["generate"]
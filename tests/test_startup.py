@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from euri_codegen.perf.startup import import_times
+
+SRC = str(Path(__file__).resolve().parents[1] / "src")
+ENV = dict(os.environ, PYTHONPATH=SRC + os.pathsep + os.environ.get("PYTHONPATH", ""))
+
+# Generous budget: the CLI module itself should import in well under this on any CI box.
+STARTUP_BUDGET_US = 400_000
+
+
+def test_cli_import_time_within_budget():
+    times = import_times("euri_codegen.cli", env=ENV)
+    assert "euriai" not in times and "streamlit" not in times
+    assert times["euri_codegen.cli"] < STARTUP_BUDGET_US
+
+
+def test_offline_commands_never_import_network_stack():
+    script = (
+        "import sys\n"
+        "from typer.testing import CliRunner\n"
+        "from euri_codegen.cli import app\n"
+        "runner = CliRunner()\n"
+        "for args in (['list-topics'], ['validate-catalog'], ['models'],\n"
+        "             ['new-spec', '--id', 'x', '--title', 't', '--summary', 's', '--signature', "
+        "'def x():']):\n"
+        "    assert runner.invoke(app, args).exit_code == 0, args\n"
+        "print(sorted(m for m in ('euriai', 'streamlit', 'requests') if m in sys.modules))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", script], env=ENV, capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == "[]"
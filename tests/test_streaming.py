@@ -0,0 +1,54 @@
+import json
+import random
+
+import pytest
+
+from euri_codegen.codegen.generator import _strip_code_fences, strip_code_fences_stream
+from euri_codegen.config import Settings
+from euri_codegen.euri_client import Euri
+
+SAMPLES = [
+    "```python\ndef f():\n    return 1\n```",
+    "  \n```py\nx = '```'\n```\n\n",
+    "```\nprint('a')\n```python\nprint('b')\n```  \n",
+    "plain text, no fences  \n\n",
+    "```python\nonly header",
+    "```",
+    "``",
+    "",
+    "```python\n\n\n  code\n\n```",
+    "   ```\nbody\n``` trailing words",
+]
+
+
+def _chunks(text, rng):
+    out, i = [], 0
+    while i < len(text):
+        n = rng.randint(1, 5)
+        out.append(text[i : i + n])
+        i += n
+    return out
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_stream_stripping_matches_batch(text):
+    rng = random.Random(0)
+    for _ in range(50):
+        streamed = "".join(strip_code_fences_stream(_chunks(text, rng)))
+        assert streamed == _strip_code_fences(text)
+
+
+class StreamingClient:
+    def stream_completion(self, **params):
+        for part in ["```python\n", "x = ", "1\n", "```"]:
+            yield "data: " + json.dumps({"choices": [{"delta": {"content": part}}]})
+        yield "data: [DONE]"
+
+
+def test_complete_stream_records_timing():
+    euri = Euri(Settings(api_key="test"))
+    euri._client = StreamingClient()
+    stream = euri.complete_stream("hi")
+    assert "".join(strip_code_fences_stream(stream)) == "x = 1"
+    assert stream.text == "```python\nx = 1\n```"
+    assert stream.ttft is not None and stream.total_seconds >= stream.ttft
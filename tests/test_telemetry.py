@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+from euri_codegen.cache import CompletionCache
+from euri_codegen.config import Settings
+from euri_codegen.euri_client import Euri
+from euri_codegen.resilience import Resilience
+from euri_codegen.telemetry import CallRecord, Telemetry, aggregate, load_records, prometheus_text
+
+
+class UsageClient:
+    def __init__(self, fail_first=0):
+        self.fail_first = fail_first
+
+    def generate_completion(self, **params):
+        if self.fail_first:
+            self.fail_first -= 1
+            raise ConnectionError("reset")
+        return {
+            "choices": [{"message": {"content": "def f(): pass"}}],
+            "usage": {"prompt_tokens": 11, "completion_tokens": 7},
+        }
+
+    def stream_completion(self, **params):
+        yield "data: " + json.dumps({"choices": [{"delta": {"content": "abcdefgh"}}]})
+        yield "data: [DONE]"
+
+
+def _euri(tmp_path, client, cache=None):
+    telemetry = Telemetry(tmp_path / "t.jsonl", command="generate")
+    euri = Euri(
+        Settings(api_key="test", model="m"),
+        cache=cache,
+        resilience=Resilience(base_delay=0.001),
+        telemetry=telemetry,
+    )
+    euri._client = client
+    return euri
+
+
+def test_records_usage_retries_cache_hits_and_streams(tmp_path):
+    euri = _euri(tmp_path, UsageClient(fail_first=1), cache=CompletionCache(tmp_path / "c.sqlite3"))
+    euri.complete("prompt", stage="generate", topic="two_sum")
+    euri.complete("prompt", stage="generate", topic="two_sum")
+    stream = euri.complete_stream("other prompt", stage="explain")
+    assert "".join(stream) == "abcdefgh"
+
+    live, hit, streamed = load_records(tmp_path / "t.jsonl")
+    assert (live.stage, live.topic, live.command, live.model) == (
+        "generate",
+        "two_sum",
+        "generate",
+        "m",
+    )
+    assert (live.prompt_tokens, live.completion_tokens, live.tokens_estimated) == (11, 7, False)
+    assert live.retries == 1 and not live.cached and live.latency_s > 0
+    assert hit.cached and hit.retries == 0
+    assert streamed.streamed and streamed.ttft_s is not None and streamed.completion_tokens == 2
+
+
+def test_failed_call_is_recorded(tmp_path):
+    euri = _euri(tmp_path, UsageClient(fail_first=10))
+    euri._resilience = Resilience(base_delay=0.001, max_attempts=2)
+    with pytest.raises(ConnectionError):
+        euri.complete("prompt", stage="optimize")
+    (rec,) = load_records(tmp_path / "t.jsonl")
+    assert rec.status == "error" and rec.retries == 1 and "reset" in rec.error
+
+
+def test_aggregate_percentiles_and_prometheus(tmp_path):
+    path = tmp_path / "t.jsonl"
+    sink = Telemetry(path)
+    for i in range(1, 101):
+        sink.record(
+            CallRecord(stage="generate", model="m", latency_s=i / 100, completion_tokens=10)
+        )
+    sink.record(CallRecord(stage="generate", model="m", cached=True))
+    path.open("a").write("{truncated\n")
+    (s,) = aggregate(load_records(path))
+    assert (s.calls, s.cached, s.p50_s, s.p95_s, s.p99_s) == (101, 1, 0.5, 0.95, 0.99)
+    assert s.completion_tokens == 1000 and s.tokens_per_s == pytest.approx(1000 / 50.5)
+    text = prometheus_text([s])
+    assert 'euri_llm_calls_total{stage="generate",model="m",outcome="cached"} 1' in text
+    assert 'euri_llm_latency_seconds{stage="generate",model="m",quantile="0.95"} 0.950000' in text
+
+
+def test_log_is_rotated_at_max_bytes_and_both_files_are_read(tmp_path):
+    path = tmp_path / "t.jsonl"
+    telemetry = Telemetry(path, max_bytes=1000)
+    for i in range(30):
+        telemetry.record(CallRecord(stage="generate", model="m", topic=str(i)))
+    rotated = tmp_path / "t.jsonl.1"
+    assert path.stat().st_size < 1000 + 400 and rotated.stat().st_size < 1000 + 400
+    topics = [r.topic for r in load_records(path)]
+    assert topics == [
+        str(i) for i in range(30 - len(topics), 30)
+    ]  # the oldest were dropped, in order
+    assert len(topics) < 30